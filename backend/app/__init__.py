@@ -8,10 +8,11 @@ from logging.handlers import RotatingFileHandler
 from flask import Flask
 from flask_cors import CORS
 from datetime import datetime
-from backend.scripts.auto_sync import auto_sync_all, start_scheduler 
 
 # Imports absolus depuis backend
-from backend.extensions import db, jwt, migrate
+from backend.extensions import db, jwt, migrate, limiter
+from backend.utils.uploads import UploadRequest
+from backend.utils.json_provider import make_json_provider
 
 def create_app(config_class):
     """Crée et configure l'application Flask."""
@@ -19,15 +20,59 @@ def create_app(config_class):
     # Création de l'application
     app = Flask(__name__)
     app.config.from_object(config_class)
-    auto_sync_all()  # Lance immédiatement une première synchro
-    start_scheduler(app)  # 
-    
+    # Fichiers téléversés écrits sur disque au fil de la réception, plafonds par route
+    app.request_class = UploadRequest
+    # Sérialisation JSON des réponses (orjson si disponible)
+    app.json = make_json_provider(app)
     app.jinja_env.globals['datetime'] = datetime
 
     # Initialisation des extensions
+    from backend.utils import database
+    database.init_app(app)
     db.init_app(app)
+    database.configure_engines(app, db)
+    from backend.utils.replicas import replica_router
+    replica_router.init_app(app)
     jwt.init_app(app)
-    migrate.init_app(app, db)
+    from backend.app.schema import MIGRATIONS_DIR
+    migrate.init_app(app, db, directory=MIGRATIONS_DIR)
+    limiter.init_app(app)
+
+    from backend.services.password_hasher import password_hasher
+    password_hasher.configure(app.config)
+
+    from backend.services.prompt_builder import prompt_builder
+    prompt_builder.configure(app.config)
+
+    from backend.services.document_analyzer import document_analyzer
+    document_analyzer.configure(app.config)
+
+    from backend.services.pdf_extractor import pdf_extractor
+    pdf_extractor.configure(app.config)
+
+    from backend.services.analysis_cache import analysis_cache
+    analysis_cache.configure(app.config)
+
+    from backend.utils.http_cache import response_cache
+    response_cache.configure(app.config)
+
+    from backend.utils.compression import compressor
+    compressor.init_app(app)
+
+    from backend.services.message_writer import message_writer
+    message_writer.init_app(app)
+
+    from backend.services.job_queue import job_queue
+    import backend.services.document_jobs  # noqa: F401  (enregistre les traitements de la file)
+    job_queue.init_app(app)
+
+    # Synchronisation différée (thread) et scheduler, selon la configuration
+    from backend.scripts import auto_sync
+    auto_sync.init_app(app)
+
+    # Commandes d'exploitation : flask massy bootstrap / schema-status
+    from backend.app.cli import massy_cli
+    app.cli.add_command(massy_cli)
 
     # Configuration CORS
     CORS(app, origins=app.config.get('CORS_ORIGINS', "*"))
@@ -41,14 +86,16 @@ def create_app(config_class):
         """
         return str(user)
 
+    from backend.services.user_cache import user_cache
+    user_cache.configure(app.config)
+
     @jwt.user_lookup_loader
     def user_lookup_callback(_jwt_header, jwt_data):
         """
-        Récupère l'objet User complet à partir de l'ID stocké dans le JWT.
+        Récupère l'utilisateur à partir de l'ID stocké dans le JWT.
+        Servi par le cache processus : aucune requête SQL tant que l'entrée est valide.
         """
-        from backend.models.user import User
-        identity = jwt_data["sub"]
-        return User.query.filter_by(id=identity).one_or_none()
+        return user_cache.get(jwt_data["sub"])
 
     # Enregistrement des blueprints
     try:
@@ -62,6 +109,9 @@ def create_app(config_class):
         from backend.routes.chatbot import chatbot_bp
         from backend.routes.media import media_bp
         from backend.routes.news import news_bp
+        from backend.routes.market_analysis import market_bp
+        from backend.routes.urbanism import urbanism_bp
+        from backend.routes.jobs import jobs_bp
         
 
         
@@ -76,6 +126,9 @@ def create_app(config_class):
         app.register_blueprint(chatbot_bp , url_prefix='/api/chatbot')
         app.register_blueprint(media_bp , url_prefix='/api/media')
         app.register_blueprint(news_bp , url_prefix='/api/news')
+        app.register_blueprint(market_bp, url_prefix='/api/market')
+        app.register_blueprint(urbanism_bp, url_prefix='/api/urbanism')
+        app.register_blueprint(jobs_bp, url_prefix='/api/jobs')
 
     except Exception as e:
         app.logger.error(f"Erreur lors du chargement des blueprints: {str(e)}")
@@ -106,6 +159,14 @@ def create_app(config_class):
     def page_not_found(e):
         return {"success": False, "message": "Ressource non trouvée", "status": 404}, 404
 
+    @app.errorhandler(413)
+    def request_entity_too_large(e):
+        return {"success": False, "message": "Requête trop volumineuse", "status": 413}, 413
+
+    @app.errorhandler(429)
+    def too_many_requests(e):
+        return {"success": False, "message": "Trop de requêtes, réessayez plus tard", "status": 429}, 429
+
     @app.errorhandler(500)
     def internal_server_error(e):
         return {"success": False, "message": "Erreur interne du serveur", "status": 500}, 500
@@ -0,0 +1,52 @@
+"""
+Commandes d'exploitation : `flask massy ...`
+
+Usage (depuis la racine du dépôt) :
+    FLASK_APP=backend.wsgi flask massy bootstrap
+    FLASK_APP=backend.wsgi flask massy schema-status
+    FLASK_APP=backend.wsgi flask massy rebuild-heatmap
+
+`bootstrap` s'exécute une fois par déploiement (étape de release), avant le
+redémarrage des workers ; ceux-ci ne font que vérifier la version du schéma.
+"""
+
+import click
+from flask.cli import AppGroup
+
+from backend.app.schema import MIGRATIONS_DIR, SchemaMismatchError, bootstrap, schema_status
+from backend.extensions import db
+
+massy_cli = AppGroup('massy', help="Commandes d'exploitation de la plateforme Massy IA.")
+
+
+@massy_cli.command('bootstrap')
+@click.option('--directory', default=MIGRATIONS_DIR, show_default=True, help="Dossier des migrations Alembic.")
+def bootstrap_command(directory):
+    """Applique les migrations et crée les tables manquantes (idempotent)."""
+    try:
+        result = bootstrap(directory)
+    except SchemaMismatchError as e:
+        raise click.ClickException(str(e))
+    state = "mis à jour" if result['changed'] else "déjà à jour"
+    click.echo(f"Schéma {state} (empreinte {result['fingerprint'][:12]}, révision {result['revision'] or 'aucune'})")
+
+
+@massy_cli.command('schema-status')
+def schema_status_command():
+    """Compare le schéma enregistré aux modèles ; code de sortie 1 si différent."""
+    status = schema_status()
+    click.echo(f"Attendu  : {status['expected'][:12]}")
+    click.echo(f"Appliqué : {(status['applied'] or 'aucun')[:12]} (révision {status['revision'] or 'aucune'})")
+    if not status['up_to_date']:
+        raise click.exceptions.Exit(1)
+
+
+@massy_cli.command('rebuild-heatmap')
+@click.option('--batch-size', default=5000, show_default=True, help="Alertes lues par lot.")
+def rebuild_heatmap_command(batch_size):
+    """Complète les geohash manquants et recalcule la carte de densité des alertes."""
+    from backend.services.alert_ingestion import rebuild_alert_heatmap
+
+    with db.engine.begin() as connection:
+        result = rebuild_alert_heatmap(connection, batch_size)
+    click.echo(f"{result['alerts_indexed']} alerte(s) indexée(s), {result['geohash_backfilled']} geohash complété(s)")
@@ -0,0 +1,214 @@
+"""
+Version du schéma de base de données.
+
+`flask massy bootstrap` (voir backend/app/cli.py) applique le schéma une fois par
+déploiement : migrations Alembic s'il y en a, création des tables manquantes,
+vérification de la base réelle (colonnes, types, nullabilité, index), puis
+enregistrement de l'empreinte des modèles dans la table `schema_version`.
+Au démarrage, un worker se contente de comparer cette empreinte à celle du code
+(lecture d'une ligne) : aucune opération de schéma, aucune sérialisation entre
+workers lors d'un redémarrage progressif.
+"""
+
+import contextlib
+import hashlib
+import os
+from typing import Optional
+
+import sqlalchemy as sa
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+from backend.extensions import db
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'migrations')
+
+# Verrou consultatif PostgreSQL : un seul bootstrap à la fois sur une base partagée
+_ADVISORY_LOCK_KEY = 0x4D415353  # 'MASS'
+
+
+class SchemaMismatchError(RuntimeError):
+    """Schéma absent, périmé ou incomplet par rapport aux modèles"""
+
+
+# Familles de types comparées entre modèles et base réfléchie (l'ordre compte : Boolean et
+# Enum avant leurs types parents éventuels). La longueur ou la précision ne sont pas vérifiées.
+_TYPE_FAMILIES = (
+    (sa.Boolean, 'boolean'), (sa.Enum, 'string'), (sa.JSON, 'json'), (sa.Integer, 'integer'),
+    (sa.Numeric, 'numeric'), (sa.DateTime, 'datetime'), (sa.Date, 'date'), (sa.Time, 'time'),
+    (sa.LargeBinary, 'binary'), (sa.Uuid, 'uuid'), (sa.String, 'string'),
+)
+
+
+def _type_family(column_type, dialect) -> Optional[str]:
+    if isinstance(column_type, sa.types.TypeDecorator):
+        column_type = column_type.load_dialect_impl(dialect)
+    for generic, family in _TYPE_FAMILIES:
+        if isinstance(column_type, generic):
+            return family
+    return None  # Type non reconnu (NullType réfléchi…) : non comparé
+
+
+def schema_fingerprint() -> str:
+    """
+    Empreinte de ce que le bootstrap vérifie : tables, colonnes (famille de type,
+    nullabilité, clé primaire) et index déclarés par les modèles.
+    """
+    import backend.models  # noqa: F401  (toutes les tables dans la métadonnée)
+
+    dialect = db.engine.dialect
+    digest = hashlib.sha256()
+    for table in sorted(db.metadata.tables.values(), key=lambda t: t.name):
+        digest.update(f"T:{table.name}\n".encode())
+        for column in sorted(table.columns, key=lambda c: c.name):
+            digest.update(f"C:{column.name}:{_type_family(column.type, dialect)}:{column.nullable}:"
+                          f"{column.primary_key}\n".encode())
+        for index in sorted(table.indexes, key=lambda i: i.name or ''):
+            digest.update(f"I:{index.name}:{','.join(c.name for c in index.columns)}:{index.unique}\n".encode())
+    return digest.hexdigest()
+
+
+def alembic_head(directory: str = MIGRATIONS_DIR) -> Optional[str]:
+    """Révision de tête des migrations, None s'il n'y a aucune migration"""
+    versions = os.path.join(directory, 'versions')
+    if not os.path.isdir(versions) or not any(name.endswith('.py') for name in os.listdir(versions)):
+        return None
+    from alembic.config import Config as AlembicConfig
+    from alembic.script import ScriptDirectory
+
+    alembic_config = AlembicConfig(os.path.join(directory, 'alembic.ini'))
+    alembic_config.set_main_option('script_location', directory)
+    return ScriptDirectory.from_config(alembic_config).get_current_head()
+
+
+def stored_version():
+    """Ligne de `schema_version`, None si la base n'a jamais été initialisée"""
+    from backend.models import SchemaVersion
+    try:
+        return db.session.get(SchemaVersion, 1)
+    except (OperationalError, ProgrammingError):
+        db.session.rollback()
+        return None
+
+
+def schema_status() -> dict:
+    current = stored_version()
+    expected = schema_fingerprint()
+    return {
+        'expected': expected,
+        'applied': current.fingerprint if current else None,
+        'revision': current.revision if current else None,
+        'up_to_date': current is not None and current.fingerprint == expected
+    }
+
+
+def check_schema(app, mode: Optional[str] = None) -> bool:
+    """
+    Vérification O(1) au démarrage d'un worker.
+    mode 'off' : aucune vérification ; 'warn' : avertissement ; 'strict' : SchemaMismatchError.
+    """
+    mode = mode or app.config.get('SCHEMA_CHECK', 'warn')
+    if mode == 'off':
+        return True
+    with app.app_context():
+        try:
+            status = schema_status()
+        finally:
+            db.session.remove()
+    if status['up_to_date']:
+        return True
+    if status['applied'] is None:
+        message = "Base non initialisée : lancer `flask massy bootstrap`"
+    else:
+        message = "Schéma de la base différent des modèles : lancer `flask massy bootstrap`"
+    if mode == 'strict':
+        raise SchemaMismatchError(message)
+    app.logger.warning(message)
+    return False
+
+
+@contextlib.contextmanager
+def _bootstrap_lock():
+    if db.engine.dialect.name != 'postgresql':
+        yield
+        return
+    with db.engine.connect() as connection:
+        connection.execute(sa.text('SELECT pg_advisory_lock(:key)'), {'key': _ADVISORY_LOCK_KEY})
+        try:
+            yield
+        finally:
+            connection.execute(sa.text('SELECT pg_advisory_unlock(:key)'), {'key': _ADVISORY_LOCK_KEY})
+
+
+def schema_drift() -> list:
+    """
+    Écarts entre les modèles et la base réelle sur tout ce que couvre l'empreinte :
+    colonnes absentes, famille de type, nullabilité, clé primaire, index absents ou différents.
+    create_all ne corrige aucun de ces écarts sur une table existante.
+    """
+    inspector = sa.inspect(db.engine)
+    dialect = db.engine.dialect
+    drift = []
+    for table in db.metadata.sorted_tables:
+        existing = {column['name']: column for column in inspector.get_columns(table.name)}
+        primary_key = set(inspector.get_pk_constraint(table.name).get('constrained_columns') or ())
+        for column in table.columns:
+            name = f"{table.name}.{column.name}"
+            reflected = existing.get(column.name)
+            if reflected is None:
+                drift.append(f"{name} absente")
+                continue
+            expected, actual = _type_family(column.type, dialect), _type_family(reflected['type'], dialect)
+            if expected and actual and expected != actual:
+                drift.append(f"{name} de type {actual} au lieu de {expected}")
+            if column.primary_key != (column.name in primary_key):
+                drift.append(f"{name} : clé primaire différente")
+            elif not column.primary_key and column.nullable != reflected['nullable']:
+                drift.append(f"{name} : {'NULL' if reflected['nullable'] else 'NOT NULL'} "
+                             f"au lieu de {'NULL' if column.nullable else 'NOT NULL'}")
+
+        indexes = {index['name']: index for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            reflected = indexes.get(index.name)
+            columns = [column.name for column in index.columns]
+            if reflected is None:
+                drift.append(f"index {index.name} absent")
+            elif list(reflected['column_names']) != columns or bool(reflected['unique']) != bool(index.unique):
+                drift.append(f"index {index.name} différent")
+    return drift
+
+
+def bootstrap(directory: str = MIGRATIONS_DIR) -> dict:
+    """
+    Met la base au niveau des modèles ; idempotent.
+    Sans changement de modèle ni nouvelle migration, se limite à la lecture de `schema_version`.
+    """
+    from backend.models import SchemaVersion
+
+    expected = schema_fingerprint()
+    head = alembic_head(directory)
+    current = stored_version()
+    if current is not None and current.fingerprint == expected and current.revision == head:
+        return {'changed': False, 'fingerprint': expected, 'revision': head}
+
+    with _bootstrap_lock():
+        # Un autre déploiement a pu terminer pendant l'attente du verrou
+        db.session.expire_all()
+        current = stored_version()
+        if current is not None and current.fingerprint == expected and current.revision == head:
+            return {'changed': False, 'fingerprint': expected, 'revision': head}
+
+        if head is not None:
+            from flask_migrate import upgrade
+            upgrade(directory=directory)
+        db.create_all()
+
+        drift = schema_drift()
+        if drift:
+            raise SchemaMismatchError(f"Migration nécessaire : {', '.join(drift)}")
+
+        current = db.session.get(SchemaVersion, 1) or SchemaVersion(id=1)
+        current.fingerprint = expected
+        current.revision = head
+        db.session.add(current)
+        db.session.commit()
+    return {'changed': True, 'fingerprint': expected, 'revision': head}
@@ -0,0 +1,56 @@
+"""
+Cycle de vie des workers de production (gunicorn, voir backend/gunicorn.conf.py).
+
+Avec preload_app, create_app() s'exécute une seule fois dans le maître et les
+workers héritent de l'application par fork. Ce qui ne doit pas être partagé
+entre processus est réinitialisé dans chaque worker :
+- pools de connexions SQLAlchemy, principale et réplicas (sockets du maître) ;
+- graine du générateur aléatoire.
+Les pools de processus, threads d'écriture et workers de la file de tâches
+sont déjà recréés par PID à la première utilisation.
+"""
+
+import logging
+import random
+
+from backend.extensions import db
+from backend.utils.replicas import replica_router
+
+logger = logging.getLogger(__name__)
+
+
+def reset_after_fork(app):
+    """À appeler dans chaque worker juste après le fork (hook post_fork)"""
+    with app.app_context():
+        for engine in db.engines.values():
+            # close=False : les connexions héritées restent au maître, le worker ouvre les siennes
+            engine.dispose(close=False)
+        replica_router.dispose(close=False)
+    random.seed()
+
+
+def warm_worker(app):
+    """
+    Prépare un worker avant sa première requête (hook post_worker_init) :
+    connexion ouverte dans le pool, workers de la file de tâches démarrés,
+    cache de réponses rempli pour les chemins de SERVING_WARM_PATHS.
+    """
+    with app.app_context():
+        try:
+            with db.engine.connect() as connection:
+                connection.exec_driver_sql('SELECT 1')
+        except Exception as e:
+            logger.warning(f"Préchauffage : base indisponible ({e})")
+
+        from backend.services.job_queue import job_queue
+        if job_queue.mode == 'threads':
+            job_queue.start()
+
+    client = app.test_client()
+    for path in app.config.get('SERVING_WARM_PATHS') or ():
+        try:
+            status = client.get(path).status_code
+            if status != 200:
+                logger.warning(f"Préchauffage de {path} : statut {status}")
+        except Exception as e:
+            logger.warning(f"Préchauffage de {path} impossible : {e}")
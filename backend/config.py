@@ -22,12 +22,135 @@ class Config:
         f'sqlite:///{os.path.join(basedir, "app.db")}'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Moteur SQLAlchemy (voir backend/utils/database.py) : pool pour PostgreSQL/MySQL,
+    # pragmas par connexion pour SQLite
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 20))
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 30))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'true').lower() in ['true', 'on', '1']
+    # Réplicas de lecture (routes @read_replica, voir backend/utils/replicas.py)
+    SQLALCHEMY_REPLICA_URIS = [u.strip() for u in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if u.strip()]
+    REPLICA_MAX_LAG_SECONDS = float(os.environ.get('REPLICA_MAX_LAG_SECONDS', 5))
+    REPLICA_CHECK_INTERVAL = float(os.environ.get('REPLICA_CHECK_INTERVAL', 5))
+    REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', 10))
+    REPLICA_CONNECT_TIMEOUT = float(os.environ.get('REPLICA_CONNECT_TIMEOUT', 3))
+    # Identifiants : stockage 'string' (VARCHAR(36)) ou 'native' (uuid PostgreSQL / 16 octets),
+    # version 7 (ordonnée dans le temps) ou 4. Lu à l'import des modèles (backend/models/types.py).
+    UUID_STORAGE = os.environ.get('UUID_STORAGE', 'string').lower()
+    UUID_VERSION = int(os.environ.get('UUID_VERSION', 7))
+
+    SQLITE_JOURNAL_MODE = os.environ.get('SQLITE_JOURNAL_MODE', 'WAL')
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))
+    SQLITE_CACHE_SIZE_KB = int(os.environ.get('SQLITE_CACHE_SIZE_KB', 20000))
+
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
 
+    # Cache des utilisateurs authentifiés (secondes, 0 pour désactiver)
+    USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL', 60))
+    USER_CACHE_MAX_SIZE = int(os.environ.get('USER_CACHE_MAX_SIZE', 10000))
+
+    # Construction des prompts du chatbot
+    LLM_MAX_PROMPT_TOKENS = int(os.environ.get('LLM_MAX_PROMPT_TOKENS', 3000))
+    LLM_CONTEXT_MAX_TOKENS = int(os.environ.get('LLM_CONTEXT_MAX_TOKENS', 800))
+    CHAT_HISTORY_WINDOW = int(os.environ.get('CHAT_HISTORY_WINDOW', 12))
+    CHAT_SUMMARY_TRIGGER = int(os.environ.get('CHAT_SUMMARY_TRIGGER', 8))
+
+    # Écriture différée des messages du chatbot
+    CHAT_WRITE_BEHIND = os.environ.get('CHAT_WRITE_BEHIND', 'false').lower() in ['true', 'on', '1']
+    CHAT_WRITE_BEHIND_INTERVAL = float(os.environ.get('CHAT_WRITE_BEHIND_INTERVAL', 0.5))
+    CHAT_WRITE_BEHIND_BATCH = int(os.environ.get('CHAT_WRITE_BEHIND_BATCH', 500))
+    CHAT_WRITE_BEHIND_MAX_PENDING = int(os.environ.get('CHAT_WRITE_BEHIND_MAX_PENDING', 10000))
+    CHAT_WRITE_BEHIND_SPILL_PATH = os.environ.get('CHAT_WRITE_BEHIND_SPILL_PATH')
+    CHAT_WRITE_BEHIND_MAX_ATTEMPTS = int(os.environ.get('CHAT_WRITE_BEHIND_MAX_ATTEMPTS', 3))
+    CHAT_WRITE_BEHIND_DEAD_LETTER_PATH = os.environ.get('CHAT_WRITE_BEHIND_DEAD_LETTER_PATH')
+
     MISTRAL_API_KEY = os.environ.get('MISTRAL_API_KEY') or "XkQdYjuz1FvrHeotMKOs4UvWcf4cBXiC"
     OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY') or ''
 
+    # Routage LLM (modèles par palier, couverture, disjoncteurs)
+    MISTRAL_SMALL_MODEL = os.environ.get('MISTRAL_SMALL_MODEL', 'mistral-small-latest')
+    MISTRAL_LARGE_MODEL = os.environ.get('MISTRAL_LARGE_MODEL', 'mistral-medium-latest')
+    OPENAI_SMALL_MODEL = os.environ.get('OPENAI_SMALL_MODEL', 'gpt-4o-mini')
+    OPENAI_LARGE_MODEL = os.environ.get('OPENAI_LARGE_MODEL', 'gpt-4o')
+    LLM_SMALL_PROMPT_TOKENS = int(os.environ.get('LLM_SMALL_PROMPT_TOKENS', 600))
+    LLM_REQUEST_TIMEOUT = float(os.environ.get('LLM_REQUEST_TIMEOUT', 20))
+    LLM_HEDGE_AFTER_MS = float(os.environ['LLM_HEDGE_AFTER_MS']) if os.environ.get('LLM_HEDGE_AFTER_MS') else None
+    LLM_BREAKER_FAILURES = int(os.environ.get('LLM_BREAKER_FAILURES', 5))
+    LLM_BREAKER_COOLDOWN = float(os.environ.get('LLM_BREAKER_COOLDOWN', 30))
+
+    # Analyse map-reduce des documents volumineux
+    ANALYSIS_SINGLE_PASS_TOKENS = int(os.environ.get('ANALYSIS_SINGLE_PASS_TOKENS', 6000))
+    ANALYSIS_CHUNK_TOKENS = int(os.environ.get('ANALYSIS_CHUNK_TOKENS', 2500))
+    ANALYSIS_REDUCE_TOKENS = int(os.environ.get('ANALYSIS_REDUCE_TOKENS', 6000))
+    ANALYSIS_MAX_WORKERS = int(os.environ.get('ANALYSIS_MAX_WORKERS', 4))
+
+    # Extraction du texte des PDF
+    PDF_BACKEND = os.environ.get('PDF_BACKEND', 'auto')  # auto, pypdfium2, pdfminer, pypdf2
+    PDF_MAX_PAGES = int(os.environ.get('PDF_MAX_PAGES', 500))
+    PDF_MAX_BYTES = int(os.environ.get('PDF_MAX_BYTES', 50 * 1024 * 1024))
+    PDF_PARALLEL_MIN_PAGES = int(os.environ.get('PDF_PARALLEL_MIN_PAGES', 32))
+    PDF_EXTRACT_WORKERS = int(os.environ.get('PDF_EXTRACT_WORKERS', 0)) or None
+
+    # Téléversements : corps plafonné par défaut, plafonds propres aux routes de fichiers
+    MAX_CONTENT_LENGTH = int(os.environ.get('MAX_CONTENT_LENGTH', 16 * 1024 * 1024))
+    UPLOAD_PDF_MAX_BYTES = int(os.environ.get('UPLOAD_PDF_MAX_BYTES', PDF_MAX_BYTES))
+    UPLOAD_VIDEO_MAX_BYTES = int(os.environ.get('UPLOAD_VIDEO_MAX_BYTES', 200 * 1024 * 1024))
+    UPLOAD_FORM_MEMORY_SIZE = int(os.environ.get('UPLOAD_FORM_MEMORY_SIZE', 4 * 1024 * 1024))
+    UPLOAD_SPOOL_DIR = os.environ.get('UPLOAD_SPOOL_DIR')
+
+    # Sérialisation JSON : auto (orjson s'il est installé), orjson ou stdlib
+    JSON_PROVIDER = os.environ.get('JSON_PROVIDER', 'auto')
+
+    # Cache serveur des réponses des endpoints de lecture (@cached_response)
+    HTTP_CACHE_ENABLED = os.environ.get('HTTP_CACHE_ENABLED', 'true').lower() in ['true', 'on', '1']
+    HTTP_CACHE_MAX_ENTRIES = int(os.environ.get('HTTP_CACHE_MAX_ENTRIES', 512))
+
+    # Compression des réponses (brotli si installé, sinon gzip)
+    COMPRESS_ENABLED = os.environ.get('COMPRESS_ENABLED', 'true').lower() in ['true', 'on', '1']
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', 1024))
+    COMPRESS_GZIP_LEVEL = int(os.environ.get('COMPRESS_GZIP_LEVEL', 6))
+    COMPRESS_BROTLI_QUALITY = int(os.environ.get('COMPRESS_BROTLI_QUALITY', 4))
+    COMPRESS_MIMETYPES = [m.strip() for m in os.environ['COMPRESS_MIMETYPES'].split(',')] \
+        if os.environ.get('COMPRESS_MIMETYPES') else None
+
+    # Cache adressé par contenu des extractions et analyses de documents
+    ANALYSIS_CACHE_ENABLED = os.environ.get('ANALYSIS_CACHE_ENABLED', 'true').lower() in ['true', 'on', '1']
+    EXTRACTION_CACHE_TTL = int(os.environ.get('EXTRACTION_CACHE_TTL', 30 * 24 * 3600))
+    ANALYSIS_CACHE_TTL = int(os.environ.get('ANALYSIS_CACHE_TTL', 7 * 24 * 3600))
+
+    # File des tâches d'analyse : 'threads' (workers dans le processus web),
+    # 'external' (python -m backend.scripts.job_worker) ou 'inline' (exécution dans la requête)
+    JOB_QUEUE_MODE = os.environ.get('JOB_QUEUE_MODE', 'threads')
+    # Mode 'threads' : workers démarrés par create_app (désactivé dans le maître gunicorn, voir gunicorn.conf.py)
+    JOB_QUEUE_AUTOSTART = os.environ.get('JOB_QUEUE_AUTOSTART', 'true').lower() in ['true', 'on', '1']
+    JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 2))
+    JOB_POLL_INTERVAL = float(os.environ.get('JOB_POLL_INTERVAL', 1.0))
+    JOB_MAX_PENDING_PER_USER = int(os.environ.get('JOB_MAX_PENDING_PER_USER', 5))
+    JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', 2))
+    JOB_STALE_AFTER = int(os.environ.get('JOB_STALE_AFTER', 600))
+    JOB_UPLOAD_DIR = os.environ.get('JOB_UPLOAD_DIR')
+    JOB_EVENTS_INTERVAL = float(os.environ.get('JOB_EVENTS_INTERVAL', 1.0))
+    JOB_EVENTS_TIMEOUT = int(os.environ.get('JOB_EVENTS_TIMEOUT', 300))
+
+    # Synchronisation des données externes (agenda de la ville, jeux d'exemple) : désactivée par
+    # défaut dans create_app (CLI, workers de tâches, scripts, workers gunicorn). Elle tourne dans
+    # un seul processus dédié : `python -m backend.scripts.auto_sync --schedule`
+    AUTO_SYNC_ON_STARTUP = os.environ.get('AUTO_SYNC_ON_STARTUP', 'false').lower() in ['true', 'on', '1']
+    SCHEDULER_ENABLED = os.environ.get('SCHEDULER_ENABLED', 'false').lower() in ['true', 'on', '1']
+    AUTO_SYNC_INTERVAL_MINUTES = int(os.environ.get('AUTO_SYNC_INTERVAL_MINUTES', 30))
+
+    # Vérification de la version du schéma au démarrage des workers : off | warn | strict
+    # (le schéma lui-même est appliqué par `flask massy bootstrap`)
+    SCHEMA_CHECK = os.environ.get('SCHEMA_CHECK', 'warn').lower()
+
+    # Chemins GET rendus par chaque worker gunicorn avant sa première requête (cache de réponses)
+    SERVING_WARM_PATHS = [p.strip() for p in os.environ.get('SERVING_WARM_PATHS', '/api/transport/stations').split(',')
+                          if p.strip()]
+
     CHROMA_HOST = os.environ.get('CHROMA_HOST') or 'localhost'
     try:
         CHROMA_PORT = int(os.environ.get('CHROMA_PORT', 8000))
@@ -37,8 +160,25 @@ class Config:
     N8N_WEBHOOK_URL = os.environ.get('N8N_WEBHOOK_URL') or 'http://localhost:5678/webhook'
     CORS_ORIGINS = os.environ.get('CORS_ORIGINS', 'http://localhost:3000').split(',')
 
+    # Ingestion en masse des alertes
+    ALERT_INGEST_MAX_BATCH = int(os.environ.get('ALERT_INGEST_MAX_BATCH', 10000))
+    ALERT_DEDUP_WINDOW_SECONDS = int(os.environ.get('ALERT_DEDUP_WINDOW_SECONDS', 300))
+    ALERT_DEDUP_GEOHASH_PRECISION = 7  # Cellules d'environ 150 m
+
     RATELIMIT_STORAGE_URL = os.environ.get('REDIS_URL') or 'memory://'
+    RATELIMIT_STORAGE_URI = RATELIMIT_STORAGE_URL  # Nom attendu par Flask-Limiter 3
     RATELIMIT_STRATEGY = 'fixed-window'
+    RATELIMIT_HEADERS_ENABLED = True
+    LOGIN_RATE_LIMIT = os.environ.get('LOGIN_RATE_LIMIT', '20 per minute')            # Par IP
+    LOGIN_ACCOUNT_RATE_LIMIT = os.environ.get('LOGIN_ACCOUNT_RATE_LIMIT', '5 per minute')  # Par compte
+    REGISTER_RATE_LIMIT = os.environ.get('REGISTER_RATE_LIMIT', '10 per hour')
+
+    # Hachage des mots de passe (pool de processus dédié)
+    BCRYPT_ROUNDS = int(os.environ.get('BCRYPT_ROUNDS', 12))
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+    PASSWORD_HASH_MAX_PENDING = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 32))
+    PASSWORD_HASH_TIMEOUT = float(os.environ.get('PASSWORD_HASH_TIMEOUT', 10))
+    PASSWORD_HASH_INLINE = False
 
     LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
 
@@ -52,6 +192,14 @@ class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     WTF_CSRF_ENABLED = False
+    RATELIMIT_ENABLED = False
+    BCRYPT_ROUNDS = 4
+    PASSWORD_HASH_INLINE = True
+    CHAT_WRITE_BEHIND = False
+    JOB_QUEUE_MODE = 'inline'
+    AUTO_SYNC_ON_STARTUP = False
+    SCHEDULER_ENABLED = False
+    SCHEMA_CHECK = 'off'
 
 
 class ProductionConfig(Config):
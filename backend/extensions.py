@@ -6,11 +6,15 @@ Centralisé pour éviter les imports circulaires et garantir l'initialisation co
 from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
 from flask_migrate import Migrate
+from flask_limiter import Limiter
+from flask_limiter.util import get_remote_address
+from backend.utils.replicas import RoutingSession
 
 # Création des instances des extensions (non attachées à l'application)
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})  # Lectures routables vers les réplicas
 jwt = JWTManager()
 migrate = Migrate()
+limiter = Limiter(key_func=get_remote_address)
 
 def init_extensions(app):
     """
@@ -20,3 +24,4 @@ def init_extensions(app):
     db.init_app(app)
     jwt.init_app(app)
     migrate.init_app(app, db)
+    limiter.init_app(app)
@@ -0,0 +1,117 @@
+"""
+Profil de production gunicorn.
+
+Usage (depuis la racine du dépôt) :
+    gunicorn -c backend/gunicorn.conf.py
+
+Réglages par variables d'environnement :
+    PORT                      Port d'écoute (défaut 5000)
+    GUNICORN_WORKER_CLASS     sync | gthread | gevent (défaut gthread)
+    GUNICORN_WORKERS          Nombre de processus (défaut selon la classe et le nombre de cœurs)
+    GUNICORN_THREADS          Threads par worker gthread (défaut 4)
+    GUNICORN_WORKER_CONNECTIONS  Connexions simultanées par worker gevent (défaut 1000)
+    GUNICORN_PRELOAD          Charge l'application dans le maître avant le fork (défaut true)
+    GUNICORN_MAX_REQUESTS     Recyclage d'un worker après N requêtes (défaut 2000, 0 = jamais)
+    GUNICORN_MAX_REQUESTS_JITTER, GUNICORN_TIMEOUT, GUNICORN_GRACEFUL_TIMEOUT, GUNICORN_KEEPALIVE
+
+Dimensionnement :
+- sync : un processus par requête en cours, pour les routes CPU (hachage, numpy) ;
+  2 × cœurs + 1 workers.
+- gthread : requêtes majoritairement en attente d'E/S (LLM, n8n, API transport) ;
+  cœurs + 1 workers × GUNICORN_THREADS. Le pool SQLAlchemy doit couvrir les threads.
+- gevent : nombreuses connexions longues (SSE /api/jobs/<id>/events) ; nécessite gevent.
+
+Le schéma est appliqué avant le démarrage par `flask massy bootstrap` ; les
+workers ne font que vérifier sa version (SCHEMA_CHECK=strict : refus de démarrer).
+La synchronisation externe et son scheduler ne tournent ni dans le maître ni
+dans les workers : le maître reste sans thread (il forke les workers, un fork
+avec des threads actifs copie leurs verrous dans un état incohérent). Les lancer
+une seule fois, à côté de gunicorn, dans un processus dédié :
+    python -m backend.scripts.auto_sync --schedule
+"""
+
+import multiprocessing
+import os
+import sys
+
+
+def _env_int(name, default):
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def _env_flag(name, default):
+    return os.environ.get(name, str(default)).lower() in ['true', 'on', '1']
+
+
+_cores = multiprocessing.cpu_count()
+
+wsgi_app = 'backend.wsgi:app'
+bind = f"0.0.0.0:{_env_int('PORT', 5000)}"
+
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread').lower()
+if worker_class == 'gevent':
+    try:
+        from gevent import monkey
+        # Avec preload_app, l'application est importée dans le maître : patcher avant tout import réseau
+        monkey.patch_all()
+    except ImportError:
+        print("[GUNICORN] gevent non installé, repli sur gthread", file=sys.stderr)
+        worker_class = 'gthread'
+if worker_class not in ('sync', 'gthread', 'gevent'):
+    raise ValueError(f"GUNICORN_WORKER_CLASS invalide : {worker_class}")
+
+if worker_class == 'sync':
+    workers = _env_int('GUNICORN_WORKERS', 2 * _cores + 1)
+else:
+    workers = _env_int('GUNICORN_WORKERS', _cores + 1)
+threads = _env_int('GUNICORN_THREADS', 4) if worker_class == 'gthread' else 1
+worker_connections = _env_int('GUNICORN_WORKER_CONNECTIONS', 1000)
+
+# Recyclage des workers (fuites mémoire, fragmentation) ; la gigue évite les redémarrages simultanés
+max_requests = _env_int('GUNICORN_MAX_REQUESTS', 2000)
+max_requests_jitter = _env_int('GUNICORN_MAX_REQUESTS_JITTER', max(max_requests // 10, 0))
+
+timeout = _env_int('GUNICORN_TIMEOUT', 60)
+graceful_timeout = _env_int('GUNICORN_GRACEFUL_TIMEOUT', 30)
+keepalive = _env_int('GUNICORN_KEEPALIVE', 5)
+
+preload_app = _env_flag('GUNICORN_PRELOAD', True)
+
+accesslog = os.environ.get('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+loglevel = os.environ.get('LOG_LEVEL', 'info').lower()
+
+# Ni synchro ni scheduler dans le maître ou les workers (processus dédié, voir plus haut) ;
+# forcé avant le chargement de la configuration Flask
+_sync_requested = _env_flag('AUTO_SYNC_ON_STARTUP', False) or _env_flag('SCHEDULER_ENABLED', False)
+os.environ['AUTO_SYNC_ON_STARTUP'] = 'false'
+os.environ['SCHEDULER_ENABLED'] = 'false'
+if preload_app:
+    # Application chargée dans le maître : pas de workers de file avant le fork (warm_worker les démarre)
+    os.environ['JOB_QUEUE_AUTOSTART'] = 'false'
+
+
+def when_ready(server):
+    """Maître prêt : il ne démarre aucun thread, la synchronisation vit dans son propre processus"""
+    if _sync_requested:
+        server.log.warning("AUTO_SYNC_ON_STARTUP/SCHEDULER_ENABLED ignorés sous gunicorn : "
+                           "lancer python -m backend.scripts.auto_sync --schedule dans un processus dédié")
+
+
+def post_fork(server, worker):
+    """Worker créé : ne rien réutiliser des connexions du maître"""
+    if preload_app:
+        from backend.app.serving import reset_after_fork
+        reset_after_fork(server.app.wsgi())
+
+
+def post_worker_init(worker):
+    """Application chargée dans le worker : version du schéma, puis préchauffage avant la première requête"""
+    from backend.app.schema import check_schema
+    from backend.app.serving import warm_worker
+    check_schema(worker.wsgi)
+    warm_worker(worker.wsgi)
+    worker.log.info(f"Worker {worker.pid} prêt ({worker_class})")
@@ -0,0 +1,106 @@
+"""Index spatial des alertes, résumé des conversations et index de pagination
+
+Revision ID: 7c1e4b2a9d03
+Revises:
+Create Date: 2026-10-19 09:00:00
+
+Première révision : amène une base créée avec le schéma initial au niveau des
+modèles actuels, sur les tables qui existaient déjà (create_all ne modifie pas
+une table existante) :
+- suspect_alerts : colonne geohash, index (latitude, longitude) et (geohash, reported_at),
+  geohash des alertes existantes et carte de densité (alert_heatmap_cells) ;
+- conversations : résumé incrémental (summary, summary_until, summary_until_id),
+  index (user_id, updated_at) ;
+- messages : index (conversation_id, created_at).
+Les tables apparues depuis (analysis_jobs, analysis_cache, schema_version) sont
+créées ensuite par `flask massy bootstrap` (create_all). Sur une base vierge,
+il n'y a rien à migrer : bootstrap crée directement tout le schéma.
+
+Chaque étape vérifie l'état de la base : la révision s'applique aussi à une base
+déjà créée par create_all avec une partie de ces changements.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from backend.models.types import GUID
+
+
+# revision identifiers, used by Alembic.
+revision = '7c1e4b2a9d03'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+INDEXES = (
+    ('suspect_alerts', 'ix_suspect_alerts_lat_lng', ['latitude', 'longitude']),
+    ('suspect_alerts', 'ix_suspect_alerts_geohash_reported', ['geohash', 'reported_at']),
+    ('conversations', 'ix_conversations_user_updated', ['user_id', 'updated_at']),
+    ('messages', 'ix_messages_conversation_created', ['conversation_id', 'created_at']),
+)
+
+
+def _columns(inspector, table):
+    return {column['name'] for column in inspector.get_columns(table)}
+
+
+def _indexes(inspector, table):
+    return {index['name'] for index in inspector.get_indexes(table)}
+
+
+def upgrade():
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    tables = set(inspector.get_table_names())
+    if 'suspect_alerts' not in tables:
+        return  # Base vierge : create_all crée le schéma à jour
+
+    geohash_added = 'geohash' not in _columns(inspector, 'suspect_alerts')
+    if geohash_added:
+        op.add_column('suspect_alerts', sa.Column('geohash', sa.String(12)))
+
+    conversation_columns = _columns(inspector, 'conversations')
+    for column in (sa.Column('summary', sa.Text()), sa.Column('summary_until', sa.DateTime()),
+                   sa.Column('summary_until_id', GUID())):
+        if column.name not in conversation_columns:
+            op.add_column('conversations', column)
+
+    # Remplacé par ix_suspect_alerts_geohash_reported, dont il est un préfixe
+    if 'ix_suspect_alerts_geohash' in _indexes(inspector, 'suspect_alerts'):
+        op.drop_index('ix_suspect_alerts_geohash', table_name='suspect_alerts')
+    for table, name, columns in INDEXES:
+        if name not in _indexes(inspector, table):
+            op.create_index(name, table, columns)
+
+    heatmap_created = 'alert_heatmap_cells' not in tables
+    if heatmap_created:
+        op.create_table(
+            'alert_heatmap_cells',
+            sa.Column('resolution', sa.Integer(), primary_key=True),
+            sa.Column('q', sa.Integer(), primary_key=True),
+            sa.Column('r', sa.Integer(), primary_key=True),
+            sa.Column('center_lat', sa.Float(), nullable=False),
+            sa.Column('center_lng', sa.Float(), nullable=False),
+            sa.Column('alert_count', sa.Integer(), nullable=False),
+            sa.Column('risk_total', sa.Integer(), nullable=False),
+            sa.Column('updated_at', sa.DateTime()),
+        )
+        op.create_index('ix_alert_heatmap_cells_res_center', 'alert_heatmap_cells',
+                        ['resolution', 'center_lat', 'center_lng'])
+
+    if geohash_added or heatmap_created:
+        # Alertes existantes : geohash et carte de densité, par lots (même code que `flask massy rebuild-heatmap`)
+        from backend.services.alert_ingestion import rebuild_alert_heatmap
+        rebuild_alert_heatmap(bind)
+
+
+def downgrade():
+    op.drop_index('ix_alert_heatmap_cells_res_center', table_name='alert_heatmap_cells')
+    op.drop_table('alert_heatmap_cells')
+    for table, name, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
+    with op.batch_alter_table('conversations') as batch:
+        batch.drop_column('summary_until_id')
+        batch.drop_column('summary_until')
+        batch.drop_column('summary')
+    with op.batch_alter_table('suspect_alerts') as batch:
+        batch.drop_column('geohash')
@@ -2,12 +2,20 @@ from .user import User, UserRole
 from .conversation import Conversation
 from .research_project import ResearchProject
 from .suspect_alert import SuspectAlert
+from .alert_heatmap import AlertHeatmapCell
 from .urbanism_project import UrbanismProject  # <- ajouter ici
+from .analysis_cache import AnalysisCacheEntry
+from .analysis_job import AnalysisJob
+from .schema_version import SchemaVersion
 
 __all__ = [
     'User', 'UserRole',
     'Conversation',
     'ResearchProject',
     'SuspectAlert',
-    'UrbanismProject'
+    'AlertHeatmapCell',
+    'UrbanismProject',
+    'AnalysisCacheEntry',
+    'AnalysisJob',
+    'SchemaVersion'
 ]
@@ -0,0 +1,92 @@
+from backend.extensions import db
+from backend.utils.geo import heatmap_deltas, hex_center, hex_boundary
+from datetime import datetime
+from sqlalchemy.exc import IntegrityError
+
+
+class AlertHeatmapCell(db.Model):
+    """Cellule hexagonale pré-agrégée de la carte de densité des alertes"""
+
+    __tablename__ = 'alert_heatmap_cells'
+
+    resolution = db.Column(db.Integer, primary_key=True)  # Rayon de l'hexagone en mètres
+    q = db.Column(db.Integer, primary_key=True)
+    r = db.Column(db.Integer, primary_key=True)
+    center_lat = db.Column(db.Float, nullable=False)
+    center_lng = db.Column(db.Float, nullable=False)
+    alert_count = db.Column(db.Integer, default=0, nullable=False)
+    risk_total = db.Column(db.Integer, default=0, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_alert_heatmap_cells_res_center', 'resolution', 'center_lat', 'center_lng'),
+    )
+
+    @classmethod
+    def apply_delta(cls, connection, points, sign=1):
+        """
+        Met à jour incrémentalement les cellules touchées par des alertes.
+
+        Appelé depuis les événements de flush de SuspectAlert (même transaction)
+        et depuis l'ingestion en masse.
+
+        Args:
+            connection: Connexion SQLAlchemy de la transaction en cours.
+            points: Itérable de (latitude, longitude, niveau de risque).
+            sign: +1 pour un ajout, -1 pour une suppression.
+        """
+        table = cls.__table__
+        now = datetime.utcnow()
+        for (resolution, q, r), (count, risk) in heatmap_deltas(points, sign).items():
+            if count == 0 and risk == 0:
+                continue
+            key = (table.c.resolution == resolution, table.c.q == q, table.c.r == r)
+            increment = {'alert_count': table.c.alert_count + count, 'risk_total': table.c.risk_total + risk,
+                         'updated_at': now}
+            if count <= 0:
+                # Retrait : la cellule existe forcément, jamais de création
+                connection.execute(table.update().where(*key).values(**increment))
+                continue
+
+            center_lat, center_lng = hex_center(q, r, resolution)
+            row = dict(resolution=resolution, q=q, r=r, center_lat=center_lat, center_lng=center_lng,
+                       alert_count=count, risk_total=risk, updated_at=now)
+            upsert = cls._upsert_statement(connection.dialect.name)
+            if upsert is not None:
+                # Une seule instruction : deux alertes simultanées dans une nouvelle cellule ne se gênent pas
+                connection.execute(upsert.values(**row).on_conflict_do_update(
+                    index_elements=['resolution', 'q', 'r'], set_=increment))
+                continue
+
+            if connection.execute(table.update().where(*key).values(**increment)).rowcount:
+                continue
+            try:
+                with connection.begin_nested():
+                    connection.execute(table.insert().values(**row))
+            except IntegrityError:
+                # Cellule créée entre-temps par une autre transaction
+                connection.execute(table.update().where(*key).values(**increment))
+
+    @classmethod
+    def _upsert_statement(cls, dialect_name):
+        """INSERT ... ON CONFLICT pour PostgreSQL et SQLite, None pour les autres bases"""
+        if dialect_name == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect_name == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            return None
+        return insert(cls.__table__)
+
+    def to_dict(self, with_boundary=False):
+        data = {
+            'q': self.q,
+            'r': self.r,
+            'resolution': self.resolution,
+            'center': {'lat': self.center_lat, 'lng': self.center_lng},
+            'count': self.alert_count,
+            'avg_risk': round(self.risk_total / self.alert_count, 2) if self.alert_count else 0
+        }
+        if with_boundary:
+            data['boundary'] = hex_boundary(self.q, self.r, self.resolution)
+        return data
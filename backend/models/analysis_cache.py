@@ -0,0 +1,40 @@
+from backend.extensions import db
+from datetime import datetime
+
+
+class AnalysisCacheEntry(db.Model):
+    """
+    Cache adressé par contenu des extractions et analyses de documents.
+
+    - kind='extraction' : digest = SHA-256 des octets du fichier, content = texte extrait.
+    - kind='market' / 'urbanism' : digest = SHA-256 (type, version du prompt, texte), content = analyse.
+    """
+
+    __tablename__ = 'analysis_cache'
+
+    kind = db.Column(db.String(20), primary_key=True)
+    digest = db.Column(db.String(64), primary_key=True)
+    content = db.Column(db.Text, nullable=False)
+    prompt_version = db.Column(db.Integer)
+    source_digest = db.Column(db.String(64), index=True)  # Fichier d'origine d'une analyse (invalidation)
+    size = db.Column(db.Integer, default=0)
+    hits = db.Column(db.Integer, default=0, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_hit_at = db.Column(db.DateTime)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    def to_dict(self):
+        return {
+            'kind': self.kind,
+            'digest': self.digest,
+            'prompt_version': self.prompt_version,
+            'source_digest': self.source_digest,
+            'size': self.size,
+            'hits': self.hits,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'last_hit_at': self.last_hit_at.isoformat() if self.last_hit_at else None,
+            'expires_at': self.expires_at.isoformat() if self.expires_at else None
+        }
+
+    def __repr__(self):
+        return f"<AnalysisCacheEntry {self.kind}:{self.digest[:12]}>"
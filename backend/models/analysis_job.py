@@ -0,0 +1,62 @@
+from backend.extensions import db
+from backend.models.types import GUID, new_id
+from datetime import datetime
+
+JOB_STATUSES = ('queued', 'running', 'succeeded', 'failed', 'cancelled')
+TERMINAL_STATUSES = ('succeeded', 'failed', 'cancelled')
+
+
+class AnalysisJob(db.Model):
+    """Tâche d'analyse de document exécutée en arrière-plan par le pool de workers"""
+
+    __tablename__ = 'analysis_jobs'
+
+    id = db.Column(GUID(), primary_key=True, default=new_id)
+    kind = db.Column(db.String(20), nullable=False)              # 'market' ou 'urbanism'
+    status = db.Column(db.String(20), nullable=False, default='queued')
+    priority = db.Column(db.Integer, nullable=False, default=5)  # Plus élevé = traité en premier
+    user_id = db.Column(GUID(), db.ForeignKey('users.id'), nullable=False)
+    input_text = db.Column(db.Text)
+    input_path = db.Column(db.String(500))                       # Fichier téléversé, en attente de traitement
+    document_hash = db.Column(db.String(64))
+    progress = db.Column(db.Float, nullable=False, default=0.0)
+    stage = db.Column(db.String(50))
+    result = db.Column(db.JSON)
+    error = db.Column(db.Text)
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    worker_id = db.Column(db.String(100))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    heartbeat_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index('ix_analysis_jobs_queue', 'status', 'priority', 'created_at'),
+        db.Index('ix_analysis_jobs_user_created', 'user_id', 'created_at'),
+    )
+
+    @property
+    def is_finished(self):
+        return self.status in TERMINAL_STATUSES
+
+    def to_dict(self, with_result=True):
+        data = {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'priority': self.priority,
+            'progress': round(self.progress or 0.0, 3),
+            'stage': self.stage,
+            'document_hash': self.document_hash,
+            'attempts': self.attempts,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+        if with_result:
+            data['result'] = self.result
+        return data
+
+    def __repr__(self):
+        return f"<AnalysisJob {self.kind} {self.status}>"
@@ -1,20 +1,30 @@
 from backend.extensions import db
+from backend.models.types import GUID, new_id
+from backend.utils.helpers import encode_cursor
+from sqlalchemy import and_, func, or_
 from datetime import datetime
-import uuid
 
 class Conversation(db.Model):
     """Modèle pour les conversations avec le chatbot"""
     __tablename__ = 'conversations'
 
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
+    id = db.Column(GUID(), primary_key=True, default=new_id)
+    user_id = db.Column(GUID(), db.ForeignKey('users.id'), nullable=False)
     title = db.Column(db.String(200))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    # Résumé incrémental des échanges sortis de la fenêtre du prompt
+    summary = db.Column(db.Text)
+    summary_until = db.Column(db.DateTime)  # Date du dernier message intégré au résumé
+    summary_until_id = db.Column(GUID())     # Son identifiant : départage les messages de même date
 
     # Relation avec les messages
     messages = db.relationship('Message', backref='conversation', lazy='dynamic', cascade='all, delete-orphan')
 
+    __table_args__ = (
+        db.Index('ix_conversations_user_updated', 'user_id', 'updated_at'),
+    )
+
     def get_messages(self):
         """Retourne les messages sous forme de liste de dicts triés par date"""
         return [msg.to_dict() for msg in self.messages.order_by(Message.created_at.asc()).all()]
@@ -30,18 +40,94 @@ class Conversation(db.Model):
             'messages': self.get_messages()
         }
 
+    def to_summary_dict(self, message_count=None, last_message=None):
+        """Résumé léger pour les listes (sans les messages)"""
+        data = {
+            'id': self.id,
+            'user_id': self.user_id,
+            'title': self.title,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+        if message_count is not None:
+            data['message_count'] = message_count
+            data['last_message'] = last_message
+        return data
+
+    @classmethod
+    def summaries_for_user(cls, user_id, limit=20, cursor=None):
+        """
+        Liste paginée des conversations d'un utilisateur avec le nombre de messages
+        et le dernier message, en une seule requête.
+
+        La page de conversations est choisie d'abord (clé (updated_at, id), LIMIT) ;
+        le nombre de messages et le dernier message ne sont calculés que pour elle,
+        par sous-requêtes corrélées sur ix_messages_conversation_created.
+
+        Args:
+            user_id: Propriétaire des conversations.
+            limit: Taille de page.
+            cursor: Tuple (updated_at, id) de la dernière conversation de la page précédente.
+
+        Returns:
+            Tuple (liste de résumés, curseur suivant ou None).
+        """
+        page = db.session.query(cls.id.label('id')).filter(cls.user_id == user_id)
+        if cursor:
+            updated_at, conversation_id = cursor
+            page = page.filter(or_(
+                cls.updated_at < updated_at,
+                and_(cls.updated_at == updated_at, cls.id < conversation_id)
+            ))
+        page = page.order_by(cls.updated_at.desc(), cls.id.desc()).limit(limit + 1).subquery()
+
+        message_count = db.select(func.count())\
+            .where(Message.conversation_id == cls.id).correlate(cls).scalar_subquery()
+        last_message_id = db.select(Message.id).where(Message.conversation_id == cls.id)\
+            .order_by(Message.created_at.desc(), Message.id.desc()).limit(1).correlate(cls).scalar_subquery()
+        last = db.aliased(Message)
+
+        query = db.session.query(
+            cls, message_count, last.sender, last.content, last.created_at
+        ).join(page, page.c.id == cls.id).outerjoin(last, last.id == last_message_id)
+
+        rows = query.order_by(cls.updated_at.desc(), cls.id.desc()).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        summaries = []
+        for conversation, count, sender, content, created_at in rows:
+            last_message = None
+            if content is not None:
+                last_message = {
+                    'sender': sender,
+                    'content': content[:200],
+                    'created_at': created_at.isoformat() if created_at else None
+                }
+            summaries.append(conversation.to_summary_dict(count or 0, last_message))
+
+        next_cursor = None
+        if has_more and rows and rows[-1][0].updated_at:
+            last = rows[-1][0]
+            next_cursor = encode_cursor(last.updated_at, last.id)
+        return summaries, next_cursor
+
 
 class Message(db.Model):
     """Modèle pour les messages dans une conversation"""
     __tablename__ = 'messages'
 
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
-    conversation_id = db.Column(db.String(36), db.ForeignKey('conversations.id'), nullable=False)
+    id = db.Column(GUID(), primary_key=True, default=new_id)
+    conversation_id = db.Column(GUID(), db.ForeignKey('conversations.id'), nullable=False)
     sender = db.Column(db.String(20), nullable=False)  # 'user' ou 'bot'
     content = db.Column(db.Text, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     meta_info = db.Column(db.String(200))  # anciennement 'metadata', facultatif
 
+    __table_args__ = (
+        db.Index('ix_messages_conversation_created', 'conversation_id', 'created_at'),
+    )
+
     def to_dict(self):
         """Retourne un dict représentant le message"""
         return {
@@ -52,3 +138,42 @@ class Message(db.Model):
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'meta_info': self.meta_info
         }
+
+    @classmethod
+    def window(cls, conversation_id, limit=50, before=None, after=None):
+        """
+        Fenêtre de messages paginée par clé (created_at, id), en ordre chronologique.
+
+        Sans curseur, retourne les `limit` messages les plus récents.
+
+        Args:
+            conversation_id: Conversation ciblée.
+            limit: Nombre maximal de messages.
+            before: Tuple (created_at, id) : messages plus anciens que ce curseur.
+            after: Tuple (created_at, id) : messages plus récents que ce curseur.
+
+        Returns:
+            Tuple (liste de messages, indicateur de messages supplémentaires).
+        """
+        query = cls.query.filter(cls.conversation_id == conversation_id)
+        if after:
+            created_at, message_id = after
+            query = query.filter(or_(
+                cls.created_at > created_at,
+                and_(cls.created_at == created_at, cls.id > message_id)
+            )).order_by(cls.created_at.asc(), cls.id.asc())
+        else:
+            if before:
+                created_at, message_id = before
+                query = query.filter(or_(
+                    cls.created_at < created_at,
+                    and_(cls.created_at == created_at, cls.id < message_id)
+                ))
+            query = query.order_by(cls.created_at.desc(), cls.id.desc())
+
+        messages = query.limit(limit + 1).all()
+        has_more = len(messages) > limit
+        messages = messages[:limit]
+        if not after:
+            messages.reverse()
+        return messages, has_more
@@ -1,19 +1,19 @@
 from backend.extensions import db
+from backend.models.types import GUID, new_id
 from datetime import datetime
-import uuid
 
 class ResearchProject(db.Model):
     """Modèle pour les projets de recherche universitaires"""
 
     __tablename__ = 'research_projects'
 
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = db.Column(GUID(), primary_key=True, default=new_id)
     title = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text, nullable=False)
     status = db.Column(db.String(20), default='draft', nullable=False)  # draft, in_progress, completed
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, onupdate=datetime.utcnow)
-    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(GUID(), db.ForeignKey('users.id'), nullable=False)
     results = db.Column(db.JSON)  # Pour stocker les résultats de la recherche
     tags = db.Column(db.JSON)  # Mots-clés associés
 
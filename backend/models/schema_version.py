@@ -0,0 +1,20 @@
+from backend.extensions import db
+from datetime import datetime
+
+
+class SchemaVersion(db.Model):
+    """Version du schéma appliquée par `flask massy bootstrap` (une seule ligne, id = 1)"""
+
+    __tablename__ = 'schema_version'
+
+    id = db.Column(db.Integer, primary_key=True)
+    fingerprint = db.Column(db.String(64), nullable=False)   # Empreinte des modèles au moment du bootstrap
+    revision = db.Column(db.String(64))                      # Révision Alembic, si des migrations existent
+    applied_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def to_dict(self):
+        return {
+            'fingerprint': self.fingerprint,
+            'revision': self.revision,
+            'applied_at': self.applied_at.isoformat() if self.applied_at else None
+        }
@@ -1,24 +1,37 @@
 from backend.extensions import db
+from backend.models.types import GUID, new_id
+from backend.models.alert_heatmap import AlertHeatmapCell
+from backend.utils.geo import geohash_encode
+from sqlalchemy import event
+from sqlalchemy.orm import column_property
+from sqlalchemy.orm.attributes import get_history
 from datetime import datetime
-import uuid
 
 class SuspectAlert(db.Model):
     """Modèle pour les alertes de comportements suspects"""
 
     __tablename__ = 'suspect_alerts'
 
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = db.Column(GUID(), primary_key=True, default=new_id)
     alert_type = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text, nullable=False)
-    latitude = db.Column(db.Float, nullable=False)
-    longitude = db.Column(db.Float, nullable=False)
-    risk_level = db.Column(db.Integer, nullable=False)  # De 1 à 10
+    # active_history : l'ancienne position est chargée avant modification (mise à jour de la carte de densité)
+    latitude = column_property(db.Column(db.Float, nullable=False), active_history=True)
+    longitude = column_property(db.Column(db.Float, nullable=False), active_history=True)
+    geohash = db.Column(db.String(12))  # Calculé automatiquement à partir de latitude/longitude
+    risk_level = column_property(db.Column(db.Integer, nullable=False), active_history=True)  # De 1 à 10
     status = db.Column(db.String(20), default='new', nullable=False)  # new, in_progress, resolved
     reported_at = db.Column(db.DateTime, default=datetime.utcnow)
     resolved_at = db.Column(db.DateTime)
-    user_id = db.Column(db.String(36), db.ForeignKey('users.id'), nullable=False)
+    user_id = db.Column(GUID(), db.ForeignKey('users.id'), nullable=False)
     additional_data = db.Column(db.JSON)  # Pour stocker des données supplémentaires (ex: images, vidéos)
 
+    __table_args__ = (
+        db.Index('ix_suspect_alerts_lat_lng', 'latitude', 'longitude'),
+        # Préfixes geohash (recherche de proximité) et déduplication (cellule, fenêtre de temps)
+        db.Index('ix_suspect_alerts_geohash_reported', 'geohash', 'reported_at'),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -32,3 +45,43 @@ class SuspectAlert(db.Model):
             'reporter': self.reporter.to_public_dict() if self.reporter else None,
             'additional_data': self.additional_data
         }
+
+
+# -------------------------------
+# Index spatial et carte de densité
+# -------------------------------
+@event.listens_for(SuspectAlert, 'before_insert')
+@event.listens_for(SuspectAlert, 'before_update')
+def _set_geohash(mapper, connection, target):
+    """Maintient la colonne geohash à jour"""
+    if target.latitude is not None and target.longitude is not None:
+        target.geohash = geohash_encode(target.latitude, target.longitude)
+
+
+@event.listens_for(SuspectAlert, 'after_insert')
+def _heatmap_on_insert(mapper, connection, target):
+    AlertHeatmapCell.apply_delta(connection, [(target.latitude, target.longitude, target.risk_level)], 1)
+
+
+@event.listens_for(SuspectAlert, 'after_delete')
+def _heatmap_on_delete(mapper, connection, target):
+    AlertHeatmapCell.apply_delta(connection, [(target.latitude, target.longitude, target.risk_level)], -1)
+
+
+@event.listens_for(SuspectAlert, 'after_update')
+def _heatmap_on_update(mapper, connection, target):
+    """Déplace l'alerte d'une cellule à l'autre si sa position ou son risque change"""
+    old_values = {}
+    for attr in ('latitude', 'longitude', 'risk_level'):
+        history = get_history(target, attr)
+        if history.deleted:
+            old_values[attr] = history.deleted[0]
+    if not old_values:
+        return
+    old_point = (
+        old_values.get('latitude', target.latitude),
+        old_values.get('longitude', target.longitude),
+        old_values.get('risk_level', target.risk_level)
+    )
+    AlertHeatmapCell.apply_delta(connection, [old_point], -1)
+    AlertHeatmapCell.apply_delta(connection, [(target.latitude, target.longitude, target.risk_level)], 1)
@@ -0,0 +1,84 @@
+"""
+Identifiants UUID des modèles.
+
+Côté Python et API, un identifiant est toujours la chaîne canonique
+'xxxxxxxx-xxxx-xxxx-xxxx-xxxxxxxxxxxx' : les identifiants exposés ne changent pas.
+Le stockage dépend de UUID_STORAGE (lu à l'import des modèles) :
+- 'string' (défaut) : VARCHAR(36), comme historiquement ;
+- 'native' : type uuid natif sur PostgreSQL, 16 octets (BLOB) sur SQLite,
+  BINARY(16) ailleurs. Index plus de deux fois plus petits, comparaisons sur
+  16 octets. Conversion d'une base existante : backend/scripts/convert_uuid_storage.py.
+
+UUID_VERSION=7 (défaut) génère des UUID ordonnés dans le temps (RFC 9562) :
+les insertions se font en fin d'index au lieu de fractionner des pages au hasard.
+L'ordre des chaînes, des octets et du type uuid PostgreSQL est le même, la
+pagination par clé (created_at, id) reste valide dans tous les modes.
+"""
+
+import os
+import time
+import uuid
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.types import TypeDecorator
+
+from backend.config import Config
+
+STORAGE = Config.UUID_STORAGE
+UUID_VERSION = Config.UUID_VERSION
+
+_NIL = uuid.UUID(int=0)
+
+
+def uuid7() -> uuid.UUID:
+    """UUID version 7 : 48 bits d'horodatage en millisecondes, puis 74 bits aléatoires"""
+    value = (time.time_ns() // 1_000_000 & (1 << 48) - 1) << 80 | int.from_bytes(os.urandom(10), 'big')
+    value = value & ~(0xF << 76) | 0x7 << 76   # Version
+    value = value & ~(0x3 << 62) | 0x2 << 62   # Variante RFC
+    return uuid.UUID(int=value)
+
+
+def new_id() -> str:
+    """Nouvel identifiant de ligne (chaîne canonique)"""
+    return str(uuid7() if UUID_VERSION == 7 else uuid.uuid4())
+
+
+class GUID(TypeDecorator):
+    """Colonne UUID : chaîne en Python, VARCHAR(36) ou forme compacte en base selon UUID_STORAGE"""
+
+    impl = sa.String
+    cache_ok = True
+
+    def __init__(self, storage: str = None):
+        super().__init__(length=36)
+        self.storage = storage or STORAGE
+
+    def load_dialect_impl(self, dialect):
+        if self.storage != 'native':
+            return dialect.type_descriptor(sa.String(36))
+        if dialect.name == 'postgresql':
+            return dialect.type_descriptor(postgresql.UUID(as_uuid=True))
+        if dialect.name == 'sqlite':
+            return dialect.type_descriptor(sa.LargeBinary(16))
+        return dialect.type_descriptor(sa.BINARY(16))
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        if self.storage != 'native':
+            return str(value)
+        if not isinstance(value, uuid.UUID):
+            try:
+                value = uuid.UUID(str(value))
+            except ValueError:
+                # Identifiant mal formé (URL) : ne correspond à aucune ligne, comme en mode chaîne
+                value = _NIL
+        return value if dialect.name == 'postgresql' else value.bytes
+
+    def process_result_value(self, value, dialect):
+        if value is None or isinstance(value, str):
+            return value
+        if isinstance(value, uuid.UUID):
+            return str(value)
+        return str(uuid.UUID(bytes=bytes(value)))
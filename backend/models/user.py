@@ -1,7 +1,6 @@
 from backend.extensions import db
-from backend.utils.security import hash_password, check_password
+from backend.models.types import GUID, new_id
 from datetime import datetime
-import uuid
 from enum import Enum
 
 class UserRole(Enum):
@@ -16,7 +15,7 @@ class User(db.Model):
     __tablename__ = 'users'
 
     # Colonnes principales
-    id = db.Column(db.String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    id = db.Column(GUID(), primary_key=True, default=new_id)
     email = db.Column(db.String(120), unique=True, nullable=False, index=True)
     username = db.Column(db.String(80), unique=True, nullable=False, index=True)
     password_hash = db.Column(db.String(256), nullable=False)
@@ -61,12 +60,22 @@ class User(db.Model):
 
     # --- Méthodes de mot de passe ---
     def set_password(self, password: str):
-        """Hash et définit le mot de passe"""
-        self.password_hash = hash_password(password)
+        """Hash et définit le mot de passe (dans le pool de hachage)"""
+        from backend.services.password_hasher import password_hasher
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password: str) -> bool:
-        """Vérifie le mot de passe"""
-        return check_password(self.password_hash, password)
+        """
+        Vérifie le mot de passe (dans le pool de hachage).
+        Si le coût bcrypt configuré a changé, le hash est recalculé de manière transparente.
+        """
+        from backend.services.password_hasher import password_hasher
+        if not password_hasher.verify(self.password_hash, password):
+            return False
+        if password_hasher.needs_rehash(self.password_hash):
+            self.password_hash = password_hasher.hash(password)
+            password_hasher.rehashed += 1
+        return True
 
     # --- Méthode pour le suivi du dernier login ---
     def update_last_login(self):
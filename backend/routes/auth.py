@@ -7,10 +7,13 @@ from flask_jwt_extended import (
     get_jwt_identity,
     get_jwt
 )
-from backend.extensions import db
+from backend.extensions import db, limiter
 from backend.models import User, UserRole
 from backend.utils.security import validate_password, validate_email
 from backend.utils.helpers import create_response, error_response
+from backend.utils.streaming import stream_query
+from backend.services.user_cache import current_user_snapshot, jwt_has_role
+from backend.services.password_hasher import password_hasher, HasherBusyError
 
 
 
@@ -39,10 +42,27 @@ from backend.models.user import User
 
 
 
+def login_account_key():
+    """Clé de limitation par compte : l'email ciblé par la tentative de connexion"""
+    data = request.get_json(silent=True) or {}
+    email = data.get('email')
+    if isinstance(email, str) and email.strip():
+        return f"login-account:{email.strip().lower()}"
+    return f"login-account-anonymous:{request.remote_addr}"
+
+
+def busy_response():
+    """Réponse 503 quand le pool de hachage est saturé"""
+    response, status = error_response("Service d'authentification saturé, réessayez dans un instant", 503)
+    response.headers['Retry-After'] = '1'
+    return response, status
+
+
 # -------------------------------
 # Enregistrement d'un utilisateur
 # -------------------------------
 @auth_bp.route('/register', methods=['POST'])
+@limiter.limit(lambda: current_app.config['REGISTER_RATE_LIMIT'])
 def register():
     try:
         data = request.get_json()
@@ -112,6 +132,9 @@ def register():
             'user': user.to_dict()
         }, "Utilisateur créé avec succès", 201)
 
+    except HasherBusyError:
+        db.session.rollback()
+        return busy_response()
     except Exception as e:
         db.session.rollback()
         current_app.logger.error(f"Erreur inscription: {str(e)}")
@@ -122,6 +145,8 @@ def register():
 # Connexion
 # -------------------------------
 @auth_bp.route('/login', methods=['POST'])
+@limiter.limit(lambda: current_app.config['LOGIN_RATE_LIMIT'])
+@limiter.limit(lambda: current_app.config['LOGIN_ACCOUNT_RATE_LIMIT'], key_func=login_account_key)
 def login():
     try:
         data = request.get_json()
@@ -136,7 +161,7 @@ def login():
             return error_response("Email ou mot de passe incorrect", 401)
 
         user.last_login = datetime.utcnow()
-        db.session.commit()
+        db.session.commit()  # Enregistre aussi un éventuel nouveau hash (changement de coût bcrypt)
 
         claims = {'role': user.role.value, 'username': user.username, 'email': user.email}
         access_token = create_access_token(
@@ -156,6 +181,9 @@ def login():
             'user': user.to_dict()
         }, "Connexion réussie")
 
+    except HasherBusyError:
+        db.session.rollback()
+        return busy_response()
     except Exception as e:
         current_app.logger.error(f"Erreur connexion: {str(e)}")
         return error_response("Erreur lors de la connexion", 500)
@@ -204,8 +232,7 @@ def logout():
 @jwt_required()
 def get_current_user():
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        user = current_user_snapshot()
         if not user:
             return error_response("Utilisateur non trouvé", 404)
         return create_response({'user': user.to_dict()}, "Profil récupéré avec succès")
@@ -220,16 +247,19 @@ def get_current_user():
 @auth_bp.route('/users/<user_id>', methods=['PUT'])
 @jwt_required()
 def update_profile(user_id):
-    current_user = User.query.get(get_jwt_identity())
-    if str(current_user.id) != user_id and not current_user.has_role(UserRole.POLICE):
+    if get_jwt_identity() != user_id and not jwt_has_role(UserRole.POLICE):
         return error_response("Accès interdit", 403)
 
-    data = request.get_json()
-    current_user.first_name = data.get("first_name", current_user.first_name)
-    current_user.last_name = data.get("last_name", current_user.last_name)
-    db.session.commit()
+    user = db.session.get(User, user_id)
+    if not user:
+        return error_response("Utilisateur non trouvé", 404)
+
+    data = request.get_json() or {}
+    user.first_name = data.get("first_name", user.first_name)
+    user.last_name = data.get("last_name", user.last_name)
+    db.session.commit()  # Invalide l'entrée du cache utilisateur
 
-    return create_response({'user': current_user.to_dict()}, "Profil mis à jour")
+    return create_response({'user': user.to_dict()}, "Profil mis à jour")
 
 
 
@@ -240,22 +270,24 @@ def update_profile(user_id):
 @jwt_required()
 def list_users():
     try:
-        current_user = User.query.get(get_jwt_identity())
-        if not current_user.has_role(UserRole.POLICE):
+        if not jwt_has_role(UserRole.POLICE):
             return error_response("Accès réservé aux forces de l'ordre", 403)
 
-        users = User.query.order_by(User.created_at.desc()).all()
-        return create_response({
-            'users': [user.to_public_dict() for user in users],
-            'count': len(users)
-        }, "Liste des utilisateurs récupérée")
+        # Diffusé par lots : mémoire constante quel que soit le nombre d'utilisateurs
+        return stream_query(User.query.order_by(User.created_at.desc()), User.to_public_dict, 'users',
+                            "Liste des utilisateurs récupérée", with_count=True)
 
     except Exception as e:
         current_app.logger.error(f"Erreur liste utilisateurs: {str(e)}")
         return error_response("Erreur lors de la récupération de la liste", 500)
 
 
-
-
-
-
+# -------------------------------
+# Métriques du hachage des mots de passe
+# -------------------------------
+@auth_bp.route('/security-metrics', methods=['GET'])
+@jwt_required()
+def security_metrics():
+    if not jwt_has_role(UserRole.POLICE):
+        return error_response("Accès réservé aux forces de l'ordre", 403)
+    return create_response({'password_hashing': password_hasher.stats()}, "Métriques récupérées")
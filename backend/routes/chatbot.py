@@ -3,20 +3,23 @@ Routes pour le chatbot IA des élections municipales.
 """
 
 from datetime import datetime
-from flask import Blueprint, request
+from flask import Blueprint, request, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from backend.extensions import db
 from backend.models.conversation import  Conversation, Message
-from backend.models.user import User
+from backend.models.types import new_id
 from backend.services import ai_service, n8n_service
-from backend.services.chroma_service import ChromaService
-from backend.utils.helpers import create_response, error_response, sanitize_input
+from backend.services.chroma_service import get_chroma_service as shared_chroma_service
+from backend.services.message_writer import message_writer
+from backend.services.user_cache import current_user_snapshot
+from backend.utils.replicas import read_replica
+from backend.utils.helpers import create_response, error_response, sanitize_input, encode_cursor, decode_cursor
 
 chatbot_bp = Blueprint('chatbot', __name__, url_prefix="/api/chatbot")
 
 def get_chroma_service():
-    """Crée et retourne le service Chroma à la demande"""
-    return ChromaService()
+    """Retourne le service Chroma partagé (créé à la première requête)"""
+    return shared_chroma_service(current_app.config['CHROMA_HOST'], current_app.config['CHROMA_PORT'])
 
 
 @chatbot_bp.route('/chat', methods=['POST'])
@@ -30,8 +33,7 @@ def chat():
             return error_response("Message requis", 400)
 
         # Récupération de l'utilisateur
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        user = current_user_snapshot()
         if not user:
             return error_response("Utilisateur non trouvé", 404)
 
@@ -39,39 +41,48 @@ def chat():
         chroma_service = get_chroma_service()
         context = chroma_service.get_relevant_context(user_message)
 
-        # Génération de la réponse AI
-        response = ai_service.generate_election_response(user_message, context)
+        received_at = datetime.utcnow()
+
+        # Conversation demandée, sinon la plus récente de l'utilisateur
+        # (en écriture différée, celle qui a des messages en attente prime)
+        conversation_id = data.get('conversation_id') or message_writer.latest_conversation_id(user.id)
+        if conversation_id:
+            conversation = db.session.get(Conversation, conversation_id)
+            if not conversation or conversation.user_id != user.id:
+                return error_response("Conversation non trouvée", 404)
+        else:
+            conversation = Conversation.query.filter_by(user_id=user.id)\
+                                            .order_by(Conversation.updated_at.desc())\
+                                            .first()
+        pending = message_writer.pending_for(conversation.id) if conversation else []
+
+        # Génération de la réponse AI (historique récent + résumé des échanges plus anciens)
+        response = ai_service.generate_election_response(user_message, context, conversation=conversation,
+                                                         pending_messages=pending)
 
         # Déclenchement du workflow N8N
         n8n_service.trigger_election_workflow(user_message, user.to_dict())
 
-        # Gestion de la conversation
-        conversation = Conversation.query.filter_by(user_id=user.id)\
-                                        .order_by(Conversation.updated_at.desc())\
-                                        .first()
-
-        if conversation:
-            # Ajouter les messages existants
-            user_msg = Message(conversation_id=conversation.id, sender='user', content=user_message)
-            bot_msg = Message(conversation_id=conversation.id, sender='bot', content=response)
-            db.session.add_all([user_msg, bot_msg])
-            conversation.updated_at = datetime.utcnow()
-        else:
-            # Créer une nouvelle conversation
+        if not conversation:
+            # Créer une nouvelle conversation (id généré ici : pas de flush nécessaire)
             conversation = Conversation(
+                id=new_id(),
                 user_id=user.id,
                 title=(user_message[:50] + "...") if len(user_message) > 50 else user_message,
-                created_at=datetime.utcnow(),
-                updated_at=datetime.utcnow()
+                created_at=received_at,
+                updated_at=received_at
             )
             db.session.add(conversation)
-            db.session.flush()  # pour récupérer conversation.id avant d'ajouter les messages
 
-            user_msg = Message(conversation_id=conversation.id, sender='user', content=user_message)
-            bot_msg = Message(conversation_id=conversation.id, sender='bot', content=response)
-            db.session.add_all([user_msg, bot_msg])
+        # Messages écrits en lot par le writer (ou ajoutés à la session en mode synchrone)
+        message_writer.add(user.id, conversation.id, [
+            message_writer.message_row(conversation.id, 'user', user_message, received_at),
+            message_writer.message_row(conversation.id, 'bot', response)
+        ])
 
-        db.session.commit()
+        # Nouvelle conversation, résumé mis à jour ou mode synchrone
+        if db.session.new or db.session.dirty:
+            db.session.commit()
 
         return create_response({
             'response': response,
@@ -84,17 +95,47 @@ def chat():
         return error_response(f"Erreur lors de la génération de la réponse : {str(e)}", 500)
 
 
+MAX_PAGE_SIZE = 100
+
+
+def _page_size(default):
+    limit = request.args.get('limit', default, type=int)
+    if limit is None or limit < 1:
+        raise ValueError("Paramètre limit invalide")
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def _message_page(conversation_id, limit, before=None, after=None):
+    """Sérialise une fenêtre de messages avec ses curseurs de navigation"""
+    messages, has_more = Message.window(conversation_id, limit, before=before, after=after)
+    return {
+        'messages': [message.to_dict() for message in messages],
+        'has_more': has_more,
+        # Curseur vers les messages plus anciens (premier de la fenêtre)
+        'before_cursor': encode_cursor(messages[0].created_at, messages[0].id) if messages else None,
+        # Curseur vers les messages plus récents (dernier de la fenêtre)
+        'after_cursor': encode_cursor(messages[-1].created_at, messages[-1].id) if messages else None
+    }
+
+
 @chatbot_bp.route('/conversations', methods=['GET'])
 @jwt_required()
+@read_replica
 def get_conversations():
-    """Récupération des conversations de l'utilisateur"""
+    """Liste paginée des conversations de l'utilisateur (résumés sans messages)"""
     try:
         current_user_id = get_jwt_identity()
-        conversations = Conversation.query.filter_by(user_id=current_user_id)\
-                                          .order_by(Conversation.updated_at.desc())\
-                                          .all()
+        try:
+            limit = _page_size(20)
+            cursor = request.args.get('cursor')
+            cursor = decode_cursor(cursor) if cursor else None
+        except ValueError as e:
+            return error_response(str(e), 400)
+
+        conversations, next_cursor = Conversation.summaries_for_user(current_user_id, limit, cursor)
         return create_response({
-            'conversations': [conv.to_dict() for conv in conversations]
+            'conversations': conversations,
+            'next_cursor': next_cursor
         }, "Conversations récupérées avec succès")
     except Exception as e:
         return error_response(f"Erreur lors de la récupération des conversations : {str(e)}", 500)
@@ -102,18 +143,56 @@ def get_conversations():
 
 @chatbot_bp.route('/conversations/<conversation_id>', methods=['GET'])
 @jwt_required()
+@read_replica
 def get_conversation(conversation_id):
-    """Récupération d'une conversation spécifique"""
+    """Récupération d'une conversation avec la fenêtre de ses messages les plus récents"""
     try:
         current_user_id = get_jwt_identity()
         conversation = Conversation.query.filter_by(id=conversation_id, user_id=current_user_id).first()
         if not conversation:
             return error_response("Conversation non trouvée", 404)
-        return create_response({'conversation': conversation.to_dict()}, "Conversation récupérée avec succès")
+        try:
+            limit = _page_size(50)
+        except ValueError as e:
+            return error_response(str(e), 400)
+
+        data = conversation.to_summary_dict()
+        data.update(_message_page(conversation.id, limit))
+        return create_response({'conversation': data}, "Conversation récupérée avec succès")
     except Exception as e:
         return error_response(f"Erreur lors de la récupération de la conversation : {str(e)}", 500)
 
 
+@chatbot_bp.route('/conversations/<conversation_id>/messages', methods=['GET'])
+@jwt_required()
+@read_replica
+def get_conversation_messages(conversation_id):
+    """
+    Messages d'une conversation paginés par clé (created_at, id).
+    Paramètres : limit, before=<curseur> (plus anciens) ou after=<curseur> (plus récents).
+    """
+    try:
+        current_user_id = get_jwt_identity()
+        exists = db.session.query(Conversation.id).filter_by(id=conversation_id, user_id=current_user_id).first()
+        if not exists:
+            return error_response("Conversation non trouvée", 404)
+        try:
+            limit = _page_size(50)
+            before = request.args.get('before')
+            after = request.args.get('after')
+            if before and after:
+                return error_response("Utilisez before ou after, pas les deux", 400)
+            before = decode_cursor(before) if before else None
+            after = decode_cursor(after) if after else None
+        except ValueError as e:
+            return error_response(str(e), 400)
+
+        return create_response(_message_page(conversation_id, limit, before, after),
+                               "Messages récupérés avec succès")
+    except Exception as e:
+        return error_response(f"Erreur lors de la récupération des messages : {str(e)}", 500)
+
+
 @chatbot_bp.route('/conversations/<conversation_id>', methods=['DELETE'])
 @jwt_required()
 def delete_conversation(conversation_id):
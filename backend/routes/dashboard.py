@@ -1,6 +1,13 @@
-from flask import Blueprint
+from flask import Blueprint, request
 from flask_jwt_extended import jwt_required
-from backend.utils.helpers import create_response
+from backend.models.user import UserRole
+from backend.services.ai_service import ai_service
+from backend.services.analysis_cache import analysis_cache
+from backend.services.llm_metrics import llm_metrics
+from backend.services.user_cache import jwt_has_role
+from backend.utils.helpers import create_response, error_response
+from backend.utils.http_cache import cached_response
+from backend.utils.replicas import read_replica
 from backend.models.urbanism_project import UrbanismProject
 from backend.models.suspect_alert import SuspectAlert
 from backend.models.research_project import ResearchProject
@@ -11,6 +18,8 @@ dashboard_bp = Blueprint('dashboard', __name__, url_prefix='/api/massy')
 
 @dashboard_bp.route('/metrics', methods=['GET'])
 @jwt_required(optional=True)
+@cached_response(max_age=15, server_ttl=30, weak=True)
+@read_replica
 def metrics():
     """Retourne les KPIs réels pour le dashboard"""
     try:
@@ -50,6 +59,7 @@ def metrics():
 
 @dashboard_bp.route('/recent-activity', methods=['GET'])
 @jwt_required(optional=True)
+@read_replica
 def recent_activity():
     """Retourne une liste d'activités récentes depuis la DB"""
     try:
@@ -101,3 +111,32 @@ def recent_activity():
 def overview():
     """Alias vers /metrics"""
     return metrics()
+
+
+@dashboard_bp.route('/llm-metrics', methods=['GET'])
+@jwt_required()
+def llm_usage_metrics():
+    """Consommation LLM (tokens, latence, tentatives, cache) par fonctionnalité, endpoint et utilisateur"""
+    if not jwt_has_role(UserRole.POLICE):
+        return error_response("Accès réservé aux forces de l'ordre", 403)
+    top_users = min(request.args.get('top_users', 20, type=int) or 20, 100)
+    return create_response({
+        'usage': llm_metrics.snapshot(top_users=top_users),
+        'providers': ai_service.router.snapshot()
+    }, "Métriques LLM récupérées")
+
+
+@dashboard_bp.route('/analysis-cache', methods=['GET', 'DELETE'])
+@jwt_required()
+def analysis_cache_admin():
+    """
+    Statistiques (GET) ou invalidation (DELETE) du cache des analyses de documents.
+    DELETE accepte ?digest=<sha256> (fichier ou analyse) et/ou ?kind=extraction|market|urbanism ;
+    sans paramètre, tout le cache est vidé.
+    """
+    if not jwt_has_role(UserRole.POLICE):
+        return error_response("Accès réservé aux forces de l'ordre", 403)
+    if request.method == 'GET':
+        return create_response({'cache': analysis_cache.stats()}, "Statistiques du cache récupérées")
+    deleted = analysis_cache.invalidate(digest=request.args.get('digest'), kind=request.args.get('kind'))
+    return create_response({'deleted': deleted}, f"{deleted} entrée(s) supprimée(s)")
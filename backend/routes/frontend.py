@@ -4,8 +4,8 @@ Routes frontend pour l'application Massy IA.
 
 from datetime import datetime, timedelta
 from flask import Blueprint, render_template, current_app
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from backend.models.user import User
+from flask_jwt_extended import jwt_required
+from backend.services.user_cache import current_user_snapshot
 from backend.models.conversation import Message as ChatMessage
 from backend.extensions import db
 import os
@@ -63,9 +63,7 @@ def inject_utils():
 @frontend_bp.route('/<string:tab>')
 @jwt_required(optional=True)
 def index(tab='dashboard'):
-    current_user = None
-    if get_jwt_identity():
-        current_user = User.query.get(get_jwt_identity())
+    current_user = current_user_snapshot()
 
     # Récupération des 10 derniers messages de l'utilisateur si connecté
     chat_messages = []
@@ -0,0 +1,147 @@
+"""
+Routes de suivi des tâches d'analyse exécutées en arrière-plan.
+"""
+
+import time
+
+from flask import Blueprint, Response, current_app, request, stream_with_context
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from backend.extensions import db
+from backend.models import AnalysisJob
+from backend.services.job_queue import job_queue, QueueFullError
+from backend.services.pdf_extractor import pdf_extractor
+from backend.utils.helpers import create_response, error_response
+from backend.utils.uploads import get_upload, UploadTooLargeError
+
+jobs_bp = Blueprint('jobs', __name__, url_prefix='/api/jobs')
+
+
+def submit_analysis_job(kind: str, success_message: str):
+    """
+    Dépose un document (PDF ou texte) dans la file d'analyse.
+
+    Répond 202 avec l'identifiant de la tâche ; avec `?sync=1`, l'analyse est exécutée
+    dans la requête et la réponse contient directement le résultat.
+    """
+    fields = {}
+    try:
+        upload = get_upload('file', extensions=('.pdf',))
+    except UploadTooLargeError as e:
+        return error_response(str(e), 413)
+    except ValueError as e:
+        return error_response(str(e), 400)
+    if upload is not None:
+        if upload.size > pdf_extractor.max_bytes:
+            return error_response(f"PDF trop volumineux (maximum {pdf_extractor.max_bytes // (1024 * 1024)} Mo)", 413)
+        # Empreinte calculée pendant la réception ; le fichier est déplacé, jamais relu en mémoire
+        fields['document_hash'] = upload.sha256
+        fields['input_path'] = job_queue.spool(upload, upload.sha256)
+    else:
+        data = request.get_json(silent=True) or request.form
+        text = (data.get('text') or '').strip()
+        if not text:
+            return error_response("Texte ou fichier PDF requis", 400)
+        fields['input_text'] = text
+
+    try:
+        priority = int(request.args.get('priority', 5))
+    except ValueError:
+        return error_response("priority doit être un entier", 400)
+    sync = request.args.get('sync', '').lower() in ('1', 'true')
+
+    try:
+        job = job_queue.enqueue(kind, get_jwt_identity(), priority=min(max(priority, 0), 9),
+                                run_inline=sync, **fields)
+    except QueueFullError as e:
+        return error_response(str(e), 429)
+
+    if job.status == 'succeeded':
+        return create_response({'job_id': job.id, **job.result}, success_message)
+    if job.status == 'failed':
+        return error_response(f"Erreur lors de l'analyse : {job.error}", 500)
+    return create_response({
+        'job': job.to_dict(with_result=False),
+        'status_url': f"/api/jobs/{job.id}",
+        'events_url': f"/api/jobs/{job.id}/events"
+    }, "Analyse mise en file d'attente", 202)
+
+
+def _user_job(job_id):
+    return AnalysisJob.query.filter_by(id=job_id, user_id=get_jwt_identity()).first()
+
+
+@jobs_bp.route('', methods=['GET'])
+@jwt_required()
+def list_jobs():
+    """Tâches récentes de l'utilisateur (sans les résultats)"""
+    try:
+        limit = min(max(int(request.args.get('limit', 20)), 1), 100)
+    except ValueError:
+        return error_response("limit doit être un entier", 400)
+    query = AnalysisJob.query.filter_by(user_id=get_jwt_identity())
+    status = request.args.get('status')
+    if status:
+        query = query.filter_by(status=status)
+    jobs = query.order_by(AnalysisJob.created_at.desc()).limit(limit).all()
+    return create_response({'jobs': [job.to_dict(with_result=False) for job in jobs]},
+                           "Tâches récupérées avec succès")
+
+
+@jobs_bp.route('/<job_id>', methods=['GET'])
+@jwt_required()
+def get_job(job_id):
+    """Statut, avancement et résultat d'une tâche"""
+    job = _user_job(job_id)
+    if not job:
+        return error_response("Tâche non trouvée", 404)
+    return create_response({'job': job.to_dict()}, "Tâche récupérée avec succès")
+
+
+@jobs_bp.route('/<job_id>/events', methods=['GET'])
+@jwt_required()
+def job_events(job_id):
+    """
+    Flux Server-Sent Events : un événement à chaque changement d'avancement,
+    puis l'événement final (avec le résultat) et fermeture du flux.
+    """
+    job = _user_job(job_id)
+    if not job:
+        return error_response("Tâche non trouvée", 404)
+    interval = current_app.config.get('JOB_EVENTS_INTERVAL', 1.0)
+    timeout = current_app.config.get('JOB_EVENTS_TIMEOUT', 300)
+
+    @stream_with_context
+    def events():
+        deadline = time.monotonic() + timeout
+        last = None
+        while True:
+            current = db.session.get(AnalysisJob, job_id, populate_existing=True)
+            state = (current.status, current.progress, current.stage)
+            finished = current.is_finished
+            payload = current.to_dict(with_result=finished)
+            # Fin de la transaction de lecture : pas de verrou conservé entre deux sondages
+            db.session.commit()
+            if state != last:
+                last = state
+                yield f"event: {'done' if finished else 'progress'}\ndata: {current_app.json.dumps(payload)}\n\n"
+            if finished:
+                return
+            if time.monotonic() >= deadline:
+                yield "event: timeout\ndata: {}\n\n"
+                return
+            time.sleep(interval)
+
+    return Response(events(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@jobs_bp.route('/<job_id>', methods=['DELETE'])
+@jwt_required()
+def cancel_job(job_id):
+    """Annulation d'une tâche encore en file d'attente"""
+    job = _user_job(job_id)
+    if not job:
+        return error_response("Tâche non trouvée", 404)
+    if not job_queue.cancel(job):
+        return error_response(f"Tâche déjà {job.status}, annulation impossible", 409)
+    return create_response({'job': job.to_dict(with_result=False)}, "Tâche annulée")
@@ -6,6 +6,7 @@ from flask import Blueprint, request
 from flask_jwt_extended import jwt_required
 from backend.services import ai_service
 from backend.utils.helpers import create_response, error_response
+from backend.utils.uploads import get_upload, limit_upload, UploadTooLargeError
 
 # Blueprint pour le module "media"
 media_bp = Blueprint('media', __name__, url_prefix='/api/media')
@@ -33,18 +34,25 @@ def generate_image():
 
 @media_bp.route('/analyze-video', methods=['POST'])
 @jwt_required()
+@limit_upload('UPLOAD_VIDEO_MAX_BYTES')
 def analyze_video():
     """
     Analyse une vidéo fournie par l'utilisateur.
-    Reçoit un fichier via form-data : key="video"
+    Reçoit un fichier via form-data : key="video" (écrit sur disque à la réception, jamais en mémoire)
     """
     try:
-        video = request.files.get('video')
+        try:
+            video = get_upload('video')
+        except UploadTooLargeError as e:
+            return error_response(str(e), 413)
+        except ValueError as e:
+            return error_response(str(e), 400)
         if not video:
             return error_response("Fichier vidéo requis", 400)
 
-        report = ai_service.analyze_video(video)
-        return create_response({"report": report}, "Analyse vidéo effectuée avec succès")
+        report = ai_service.analyze_video(video.path)
+        return create_response({"report": report, "size": video.size, "sha256": video.sha256},
+                               "Analyse vidéo effectuée avec succès")
     
     except Exception as e:
         return error_response(f"Erreur lors de l'analyse de la vidéo : {str(e)}", 500)
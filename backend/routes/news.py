@@ -1,17 +1,20 @@
 from flask import Blueprint, request
 import requests
-from bs4 import BeautifulSoup
 from backend.utils.helpers import create_response, error_response
+from backend.utils.http_cache import cached_response
 
 news_bp = Blueprint('news', __name__, url_prefix='/api/news')
 
 
 @news_bp.route('/', methods=['GET'])
+@cached_response(max_age=300, server_ttl=600, stale_while_revalidate=600)
 def get_news():
     """
     Scraper les actualités locales de Massy et renvoyer directement au frontend.
     Filtrage par catégorie si nécessaire.
     """
+    from bs4 import BeautifulSoup  # Import à l'usage : inutile au démarrage des workers
+
     category_filter = request.args.get('category', 'all').lower()
 
     try:
@@ -3,22 +3,34 @@ Routes pour la gestion policière : détection de comportements suspects et opti
 """
 
 from flask import Blueprint, request, current_app
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from backend.models import User, SuspectAlert, UserRole
+from flask_jwt_extended import jwt_required
+from backend.models import SuspectAlert, UserRole, AlertHeatmapCell
+from backend.models.types import new_id
 from backend.extensions import db
 from backend.utils.helpers import create_response, error_response
+from backend.utils.streaming import stream_query
+from backend.utils.replicas import read_replica
+from backend.utils.geo import (
+    EARTH_RADIUS_M, HEATMAP_RESOLUTIONS_M, geohash_cover_radius, geohash_encode, haversine_m,
+    radius_bounding_box, validate_bbox
+)
+from backend.services.patrol_optimizer import patrol_optimizer
+from backend.services.user_cache import current_user_snapshot, jwt_has_role
+from backend.services.alert_ingestion import alert_ingestion, parse_ndjson, rebuild_alert_heatmap, IngestionError
+from sqlalchemy import func, or_
+from sqlalchemy.orm import joinedload
+import numpy as np
 from datetime import datetime, timedelta
+import math
 import random
-import uuid
 
 police_bp = Blueprint('police', __name__, url_prefix='/api/police')
 
 
 def check_police_access():
-    """Vérifie que l'utilisateur connecté est un membre de la police"""
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
-    if not user or not user.has_role(UserRole.POLICE):
+    """Vérifie que l'utilisateur connecté est un membre de la police (rôle lu dans le JWT)"""
+    user = current_user_snapshot()
+    if not user or not jwt_has_role(UserRole.POLICE):
         return None, error_response("Accès refusé. Réservé aux forces de l'ordre.", 403)
     return user, None
 
@@ -51,7 +63,7 @@ def detect_suspects():
             time_delta = random.randint(1, 120)
 
             alert = SuspectAlert(
-                id=str(uuid.uuid4()),
+                id=new_id(),
                 alert_type=alert_type,
                 description=f"{alert_type} détecté près de {location['name']}. "
                             f"Témoins rapportent un individu {random.choice(['agité', 'masqué', 'armé', 'en fuite'])}.",
@@ -82,38 +94,52 @@ def detect_suspects():
 @police_bp.route('/optimize-patrols', methods=['GET'])
 @jwt_required()
 def optimize_patrols():
-    """Optimise les patrouilles en fonction des alertes (simulation)"""
+    """Optimise les tournées de patrouille en fonction des alertes actives"""
     user, error = check_police_access()
     if error:
         return error
 
     try:
-        alerts = SuspectAlert.query.filter_by(status='new').order_by(SuspectAlert.risk_level.desc()).all()
-        if not alerts:
+        vehicles = request.args.get('vehicles', 3, type=int)
+        budget = request.args.get('budget', 60, type=float)
+        if vehicles is None or not 1 <= vehicles <= 20:
+            return error_response("Le nombre de patrouilles doit être compris entre 1 et 20", 400)
+        if budget is None or not 5 <= budget <= 480:
+            return error_response("La durée de tournée doit être comprise entre 5 et 480 minutes", 400)
+
+        # Signature de l'ensemble des alertes actives : le cache reste valide tant qu'elle ne change pas
+        signature = tuple(db.session.query(
+            func.count(SuspectAlert.id),
+            func.max(SuspectAlert.reported_at),
+            func.sum(SuspectAlert.risk_level),
+            func.sum(SuspectAlert.latitude),
+            func.sum(SuspectAlert.longitude)
+        ).filter(SuspectAlert.status == 'new').one())
+        if not signature[0]:
             return create_response({'routes': []}, "Aucune alerte récente. Patrouilles standard recommandées.")
 
-        routes = []
-        for alert in alerts[:3]:
-            path = [{'lat': alert.latitude + random.uniform(-0.0005, 0.0005) * j,
-                     'lng': alert.longitude + random.uniform(-0.0005, 0.0005) * j} for j in range(5)]
-            routes.append({
-                'id': str(uuid.uuid4()),
-                'alert_id': alert.id,
-                'alert_type': alert.alert_type,
-                'path': path,
-                'duration': random.randint(20, 60),
-                'priority': 'high' if alert.risk_level > 7 else 'medium',
-                'recommended_actions': [
-                    'Surveillance renforcée',
-                    'Contact avec les témoins',
-                    'Vérification des caméras à proximité'
-                ]
-            })
+        cache_key = (signature, vehicles, budget)
+        result = patrol_optimizer.get_cached(cache_key)
+        cached = result is not None
+        if not cached:
+            rows = db.session.query(
+                SuspectAlert.id, SuspectAlert.latitude, SuspectAlert.longitude,
+                SuspectAlert.risk_level, SuspectAlert.alert_type
+            ).filter(SuspectAlert.status == 'new').all()
+            ids, lat, lng, risk, types = zip(*rows)
+            result = patrol_optimizer.optimize(ids, np.array(lat), np.array(lng), np.array(risk), types,
+                                               vehicles=vehicles, budget_minutes=budget)
+            patrol_optimizer.store(cache_key, result)
 
+        routes = result['routes']
         return create_response({
             'optimized_routes': len(routes),
-            'routes': routes
-        }, f"{len(routes)} itinéraire(s) optimisé(s) basé(s) sur {len(alerts)} alerte(s).")
+            'routes': routes,
+            'alerts_covered': result['alerts_covered'],
+            'clusters': result['clusters'],
+            'computation_ms': result['computation_ms'],
+            'cached': cached
+        }, f"{len(routes)} itinéraire(s) optimisé(s) basé(s) sur {result['alerts_total']} alerte(s).")
 
     except Exception as e:
         current_app.logger.error(f"Erreur optimisation patrouilles: {str(e)}")
@@ -122,6 +148,7 @@ def optimize_patrols():
 
 @police_bp.route('/alerts', methods=['GET'])
 @jwt_required()
+@read_replica
 def get_alerts():
     """Récupère toutes les alertes (avec filtres)"""
     user, error = check_police_access()
@@ -138,14 +165,57 @@ def get_alerts():
         if risk_level:
             query = query.filter_by(risk_level=int(risk_level))
 
-        alerts = query.order_by(SuspectAlert.reported_at.desc()).all()
-        return create_response({'alerts': [alert.to_dict() for alert in alerts]}, "Alertes récupérées avec succès")
+        # Rapporteur chargé par jointure (pas de requête par alerte), lignes diffusées par lots
+        query = query.options(joinedload(SuspectAlert.reporter)).order_by(SuspectAlert.reported_at.desc())
+        return stream_query(query, SuspectAlert.to_dict, 'alerts', "Alertes récupérées avec succès")
 
     except Exception as e:
         current_app.logger.error(f"Erreur récupération alertes: {str(e)}")
         return error_response("Erreur interne lors de la récupération des alertes", 500)
 
 
+@police_bp.route('/alerts/bulk', methods=['POST'])
+@jwt_required()
+def ingest_alerts():
+    """
+    Ingestion en masse d'alertes (capteurs, caméras).
+    Accepte du NDJSON (Content-Type: application/x-ndjson) ou un tableau JSON
+    (éventuellement sous la clé "alerts").
+    """
+    user, error = check_police_access()
+    if error:
+        return error
+
+    try:
+        alert_ingestion.configure(current_app.config)
+        source = request.args.get('source') or request.headers.get('X-Alert-Source')
+        parse_errors = []
+
+        if request.mimetype in ('application/x-ndjson', 'application/ndjson', 'application/jsonl'):
+            records, parse_errors = parse_ndjson(request.stream, alert_ingestion.max_batch)
+        else:
+            data = request.get_json(silent=True)
+            if isinstance(data, dict):
+                data = data.get('alerts')
+            if not isinstance(data, list):
+                return error_response("Tableau d'alertes ou flux NDJSON requis", 400)
+            records = [record if isinstance(record, dict) else None for record in data]
+
+        if not records:
+            return error_response("Aucune alerte à ingérer", 400)
+
+        stats = alert_ingestion.ingest(records, user.id, source=source, parse_errors=parse_errors)
+        status_code = 201 if stats['accepted'] else 200
+        return create_response(stats, f"{stats['accepted']} alerte(s) ingérée(s) sur {stats['received']}", status_code)
+
+    except IngestionError as e:
+        return error_response(str(e), 413)
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Erreur ingestion alertes: {str(e)}")
+        return error_response("Erreur interne lors de l'ingestion des alertes", 500)
+
+
 @police_bp.route('/alerts/<alert_id>', methods=['PUT'])
 @jwt_required()
 def update_alert(alert_id):
@@ -172,3 +242,202 @@ def update_alert(alert_id):
         db.session.rollback()
         current_app.logger.error(f"Erreur mise à jour alerte: {str(e)}")
         return error_response("Erreur interne lors de la mise à jour de l'alerte", 500)
+
+
+# -------------------------------
+# Requêtes géospatiales
+# -------------------------------
+MAX_SEARCH_RADIUS_M = 50000
+MAX_GEO_RESULTS = 1000
+
+
+def _geo_limit(default):
+    limit = request.args.get('limit', default, type=int)
+    if limit is None or limit < 1:
+        raise ValueError("Paramètre limit invalide")
+    return min(limit, MAX_GEO_RESULTS)
+
+
+def _filter_status(query, status):
+    if status != 'all':
+        query = query.filter(SuspectAlert.status == status)
+    return query
+
+
+def _read_bbox():
+    """Lit une boîte englobante depuis les paramètres de requête (ou None si absente)"""
+    keys = ('min_lat', 'min_lng', 'max_lat', 'max_lng')
+    values = [request.args.get(key, type=float) for key in keys]
+    if all(value is None for value in values):
+        return None
+    if any(value is None for value in values) or not validate_bbox(*values):
+        raise ValueError("Boîte englobante invalide (min_lat, min_lng, max_lat, max_lng)")
+    return values
+
+
+@police_bp.route('/alerts/nearby', methods=['GET'])
+@jwt_required()
+def get_alerts_nearby():
+    """Alertes dans un rayon (mètres) autour d'un point, triées par distance"""
+    user, error = check_police_access()
+    if error:
+        return error
+
+    try:
+        lat = request.args.get('lat', type=float)
+        lng = request.args.get('lng', type=float)
+        radius = request.args.get('radius', 500, type=float)
+        status = request.args.get('status', 'new')
+        try:
+            limit = _geo_limit(200)
+        except ValueError as e:
+            return error_response(str(e), 400)
+
+        if lat is None or lng is None or not validate_bbox(lat, lng, lat, lng):
+            return error_response("Paramètres lat et lng requis", 400)
+        if radius is None or not 0 < radius <= MAX_SEARCH_RADIUS_M:
+            return error_response(f"Le rayon doit être compris entre 0 et {MAX_SEARCH_RADIUS_M} m", 400)
+
+        # Pré-filtre indexé : préfixes geohash + boîte englobante, puis distance exacte
+        min_lat, min_lng, max_lat, max_lng = radius_bounding_box(lat, lng, radius)
+        query = _filter_status(SuspectAlert.query.options(joinedload(SuspectAlert.reporter)), status).filter(
+            SuspectAlert.latitude.between(min_lat, max_lat),
+            SuspectAlert.longitude.between(min_lng, max_lng)
+        )
+        prefixes = geohash_cover_radius(lat, lng, radius)
+        if prefixes:
+            query = query.filter(or_(*[SuspectAlert.geohash.like(f"{prefix}%") for prefix in prefixes]))
+
+        # Tri et limite en SQL sur une distance plane approchée (degrés², écart < 0,1 % à 50 km),
+        # la distance exacte ne départage que les lignes lues
+        d_lat = SuspectAlert.latitude - lat
+        d_lng = (SuspectAlert.longitude - lng) * math.cos(math.radians(lat))
+        approx = d_lat * d_lat + d_lng * d_lng
+        radius_deg = math.degrees(radius / EARTH_RADIUS_M) * 1.01
+        query = query.filter(approx <= radius_deg * radius_deg).order_by(approx).limit(limit + max(limit // 10, 10))
+
+        matches = []
+        for alert in query.yield_per(200):
+            distance = haversine_m(lat, lng, alert.latitude, alert.longitude)
+            if distance <= radius:
+                matches.append((distance, alert))
+        matches.sort(key=lambda item: item[0])
+
+        alerts = []
+        for distance, alert in matches[:limit]:
+            data = alert.to_dict()
+            data['distance_m'] = round(distance, 1)
+            alerts.append(data)
+
+        return create_response({
+            'alerts': alerts,
+            'count': len(alerts),
+            'center': {'lat': lat, 'lng': lng, 'geohash': geohash_encode(lat, lng)},
+            'radius': radius
+        }, f"{len(alerts)} alerte(s) dans un rayon de {int(radius)} m")
+
+    except Exception as e:
+        current_app.logger.error(f"Erreur recherche par rayon: {str(e)}")
+        return error_response("Erreur interne lors de la recherche géographique", 500)
+
+
+@police_bp.route('/alerts/bbox', methods=['GET'])
+@jwt_required()
+def get_alerts_in_bbox():
+    """Alertes contenues dans une boîte englobante (vue courante de la carte)"""
+    user, error = check_police_access()
+    if error:
+        return error
+
+    try:
+        try:
+            bbox = _read_bbox()
+        except ValueError as e:
+            return error_response(str(e), 400)
+        if bbox is None:
+            return error_response("Paramètres min_lat, min_lng, max_lat, max_lng requis", 400)
+
+        min_lat, min_lng, max_lat, max_lng = bbox
+        status = request.args.get('status', 'new')
+        try:
+            limit = _geo_limit(500)
+        except ValueError as e:
+            return error_response(str(e), 400)
+
+        alerts = _filter_status(SuspectAlert.query.options(joinedload(SuspectAlert.reporter)), status).filter(
+            SuspectAlert.latitude.between(min_lat, max_lat),
+            SuspectAlert.longitude.between(min_lng, max_lng)
+        ).order_by(SuspectAlert.reported_at.desc()).limit(limit).all()
+
+        return create_response({
+            'alerts': [alert.to_dict() for alert in alerts],
+            'count': len(alerts)
+        }, f"{len(alerts)} alerte(s) dans la zone")
+
+    except Exception as e:
+        current_app.logger.error(f"Erreur recherche par zone: {str(e)}")
+        return error_response("Erreur interne lors de la recherche géographique", 500)
+
+
+@police_bp.route('/heatmap', methods=['GET'])
+@jwt_required()
+def get_heatmap():
+    """Carte de densité hexagonale pré-calculée (toutes alertes confondues)"""
+    user, error = check_police_access()
+    if error:
+        return error
+
+    try:
+        resolution = request.args.get('resolution', 500, type=int)
+        if resolution not in HEATMAP_RESOLUTIONS_M:
+            return error_response(
+                f"Résolution invalide. Choix possibles: {', '.join(map(str, HEATMAP_RESOLUTIONS_M))}", 400)
+        try:
+            bbox = _read_bbox()
+        except ValueError as e:
+            return error_response(str(e), 400)
+        with_boundary = request.args.get('boundary', 'false').lower() == 'true'
+
+        query = AlertHeatmapCell.query.filter(
+            AlertHeatmapCell.resolution == resolution,
+            AlertHeatmapCell.alert_count > 0
+        )
+        if bbox:
+            min_lat, min_lng, max_lat, max_lng = bbox
+            query = query.filter(
+                AlertHeatmapCell.center_lat.between(min_lat, max_lat),
+                AlertHeatmapCell.center_lng.between(min_lng, max_lng)
+            )
+
+        cells = [cell.to_dict(with_boundary) for cell in query.all()]
+        return create_response({
+            'resolution': resolution,
+            'cells': cells,
+            'total_alerts': sum(cell['count'] for cell in cells)
+        }, f"{len(cells)} cellule(s) de densité récupérée(s)")
+
+    except Exception as e:
+        current_app.logger.error(f"Erreur carte de densité: {str(e)}")
+        return error_response("Erreur interne lors du calcul de la carte de densité", 500)
+
+
+@police_bp.route('/heatmap/rebuild', methods=['POST'])
+@jwt_required()
+def rebuild_heatmap():
+    """
+    Recalcule entièrement l'index spatial et la carte de densité (rattrapage des données existantes).
+    Sur un gros volume, préférer `flask massy rebuild-heatmap`, hors requête web.
+    """
+    user, error = check_police_access()
+    if error:
+        return error
+
+    try:
+        result = rebuild_alert_heatmap(db.session.connection())
+        db.session.commit()
+        return create_response(result, "Carte de densité recalculée avec succès")
+
+    except Exception as e:
+        db.session.rollback()
+        current_app.logger.error(f"Erreur reconstruction carte de densité: {str(e)}")
+        return error_response("Erreur interne lors de la reconstruction de la carte de densité", 500)
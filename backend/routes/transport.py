@@ -5,6 +5,7 @@ Routes pour la récupération des informations de transport (SNCF, RATP) à Mass
 from flask import Blueprint, request, current_app
 from flask_jwt_extended import jwt_required
 from backend.utils.helpers import create_response, error_response
+from backend.utils.http_cache import cached_response
 import requests
 from datetime import datetime
 
@@ -162,6 +163,7 @@ def get_ratp_journeys():
 
 @transport_bp.route('/stations', methods=['GET'])
 @jwt_required(optional=True)
+@cached_response(max_age=3600, server_ttl=3600, stale_while_revalidate=86400)
 def get_transport_stations():
     """Récupère les stations de transport autour de Massy avec coordonnées réelles"""
     try:
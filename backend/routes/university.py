@@ -3,10 +3,13 @@ Routes pour l'analyse et la gestion de projets de recherche universitaire.
 """
 
 from flask import Blueprint, current_app, request
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from backend.models import User, UserRole, ResearchProject
+from flask_jwt_extended import jwt_required
+from backend.models import UserRole, ResearchProject
+from backend.models.types import new_id
 from backend.extensions import db
 from backend.utils.helpers import create_response, error_response
+from backend.utils.streaming import stream_query
+from backend.services.user_cache import current_user_snapshot, jwt_has_role
 import random
 import uuid
 
@@ -18,9 +21,8 @@ university_bp = Blueprint('university', __name__, url_prefix='/api/university')
 def perform_research():
     """Effectue une recherche universitaire"""
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        if not user or not user.has_role(UserRole.UNIVERSITY):
+        user = current_user_snapshot()
+        if not user or not jwt_has_role(UserRole.UNIVERSITY):
             return error_response("Accès refusé. Réservé aux universités.", 403)
 
         data = request.get_json() or {}
@@ -63,7 +65,7 @@ def perform_research():
 
         # Sauvegarde du projet
         project = ResearchProject(
-            id=str(uuid.uuid4()),
+            id=new_id(),
             title=f"Recherche: {query}",
             description=f"Analyse approfondie de {query} et ses impacts sur Massy. "
                         f"Méthodologie: {random.choice(['Enquête terrain', 'Analyse de données', 'Modélisation'])}.",
@@ -98,15 +100,12 @@ def perform_research():
 def get_projects():
     """Récupère tous les projets de recherche de l'utilisateur"""
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        if not user or not user.has_role(UserRole.UNIVERSITY):
+        user = current_user_snapshot()
+        if not user or not jwt_has_role(UserRole.UNIVERSITY):
             return error_response("Accès refusé.", 403)
 
-        projects = ResearchProject.query.filter_by(user_id=user.id).order_by(ResearchProject.updated_at.desc()).all()
-        return create_response({
-            'projects': [project.to_dict() for project in projects]
-        }, f"{len(projects)} projet(s) récupéré(s).")
+        projects = ResearchProject.query.filter_by(user_id=user.id).order_by(ResearchProject.updated_at.desc())
+        return stream_query(projects, ResearchProject.to_dict, 'projects', "Projets récupérés.", with_count=True)
 
     except Exception as e:
         current_app.logger.error(f"Erreur récupération projets universitaires: {str(e)}")
@@ -118,9 +117,8 @@ def get_projects():
 def get_project(project_id):
     """Récupère un projet spécifique avec ses résultats"""
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        if not user or not user.has_role(UserRole.UNIVERSITY):
+        user = current_user_snapshot()
+        if not user or not jwt_has_role(UserRole.UNIVERSITY):
             return error_response("Accès refusé.", 403)
 
         project = ResearchProject.query.get(project_id)
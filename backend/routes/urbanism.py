@@ -2,72 +2,31 @@
 Routes pour l'analyse des projets et documents d'urbanisme avec l'IA.
 """
 
-from flask import Blueprint, request
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from backend.services import ai_service, n8n_service
-from backend.models import User, UrbanismProject
+from flask import Blueprint
+from flask_jwt_extended import jwt_required
+from backend.services.user_cache import current_user_snapshot
 from backend.extensions import db
-from backend.utils.helpers import create_response, error_response, extract_text_from_pdf
-import datetime
+from backend.routes.jobs import submit_analysis_job
+from backend.utils.helpers import create_response, error_response
+from backend.utils.http_cache import cached_response
+from backend.utils.uploads import limit_upload
 
 urbanism_bp = Blueprint('urbanism', __name__, url_prefix='/api/urbanism')
 
 
 @urbanism_bp.route('/analyze', methods=['POST'])
 @jwt_required()
+@limit_upload('UPLOAD_PDF_MAX_BYTES')
 def analyze_urbanism_document():
-    """Analyse d'un document ou projet d'urbanisme via l'IA et sauvegarde dans la base"""
+    """
+    Analyse d'un document ou projet d'urbanisme via l'IA et sauvegarde dans la base.
+    L'analyse est mise en file d'attente (202 + identifiant de tâche) ; `?sync=1` l'exécute dans la requête.
+    """
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        user = current_user_snapshot()
         if not user:
             return error_response("Utilisateur non trouvé", 404)
-
-        offer_text = ""
-
-        # Vérification si un fichier PDF est fourni
-        if 'file' in request.files:
-            pdf_file = request.files['file']
-            if not pdf_file.filename:
-                return error_response("Aucun fichier sélectionné", 400)
-            if not pdf_file.filename.lower().endswith('.pdf'):
-                return error_response("Le fichier doit être au format PDF", 400)
-            
-            offer_text = extract_text_from_pdf(pdf_file)
-        else:
-            data = request.get_json() or {}
-            offer_text = data.get('text', '').strip()
-            if not offer_text:
-                return error_response("Texte ou fichier PDF requis", 400)
-
-        # Analyse IA
-        analysis = ai_service.analyze_market_offer(offer_text)
-
-        # Déclenchement workflow N8N
-        n8n_service.trigger_market_analysis_workflow({
-            'user': user.to_dict(),
-            'text': offer_text,
-            'analysis': analysis
-        })
-
-        # Sauvegarde dans la base
-        project = UrbanismProject(
-            user_id=user.id,
-            title=f"Analyse Urbanisme {datetime.datetime.utcnow().isoformat()}",
-            content=offer_text,
-            analysis=analysis,
-            created_at=datetime.datetime.utcnow(),
-            updated_at=datetime.datetime.utcnow()
-        )
-        db.session.add(project)
-        db.session.commit()
-
-        return create_response({
-            'project_id': project.id,
-            'analysis': analysis,
-            'text_length': len(offer_text)
-        }, "Analyse effectuée et sauvegardée avec succès")
-
+        return submit_analysis_job('urbanism', "Analyse effectuée et sauvegardée avec succès")
     except Exception as e:
         db.session.rollback()
         return error_response(f"Erreur lors de l'analyse : {str(e)}", 500)
@@ -75,6 +34,7 @@ def analyze_urbanism_document():
 
 @urbanism_bp.route('/templates', methods=['GET'])
 @jwt_required()
+@cached_response(max_age=3600, public=False, server_ttl=3600)
 def get_urbanism_templates():
     """Récupération des modèles de documents d'urbanisme"""
     try:
@@ -1,9 +1,9 @@
 # backend/scripts/auto_sync.py
-import requests
-from bs4 import BeautifulSoup
+# requests, bs4 et apscheduler sont importés à l'usage : ce module est chargé
+# par create_app et ne doit pas alourdir le démarrage des workers.
+import threading
 from datetime import datetime
 import random
-from apscheduler.schedulers.background import BackgroundScheduler
 
 from backend.extensions import db
 from backend.models.urbanism_project import UrbanismProject   # ✅ CORRECT
@@ -13,6 +13,9 @@ from backend.models.research_project import ResearchProject   # ✅ CORRECT
 
 def sync_urbanism():
     """Synchronise les projets UrbanismProject avec les événements Massy"""
+    import requests
+    from bs4 import BeautifulSoup
+
     try:
         url = "https://www.ville-massy.fr/agenda"
         response = requests.get(url, timeout=10)
@@ -116,14 +119,65 @@ def auto_sync_all():
     print("[SYNC] Synchronisation terminée.")
 
 
-def start_scheduler(app):
+def start_scheduler(app, minutes=30):
     """Démarre le scheduler en arrière-plan"""
+    from apscheduler.schedulers.background import BackgroundScheduler
+
     scheduler = BackgroundScheduler()
-    scheduler.add_job(func=lambda: run_with_context(app), trigger="interval", minutes=30)
+    scheduler.add_job(func=lambda: run_with_context(app), trigger="interval", minutes=minutes)
     scheduler.start()
-    print("[SCHEDULER] Synchronisation programmée toutes les 30 minutes.")
+    print(f"[SCHEDULER] Synchronisation programmée toutes les {minutes} minutes.")
+    return scheduler
 
 
 def run_with_context(app):
     with app.app_context():
         auto_sync_all()
+
+
+def init_app(app, sync_on_startup=None, scheduler=None):
+    """
+    Branche la synchronisation sur l'application (appelé par create_app).
+    Rien n'est exécuté dans create_app : la première synchro part dans un thread
+    (AUTO_SYNC_ON_STARTUP) et le scheduler n'est démarré que si SCHEDULER_ENABLED.
+    Les arguments remplacent la configuration. Sous gunicorn, ni le maître ni les workers ne
+    synchronisent : voir main() (--schedule), lancé dans un processus dédié.
+    """
+    if sync_on_startup is None:
+        sync_on_startup = app.config.get('AUTO_SYNC_ON_STARTUP')
+    if scheduler is None:
+        scheduler = app.config.get('SCHEDULER_ENABLED')
+    if sync_on_startup:
+        threading.Thread(target=run_with_context, args=(app,), name="auto-sync", daemon=True).start()
+    if scheduler:
+        start_scheduler(app, app.config.get('AUTO_SYNC_INTERVAL_MINUTES', 30))
+
+
+def main():
+    """
+    python -m backend.scripts.auto_sync             synchronisation ponctuelle (cron)
+    python -m backend.scripts.auto_sync --schedule  processus planificateur dédié
+    """
+    import os
+    import signal
+    import sys
+
+    # Ce processus synchronise lui-même : create_app ne doit rien lancer en plus
+    os.environ['AUTO_SYNC_ON_STARTUP'] = os.environ['SCHEDULER_ENABLED'] = 'false'
+    from backend.app import create_app
+    from backend.config import config
+
+    app = create_app(config.get(os.environ.get('FLASK_ENV', 'default'), config['default']))
+    run_with_context(app)
+    if '--schedule' not in sys.argv[1:]:
+        return
+    scheduler = start_scheduler(app, app.config.get('AUTO_SYNC_INTERVAL_MINUTES', 30))
+    signal.signal(signal.SIGTERM, lambda *_: scheduler.shutdown(wait=False) or sys.exit(0))
+    try:
+        signal.pause()
+    except KeyboardInterrupt:
+        scheduler.shutdown(wait=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark de la sérialisation des grandes réponses JSON (alertes, messages).
+
+Usage :
+    python -m backend.scripts.bench_json [nombre_elements ...]
+
+Compare le fournisseur Flask d'origine (json standard, clés triées),
+le module standard sans tri, et orjson, sur des réponses create_response().
+"""
+
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from backend.utils.json_provider import OrJSONProvider, StdlibJSONProvider, orjson
+
+
+def synthetic_alerts(n: int) -> list:
+    """Dictionnaires au format SuspectAlert.to_dict()"""
+    start = datetime(2025, 1, 1)
+    return [{
+        'id': str(uuid.uuid4()),
+        'type': f"type-{i % 6}",
+        'description': "Individu observé à plusieurs reprises près de l'entrée de la gare RER, comportement inhabituel.",
+        'location': {'lat': 48.73 + (i % 100) * 1e-4, 'lng': 2.29 + (i % 70) * 1e-4},
+        'risk_level': i % 10 + 1,
+        'status': ('new', 'in_progress', 'resolved')[i % 3],
+        'reported_at': (start + timedelta(minutes=i)).isoformat(),
+        'resolved_at': None,
+        'reporter': {'id': str(uuid.uuid4()), 'username': f"agent{i % 40}", 'role': 'police'},
+        'additional_data': {'source': 'mobile', 'photos': [f"photo-{i}.jpg"]}
+    } for i in range(n)]
+
+
+def synthetic_messages(n: int) -> list:
+    """Dictionnaires au format Message.to_dict()"""
+    conversation_id = str(uuid.uuid4())
+    start = datetime(2025, 3, 1)
+    return [{
+        'id': str(uuid.uuid4()),
+        'conversation_id': conversation_id,
+        'sender': 'user' if i % 2 == 0 else 'bot',
+        'content': "Quels sont les horaires des bureaux de vote à Massy pour les élections municipales ? " * 3,
+        'created_at': (start + timedelta(seconds=30 * i)).isoformat(),
+        'meta_info': None
+    } for i in range(n)]
+
+
+def timed(app, provider, payload, repeat: int = 5) -> float:
+    app.json = provider
+    with app.app_context():
+        best = float('inf')
+        for _ in range(repeat):
+            started = time.perf_counter()
+            body = app.json.response({'success': True, 'message': "Succès", 'status': 200, 'data': payload}).get_data()
+            best = min(best, time.perf_counter() - started)
+    return best * 1000, len(body)
+
+
+def run(sizes):
+    app = Flask(__name__)
+    providers = [("flask (json, tri)", DefaultJSONProvider(app)), ("json sans tri", StdlibJSONProvider(app))]
+    if orjson is not None:
+        providers.append(("orjson", OrJSONProvider(app)))
+    for n in sizes:
+        for label, payload in (("alertes", {'alerts': synthetic_alerts(n)}),
+                               ("messages", {'messages': synthetic_messages(n)})):
+            print(f"{n} {label}")
+            reference = None
+            for name, provider in providers:
+                elapsed, size = timed(app, provider, payload)
+                reference = reference or elapsed
+                print(f"  {name:<20} {elapsed:9.1f} ms  x{reference / elapsed:5.1f}  ({size // 1024} Ko)")
+
+
+if __name__ == '__main__':
+    run([int(arg) for arg in sys.argv[1:]] or [1000, 10000, 50000])
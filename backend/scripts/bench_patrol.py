@@ -0,0 +1,43 @@
+"""
+Benchmark du moteur d'optimisation des patrouilles sur des alertes synthétiques.
+
+Usage :
+    python -m backend.scripts.bench_patrol [nombre_alertes ...]
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from backend.services.patrol_optimizer import PatrolOptimizer
+
+
+def synthetic_alerts(n: int, seed: int = 42):
+    """Génère n alertes réparties autour de points chauds de Massy"""
+    rng = np.random.default_rng(seed)
+    hotspots = np.array([[48.735, 2.29], [48.732, 2.295], [48.738, 2.289], [48.729, 2.301], [48.725, 2.27]])
+    picks = rng.integers(0, len(hotspots), n)
+    lat = hotspots[picks, 0] + rng.normal(0, 0.004, n)
+    lng = hotspots[picks, 1] + rng.normal(0, 0.006, n)
+    risk = rng.integers(1, 11, n)
+    ids = [f"alert-{i}" for i in range(n)]
+    types = [f"type-{i % 6}" for i in range(n)]
+    return ids, lat, lng, risk, types
+
+
+def run(sizes):
+    optimizer = PatrolOptimizer()
+    for n in sizes:
+        ids, lat, lng, risk, types = synthetic_alerts(n)
+        for vehicles in (3, 8):
+            started = time.perf_counter()
+            result = optimizer.optimize(ids, lat, lng, risk, types, vehicles=vehicles, budget_minutes=90)
+            elapsed = (time.perf_counter() - started) * 1000
+            print(f"{n:>7} alertes | {vehicles} patrouilles | {result['clusters']:>3} clusters | "
+                  f"{len(result['routes'])} tournées | {result['alerts_covered']:>7} alertes couvertes | "
+                  f"{elapsed:8.1f} ms")
+
+
+if __name__ == '__main__':
+    run([int(arg) for arg in sys.argv[1:]] or [1000, 10000, 50000])
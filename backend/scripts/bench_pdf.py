@@ -0,0 +1,81 @@
+"""
+Benchmark de l'extraction de texte PDF (séquentielle et parallèle, par moteur).
+
+Usage :
+    python -m backend.scripts.bench_pdf [fichier.pdf ...]
+
+Sans argument, des PDF synthétiques de 10, 100 et 300 pages sont générés.
+"""
+
+import sys
+import time
+
+from backend.services.pdf_extractor import PdfExtractor, available_backends, iter_page_texts
+
+LOREM = ("Le titulaire du marché s'engage à exécuter les prestations conformément au cahier "
+         "des clauses techniques particulières de la Ville de Massy.")
+
+
+def build_sample_pdf(pages: int, lines_per_page: int = 40) -> bytes:
+    """Construit un PDF texte minimal (police standard Helvetica) sans dépendance externe"""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # Arbre des pages, complété une fois les pages numérotées
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for page in range(pages):
+        lines = [f"Page {page + 1} ligne {line + 1} : {LOREM}" for line in range(lines_per_page)]
+        text = "\n".join(f"({line.encode('ascii', 'replace').decode()}) Tj T*" for line in lines)
+        stream = f"BT /F1 8 Tf 10 TL 40 800 Td\n{text}\nET".encode('latin-1')
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+        content_id = len(objects)
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id)
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {pages} >>".encode()
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    output += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(output)
+
+
+def legacy_extract(data: bytes) -> str:
+    """Ancienne implémentation (concaténation de chaînes page par page)"""
+    text = ""
+    for page_text in iter_page_texts('pypdf2', data):
+        text += page_text + "\n"
+    return text.strip()
+
+
+def timed(label, func):
+    started = time.perf_counter()
+    text = func()
+    print(f"  {label:<24} {(time.perf_counter() - started) * 1000:9.1f} ms  ({len(text)} caractères)")
+
+
+def run(samples):
+    extractor = PdfExtractor(max_pages=10000)
+    for name, data in samples:
+        print(f"{name} ({len(data) // 1024} Ko)")
+        timed("pypdf2 (historique)", lambda: legacy_extract(data))
+        for backend in available_backends():
+            extractor.backend = backend
+            timed(f"{backend} séquentiel", lambda: extractor.extract(data, parallel=False))
+            timed(f"{backend} parallèle", lambda: extractor.extract(data, parallel=True))
+    extractor.shutdown()
+
+
+if __name__ == '__main__':
+    if sys.argv[1:]:
+        samples = [(path, open(path, 'rb').read()) for path in sys.argv[1:]]
+    else:
+        samples = [(f"synthétique {n} pages", build_sample_pdf(n)) for n in (10, 100, 300)]
+    run(samples)
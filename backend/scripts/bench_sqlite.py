@@ -0,0 +1,115 @@
+"""
+Benchmark de concurrence SQLite : écritures de messages du chat pendant des lectures.
+
+Usage :
+    python -m backend.scripts.bench_sqlite [écrivains] [lecteurs] [messages_par_écrivain]
+
+Compare, sur une base fichier temporaire :
+- « rollback » : moteur tel qu'avant (journal DELETE, synchronous=FULL, délai pysqlite de 5 s) ;
+- « wal »      : pragmas de backend/utils/database.py (WAL, synchronous=NORMAL, busy_timeout, mmap).
+
+Chaque écrivain insère ses messages un par un (une transaction par message,
+comme le chemin synchrone du chat) ; les lecteurs relisent en boucle les
+derniers messages d'une conversation. Affiche le débit et les erreurs
+« database is locked ».
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, MetaData, String, Table, Text, create_engine, insert, select
+from sqlalchemy.exc import OperationalError
+
+from backend.config import Config
+from backend.utils.database import install_sqlite_pragmas
+
+metadata = MetaData()
+messages = Table(
+    'messages', metadata,
+    Column('id', String(36), primary_key=True),
+    Column('conversation_id', String(36), index=True, nullable=False),
+    Column('sender', String(10)),
+    Column('content', Text),
+    Column('created_at', DateTime, index=True),
+)
+
+CONVERSATIONS = [str(uuid.uuid4()) for _ in range(8)]
+
+
+def run(profile: str, writers: int, readers: int, per_writer: int) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}",
+                               connect_args={'check_same_thread': False}, pool_size=writers + readers)
+        if profile == 'wal':
+            install_sqlite_pragmas(engine, {name: getattr(Config, name) for name in dir(Config) if name.isupper()})
+        metadata.create_all(engine)
+
+        stats = {'writes': 0, 'reads': 0, 'locked': 0}
+        lock = threading.Lock()
+        done = threading.Event()
+
+        def write(index: int):
+            ok = locked = 0
+            for i in range(per_writer):
+                row = {'id': str(uuid.uuid4()), 'conversation_id': CONVERSATIONS[(index + i) % len(CONVERSATIONS)],
+                       'sender': 'user', 'content': 'Quels sont les horaires du bureau de vote ? ' * 4,
+                       'created_at': datetime.utcnow()}
+                try:
+                    with engine.begin() as connection:
+                        connection.execute(insert(messages), row)
+                    ok += 1
+                except OperationalError:
+                    locked += 1
+            with lock:
+                stats['writes'] += ok
+                stats['locked'] += locked
+
+        def read(index: int):
+            ok = locked = 0
+            query = (select(messages).where(messages.c.conversation_id == CONVERSATIONS[index % len(CONVERSATIONS)])
+                     .order_by(messages.c.created_at.desc()).limit(50))
+            while not done.is_set():
+                try:
+                    with engine.connect() as connection:
+                        connection.execute(query).fetchall()
+                    ok += 1
+                except OperationalError:
+                    locked += 1
+            with lock:
+                stats['reads'] += ok
+                stats['locked'] += locked
+
+        reader_threads = [threading.Thread(target=read, args=(i,)) for i in range(readers)]
+        writer_threads = [threading.Thread(target=write, args=(i,)) for i in range(writers)]
+        started = time.perf_counter()
+        for thread in reader_threads + writer_threads:
+            thread.start()
+        for thread in writer_threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        done.set()
+        for thread in reader_threads:
+            thread.join()
+        engine.dispose()
+
+    stats['elapsed'] = elapsed
+    return stats
+
+
+def main():
+    writers, readers, per_writer = (int(arg) for arg in (sys.argv[1:] + ['8', '4', '300'][len(sys.argv[1:]):]))
+    print(f"{writers} écrivains × {per_writer} messages, {readers} lecteurs\n")
+    print(f"{'profil':<10} {'durée (s)':>10} {'écritures/s':>12} {'lectures/s':>11} {'verrouillé':>11}")
+    for profile in ('rollback', 'wal'):
+        stats = run(profile, writers, readers, per_writer)
+        print(f"{profile:<10} {stats['elapsed']:>10.2f} {stats['writes'] / stats['elapsed']:>12.0f} "
+              f"{stats['reads'] / stats['elapsed']:>11.0f} {stats['locked']:>11}")
+
+
+if __name__ == '__main__':
+    main()
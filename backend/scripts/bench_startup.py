@@ -0,0 +1,97 @@
+"""
+Profil de démarrage de l'application (create_app) basé sur `python -X importtime`.
+
+Usage :
+    python -m backend.scripts.bench_startup [--config testing] [--top 15] [--budget-ms 1000]
+
+Lance create_app() dans un interpréteur neuf, puis affiche :
+- la durée totale import + create_app ;
+- les modules les plus coûteux (temps cumulé, premier niveau d'import) ;
+- les dépendances lourdes chargées alors qu'elles doivent l'être à l'usage.
+
+Code de sortie 1 si une dépendance lourde est chargée au démarrage ou si le
+budget (--budget-ms) est dépassé : utilisable comme garde-fou en CI.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# Dépendances importées à la première utilisation uniquement (chatbot, actualités,
+# synchronisation, extraction PDF) : leur présence au démarrage est une régression
+HEAVY_MODULES = (
+    'chromadb', 'onnxruntime', 'sentence_transformers', 'torch', 'transformers',
+    'bs4', 'apscheduler', 'PyPDF2', 'pypdfium2', 'pdfminer',
+)
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+from backend.app import create_app
+from backend.config import config
+create_app(config[{config_name!r}])
+elapsed = (time.perf_counter() - started) * 1000
+print(json.dumps({{'create_app_ms': elapsed, 'modules': sorted(sys.modules)}}))
+"""
+
+
+def parse_importtime(stderr: str) -> list:
+    """Lignes `import time: self | cumulative | module` -> [(module, cumulé en µs, profondeur)]"""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        try:
+            _, cumulative, name = line[len('import time:'):].split('|')
+            depth = (len(name) - len(name.lstrip())) // 2
+            entries.append((name.strip(), int(cumulative), depth))
+        except ValueError:
+            continue
+    return entries
+
+
+def measure_startup(config_name: str = 'testing') -> dict:
+    """Exécute create_app() dans un sous-processus et retourne le profil de démarrage"""
+    env = dict(os.environ, PYTHONPATH=str(PROJECT_ROOT), PYTHONDONTWRITEBYTECODE='1')
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _PROBE.format(config_name=config_name)],
+        cwd=PROJECT_ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    modules = set(result.pop('modules'))
+    result['imports'] = parse_importtime(completed.stderr)
+    result['heavy_loaded'] = sorted(name for name in HEAVY_MODULES if name in modules)
+    return result
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--config', default='testing')
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--budget-ms', type=float, default=None)
+    args = parser.parse_args()
+
+    result = measure_startup(args.config)
+    print(f"import + create_app : {result['create_app_ms']:.0f} ms")
+    print("\nModules les plus coûteux (premier niveau, cumulé) :")
+    top_level = sorted((entry for entry in result['imports'] if entry[2] == 0), key=lambda entry: -entry[1])
+    for name, cumulative, _ in top_level[:args.top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    failed = False
+    if result['heavy_loaded']:
+        print(f"\nDépendances lourdes chargées au démarrage : {', '.join(result['heavy_loaded'])}")
+        failed = True
+    if args.budget_ms is not None and result['create_app_ms'] > args.budget_ms:
+        print(f"\nBudget dépassé : {result['create_app_ms']:.0f} ms > {args.budget_ms:.0f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
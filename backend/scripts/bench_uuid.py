@@ -0,0 +1,80 @@
+"""
+Benchmark du stockage des identifiants : VARCHAR(36) ou 16 octets, UUID v4 ou v7.
+
+Usage :
+    python -m backend.scripts.bench_uuid [lignes] [taille_lot]
+
+Insère des lignes de type message (clé primaire UUID, clé étrangère UUID indexée)
+dans une base SQLite fichier, avec les pragmas de backend/utils/database.py, et
+affiche pour chaque profil la durée d'insertion, la taille de la base et celle
+des index (dbstat quand SQLite le fournit).
+"""
+
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, MetaData, Table, Text, create_engine, insert
+
+from backend.config import Config
+from backend.models.types import GUID, uuid7
+from backend.utils.database import install_sqlite_pragmas
+
+PROFILES = [('string', 4), ('string', 7), ('native', 4), ('native', 7)]
+
+
+def run(storage: str, version: int, rows: int, batch_size: int) -> dict:
+    metadata = MetaData()
+    messages = Table(
+        'messages', metadata,
+        Column('id', GUID(storage=storage), primary_key=True),
+        Column('conversation_id', GUID(storage=storage), index=True, nullable=False),
+        Column('content', Text),
+        Column('created_at', DateTime),
+    )
+    generate = uuid7 if version == 7 else uuid.uuid4
+    conversations = [str(generate()) for _ in range(64)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'bench.db')
+        engine = create_engine(f'sqlite:///{path}')
+        install_sqlite_pragmas(engine, {name: getattr(Config, name) for name in dir(Config) if name.isupper()})
+        metadata.create_all(engine)
+
+        started = time.perf_counter()
+        for offset in range(0, rows, batch_size):
+            batch = [{'id': str(generate()), 'conversation_id': conversations[(offset + i) % len(conversations)],
+                      'content': 'Bonjour', 'created_at': datetime.utcnow()}
+                     for i in range(min(batch_size, rows - offset))]
+            with engine.begin() as connection:
+                connection.execute(insert(messages), batch)
+        elapsed = time.perf_counter() - started
+
+        with engine.begin() as connection:
+            connection.exec_driver_sql('PRAGMA wal_checkpoint(TRUNCATE)')
+            try:
+                index_bytes = connection.exec_driver_sql(
+                    "SELECT SUM(pgsize) FROM dbstat WHERE name LIKE '%messages%' AND name != 'messages'"
+                ).scalar() or 0
+            except Exception:
+                index_bytes = None
+        engine.dispose()
+        return {'elapsed': elapsed, 'size': os.path.getsize(path), 'index_size': index_bytes}
+
+
+def main():
+    rows, batch_size = (int(arg) for arg in (sys.argv[1:] + ['100000', '1000'][len(sys.argv[1:]):]))
+    print(f"{rows} lignes, lots de {batch_size}\n")
+    print(f"{'stockage':<9} {'uuid':>5} {'durée (s)':>10} {'lignes/s':>10} {'base (Ko)':>10} {'index (Ko)':>11}")
+    for storage, version in PROFILES:
+        stats = run(storage, version, rows, batch_size)
+        index_size = f"{stats['index_size'] / 1024:>11.0f}" if stats['index_size'] is not None else f"{'-':>11}"
+        print(f"{storage:<9} {'v' + str(version):>5} {stats['elapsed']:>10.2f} {rows / stats['elapsed']:>10.0f} "
+              f"{stats['size'] / 1024:>10.0f} {index_size}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Conversion du stockage des identifiants UUID d'une base (voir backend/models/types.py).
+
+Usage :
+    python -m backend.scripts.convert_uuid_storage SOURCE_URL CIBLE_URL [--from string] [--to native]
+
+Copie toutes les tables de SOURCE_URL vers une base CIBLE_URL vide, dans l'ordre
+des clés étrangères et par lots, en réécrivant les colonnes UUID dans le format
+demandé (VARCHAR(36) ↔ uuid PostgreSQL / 16 octets). Les identifiants exposés
+par l'API restent les mêmes chaînes. La source n'est pas modifiée.
+
+Ensuite : basculer UUID_STORAGE (et DATABASE_URL) de l'application vers la cible,
+puis lancer `flask massy bootstrap` pour enregistrer l'empreinte du schéma.
+"""
+
+import argparse
+import sys
+import time
+
+import sqlalchemy as sa
+
+from backend.models.types import GUID
+
+STORAGES = ('string', 'native')
+
+
+def retyped_metadata(metadata: sa.MetaData, storage: str) -> sa.MetaData:
+    """Copie du schéma dont les colonnes UUID utilisent le stockage demandé"""
+    copy = sa.MetaData()
+    for table in metadata.sorted_tables:
+        table = table.to_metadata(copy)
+        for column in table.columns:
+            if isinstance(column.type, GUID):
+                column.type = GUID(storage=storage)
+    return copy
+
+
+def convert(source_url: str, target_url: str, source_storage: str = 'string', target_storage: str = 'native',
+            batch_size: int = 1000, log=print) -> dict:
+    """Copie la base source vers la cible ; renvoie le nombre de lignes par table"""
+    from backend.extensions import db
+    import backend.models  # noqa: F401  (enregistre toutes les tables dans db.metadata)
+
+    source_metadata = retyped_metadata(db.metadata, source_storage)
+    target_metadata = retyped_metadata(db.metadata, target_storage)
+    source, target = sa.create_engine(source_url), sa.create_engine(target_url)
+    counts = {}
+    try:
+        existing = set(sa.inspect(target).get_table_names())
+        if existing & set(target_metadata.tables):
+            raise RuntimeError(f"La base cible contient déjà des tables : {', '.join(sorted(existing))}")
+        target_metadata.create_all(target)
+        source_tables = set(sa.inspect(source).get_table_names())
+
+        with source.connect() as reader, target.begin() as writer:
+            for table in target_metadata.sorted_tables:
+                if table.name not in source_tables:
+                    continue
+                started, counts[table.name] = time.perf_counter(), 0
+                result = reader.execution_options(yield_per=batch_size).execute(
+                    sa.select(source_metadata.tables[table.name]))
+                for rows in result.mappings().partitions(batch_size):
+                    writer.execute(sa.insert(table), [dict(row) for row in rows])
+                    counts[table.name] += len(rows)
+                log(f"{table.name:<24} {counts[table.name]:>9} lignes  {time.perf_counter() - started:6.2f} s")
+    finally:
+        source.dispose()
+        target.dispose()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('source_url')
+    parser.add_argument('target_url')
+    parser.add_argument('--from', dest='source_storage', choices=STORAGES, default='string')
+    parser.add_argument('--to', dest='target_storage', choices=STORAGES, default='native')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    try:
+        convert(args.source_url, args.target_url, args.source_storage, args.target_storage, args.batch_size)
+    except Exception as e:
+        print(f"Conversion impossible : {e}", file=sys.stderr)
+        sys.exit(1)
+    print(f"\nTerminé. Démarrer l'application avec UUID_STORAGE={args.target_storage} sur la nouvelle base, "
+          f"puis lancer `flask massy bootstrap`.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+"""
+Worker autonome de la file d'analyse (mode JOB_QUEUE_MODE=external).
+
+Usage :
+    python -m backend.scripts.job_worker [nombre de threads]
+
+Plusieurs workers (sur une ou plusieurs machines partageant la base) peuvent
+tourner en parallèle : la prise de tâche est atomique.
+"""
+
+import os
+import signal
+import sys
+
+from backend.app import create_app
+from backend.app.schema import check_schema
+from backend.config import config
+from backend.services.job_queue import job_queue
+
+
+def main():
+    app = create_app(config.get(os.environ.get('FLASK_ENV', 'default'), config['default']))
+    check_schema(app)
+    if sys.argv[1:]:
+        job_queue.workers = int(sys.argv[1])
+    job_queue.start()
+    app.logger.info(f"Worker d'analyse démarré ({job_queue.workers} threads)")
+
+    signal.signal(signal.SIGTERM, lambda *_: job_queue.stop())
+    try:
+        signal.pause()
+    except KeyboardInterrupt:
+        pass
+    job_queue.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,12 @@
 import logging
-import requests
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
+import time
 from backend.config import Config
+from backend.services.llm_metrics import llm_metrics
+from backend.services.llm_router import LLMRouter, LLMUnavailableError, SMALL, LARGE
+from backend.services.analysis_cache import analysis_cache, digest_text
+from backend.services.document_analyzer import document_analyzer
+from backend.services.prompt_builder import prompt_builder
+from backend.utils.tokens import count_tokens, count_message_tokens
 
 logger = logging.getLogger(__name__)
 
@@ -9,65 +14,141 @@ class AIService:
     def __init__(self, config):
         self.config = config
         self.mistral_api_key = config.MISTRAL_API_KEY
-        self.timeout = 30
-        self.mistral_base_url = "https://api.mistral.ai/v1"  # API Mistral
-
-    @retry(stop=stop_after_attempt(3),
-           wait=wait_exponential(multiplier=1, min=4, max=10),
-           retry=retry_if_exception_type(requests.exceptions.RequestException))
-    def mistral_chat_completion(self, messages, model="mistral-medium-latest", temperature=0.3):
-        if not self.mistral_api_key:
-            logger.error("Mistral API key not configured")
+        # Routage Mistral / OpenAI avec délai global borné (remplace les relances tenacity)
+        self.router = LLMRouter.from_config(config)
+
+    def chat_completion(self, messages, tier=None, temperature=0.3):
+        """
+        Complétion via le routeur LLM.
+        `tier` force le palier de modèle (SMALL/LARGE) ; par défaut il dépend de la taille du prompt.
+        """
+        if not self.router.targets:
+            logger.error("No LLM API key configured")
             return None
-        headers = {"Authorization": f"Bearer {self.mistral_api_key}", "Content-Type": "application/json"}
-        payload = {"model": model, "messages": messages, "temperature": temperature}
+        started = time.perf_counter()
         try:
-            response = requests.post(f"{self.mistral_base_url}/chat/completions", headers=headers, json=payload, timeout=self.timeout)
-            response.raise_for_status()
-            return response.json()["choices"][0]["message"]["content"]
-        except Exception as e:
-            logger.error(f"Mistral API error: {e}")
+            result = self.router.complete(messages, tier=tier, temperature=temperature)
+        except LLMUnavailableError as e:
+            logger.error(f"LLM API error: {e}")
+            llm_metrics.record(latency_ms=(time.perf_counter() - started) * 1000, ok=False,
+                               prompt_estimate=count_message_tokens(messages))
             return None
+        llm_metrics.record(result.provider, result.model, result.usage, result.latency_ms, result.attempts,
+                           result.hedged, cache='miss', prompt_estimate=count_message_tokens(messages),
+                           completion_estimate=count_tokens(result.content))
+        return result.content
 
     # ================= Chatbot / FAQ =================
-    def generate_election_response(self, user_query, context=None):
-        """Réponse pour le chatbot municipal"""
+    @llm_metrics.track('generate_election_response')
+    def generate_election_response(self, user_query, context=None, conversation=None, pending_messages=None):
+        """Réponse pour le chatbot municipal, avec l'historique borné de la conversation"""
         system_message = "Vous êtes un assistant officiel de la Ville de Massy."
-        if context:
-            system_message += f"\nContexte: {context}"
-        messages = [
-            {"role": "system", "content": system_message},
-            {"role": "user", "content": user_query}
-        ]
         try:
-            return self.mistral_chat_completion(messages) or "Désolé, problème technique. Contactez la mairie."
+            messages = prompt_builder.build(system_message, user_query, context=context,
+                                            conversation=conversation, summarize=self.summarize_turns,
+                                            pending_messages=pending_messages)
+            return self.chat_completion(messages) or "Désolé, problème technique. Contactez la mairie."
         except Exception as e:
             logger.error(f"Error generating election response: {e}")
             return "Désolé, problème technique. Contactez la mairie."
 
-    # ================= Analyse d'offres / urbanisme =================
-    def analyze_market_offer(self, offer_text):
-        """Analyse une offre de marché public"""
-        system_message = "Vous êtes un expert en analyse d'offres de marchés publics pour la ville de Massy."
+    @llm_metrics.track('summarize_turns')
+    def summarize_turns(self, previous_summary, turns):
+        """Met à jour le résumé d'une conversation avec les tours sortis de la fenêtre récente"""
+        transcript = "\n".join(
+            f"{'Utilisateur' if turn['role'] == 'user' else 'Assistant'}: {turn['content']}" for turn in turns
+        )
         messages = [
-            {"role": "system", "content": system_message},
-            {"role": "user", "content": f"Analyse: {offer_text}"}
+            {"role": "system", "content": "Résumez de façon factuelle et concise (10 lignes maximum) "
+                                          "une conversation entre un habitant et l'assistant de la Ville de Massy. "
+                                          "Conservez les faits, demandes et réponses utiles pour la suite."},
+            {"role": "user", "content": f"Résumé existant: {previous_summary or 'aucun'}\n\nNouveaux échanges:\n{transcript}"}
         ]
+        return self.chat_completion(messages, tier=SMALL, temperature=0.1)
+
+    # ================= Analyse d'offres / urbanisme =================
+    ANALYSIS_PROMPTS = {
+        'market': {
+            'system': "Vous êtes un expert en analyse d'offres de marchés publics pour la ville de Massy.",
+            'map': "Extrait {index}/{total} d'un dossier de consultation. Relevez les éléments clés "
+                   "(objet, lots, délais, prix, critères, pénalités, risques) de cet extrait uniquement.",
+            'reduce': "Voici les analyses partielles d'un dossier de consultation. Rédigez l'analyse complète "
+                      "de l'offre : synthèse, points forts, risques, recommandations.",
+            'error': "Erreur lors de l'analyse de l'offre."
+        },
+        'urbanism': {
+            'system': "Vous êtes un expert en urbanisme et projets municipaux de la ville de Massy.",
+            'map': "Extrait {index}/{total} d'un document d'urbanisme. Relevez les règles, zonages, "
+                   "contraintes et projets mentionnés dans cet extrait uniquement.",
+            'reduce': "Voici les analyses partielles d'un document d'urbanisme. Rédigez l'analyse complète "
+                      "du document : synthèse, enjeux, contraintes, recommandations.",
+            'error': "Erreur lors de l'analyse du document."
+        }
+    }
+    ANALYSIS_PROMPT_VERSION = 1
+
+    def _analyze_document(self, kind, text, progress=None, source_digest=None):
+        """
+        Analyse servie par le cache adressé par contenu (texte + version du prompt) si possible,
+        sinon calculée puis mise en cache.
+        """
+        digest = digest_text(kind, self.ANALYSIS_PROMPT_VERSION, text)
+        cached = analysis_cache.get(kind, digest)
+        if cached is not None:
+            llm_metrics.record(cache='hit')
+            return cached
+        analysis = self._run_analysis(kind, text, progress)
+        if analysis != self.ANALYSIS_PROMPTS[kind]['error']:
+            analysis_cache.put(kind, digest, analysis, self.ANALYSIS_PROMPT_VERSION, source_digest)
+        return analysis
+
+    def _run_analysis(self, kind, text, progress=None):
+        """
+        Analyse en une passe pour les textes courts, en map-reduce pour les documents volumineux
+        (découpage en sections, analyses partielles parallèles mises en cache, synthèse finale).
+        """
+        prompts = self.ANALYSIS_PROMPTS[kind]
+        if count_tokens(text) <= getattr(self.config, 'ANALYSIS_SINGLE_PASS_TOKENS', 6000):
+            messages = [
+                {"role": "system", "content": prompts['system']},
+                {"role": "user", "content": f"Analyse: {text}"}
+            ]
+            return self.chat_completion(messages, tier=LARGE) or prompts['error']
+
+        def analyze_chunk(chunk, index, total):
+            return self.chat_completion([
+                {"role": "system", "content": prompts['system']},
+                {"role": "user", "content": f"{prompts['map'].format(index=index, total=total)}\n\n{chunk}"}
+            ], tier=SMALL, temperature=0.1)
+
+        def reduce_partials(partials, final):
+            instruction = prompts['reduce'] if final else "Fusionnez ces analyses partielles sans perdre d'information utile."
+            return self.chat_completion([
+                {"role": "system", "content": prompts['system']},
+                {"role": "user", "content": instruction + "\n\n" + "\n\n---\n\n".join(partials)}
+            ], tier=LARGE)
+
+        result = document_analyzer.analyze(
+            text, f"{kind}:v{self.ANALYSIS_PROMPT_VERSION}", analyze_chunk, reduce_partials,
+            progress=progress, on_cache_hit=lambda: llm_metrics.record(cache='hit')
+        )
+        logger.info(f"Analyse {kind} en {result['chunks']} parties, {len(result['failed_chunks'])} échec(s)")
+        return result['report'] or prompts['error']
+
+    @llm_metrics.track('analyze_market_offer')
+    def analyze_market_offer(self, offer_text, progress=None, source_digest=None):
+        """Analyse une offre de marché public"""
         try:
-            return self.mistral_chat_completion(messages) or "Erreur lors de l'analyse de l'offre."
+            return self._analyze_document('market', offer_text, progress, source_digest)
         except Exception as e:
             logger.error(f"Error analyzing market offer: {e}")
             return "Erreur lors de l'analyse de l'offre."
 
-    def analyze_urbanism_document(self, document_text):
+    @llm_metrics.track('analyze_urbanism_document')
+    def analyze_urbanism_document(self, document_text, progress=None, source_digest=None):
         """Analyse un document ou projet d'urbanisme"""
-        system_message = "Vous êtes un expert en urbanisme et projets municipaux de la ville de Massy."
-        messages = [
-            {"role": "system", "content": system_message},
-            {"role": "user", "content": f"Analyse: {document_text}"}
-        ]
         try:
-            return self.mistral_chat_completion(messages) or "Erreur lors de l'analyse du document."
+            return self._analyze_document('urbanism', document_text, progress, source_digest)
         except Exception as e:
             logger.error(f"Error analyzing urbanism document: {e}")
             return "Erreur lors de l'analyse du document."
@@ -82,8 +163,8 @@ class AIService:
             logger.error(f"Error generating image: {e}")
             return None
 
-    def analyze_video(self, video_file):
-        """Analyse une vidéo via IA"""
+    def analyze_video(self, video_path):
+        """Analyse une vidéo via IA (chemin du fichier téléversé)"""
         try:
             # Simulation / placeholder
             return {"summary": "Vidéo analysée avec succès", "duration_seconds": 120}
@@ -0,0 +1,284 @@
+"""
+Pipeline d'ingestion en masse des alertes (capteurs, caméras, systèmes de détection externes).
+
+Étapes : lecture NDJSON/JSON -> validation vectorisée (NumPy) -> déduplication par
+(type, cellule geohash, fenêtre temporelle) -> insertion executemany en une transaction
+-> mise à jour incrémentale de la carte de densité.
+
+rebuild_alert_heatmap() recalcule la carte complète par lots (migration, `flask massy rebuild-heatmap`).
+"""
+
+import json
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import and_, bindparam, insert, or_, select
+
+from backend.extensions import db
+from backend.models import SuspectAlert, AlertHeatmapCell
+from backend.models.types import new_id
+from backend.utils.geo import geohash_encode, geohash_prefix_range
+
+logger = logging.getLogger(__name__)
+
+ALLOWED_STATUSES = ('new', 'in_progress', 'resolved')
+MAX_REPORTED_ERRORS = 50
+EPOCH = datetime(1970, 1, 1)
+# Cellules par requête de déduplication (une plage d'index chacune)
+DEDUP_CELLS_PER_QUERY = 200
+
+
+class IngestionError(ValueError):
+    """Lot d'alertes illisible ou trop volumineux"""
+
+
+def parse_ndjson(lines: Iterable[bytes], max_records: int) -> Tuple[List[Optional[dict]], List[dict]]:
+    """
+    Décode un flux NDJSON ligne par ligne.
+
+    Returns:
+        (enregistrements, erreurs) ; un enregistrement illisible est remplacé par None
+        pour conserver la numérotation des lignes.
+    """
+    records: List[Optional[dict]] = []
+    errors: List[dict] = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if len(records) >= max_records:
+            raise IngestionError(f"Lot trop volumineux (maximum {max_records} alertes)")
+        try:
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("objet JSON attendu")
+            records.append(record)
+        except ValueError as e:
+            errors.append({'line': len(records) + 1, 'error': f"JSON invalide: {e}"})
+            records.append(None)
+    return records, errors
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _parse_datetime(value: Any, default: datetime) -> Optional[datetime]:
+    if value in (None, ''):
+        return default
+    if isinstance(value, (int, float)):
+        try:
+            return EPOCH + timedelta(seconds=value)
+        except (OverflowError, ValueError):
+            return None  # Millisecondes, NaN, infini : hors de la plage des dates
+    try:
+        parsed = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def _epoch(value: datetime) -> float:
+    """Secondes depuis l'epoch d'une date UTC naïve (indépendant du fuseau du serveur)"""
+    return (value - EPOCH).total_seconds()
+
+
+def validate_batch(records: List[Optional[dict]]) -> Tuple[np.ndarray, Dict[str, np.ndarray], List[dict]]:
+    """
+    Valide un lot en une passe vectorisée.
+
+    Returns:
+        (masque des enregistrements valides, colonnes NumPy, erreurs par ligne)
+    """
+    n = len(records)
+    empty: dict = {}
+    rows = [record if record is not None else empty for record in records]
+    lat = np.fromiter((_to_float(r.get('latitude', r.get('lat'))) for r in rows), dtype=float, count=n)
+    lng = np.fromiter((_to_float(r.get('longitude', r.get('lng'))) for r in rows), dtype=float, count=n)
+    risk = np.fromiter((_to_float(r.get('risk_level')) for r in rows), dtype=float, count=n)
+    has_type = np.fromiter((isinstance(r.get('type', r.get('alert_type')), str)
+                            and bool(r.get('type', r.get('alert_type')).strip()) for r in rows), dtype=bool, count=n)
+    has_status = np.fromiter((r.get('status', 'new') in ALLOWED_STATUSES for r in rows), dtype=bool, count=n)
+    has_data = np.fromiter((isinstance(r.get('additional_data') or {}, dict) for r in rows), dtype=bool, count=n)
+
+    now = datetime.utcnow()
+    reported = [_parse_datetime(r.get('reported_at'), now) for r in rows]
+    has_date = np.fromiter((d is not None for d in reported), dtype=bool, count=n)
+    timestamps = np.fromiter((_epoch(d) if d else 0.0 for d in reported), dtype=float, count=n)
+
+    parsed = np.fromiter((record is not None for record in records), dtype=bool, count=n)
+    checks = {
+        'latitude invalide': (lat >= -90) & (lat <= 90),
+        'longitude invalide': (lng >= -180) & (lng <= 180),
+        'risk_level doit être un entier entre 1 et 10': (risk >= 1) & (risk <= 10) & (np.mod(risk, 1) == 0),
+        'type requis': has_type,
+        'statut invalide': has_status,
+        'additional_data doit être un objet': has_data,
+        'reported_at invalide': has_date,
+    }
+    valid = parsed.copy()
+    for mask in checks.values():
+        valid &= mask  # Les NaN échouent toutes les comparaisons
+
+    errors = []
+    for index in np.flatnonzero(parsed & ~valid)[:MAX_REPORTED_ERRORS]:
+        reasons = [message for message, mask in checks.items() if not mask[index]]
+        errors.append({'line': int(index) + 1, 'error': ', '.join(reasons)})
+
+    columns = {'lat': lat, 'lng': lng, 'risk': risk, 'timestamp': timestamps}
+    return valid, {**columns, 'reported_at': np.array(reported, dtype=object)}, errors
+
+
+class AlertIngestionPipeline:
+    """Insère des lots d'alertes dédupliquées"""
+
+    def __init__(self, dedup_window_seconds: int = 300, dedup_precision: int = 7, max_batch: int = 10000):
+        self.dedup_window_seconds = dedup_window_seconds
+        self.dedup_precision = dedup_precision  # Cellule geohash de ~150 m
+        self.max_batch = max_batch
+
+    def configure(self, config):
+        """Applique la configuration Flask (appelé à chaque lot)"""
+        self.dedup_window_seconds = config.get('ALERT_DEDUP_WINDOW_SECONDS', self.dedup_window_seconds)
+        self.dedup_precision = config.get('ALERT_DEDUP_GEOHASH_PRECISION', self.dedup_precision)
+        self.max_batch = config.get('ALERT_INGEST_MAX_BATCH', self.max_batch)
+
+    def _key(self, alert_type: str, geohash: str, timestamp: float) -> tuple:
+        return (alert_type, geohash[:self.dedup_precision], int(timestamp // self.dedup_window_seconds))
+
+    def _existing_keys(self, cells: set, min_ts: float, max_ts: float) -> set:
+        """Clés de déduplication déjà présentes en base pour les cellules du lot"""
+        window = self.dedup_window_seconds
+        start = EPOCH + timedelta(seconds=min_ts - min_ts % window)
+        end = EPOCH + timedelta(seconds=max_ts - max_ts % window + window)
+        # Une plage [cellule, cellule~) par cellule : parcours de ix_suspect_alerts_geohash_reported
+        cells = sorted(cells)
+        rows = []
+        for offset in range(0, len(cells), DEDUP_CELLS_PER_QUERY):
+            ranges = [geohash_prefix_range(cell) for cell in cells[offset:offset + DEDUP_CELLS_PER_QUERY]]
+            rows += db.session.query(SuspectAlert.alert_type, SuspectAlert.geohash, SuspectAlert.reported_at).filter(
+                or_(*[and_(SuspectAlert.geohash >= low, SuspectAlert.geohash < high) for low, high in ranges]),
+                SuspectAlert.reported_at >= start,
+                SuspectAlert.reported_at < end
+            ).all()
+        return {self._key(alert_type, geohash, _epoch(reported_at))
+                for alert_type, geohash, reported_at in rows if geohash and reported_at}
+
+    def ingest(self, records: List[Optional[dict]], user_id: str, source: Optional[str] = None,
+               parse_errors: Optional[List[dict]] = None) -> dict:
+        """
+        Valide, déduplique et insère un lot d'alertes.
+
+        Returns:
+            Statistiques du lot (acceptées, doublons, erreurs, débit).
+        """
+        started = time.perf_counter()
+        if len(records) > self.max_batch:
+            raise IngestionError(f"Lot trop volumineux (maximum {self.max_batch} alertes)")
+
+        valid, columns, errors = validate_batch(records)
+        errors = (parse_errors or []) + errors
+        indices = np.flatnonzero(valid)
+
+        rows = []
+        points = []
+        batch_keys = set()
+        duplicates = 0
+        if len(indices):
+            geohashes = {i: geohash_encode(columns['lat'][i], columns['lng'][i]) for i in indices}
+            cells = {geohash[:self.dedup_precision] for geohash in geohashes.values()}
+            stamps = columns['timestamp'][indices]
+            seen = self._existing_keys(cells, stamps.min(), stamps.max())
+
+            for i in indices:
+                record = records[i]
+                alert_type = record.get('type', record.get('alert_type')).strip()[:100]
+                key = self._key(alert_type, geohashes[i], columns['timestamp'][i])
+                if key in seen or key in batch_keys:
+                    duplicates += 1
+                    continue
+                batch_keys.add(key)
+
+                additional_data = record.get('additional_data') or {}
+                if source:
+                    additional_data = {**additional_data, 'source': source}
+                risk = int(columns['risk'][i])
+                rows.append({
+                    'id': new_id(),
+                    'alert_type': alert_type,
+                    'description': str(record.get('description') or alert_type),
+                    'latitude': float(columns['lat'][i]),
+                    'longitude': float(columns['lng'][i]),
+                    'geohash': geohashes[i],
+                    'risk_level': risk,
+                    'status': record.get('status', 'new'),
+                    'reported_at': columns['reported_at'][i],
+                    'user_id': user_id,
+                    'additional_data': additional_data or None
+                })
+                points.append((rows[-1]['latitude'], rows[-1]['longitude'], risk))
+
+        if rows:
+            # executemany : les événements ORM ne sont pas déclenchés, geohash et densité sont gérés ici
+            db.session.execute(insert(SuspectAlert), rows)
+            AlertHeatmapCell.apply_delta(db.session.connection(), points, 1)
+        db.session.commit()
+
+        elapsed = time.perf_counter() - started
+        stats = {
+            'received': len(records),
+            'accepted': len(rows),
+            'duplicates': duplicates,
+            'rejected': len(records) - len(indices),
+            'errors': errors[:MAX_REPORTED_ERRORS],
+            'elapsed_ms': round(elapsed * 1000, 1),
+            'throughput_per_second': round(len(records) / elapsed) if elapsed > 0 else None
+        }
+        logger.info(f"Ingestion alertes: {stats['accepted']}/{stats['received']} insérées, "
+                    f"{duplicates} doublon(s), {stats['elapsed_ms']} ms")
+        return stats
+
+
+def rebuild_alert_heatmap(connection, batch_size: int = 5000) -> dict:
+    """
+    Recalcule la carte de densité à partir de toutes les alertes et complète les geohash manquants.
+
+    Les alertes sont lues par lots (pagination par clé sur id) : la mémoire reste bornée
+    quel que soit le volume. Le tout se fait dans la transaction de `connection`.
+
+    Returns:
+        Nombre d'alertes indexées et de geohash complétés.
+    """
+    alerts = SuspectAlert.__table__
+    connection.execute(AlertHeatmapCell.__table__.delete())
+    query = select(alerts.c.id, alerts.c.latitude, alerts.c.longitude, alerts.c.risk_level, alerts.c.geohash)\
+        .order_by(alerts.c.id).limit(batch_size)
+    backfill = alerts.update().where(alerts.c.id == bindparam('alert_id')).values(geohash=bindparam('new_geohash'))
+
+    indexed = backfilled = 0
+    last_id = None
+    while True:
+        rows = connection.execute(query if last_id is None else query.where(alerts.c.id > last_id)).all()
+        if not rows:
+            break
+        missing = [{'alert_id': alert_id, 'new_geohash': geohash_encode(lat, lng)}
+                   for alert_id, lat, lng, _, geohash in rows if not geohash]
+        if missing:
+            connection.execute(backfill, missing)
+        AlertHeatmapCell.apply_delta(connection, [(lat, lng, risk) for _, lat, lng, risk, _ in rows], 1)
+        indexed += len(rows)
+        backfilled += len(missing)
+        last_id = rows[-1][0]
+    return {'alerts_indexed': indexed, 'geohash_backfilled': backfilled}
+
+
+# Instance globale
+alert_ingestion = AlertIngestionPipeline()
@@ -0,0 +1,154 @@
+"""
+Cache adressé par contenu des documents analysés.
+
+Un même DCE téléversé par plusieurs agents n'est extrait et analysé qu'une fois :
+- texte extrait indexé par SHA-256 des octets du fichier ;
+- analyse indexée par SHA-256 du type d'analyse, de la version du prompt et du texte
+  (un changement de prompt invalide naturellement les anciennes analyses).
+
+Les entrées expirent après un TTL et peuvent être invalidées manuellement.
+"""
+
+import hashlib
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from flask import has_app_context
+from sqlalchemy import delete, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from backend.extensions import db
+from backend.models.analysis_cache import AnalysisCacheEntry
+
+logger = logging.getLogger(__name__)
+
+EXTRACTION = 'extraction'
+PURGE_EVERY = 100
+
+
+def digest_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def digest_text(kind: str, prompt_version: int, text: str) -> str:
+    return hashlib.sha256(f"{kind}:v{prompt_version}\x00{text}".encode('utf-8')).hexdigest()
+
+
+class AnalysisCache:
+    """Lecture/écriture des entrées de cache en base"""
+
+    def __init__(self, enabled: bool = True, extraction_ttl: int = 30 * 24 * 3600, analysis_ttl: int = 7 * 24 * 3600):
+        self.enabled = enabled
+        self.extraction_ttl = extraction_ttl
+        self.analysis_ttl = analysis_ttl
+        self._writes = 0
+
+    def configure(self, config):
+        """Applique la configuration Flask (appelé par create_app)"""
+        self.enabled = config.get('ANALYSIS_CACHE_ENABLED', self.enabled)
+        self.extraction_ttl = config.get('EXTRACTION_CACHE_TTL', self.extraction_ttl)
+        self.analysis_ttl = config.get('ANALYSIS_CACHE_TTL', self.analysis_ttl)
+
+    def _active(self) -> bool:
+        return self.enabled and has_app_context()
+
+    # Lectures et écritures sur une connexion dédiée, dans leur propre transaction :
+    # la session de la requête appelante n'est ni validée ni annulée par le cache.
+
+    def get(self, kind: str, digest: str) -> Optional[str]:
+        """Contenu en cache, ou None si absent ou expiré"""
+        if not self._active():
+            return None
+        table = AnalysisCacheEntry.__table__
+        key = (table.c.kind == kind, table.c.digest == digest)
+        now = datetime.utcnow()
+        try:
+            with db.engine.begin() as connection:
+                content = connection.execute(select(table.c.content).where(*key, table.c.expires_at > now)).scalar()
+                if content is not None:
+                    # Compteur mis à jour en SQL pour ne pas perdre d'incréments entre workers
+                    connection.execute(update(table).where(*key).values(hits=table.c.hits + 1, last_hit_at=now))
+        except SQLAlchemyError as e:
+            logger.warning(f"Lecture du cache d'analyse impossible: {e}")
+            return None
+        return content
+
+    def put(self, kind: str, digest: str, content: str, prompt_version: Optional[int] = None,
+            source_digest: Optional[str] = None):
+        """Enregistre (ou remplace) une entrée"""
+        if not self._active() or not content:
+            return
+        table = AnalysisCacheEntry.__table__
+        ttl = self.extraction_ttl if kind == EXTRACTION else self.analysis_ttl
+        now = datetime.utcnow()
+        values = {'content': content, 'prompt_version': prompt_version, 'source_digest': source_digest,
+                  'size': len(content), 'created_at': now, 'expires_at': now + timedelta(seconds=ttl)}
+        try:
+            with db.engine.begin() as connection:
+                replaced = connection.execute(update(table).where(
+                    table.c.kind == kind, table.c.digest == digest).values(**values)).rowcount
+                if not replaced:
+                    connection.execute(insert(table).values(kind=kind, digest=digest, **values))
+        except IntegrityError:
+            pass  # Même document analysé en parallèle par un autre worker : son entrée fait foi
+        except SQLAlchemyError as e:
+            logger.warning(f"Écriture du cache d'analyse impossible: {e}")
+            return
+        self._writes += 1
+        if self._writes % PURGE_EVERY == 0:
+            self.purge_expired()
+
+    def invalidate(self, digest: Optional[str] = None, kind: Optional[str] = None) -> int:
+        """
+        Supprime des entrées. Un digest de fichier supprime aussi les analyses qui en découlent.
+        Sans argument, vide tout le cache.
+        """
+        query = db.session.query(AnalysisCacheEntry)
+        if digest:
+            query = query.filter(or_(AnalysisCacheEntry.digest == digest,
+                                     AnalysisCacheEntry.source_digest == digest))
+        if kind:
+            query = query.filter(AnalysisCacheEntry.kind == kind)
+        deleted = query.delete(synchronize_session=False)
+        db.session.commit()
+        return deleted
+
+    def purge_expired(self) -> int:
+        table = AnalysisCacheEntry.__table__
+        try:
+            with db.engine.begin() as connection:
+                return connection.execute(delete(table).where(table.c.expires_at <= datetime.utcnow())).rowcount
+        except SQLAlchemyError as e:
+            logger.warning(f"Purge du cache d'analyse impossible: {e}")
+            return 0
+
+    def stats(self) -> dict:
+        rows = db.session.query(
+            AnalysisCacheEntry.kind, db.func.count(), db.func.sum(AnalysisCacheEntry.hits),
+            db.func.sum(AnalysisCacheEntry.size)
+        ).group_by(AnalysisCacheEntry.kind).all()
+        return {kind: {'entries': count, 'hits': int(hits or 0), 'bytes': int(size or 0)}
+                for kind, count, hits, size in rows}
+
+    def extract_pdf_text(self, file) -> tuple:
+        """
+        Texte d'un PDF téléversé, servi par le cache si le même fichier a déjà été extrait.
+
+        Returns:
+            (texte, digest du fichier, provenance du cache)
+        """
+        from backend.services.pdf_extractor import pdf_extractor
+
+        data = pdf_extractor.read_bounded(file)
+        digest = digest_bytes(data)
+        text = self.get(EXTRACTION, digest)
+        if text is not None:
+            return text, digest, True
+        text = pdf_extractor.extract(data)
+        self.put(EXTRACTION, digest, text)
+        return text, digest, False
+
+
+# Instance globale
+analysis_cache = AnalysisCache()
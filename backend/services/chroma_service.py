@@ -1,9 +1,7 @@
 import logging
+import threading
 import uuid
 from typing import List, Dict, Optional
-import chromadb
-from chromadb.utils import embedding_functions
-from chromadb.config import Settings
 
 logger = logging.getLogger(__name__)
 
@@ -11,6 +9,12 @@ class ChromaService:
     def __init__(self, host: str = "localhost", port: int = 8000):
         """Initialise ChromaDB et la collection 'massy_documents'"""
         try:
+            # chromadb (et onnxruntime / sentence-transformers derrière lui) coûte
+            # plusieurs centaines de ms : importé à la première utilisation seulement
+            import chromadb
+            from chromadb.utils import embedding_functions
+            from chromadb.config import Settings
+
             self.client = chromadb.HttpClient(
                 host=host,
                 port=port,
@@ -75,6 +79,23 @@ class ChromaService:
             context += f"{i}. {snippet}...\n"
         return context
 
-def get_chroma_service() -> ChromaService:
-    """Factory pour récupérer le service ChromaDB"""
-    return ChromaService()
+_instance: Optional[ChromaService] = None
+_instance_lock = threading.Lock()
+
+
+def get_chroma_service(host: str = "localhost", port: int = 8000) -> ChromaService:
+    """
+    Factory pour récupérer le service ChromaDB.
+    L'instance est partagée par le processus une fois la collection obtenue ;
+    tant que ChromaDB est injoignable, chaque appel retente la connexion.
+    """
+    global _instance
+    if _instance is not None:
+        return _instance
+    with _instance_lock:
+        if _instance is None:
+            service = ChromaService(host, port)
+            if service.collection is None:
+                return service
+            _instance = service
+    return _instance
@@ -0,0 +1,237 @@
+"""
+Analyse map-reduce des documents volumineux (DCE, PLU, rapports).
+
+1. Découpage du texte en sections (articles, chapitres, titres numérotés) puis
+   en morceaux bornés en tokens.
+2. Map : analyse de chaque morceau en parallèle, avec une concurrence bornée.
+   Les analyses partielles sont mises en cache par empreinte SHA-256 du morceau :
+   un document ré-analysé (ou modifié localement) ne repaye que les morceaux changés.
+3. Reduce : fusion des analyses partielles en un rapport final, par paliers si
+   les analyses partielles dépassent elles-mêmes le budget d'un prompt.
+"""
+
+import contextvars
+import hashlib
+import logging
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+from backend.utils.tokens import count_tokens, truncate_to_tokens
+
+logger = logging.getLogger(__name__)
+
+# Début de section : ARTICLE 3, Chapitre II, TITRE 1, 2.1 Objet du marché, saut de page
+SECTION_PATTERN = re.compile(
+    r"\n(?=\s*(?:ARTICLE|Article|CHAPITRE|Chapitre|TITRE|Titre|SECTION|Section|ANNEXE|Annexe)\s+[\dIVXLC]+"
+    r"|\s*\d+(?:\.\d+)*\.?\s+[A-ZÉÈÀ][^\n]{2,80}\n)|\f"
+)
+SENTENCE_PATTERN = re.compile(r"(?<=[.!?;:])\s+")
+
+ProgressCallback = Callable[[int, int, str], None]
+
+
+def _pack(pieces: List[str], max_tokens: int, separator: str) -> List[str]:
+    """Regroupe des morceaux consécutifs tant que le budget le permet"""
+    chunks, current, size = [], [], 0
+    for piece in pieces:
+        cost = count_tokens(piece)
+        if current and size + cost > max_tokens:
+            chunks.append(separator.join(current))
+            current, size = [], 0
+        current.append(piece)
+        size += cost
+    if current:
+        chunks.append(separator.join(current))
+    return chunks
+
+
+def _pack_lists(items: List[str], max_tokens: int) -> List[List[str]]:
+    """Regroupe des éléments consécutifs en listes tenant dans le budget"""
+    groups, current, size = [], [], 0
+    for item in items:
+        cost = count_tokens(item)
+        if current and size + cost > max_tokens:
+            groups.append(current)
+            current, size = [], 0
+        current.append(item)
+        size += cost
+    if current:
+        groups.append(current)
+    return groups
+
+
+def split_sections(text: str, max_tokens: int = 2500) -> List[str]:
+    """
+    Découpe un document en morceaux d'au plus `max_tokens` tokens,
+    en respectant autant que possible les frontières de sections puis de paragraphes.
+    """
+    pieces = []
+    for section in SECTION_PATTERN.split(text):
+        section = section.strip()
+        if not section:
+            continue
+        if count_tokens(section) <= max_tokens:
+            pieces.append(section)
+            continue
+        for paragraph in re.split(r"\n\s*\n", section):
+            paragraph = paragraph.strip()
+            if not paragraph:
+                continue
+            if count_tokens(paragraph) <= max_tokens:
+                pieces.append(paragraph)
+                continue
+            for sentence_group in _pack(SENTENCE_PATTERN.split(paragraph), max_tokens, " "):
+                pieces.append(truncate_to_tokens(sentence_group, max_tokens))
+    return _pack(pieces, max_tokens, "\n\n")
+
+
+class ChunkCache:
+    """Cache LRU des analyses partielles, indexé par empreinte du morceau"""
+
+    def __init__(self, max_size: int = 2000):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class DocumentAnalyzer:
+    """Orchestre le découpage, l'analyse parallèle des morceaux et la synthèse"""
+
+    def __init__(self, chunk_tokens: int = 2500, reduce_tokens: int = 6000,
+                 max_workers: int = 4, cache: Optional[ChunkCache] = None):
+        self.chunk_tokens = chunk_tokens
+        self.reduce_tokens = reduce_tokens
+        self.max_workers = max_workers
+        self.cache = cache or ChunkCache()
+
+    def configure(self, config):
+        """Applique la configuration Flask (appelé par create_app)"""
+        self.chunk_tokens = config.get('ANALYSIS_CHUNK_TOKENS', self.chunk_tokens)
+        self.reduce_tokens = config.get('ANALYSIS_REDUCE_TOKENS', self.reduce_tokens)
+        self.max_workers = config.get('ANALYSIS_MAX_WORKERS', self.max_workers)
+
+    @staticmethod
+    def chunk_key(namespace: str, chunk: str) -> str:
+        return hashlib.sha256(f"{namespace}\x00{chunk}".encode('utf-8')).hexdigest()
+
+    def _map(self, chunks: List[str], namespace: str, analyze_chunk: Callable[[str, int, int], Optional[str]],
+             progress: Optional[ProgressCallback], on_cache_hit: Optional[Callable[[], None]]) -> List[Optional[str]]:
+        total = len(chunks)
+        results: List[Optional[str]] = [None] * total
+        done = 0
+        lock = threading.Lock()
+
+        def report():
+            nonlocal done
+            with lock:
+                done += 1
+                current = done
+            if progress:
+                progress(current, total, 'map')
+
+        pending = []
+        for index, chunk in enumerate(chunks):
+            cached = self.cache.get(self.chunk_key(namespace, chunk))
+            if cached is not None:
+                results[index] = cached
+                if on_cache_hit:
+                    on_cache_hit()
+                report()
+            else:
+                pending.append(index)
+
+        def work(index):
+            partial = analyze_chunk(chunks[index], index + 1, total)
+            if partial:
+                self.cache.set(self.chunk_key(namespace, chunks[index]), partial)
+            results[index] = partial
+            report()
+
+        if pending:
+            # Chaque tâche reçoit une copie du contexte (requête Flask, fonctionnalité mesurée)
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(pending))) as executor:
+                futures = [executor.submit(contextvars.copy_context().run, work, index) for index in pending]
+                for future in futures:
+                    try:
+                        future.result()
+                    except Exception as e:
+                        logger.error(f"Analyse d'un morceau impossible: {e}")
+        return results
+
+    def _reduce(self, partials: List[str], reduce_fn: Callable[[List[str], bool], Optional[str]],
+                progress: Optional[ProgressCallback]) -> Optional[str]:
+        level = 0
+        while True:
+            groups = _pack_lists(partials, self.reduce_tokens)
+            if len(groups) == 1:
+                if progress:
+                    progress(1, 1, 'reduce')
+                return reduce_fn(partials, True)
+            # Trop volumineux pour une seule synthèse : synthèses intermédiaires par groupe
+            level += 1
+            logger.info(f"Synthèse intermédiaire niveau {level}: {len(partials)} analyses -> {len(groups)} groupes")
+            regrouped = [merged for merged in (reduce_fn(group, False) for group in groups) if merged]
+            if not regrouped or len(regrouped) >= len(partials):
+                budget = self.reduce_tokens // max(1, len(partials))
+                return reduce_fn([truncate_to_tokens(p, budget) for p in partials], True)
+            partials = regrouped
+
+    def analyze(self, text: str, namespace: str,
+                analyze_chunk: Callable[[str, int, int], Optional[str]],
+                reduce_fn: Callable[[List[str], bool], Optional[str]],
+                progress: Optional[ProgressCallback] = None,
+                on_cache_hit: Optional[Callable[[], None]] = None) -> dict:
+        """
+        Analyse un document volumineux.
+
+        Args:
+            text: Texte intégral.
+            namespace: Type d'analyse et version du prompt (clé de cache).
+            analyze_chunk: (morceau, numéro, total) -> analyse partielle.
+            reduce_fn: (analyses partielles, synthèse finale ?) -> synthèse.
+            progress: Rappel (fait, total, étape) pour le suivi d'avancement.
+            on_cache_hit: Rappel à chaque analyse partielle servie par le cache.
+
+        Returns:
+            dict avec 'report', 'chunks', 'failed_chunks'.
+        """
+        chunks = split_sections(text, self.chunk_tokens)
+        if progress:
+            progress(0, len(chunks), 'split')
+        partials = self._map(chunks, namespace, analyze_chunk, progress, on_cache_hit)
+
+        failed = [index + 1 for index, partial in enumerate(partials) if not partial]
+        available = [f"[Partie {index + 1}/{len(chunks)}]\n{partial}"
+                     for index, partial in enumerate(partials) if partial]
+        if not available:
+            return {'report': None, 'chunks': len(chunks), 'failed_chunks': failed}
+
+        report = self._reduce(available, reduce_fn, progress)
+        if report and failed:
+            report += f"\n\n(Parties non analysées : {', '.join(map(str, failed))})"
+        return {'report': report, 'chunks': len(chunks), 'failed_chunks': failed}
+
+
+# Instance globale
+document_analyzer = DocumentAnalyzer()
@@ -0,0 +1,98 @@
+"""
+Traitements exécutés par les workers de la file d'analyse :
+extraction du PDF, analyse IA avec suivi d'avancement, workflow N8N et sauvegarde.
+"""
+
+import datetime
+import logging
+
+from backend.extensions import db
+from backend.models import User, UrbanismProject
+from backend.services import ai_service, n8n_service
+from backend.services.analysis_cache import analysis_cache, EXTRACTION
+from backend.services.job_queue import job_queue
+from backend.services.pdf_extractor import pdf_extractor
+
+logger = logging.getLogger(__name__)
+
+# Part de la barre d'avancement attribuée à chaque étape
+EXTRACTION_SHARE = 0.1
+ANALYSIS_SHARE = 0.85
+
+
+def _load_text(job, report) -> tuple:
+    """Texte à analyser : fourni directement, ou extrait du PDF déposé (via le cache d'extraction)"""
+    if job.input_text is not None:
+        return job.input_text, False
+    report(0.0, 'extraction')
+    text = analysis_cache.get(EXTRACTION, job.document_hash) if job.document_hash else None
+    cached = text is not None
+    if not cached:
+        text = pdf_extractor.extract(job.input_path)
+        if job.document_hash:
+            analysis_cache.put(EXTRACTION, job.document_hash, text)
+    report(EXTRACTION_SHARE, 'analysis')
+    return text, cached
+
+
+def _analysis_progress(report):
+    """Convertit l'avancement (fait, total, étape) de l'analyseur en fraction de la tâche"""
+    def progress(done, total, stage):
+        if stage == 'reduce':
+            report(EXTRACTION_SHARE + ANALYSIS_SHARE, 'reduce')
+        else:
+            report(EXTRACTION_SHARE + ANALYSIS_SHARE * done / max(total, 1), stage)
+    return progress
+
+
+def run_market_analysis(job, report) -> dict:
+    text, extraction_cached = _load_text(job, report)
+    analysis = ai_service.analyze_market_offer(
+        text, progress=_analysis_progress(report), source_digest=job.document_hash
+    )
+    report(0.97, 'workflow')
+    n8n_service.trigger_market_analysis_workflow({'text': text, 'analysis': analysis})
+    return {
+        'analysis': analysis,
+        'text_length': len(text),
+        'document_hash': job.document_hash,
+        'extraction_cached': extraction_cached
+    }
+
+
+def run_urbanism_analysis(job, report) -> dict:
+    user = db.session.get(User, job.user_id)
+    if user is None:
+        raise ValueError("Utilisateur non trouvé")
+    text, extraction_cached = _load_text(job, report)
+    analysis = ai_service.analyze_urbanism_document(
+        text, progress=_analysis_progress(report), source_digest=job.document_hash
+    )
+    report(0.97, 'workflow')
+    n8n_service.trigger_market_analysis_workflow({
+        'user': user.to_dict(),
+        'text': text,
+        'analysis': analysis
+    })
+
+    now = datetime.datetime.utcnow()
+    project = UrbanismProject(
+        user_id=user.id,
+        title=f"Analyse Urbanisme {now.isoformat()}",
+        description=analysis,
+        created_at=now,
+        updated_at=now
+    )
+    db.session.add(project)
+    db.session.commit()
+    return {
+        'project_id': project.id,
+        'analysis': analysis,
+        'text_length': len(text),
+        'document_hash': job.document_hash,
+        'extraction_cached': extraction_cached
+    }
+
+
+job_queue.register('market', run_market_analysis)
+job_queue.register('urbanism', run_urbanism_analysis)
@@ -0,0 +1,281 @@
+"""
+File de tâches d'analyse en base de données et pool de workers local.
+
+- La file est la table `analysis_jobs` : fonctionne avec SQLite comme avec
+  PostgreSQL, et survit aux redémarrages.
+- Prise d'une tâche atomique : `UPDATE ... WHERE status = 'queued'` sur la tâche
+  la plus prioritaire ; un seul worker (thread ou processus) peut la réclamer.
+- Concurrence bornée par le nombre de workers, priorités, limite de tâches en
+  attente par utilisateur.
+- Les tâches « running » dont le worker ne donne plus signe de vie sont remises
+  en file (ou échouent après `max_attempts`).
+
+Modes : 'threads' (workers dans le processus web, démarrés avec l'application), 'inline' (exécution immédiate,
+pour les tests), 'external' (workers lancés par `python -m backend.scripts.job_worker`).
+"""
+
+import logging
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
+
+from sqlalchemy import update
+
+from backend.extensions import db
+from backend.models.analysis_job import AnalysisJob
+from backend.utils.uploads import move_upload
+
+logger = logging.getLogger(__name__)
+
+JobHandler = Callable[[AnalysisJob, Callable[[float, str], None]], dict]
+
+
+class QueueFullError(RuntimeError):
+    """Trop de tâches en attente pour cet utilisateur"""
+
+
+class JobQueue:
+    """File de tâches en base avec pool de workers"""
+
+    def __init__(self, mode: str = 'threads', workers: int = 2, poll_interval: float = 1.0,
+                 max_pending_per_user: int = 5, max_attempts: int = 2, stale_after: int = 600):
+        self.mode = mode
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.max_pending_per_user = max_pending_per_user
+        self.max_attempts = max_attempts
+        self.stale_after = stale_after
+        self.upload_dir = None
+        self.app = None
+        self.handlers: Dict[str, JobHandler] = {}
+        self._threads = []
+        self._threads_pid = None
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        """Lie la file à l'application (appelé par create_app)"""
+        self.app = app
+        config = app.config
+        self.mode = config.get('JOB_QUEUE_MODE', self.mode)
+        self.workers = config.get('JOB_WORKERS', self.workers)
+        self.poll_interval = config.get('JOB_POLL_INTERVAL', self.poll_interval)
+        self.max_pending_per_user = config.get('JOB_MAX_PENDING_PER_USER', self.max_pending_per_user)
+        self.max_attempts = config.get('JOB_MAX_ATTEMPTS', self.max_attempts)
+        self.stale_after = config.get('JOB_STALE_AFTER', self.stale_after)
+        self.upload_dir = config.get('JOB_UPLOAD_DIR') or os.path.join(app.instance_path, 'job_uploads')
+        if self.mode == 'threads' and config.get('JOB_QUEUE_AUTOSTART', True):
+            # Tâches restées en file ou remises en file avant un redémarrage : traitées sans attendre un enqueue
+            self.start()
+
+    def register(self, kind: str, handler: JobHandler):
+        self.handlers[kind] = handler
+
+    def spool(self, upload, digest: str) -> str:
+        """Conserve un fichier téléversé en attendant son traitement (un fichier par contenu)"""
+        return move_upload(upload, os.path.join(self.upload_dir, f"{digest}.pdf"))
+
+    # -------------------------------
+    # Producteur
+    # -------------------------------
+    def enqueue(self, kind: str, user_id: str, priority: int = 5, run_inline: bool = False,
+                **fields) -> AnalysisJob:
+        """
+        Crée une tâche. En mode 'inline' (ou avec `run_inline`), elle est exécutée avant le retour.
+
+        Raises:
+            QueueFullError: si l'utilisateur a déjà trop de tâches en attente.
+        """
+        if kind not in self.handlers:
+            raise ValueError(f"Type de tâche inconnu: {kind}")
+        pending = AnalysisJob.query.filter(
+            AnalysisJob.user_id == user_id, AnalysisJob.status.in_(('queued', 'running'))
+        ).count()
+        if pending >= self.max_pending_per_user:
+            raise QueueFullError(f"Trop d'analyses en cours ({pending}), réessayez plus tard")
+
+        inline = run_inline or self.mode == 'inline'
+        job = AnalysisJob(kind=kind, user_id=user_id, priority=priority, **fields)
+        if inline:
+            # Créée déjà réclamée : les workers du pool ne peuvent pas la prendre en parallèle
+            now = datetime.utcnow()
+            job.status, job.worker_id, job.attempts = 'running', 'inline', 1
+            job.started_at = job.heartbeat_at = now
+            job.stage = 'started'
+        db.session.add(job)
+        db.session.commit()
+
+        if inline:
+            self.run(job.id, worker_id='inline')
+            db.session.refresh(job)
+        elif self.mode == 'threads':
+            self.start()
+            self._wakeup.set()
+        return job
+
+    def cancel(self, job: AnalysisJob) -> bool:
+        """Annule une tâche encore en file"""
+        cancelled = db.session.execute(
+            update(AnalysisJob).where(AnalysisJob.id == job.id, AnalysisJob.status == 'queued')
+            .values(status='cancelled', finished_at=datetime.utcnow())
+        ).rowcount
+        db.session.commit()
+        db.session.refresh(job)
+        if cancelled:
+            self._discard_input(job)
+            db.session.commit()
+        return bool(cancelled)
+
+    # -------------------------------
+    # Consommateur
+    # -------------------------------
+    def claim(self, worker_id: str) -> Optional[str]:
+        """Réclame atomiquement la tâche en file la plus prioritaire"""
+        for _ in range(5):
+            candidate = db.session.query(AnalysisJob.id).filter(AnalysisJob.status == 'queued').order_by(
+                AnalysisJob.priority.desc(), AnalysisJob.created_at.asc()
+            ).limit(1).scalar()
+            if candidate is None:
+                db.session.commit()
+                return None
+            now = datetime.utcnow()
+            claimed = db.session.execute(
+                update(AnalysisJob).where(AnalysisJob.id == candidate, AnalysisJob.status == 'queued').values(
+                    status='running', worker_id=worker_id, started_at=now, heartbeat_at=now,
+                    attempts=AnalysisJob.attempts + 1, stage='started'
+                )
+            ).rowcount
+            db.session.commit()
+            if claimed:
+                return candidate
+        return None  # Forte contention : on réessaiera au prochain tour
+
+    def _progress_updater(self, job_id: str):
+        last = {'at': 0.0}
+        lock = threading.Lock()
+
+        def report(progress: float, stage: str):
+            # Appelé depuis les threads de l'analyse : connexion dédiée, écritures espacées
+            now = time.monotonic()
+            with lock:
+                if now - last['at'] < 0.5 and progress < 1:
+                    return
+                last['at'] = now
+            try:
+                with db.engine.begin() as connection:
+                    connection.execute(update(AnalysisJob).where(AnalysisJob.id == job_id).values(
+                        progress=min(max(progress, 0.0), 1.0), stage=stage, heartbeat_at=datetime.utcnow()
+                    ))
+            except Exception as e:
+                # L'avancement est indicatif : il ne doit jamais faire échouer l'analyse
+                logger.warning(f"Avancement de la tâche {job_id} non enregistré: {e}")
+        return report
+
+    def run(self, job_id: str, worker_id: str):
+        """Exécute une tâche réclamée par ce worker (claim, ou créée par enqueue en mode inline)"""
+        job = db.session.get(AnalysisJob, job_id, populate_existing=True)
+        # Aucune transaction ouverte pendant l'analyse (SQLite verrouille la base sinon)
+        db.session.commit()
+        if job is None:
+            return
+        if job.status != 'running' or job.worker_id != worker_id:
+            logger.warning(f"Tâche {job_id} non exécutée par {worker_id} : {job.status}, worker {job.worker_id}")
+            return
+        handler = self.handlers[job.kind]
+        try:
+            result = handler(job, self._progress_updater(job_id))
+        except Exception as e:
+            db.session.rollback()
+            logger.exception(f"Tâche {job_id} ({job.kind}) en échec")
+            job = db.session.get(AnalysisJob, job_id)
+            job.status, job.error, job.finished_at = 'failed', str(e), datetime.utcnow()
+            self._discard_input(job)
+            db.session.commit()
+            return
+        job = db.session.get(AnalysisJob, job_id, populate_existing=True)
+        self._discard_input(job)
+        job.status, job.result, job.progress, job.stage = 'succeeded', result, 1.0, 'done'
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+
+    @staticmethod
+    def _discard_input(job: AnalysisJob):
+        """Supprime le fichier d'entrée s'il n'est plus attendu par aucune autre tâche"""
+        path, job.input_path = job.input_path, None
+        if not path:
+            return
+        still_needed = AnalysisJob.query.filter(
+            AnalysisJob.id != job.id, AnalysisJob.input_path == path,
+            AnalysisJob.status.in_(('queued', 'running'))
+        ).count()
+        if not still_needed:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def requeue_stale(self) -> int:
+        """Remet en file les tâches dont le worker a disparu"""
+        limit = datetime.utcnow() - timedelta(seconds=self.stale_after)
+        stale = AnalysisJob.query.filter(AnalysisJob.status == 'running', AnalysisJob.heartbeat_at < limit).all()
+        for job in stale:
+            if job.attempts >= self.max_attempts:
+                job.status, job.error, job.finished_at = 'failed', "Worker interrompu", datetime.utcnow()
+            else:
+                job.status, job.worker_id = 'queued', None
+        db.session.commit()
+        return len(stale)
+
+    def work_once(self, worker_id: str) -> bool:
+        """Traite au plus une tâche ; retourne False si la file est vide"""
+        job_id = self.claim(worker_id)
+        if job_id is None:
+            return False
+        self.run(job_id, worker_id)
+        return True
+
+    def _worker_loop(self, worker_id: str):
+        with self.app.app_context():
+            while not self._stop.is_set():
+                try:
+                    if worker_id.endswith('-0'):
+                        self.requeue_stale()
+                    while not self._stop.is_set() and self.work_once(worker_id):
+                        pass
+                except Exception as e:
+                    logger.error(f"Worker {worker_id}: {e}")
+                    db.session.rollback()
+                finally:
+                    db.session.remove()
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+    def start(self):
+        """Démarre les workers du processus courant (une fois par processus)"""
+        with self._lock:
+            if self._threads_pid == os.getpid() and all(t.is_alive() for t in self._threads):
+                return
+            self._stop.clear()
+            prefix = f"{socket.gethostname()}:{os.getpid()}"
+            self._threads = [
+                threading.Thread(target=self._worker_loop, args=(f"{prefix}-{i}",), name=f'job-worker-{i}', daemon=True)
+                for i in range(self.workers)
+            ]
+            self._threads_pid = os.getpid()
+            for thread in self._threads:
+                thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+
+# Instance globale
+job_queue = JobQueue()
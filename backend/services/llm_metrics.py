@@ -0,0 +1,175 @@
+"""
+Comptabilité des appels LLM : tokens, latence, tentatives et statut de cache.
+
+Chaque appel est rattaché à la fonctionnalité appelante (méthode d'AIService),
+à l'endpoint Flask et à l'utilisateur JWT de la requête. Les agrégats sont
+conservés en mémoire (par processus) et chaque appel produit une ligne de log
+JSON sur le logger `backend.llm`.
+"""
+
+import functools
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from contextvars import ContextVar
+from dataclasses import dataclass, asdict
+from typing import Optional
+
+from flask import has_request_context, request
+
+logger = logging.getLogger('backend.llm')
+
+_current_feature: ContextVar[Optional[str]] = ContextVar('llm_feature', default=None)
+
+
+@dataclass
+class LLMCallRecord:
+    """Mesures d'un appel LLM"""
+    feature: str
+    endpoint: Optional[str]
+    user_id: Optional[str]
+    provider: Optional[str]
+    model: Optional[str]
+    prompt_tokens: int
+    completion_tokens: int
+    latency_ms: float
+    retries: int
+    cache: str          # 'hit', 'miss' ou 'none'
+    hedged: bool = False
+    ok: bool = True
+    estimated_tokens: bool = False
+
+
+class _Aggregate:
+    __slots__ = ('calls', 'errors', 'cache_hits', 'retries', 'prompt_tokens', 'completion_tokens',
+                 'latency_total_ms', 'latency_max_ms')
+
+    def __init__(self):
+        self.calls = self.errors = self.cache_hits = self.retries = 0
+        self.prompt_tokens = self.completion_tokens = 0
+        self.latency_total_ms = self.latency_max_ms = 0.0
+
+    def add(self, record: LLMCallRecord):
+        self.calls += 1
+        self.errors += 0 if record.ok else 1
+        self.cache_hits += 1 if record.cache == 'hit' else 0
+        self.retries += record.retries
+        self.prompt_tokens += record.prompt_tokens
+        self.completion_tokens += record.completion_tokens
+        self.latency_total_ms += record.latency_ms
+        self.latency_max_ms = max(self.latency_max_ms, record.latency_ms)
+
+    def to_dict(self) -> dict:
+        upstream = self.calls - self.cache_hits
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'cache_hits': self.cache_hits,
+            'retries': self.retries,
+            'prompt_tokens': self.prompt_tokens,
+            'completion_tokens': self.completion_tokens,
+            'total_tokens': self.prompt_tokens + self.completion_tokens,
+            'avg_latency_ms': round(self.latency_total_ms / upstream, 1) if upstream else None,
+            'max_latency_ms': round(self.latency_max_ms, 1)
+        }
+
+
+class LLMMetrics:
+    """Agrégats des appels LLM par fonctionnalité, endpoint et utilisateur"""
+
+    def __init__(self, max_users: int = 5000):
+        self.max_users = max_users
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.started_at = time.time()
+            self._total = _Aggregate()
+            self._by_feature = defaultdict(_Aggregate)
+            self._by_endpoint = defaultdict(_Aggregate)
+            self._by_model = defaultdict(_Aggregate)
+            self._by_user: "OrderedDict[str, _Aggregate]" = OrderedDict()
+
+    def track(self, feature: str):
+        """Décorateur : rattache les appels LLM de la méthode à la fonctionnalité `feature`"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                token = _current_feature.set(feature)
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    _current_feature.reset(token)
+            return wrapper
+        return decorator
+
+    @staticmethod
+    def _request_scope():
+        if not has_request_context():
+            return None, None
+        user_id = None
+        try:
+            from flask_jwt_extended import get_jwt_identity
+            user_id = get_jwt_identity()
+        except Exception:
+            pass
+        return request.endpoint, user_id
+
+    def record(self, provider=None, model=None, usage=None, latency_ms=0.0, attempts=1, hedged=False,
+               cache='none', ok=True, prompt_estimate=0, completion_estimate=0) -> LLMCallRecord:
+        """
+        Enregistre un appel. Les tokens viennent du champ `usage` de l'API ;
+        à défaut, les estimations locales sont utilisées.
+        """
+        usage = usage or {}
+        endpoint, user_id = self._request_scope()
+        record = LLMCallRecord(
+            feature=_current_feature.get() or 'other',
+            endpoint=endpoint,
+            user_id=str(user_id) if user_id is not None else None,
+            provider=provider,
+            model=model,
+            prompt_tokens=int(usage.get('prompt_tokens', prompt_estimate)),
+            completion_tokens=int(usage.get('completion_tokens', completion_estimate)),
+            latency_ms=round(latency_ms, 1),
+            retries=max(0, attempts - 1),
+            cache=cache,
+            hedged=hedged,
+            ok=ok,
+            estimated_tokens=not usage and cache != 'hit'
+        )
+        with self._lock:
+            self._total.add(record)
+            self._by_feature[record.feature].add(record)
+            self._by_endpoint[record.endpoint or '-'].add(record)
+            if record.model:
+                self._by_model[f"{record.provider}:{record.model}"].add(record)
+            if record.user_id:
+                aggregate = self._by_user.pop(record.user_id, None) or _Aggregate()
+                aggregate.add(record)
+                self._by_user[record.user_id] = aggregate
+                while len(self._by_user) > self.max_users:
+                    self._by_user.popitem(last=False)
+        logger.info(json.dumps({'event': 'llm_call', **asdict(record)}))
+        return record
+
+    def snapshot(self, top_users: int = 20) -> dict:
+        """Agrégats courants ; les utilisateurs sont triés par tokens consommés"""
+        with self._lock:
+            users = sorted(self._by_user.items(),
+                           key=lambda item: item[1].prompt_tokens + item[1].completion_tokens, reverse=True)
+            return {
+                'since': self.started_at,
+                'total': self._total.to_dict(),
+                'by_feature': {name: agg.to_dict() for name, agg in self._by_feature.items()},
+                'by_endpoint': {name: agg.to_dict() for name, agg in self._by_endpoint.items()},
+                'by_model': {name: agg.to_dict() for name, agg in self._by_model.items()},
+                'top_users': [{'user_id': user_id, **agg.to_dict()} for user_id, agg in users[:top_users]]
+            }
+
+
+# Instance globale
+llm_metrics = LLMMetrics()
@@ -0,0 +1,295 @@
+"""
+Routage des appels LLM entre fournisseurs (Mistral, OpenAI) et modèles.
+
+- Statistiques glissantes par fournisseur/modèle : latence p50/p95 et taux d'erreur.
+- Les prompts courts (questions de type FAQ) vont vers les petits modèles, plus rapides.
+- Couverture (hedging) : si le premier fournisseur n'a pas répondu après un délai
+  calé sur son p95, un second est interrogé en parallèle et la première réponse gagne.
+- Disjoncteurs : un fournisseur en échec répété est écarté pendant un temps de repos.
+- Délai global borné : plus de relances exponentielles qui bloquent une requête 30 s.
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+import requests
+
+from backend.utils.tokens import count_message_tokens
+
+logger = logging.getLogger(__name__)
+
+SMALL = 'small'
+LARGE = 'large'
+
+
+class LLMUnavailableError(RuntimeError):
+    """Aucun fournisseur n'a pu répondre dans le délai imparti"""
+
+
+@dataclass
+class ProviderTarget:
+    """Un modèle chez un fournisseur compatible avec l'API chat/completions"""
+    provider: str
+    model: str
+    tier: str
+    base_url: str
+    api_key: str
+
+    @property
+    def name(self) -> str:
+        return f"{self.provider}:{self.model}"
+
+
+@dataclass
+class LLMResult:
+    """Réponse d'un appel routé"""
+    content: str
+    provider: str
+    model: str
+    latency_ms: float
+    usage: dict = field(default_factory=dict)
+    attempts: int = 1
+    hedged: bool = False
+
+
+class RollingStats:
+    """Fenêtre glissante des derniers appels d'une cible"""
+
+    def __init__(self, size: int = 200):
+        self._samples = deque(maxlen=size)  # (latence ms, succès)
+        self._lock = threading.Lock()
+
+    def record(self, latency_ms: float, ok: bool):
+        with self._lock:
+            self._samples.append((latency_ms, ok))
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            samples = list(self._samples)
+        latencies = sorted(latency for latency, ok in samples if ok)
+        count = len(latencies)
+
+        def percentile(p):
+            return round(latencies[min(count - 1, int(p * count))], 1) if count else None
+
+        return {
+            'samples': len(samples),
+            'p50_ms': percentile(0.50),
+            'p95_ms': percentile(0.95),
+            'error_rate': round(sum(1 for _, ok in samples if not ok) / len(samples), 3) if samples else 0.0
+        }
+
+
+class CircuitBreaker:
+    """Disjoncteur : ouvert après N échecs consécutifs, un essai autorisé après le temps de repos"""
+
+    def __init__(self, failure_threshold: int = 5, cooldown: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return 'closed'
+        return 'half_open' if time.monotonic() - self.opened_at >= self.cooldown else 'open'
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half_open' and not self._trial:
+                self._trial = True
+                return True
+            return False
+
+    def record(self, ok: bool):
+        with self._lock:
+            self._trial = False
+            if ok:
+                self.failures = 0
+                self.opened_at = None
+                return
+            self.failures += 1
+            if self.failures >= self.failure_threshold or self.opened_at is not None:
+                self.opened_at = time.monotonic()
+
+
+def openai_compatible_call(session: requests.Session, target: ProviderTarget, messages: List[dict],
+                           temperature: float, timeout: float) -> tuple:
+    """Appel HTTP chat/completions (Mistral et OpenAI partagent le même format)"""
+    response = session.post(
+        f"{target.base_url}/chat/completions",
+        headers={"Authorization": f"Bearer {target.api_key}", "Content-Type": "application/json"},
+        json={"model": target.model, "messages": messages, "temperature": temperature},
+        timeout=timeout
+    )
+    response.raise_for_status()
+    data = response.json()
+    return data["choices"][0]["message"]["content"], data.get("usage") or {}
+
+
+class LLMRouter:
+    """Choisit le fournisseur/modèle de chaque appel et borne sa latence"""
+
+    def __init__(self, targets: List[ProviderTarget], call: Optional[Callable] = None,
+                 small_prompt_tokens: int = 600, request_timeout: float = 20.0,
+                 hedge_after_ms: Optional[float] = None, hedge_min_ms: float = 1500.0,
+                 breaker_failures: int = 5, breaker_cooldown: float = 30.0, max_workers: int = 16):
+        self.targets = targets
+        self.small_prompt_tokens = small_prompt_tokens
+        self.request_timeout = request_timeout
+        self.hedge_after_ms = hedge_after_ms
+        self.hedge_min_ms = hedge_min_ms
+        self.stats: Dict[str, RollingStats] = {t.name: RollingStats() for t in targets}
+        self.breakers: Dict[str, CircuitBreaker] = {
+            t.name: CircuitBreaker(breaker_failures, breaker_cooldown) for t in targets
+        }
+        self._session = requests.Session()
+        self._call = call or (lambda target, messages, temperature, timeout:
+                              openai_compatible_call(self._session, target, messages, temperature, timeout))
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='llm')
+        self.hedges = 0
+
+    @classmethod
+    def from_config(cls, config) -> "LLMRouter":
+        """Construit les cibles à partir des clés d'API configurées"""
+        targets = []
+        if getattr(config, 'MISTRAL_API_KEY', None):
+            base_url = "https://api.mistral.ai/v1"
+            targets += [
+                ProviderTarget('mistral', config.MISTRAL_SMALL_MODEL, SMALL, base_url, config.MISTRAL_API_KEY),
+                ProviderTarget('mistral', config.MISTRAL_LARGE_MODEL, LARGE, base_url, config.MISTRAL_API_KEY),
+            ]
+        if getattr(config, 'OPENAI_API_KEY', None):
+            base_url = "https://api.openai.com/v1"
+            targets += [
+                ProviderTarget('openai', config.OPENAI_SMALL_MODEL, SMALL, base_url, config.OPENAI_API_KEY),
+                ProviderTarget('openai', config.OPENAI_LARGE_MODEL, LARGE, base_url, config.OPENAI_API_KEY),
+            ]
+        return cls(
+            targets,
+            small_prompt_tokens=config.LLM_SMALL_PROMPT_TOKENS,
+            request_timeout=config.LLM_REQUEST_TIMEOUT,
+            hedge_after_ms=config.LLM_HEDGE_AFTER_MS,
+            breaker_failures=config.LLM_BREAKER_FAILURES,
+            breaker_cooldown=config.LLM_BREAKER_COOLDOWN
+        )
+
+    # -------------------------------
+    # Sélection
+    # -------------------------------
+    def _score(self, target: ProviderTarget) -> float:
+        snapshot = self.stats[target.name].snapshot()
+        p95 = snapshot['p95_ms'] if snapshot['p95_ms'] is not None else self.hedge_min_ms
+        return p95 * (1 + 4 * snapshot['error_rate'])
+
+    def candidates(self, messages: List[dict], tier: Optional[str] = None) -> List[ProviderTarget]:
+        """
+        Cibles ordonnées pour un appel : palier demandé (ou déduit de la taille du prompt)
+        d'abord, trié par latence pondérée par le taux d'erreur, puis l'autre palier en repli.
+        """
+        if tier is None:
+            tier = SMALL if count_message_tokens(messages) <= self.small_prompt_tokens else LARGE
+        preferred = sorted((t for t in self.targets if t.tier == tier), key=self._score)
+        fallback = sorted((t for t in self.targets if t.tier != tier), key=self._score)
+        return preferred + fallback
+
+    def _hedge_delay(self, target: ProviderTarget) -> float:
+        if self.hedge_after_ms is not None:
+            return self.hedge_after_ms / 1000
+        p95 = self.stats[target.name].snapshot()['p95_ms']
+        return max(self.hedge_min_ms, p95 or 0) / 1000
+
+    # -------------------------------
+    # Appel
+    # -------------------------------
+    def _attempt(self, target: ProviderTarget, messages: List[dict], temperature: float, timeout: float):
+        started = time.perf_counter()
+        try:
+            content, usage = self._call(target, messages, temperature, timeout)
+        except Exception:
+            self.stats[target.name].record((time.perf_counter() - started) * 1000, False)
+            self.breakers[target.name].record(False)
+            raise
+        latency_ms = (time.perf_counter() - started) * 1000
+        self.stats[target.name].record(latency_ms, True)
+        self.breakers[target.name].record(True)
+        return target, content, usage, latency_ms
+
+    def complete(self, messages: List[dict], tier: Optional[str] = None, temperature: float = 0.3) -> LLMResult:
+        """
+        Exécute un appel chat/completions avec repli et couverture.
+
+        Raises:
+            LLMUnavailableError: si aucun fournisseur n'a répondu avant le délai global.
+        """
+        deadline = time.monotonic() + self.request_timeout
+        queue = [t for t in self.candidates(messages, tier) if self.breakers[t.name].state != 'open']
+        running = {}
+        attempts = 0
+        hedged = False
+        errors = []
+
+        def launch():
+            nonlocal attempts
+            while queue:
+                target = queue.pop(0)
+                if self.breakers[target.name].allow():
+                    attempts += 1
+                    remaining = max(0.1, deadline - time.monotonic())
+                    running[self._executor.submit(self._attempt, target, messages, temperature, remaining)] = target
+                    return target
+            return None
+
+        primary = launch()
+        while running:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            # Tant qu'un seul appel est en cours, on attend au plus le délai de couverture
+            timeout = min(remaining, self._hedge_delay(primary)) if len(running) == 1 and queue else remaining
+            done, _ = wait(list(running), timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                if launch() is not None:
+                    hedged = True
+                    self.hedges += 1
+                continue
+            for future in done:
+                target = running.pop(future)
+                try:
+                    winner, content, usage, latency_ms = future.result()
+                except Exception as e:
+                    errors.append(f"{target.name}: {e}")
+                    logger.warning(f"Échec LLM {target.name}: {e}")
+                    if not running:
+                        primary = launch() or primary
+                    continue
+                if content:
+                    return LLMResult(content, winner.provider, winner.model, round(latency_ms, 1),
+                                     usage, attempts, hedged)
+                errors.append(f"{target.name}: réponse vide")
+                if not running:
+                    primary = launch() or primary
+
+        raise LLMUnavailableError("; ".join(errors) or "Aucun fournisseur LLM disponible")
+
+    def snapshot(self) -> dict:
+        """Statistiques et état des disjoncteurs par fournisseur/modèle"""
+        return {
+            'hedges': self.hedges,
+            'targets': [
+                {'provider': t.provider, 'model': t.model, 'tier': t.tier,
+                 'breaker': self.breakers[t.name].state, **self.stats[t.name].snapshot()}
+                for t in self.targets
+            ]
+        }
@@ -0,0 +1,346 @@
+"""
+Écriture différée (write-behind) des messages du chatbot.
+
+Les requêtes de chat déposent leurs messages dans un tampon mémoire ; un thread
+de fond les insère par lots (executemany) et met à jour `updated_at` des
+conversations en un seul commit. Le chemin de requête n'écrit plus en base.
+
+- Mode synchrone (par défaut, et en tests) : les messages sont ajoutés à la session
+  de la requête, comme avant.
+- Contre-pression : au-delà de `max_pending` messages en attente, l'écriture
+  redevient synchrone plutôt que de perdre des données.
+- Arrêt : le tampon est vidé à la sortie du processus ; si la base est
+  indisponible, les lignes sont sauvegardées dans un fichier JSONL rejoué au
+  démarrage suivant.
+- Lot refusé : si la base répond mais rejette le lot (contrainte violée…), le lot
+  est réécrit par moitiés pour isoler les lignes fautives. Une ligne rejetée
+  `max_attempts` fois part dans un fichier de lettres mortes (JSONL, non rejoué)
+  au lieu de bloquer le tampon. Les erreurs transitoires (base indisponible,
+  verrou) remettent simplement le lot en attente.
+"""
+
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import insert, update
+from sqlalchemy.exc import DisconnectionError, InterfaceError, OperationalError
+
+from backend.extensions import db
+from backend.models.conversation import Conversation, Message
+from backend.models.types import new_id
+
+logger = logging.getLogger(__name__)
+
+# Erreurs qui ne tiennent pas aux lignes écrites : le lot est retenté tel quel
+TRANSIENT_ERRORS = (OperationalError, InterfaceError, DisconnectionError)
+
+
+class MessageWriter:
+    """Tampon d'insertion des messages, vidé périodiquement par un thread de fond"""
+
+    def __init__(self, enabled: bool = False, flush_interval: float = 0.5,
+                 max_batch: int = 500, max_pending: int = 10000, spill_path: Optional[str] = None,
+                 max_attempts: int = 3, dead_letter_path: Optional[str] = None):
+        self.enabled = enabled
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self.spill_path = spill_path
+        self.max_attempts = max_attempts
+        self.dead_letter_path = dead_letter_path
+        self.app = None
+        self._messages: List[dict] = []
+        self._touched: Dict[str, datetime] = {}       # conversation_id -> updated_at
+        self._latest_by_user: Dict[str, str] = {}     # user_id -> conversation_id
+        self._inflight: List[dict] = []
+        self._attempts: Dict[str, int] = {}           # message id -> rejets de la ligne seule
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._thread_pid = None
+        self._replayed_pid = None
+        self.flushed = 0
+        self.batches = 0
+        self.failures = 0
+        self.sync_fallbacks = 0
+        self.dead_lettered = 0
+
+    def init_app(self, app):
+        """Lie le writer à l'application (appelé par create_app)"""
+        self.app = app
+        config = app.config
+        self.enabled = config.get('CHAT_WRITE_BEHIND', self.enabled)
+        self.flush_interval = config.get('CHAT_WRITE_BEHIND_INTERVAL', self.flush_interval)
+        self.max_batch = config.get('CHAT_WRITE_BEHIND_BATCH', self.max_batch)
+        self.max_pending = config.get('CHAT_WRITE_BEHIND_MAX_PENDING', self.max_pending)
+        self.spill_path = config.get('CHAT_WRITE_BEHIND_SPILL_PATH') or os.path.join(
+            app.instance_path, 'pending_messages.jsonl')
+        self.max_attempts = config.get('CHAT_WRITE_BEHIND_MAX_ATTEMPTS', self.max_attempts)
+        self.dead_letter_path = config.get('CHAT_WRITE_BEHIND_DEAD_LETTER_PATH') or os.path.join(
+            app.instance_path, 'dead_messages.jsonl')
+        if self.enabled:
+            atexit.register(self.shutdown)
+
+    # -------------------------------
+    # Chemin de requête
+    # -------------------------------
+    @staticmethod
+    def message_row(conversation_id: str, sender: str, content: str, created_at: Optional[datetime] = None) -> dict:
+        return {
+            'id': new_id(),
+            'conversation_id': conversation_id,
+            'sender': sender,
+            'content': content,
+            'created_at': created_at or datetime.utcnow(),
+            'meta_info': None
+        }
+
+    def add(self, user_id: str, conversation_id: str, rows: List[dict]):
+        """
+        Enregistre les messages d'un échange.
+
+        En mode synchrone, les messages rejoignent la session courante (commit par
+        l'appelant) ; sinon ils sont mis en tampon sans accès à la base.
+        """
+        updated_at = max(row['created_at'] for row in rows)
+        with self._lock:
+            buffered = self.enabled and len(self._messages) + len(rows) <= self.max_pending
+            if buffered:
+                self._messages.extend(rows)
+                self._touched[conversation_id] = updated_at
+                self._latest_by_user[str(user_id)] = conversation_id
+                full = len(self._messages) >= self.max_batch
+
+        if not buffered:
+            if self.enabled:
+                self.sync_fallbacks += 1
+            db.session.add_all([Message(**row) for row in rows])
+            db.session.query(Conversation).filter_by(id=conversation_id).update({'updated_at': updated_at})
+            return
+
+        self._ensure_thread()
+        if full:
+            self._wakeup.set()
+
+    def pending_for(self, conversation_id: str) -> List[dict]:
+        """Messages d'une conversation pas encore écrits en base (ordre chronologique)"""
+        with self._lock:
+            rows = [row for row in self._inflight + self._messages if row['conversation_id'] == conversation_id]
+        return sorted(rows, key=lambda row: row['created_at'])
+
+    def latest_conversation_id(self, user_id: str) -> Optional[str]:
+        """Conversation la plus récemment utilisée par l'utilisateur, si elle a des messages en attente"""
+        with self._lock:
+            return self._latest_by_user.get(str(user_id))
+
+    # -------------------------------
+    # Vidage du tampon
+    # -------------------------------
+    def _ensure_thread(self):
+        # Un thread par processus : après un fork (gunicorn), le thread du parent n'existe plus
+        if self._thread is not None and self._thread_pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or self._thread_pid != os.getpid() or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='message-writer', daemon=True)
+                self._thread_pid = os.getpid()
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Écriture différée des messages impossible: {e}")
+
+    def _drain(self):
+        with self._lock:
+            rows, self._messages = self._messages, []
+            touched, self._touched = self._touched, {}
+            self._inflight = rows
+        return rows, touched
+
+    def _write(self, rows: List[dict], touched: Dict[str, datetime]):
+        with self.app.app_context():
+            try:
+                for start in range(0, len(rows), self.max_batch):
+                    db.session.execute(insert(Message), rows[start:start + self.max_batch])
+                if touched:
+                    db.session.execute(update(Conversation), [
+                        {'id': conversation_id, 'updated_at': updated_at}
+                        for conversation_id, updated_at in touched.items()
+                    ])
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                raise
+            finally:
+                db.session.remove()
+
+    def _isolate(self, rows: List[dict]) -> Tuple[List[dict], List[Tuple[dict, str]], List[dict]]:
+        """
+        Réécrit un lot refusé par moitiés, chacune dans sa transaction.
+        Retourne (lignes écrites, lignes rejetées seules avec l'erreur, lignes à retenter).
+        """
+        try:
+            self._write(rows, {})
+            return rows, [], []
+        except TRANSIENT_ERRORS:
+            return [], [], rows
+        except Exception as e:
+            if len(rows) == 1:
+                return [], [(rows[0], str(e).splitlines()[0])], []
+        middle = len(rows) // 2
+        written, rejected, retry = self._isolate(rows[:middle])
+        more_written, more_rejected, more_retry = self._isolate(rows[middle:])
+        return written + more_written, rejected + more_rejected, retry + more_retry
+
+    def _requeue(self, rows: List[dict], touched: Dict[str, datetime]):
+        with self._lock:
+            # Remise en tête du tampon pour la prochaine tentative
+            self._messages = rows + self._messages
+            for conversation_id, updated_at in touched.items():
+                self._touched[conversation_id] = max(updated_at, self._touched.get(conversation_id, updated_at))
+            self._inflight = []
+
+    def flush(self) -> int:
+        """Écrit le tampon en base en une transaction. Retourne le nombre de messages écrits."""
+        with self._flush_lock:
+            if self._replayed_pid != os.getpid():
+                # Premier vidage du processus : reprise des messages sauvegardés à l'arrêt précédent
+                self._replayed_pid = os.getpid()
+                self.replay_spill()
+            rows, touched = self._drain()
+            if not rows and not touched:
+                return 0
+            started = time.perf_counter()
+            try:
+                self._write(rows, touched)
+                written = rows
+            except TRANSIENT_ERRORS:
+                self.failures += 1
+                self._requeue(rows, touched)
+                raise
+            except Exception as e:
+                self.failures += 1
+                if self.app is None:
+                    self._requeue(rows, touched)
+                    raise
+                logger.warning(f"Lot de {len(rows)} message(s) refusé ({str(e).splitlines()[0]}), écriture par moitiés")
+                written = self._write_isolated(rows, touched)
+            with self._lock:
+                self._inflight = []
+                for row in written:
+                    self._attempts.pop(row['id'], None)
+                # Les conversations écrites sont de nouveau à jour en base
+                self._latest_by_user = {user_id: conversation_id for user_id, conversation_id
+                                        in self._latest_by_user.items() if conversation_id in self._touched}
+            self.flushed += len(written)
+            self.batches += 1
+            logger.debug(f"{len(written)} message(s) écrits en {(time.perf_counter() - started) * 1000:.1f} ms")
+            return len(written)
+
+    def _write_isolated(self, rows: List[dict], touched: Dict[str, datetime]) -> List[dict]:
+        """Écrit ce qui peut l'être, remet en attente le reste, écarte les lignes rejetées trop souvent"""
+        written, rejected, retry = self._isolate(rows)
+        dead = []
+        for row, error in rejected:
+            attempts = self._attempts.get(row['id'], 0) + 1
+            if attempts >= self.max_attempts:
+                self._attempts.pop(row['id'], None)
+                dead.append({**row, 'error': error, 'attempts': attempts})
+            else:
+                self._attempts[row['id']] = attempts
+                retry.append(row)
+        if dead:
+            self.dead_lettered += len(dead)
+            self._append_jsonl(self.dead_letter_path, dead)
+            for row in dead:
+                logger.error(f"Message {row['id']} (conversation {row['conversation_id']}) écarté après "
+                             f"{row['attempts']} tentative(s), voir {self.dead_letter_path}: {row['error']}")
+
+        pending = {row['conversation_id'] for row in retry}
+        self._requeue(retry, {key: value for key, value in touched.items() if key in pending})
+        done = {key: value for key, value in touched.items()
+                if key not in pending and any(row['conversation_id'] == key for row in written)}
+        if done:
+            try:
+                self._write([], done)
+            except Exception as e:
+                logger.warning(f"Mise à jour des dates de conversation impossible: {e}")
+        return written
+
+    # -------------------------------
+    # Arrêt et reprise
+    # -------------------------------
+    def shutdown(self):
+        """Vide le tampon ; en cas d'échec, sauvegarde les lignes sur disque"""
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Vidage final des messages impossible, sauvegarde dans {self.spill_path}: {e}")
+            rows, touched = self._drain()
+            self._spill(rows, touched)
+
+    def _spill(self, rows: List[dict], touched: Dict[str, datetime]):
+        self._append_jsonl(self.spill_path, rows)
+
+    @staticmethod
+    def _append_jsonl(path: Optional[str], rows: List[dict]):
+        if not rows or not path:
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'a', encoding='utf-8') as spill:
+            for row in rows:
+                spill.write(json.dumps({**row, 'created_at': row['created_at'].isoformat()}) + '\n')
+            spill.flush()
+            os.fsync(spill.fileno())
+
+    def replay_spill(self):
+        """Réinsère les messages sauvegardés lors d'un arrêt précédent"""
+        if not self.spill_path or not os.path.exists(self.spill_path):
+            return 0
+        replay_path = f"{self.spill_path}.{os.getpid()}"
+        try:
+            os.replace(self.spill_path, replay_path)  # Un seul processus rejoue le fichier
+        except OSError:
+            return 0
+        with open(replay_path, encoding='utf-8') as spill:
+            rows = [json.loads(line) for line in spill if line.strip()]
+        touched: Dict[str, datetime] = {}
+        for row in rows:
+            row['created_at'] = datetime.fromisoformat(row['created_at'])
+            touched[row['conversation_id']] = max(row['created_at'], touched.get(row['conversation_id'], row['created_at']))
+        with self._lock:
+            self._messages = rows + self._messages
+            for conversation_id, updated_at in touched.items():
+                self._touched.setdefault(conversation_id, updated_at)
+        os.remove(replay_path)
+        logger.info(f"{len(rows)} message(s) en attente rechargés depuis {self.spill_path}")
+        return len(rows)
+
+    def stats(self) -> dict:
+        with self._lock:
+            pending = len(self._messages) + len(self._inflight)
+        return {
+            'enabled': self.enabled,
+            'pending': pending,
+            'flushed': self.flushed,
+            'batches': self.batches,
+            'failures': self.failures,
+            'sync_fallbacks': self.sync_fallbacks,
+            'dead_lettered': self.dead_lettered
+        }
+
+
+# Instance globale
+message_writer = MessageWriter()
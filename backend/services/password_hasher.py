@@ -0,0 +1,128 @@
+"""
+Hachage et vérification bcrypt hors du thread de requête.
+
+Les calculs bcrypt sont envoyés dans un pool de processus dédié avec une file
+bornée : en cas de rafale de connexions, les requêtes excédentaires sont
+refusées immédiatement (503) au lieu de monopoliser tous les workers.
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+
+from backend.utils.security import hash_password, check_password, password_cost
+
+logger = logging.getLogger(__name__)
+
+
+def _pool_context():
+    # Jamais de fork : le processus gunicorn porte des threads (écriture différée,
+    # file d'analyses) dont les verrous seraient copiés dans un état incohérent
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+class HasherBusyError(RuntimeError):
+    """File d'attente du pool de hachage pleine"""
+
+
+class PasswordHasher:
+    """Exécute bcrypt dans un pool de processus avec une file d'attente bornée"""
+
+    def __init__(self, rounds: int = 12, workers: int = 2, max_pending: int = 32,
+                 timeout: float = 10.0, inline: bool = False):
+        self.rounds = rounds
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.inline = inline
+        self._executor = None
+        self._executor_pid = None
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=1000)
+        self.rejected = 0
+        self.rehashed = 0
+
+    def configure(self, config):
+        """Applique la configuration Flask (appelé par create_app)"""
+        self.rounds = config.get('BCRYPT_ROUNDS', self.rounds)
+        self.workers = config.get('PASSWORD_HASH_WORKERS', self.workers)
+        self.timeout = config.get('PASSWORD_HASH_TIMEOUT', self.timeout)
+        self.inline = config.get('PASSWORD_HASH_INLINE', self.inline)
+        max_pending = config.get('PASSWORD_HASH_MAX_PENDING', self.max_pending)
+        if max_pending != self.max_pending:
+            self.max_pending = max_pending
+            self._slots = threading.BoundedSemaphore(max_pending)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Un pool par processus : après un fork (gunicorn), le pool du parent est inutilisable
+        with self._lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=_pool_context())
+                self._executor_pid = os.getpid()
+            return self._executor
+
+    def _run(self, func, *args):
+        if not self._slots.acquire(blocking=False):
+            self.rejected += 1
+            raise HasherBusyError("Trop de vérifications de mot de passe en cours")
+        started = time.perf_counter()
+        try:
+            if self.inline:
+                return func(*args)
+            future = self._get_executor().submit(func, *args)
+            try:
+                return future.result(timeout=self.timeout)
+            except FutureTimeoutError:
+                future.cancel()
+                raise HasherBusyError("Délai de vérification du mot de passe dépassé")
+        finally:
+            self._slots.release()
+            self._latencies.append((time.perf_counter() - started) * 1000)
+
+    def hash(self, password: str) -> str:
+        """Hash un mot de passe avec le coût configuré"""
+        return self._run(hash_password, password, self.rounds)
+
+    def verify(self, hashed_password: str, password: str) -> bool:
+        """Vérifie un mot de passe contre son hash"""
+        return self._run(check_password, hashed_password, password)
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """Vrai si le hash a été calculé avec un autre coût que celui configuré"""
+        return password_cost(hashed_password) != self.rounds
+
+    def stats(self) -> dict:
+        """Statistiques de latence (ms) des opérations bcrypt"""
+        latencies = sorted(self._latencies)
+        count = len(latencies)
+
+        def percentile(p):
+            return round(latencies[min(count - 1, int(p * count))], 1) if count else None
+
+        return {
+            'rounds': self.rounds,
+            'workers': 0 if self.inline else self.workers,
+            'max_pending': self.max_pending,
+            'samples': count,
+            'p50_ms': percentile(0.50),
+            'p95_ms': percentile(0.95),
+            'max_ms': round(latencies[-1], 1) if count else None,
+            'rejected': self.rejected,
+            'rehashed': self.rehashed
+        }
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None and self._executor_pid == os.getpid():
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Instance globale
+password_hasher = PasswordHasher()
@@ -0,0 +1,282 @@
+"""
+Moteur d'optimisation des patrouilles.
+
+1. Regroupement des alertes par position, pondéré par le niveau de risque
+   (k-means vectorisé avec NumPy).
+2. Tournées multi-véhicules sur une matrice de distances haversine :
+   insertion gloutonne sous contrainte de temps (priorité au risque couvert
+   par minute ajoutée), puis amélioration 2-opt de chaque tournée.
+3. Cache des résultats tant que l'ensemble des alertes ne change pas.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+EARTH_RADIUS_M = 6371000.0
+
+# Commissariat de Massy (point de départ et de retour des patrouilles)
+DEFAULT_DEPOT = (48.7306, 2.2769)
+
+
+def haversine_matrix(lat_a: np.ndarray, lng_a: np.ndarray, lat_b: np.ndarray, lng_b: np.ndarray) -> np.ndarray:
+    """Matrice des distances (mètres) entre deux ensembles de points"""
+    phi_a = np.radians(lat_a)[:, None]
+    phi_b = np.radians(lat_b)[None, :]
+    d_phi = phi_b - phi_a
+    d_lambda = np.radians(lng_b)[None, :] - np.radians(lng_a)[:, None]
+    a = np.sin(d_phi / 2) ** 2 + np.cos(phi_a) * np.cos(phi_b) * np.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def cluster_alerts(lat: np.ndarray, lng: np.ndarray, risk: np.ndarray,
+                   n_clusters: int, iterations: int = 15, seed: int = 0) -> np.ndarray:
+    """
+    Regroupe les alertes (k-means pondéré par le risque, initialisation k-means++).
+
+    Les calculs se font dans une projection locale en mètres.
+
+    Returns:
+        Tableau des indices de cluster pour chaque alerte.
+    """
+    n = len(lat)
+    n_clusters = max(1, min(n_clusters, n))
+    ref = np.radians(lat.mean())
+    points = np.column_stack((
+        np.radians(lng) * EARTH_RADIUS_M * np.cos(ref),
+        np.radians(lat) * EARTH_RADIUS_M
+    ))
+    weights = risk.astype(float)
+
+    # Initialisation k-means++ : probabilité proportionnelle à risque × distance²
+    rng = np.random.default_rng(seed)
+    centers = np.empty((n_clusters, 2))
+    centers[0] = points[np.argmax(weights)]
+    closest = ((points - centers[0]) ** 2).sum(axis=1)
+    for i in range(1, n_clusters):
+        probabilities = closest * weights
+        total = probabilities.sum()
+        if total <= 0:
+            centers = centers[:i]
+            break
+        centers[i] = points[rng.choice(n, p=probabilities / total)]
+        closest = np.minimum(closest, ((points - centers[i]) ** 2).sum(axis=1))
+
+    labels = np.zeros(n, dtype=int)
+    point_norms = (points ** 2).sum(axis=1)[:, None]
+    for _ in range(iterations):
+        # ||p - c||² = ||p||² - 2 p·c + ||c||² : évite un tableau n × k × 2
+        distances = point_norms - 2 * points @ centers.T + (centers ** 2).sum(axis=1)[None, :]
+        new_labels = distances.argmin(axis=1)
+        weight_sums = np.bincount(new_labels, weights=weights, minlength=len(centers))
+        non_empty = weight_sums > 0
+        for axis in (0, 1):
+            sums = np.bincount(new_labels, weights=weights * points[:, axis], minlength=len(centers))
+            centers[non_empty, axis] = sums[non_empty] / weight_sums[non_empty]
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+
+    # Renumérotation compacte (clusters vides supprimés)
+    _, labels = np.unique(labels, return_inverse=True)
+    return labels
+
+
+def _route_time(route: Sequence[int], travel: np.ndarray, service: np.ndarray) -> float:
+    stops = [0] + list(route) + [0]
+    return float(sum(travel[a, b] for a, b in zip(stops, stops[1:])) + service[list(route)].sum())
+
+
+def _two_opt(route: List[int], travel: np.ndarray) -> List[int]:
+    """Amélioration 2-opt d'une tournée (le dépôt reste aux extrémités)"""
+    best = [0] + route + [0]
+    improved = True
+    while improved:
+        improved = False
+        for i in range(1, len(best) - 2):
+            for j in range(i + 1, len(best) - 1):
+                delta = (travel[best[i - 1], best[j]] + travel[best[i], best[j + 1]]
+                         - travel[best[i - 1], best[i]] - travel[best[j], best[j + 1]])
+                if delta < -1e-9:
+                    best[i:j + 1] = best[i:j + 1][::-1]
+                    improved = True
+    return best[1:-1]
+
+
+def plan_routes(travel: np.ndarray, service: np.ndarray, score: np.ndarray,
+                vehicles: int, budget: float) -> List[List[int]]:
+    """
+    Construit des tournées multi-véhicules sous contrainte de durée.
+
+    Args:
+        travel: Matrice des temps de trajet (minutes), le nœud 0 est le dépôt.
+        service: Temps passé sur place pour chaque nœud (minutes).
+        score: Priorité de chaque nœud (0 pour le dépôt).
+        vehicles: Nombre de patrouilles disponibles.
+        budget: Durée maximale d'une tournée (minutes).
+
+    Returns:
+        Liste de tournées (indices de nœuds, sans le dépôt).
+    """
+    n_nodes = len(score)
+    routes: List[List[int]] = [[] for _ in range(vehicles)]
+    times = np.zeros(vehicles)
+    remaining = np.ones(n_nodes, dtype=bool)
+    remaining[0] = False
+
+    while remaining.any():
+        best = None
+        candidates = np.flatnonzero(remaining)
+        for v in range(vehicles):
+            stops = [0] + routes[v] + [0]
+            for position in range(len(stops) - 1):
+                a, b = stops[position], stops[position + 1]
+                added = travel[a, candidates] + travel[candidates, b] - travel[a, b] + service[candidates]
+                feasible = times[v] + added <= budget
+                if not feasible.any():
+                    continue
+                ratio = np.where(feasible, score[candidates] / (added + 1e-6), -1.0)
+                k = int(ratio.argmax())
+                if best is None or ratio[k] > best[0]:
+                    best = (ratio[k], v, position, int(candidates[k]))
+        if best is None:
+            break
+        _, v, position, node = best
+        routes[v].insert(position, node)
+        remaining[node] = False
+        routes[v] = _two_opt(routes[v], travel)
+        times[v] = _route_time(routes[v], travel, service)
+
+    return routes
+
+
+class PatrolOptimizer:
+    """Optimise les tournées de patrouille et met en cache les résultats"""
+
+    def __init__(self, depot=DEFAULT_DEPOT, speed_kmh: float = 25.0, max_clusters: int = 60,
+                 service_minutes: float = 5.0, cache_size: int = 32):
+        self.depot = depot
+        self.speed_kmh = speed_kmh
+        self.max_clusters = max_clusters
+        self.service_minutes = service_minutes
+        self.cache_size = cache_size
+        self._cache: Dict[tuple, dict] = {}
+        self._lock = threading.Lock()
+
+    def get_cached(self, key: tuple) -> Optional[dict]:
+        with self._lock:
+            return self._cache.get(key)
+
+    def store(self, key: tuple, result: dict):
+        with self._lock:
+            if len(self._cache) >= self.cache_size:
+                self._cache.pop(next(iter(self._cache)))
+            self._cache[key] = result
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def optimize(self, alert_ids: Sequence[str], lat: np.ndarray, lng: np.ndarray, risk: np.ndarray,
+                 alert_types: Sequence[str], vehicles: int = 3, budget_minutes: float = 60.0) -> dict:
+        """
+        Calcule les tournées optimisées.
+
+        Returns:
+            Dict contenant les tournées et les statistiques de calcul.
+        """
+        started = time.perf_counter()
+        lat = np.asarray(lat, dtype=float)
+        lng = np.asarray(lng, dtype=float)
+        risk = np.clip(np.asarray(risk, dtype=float), 1, 10)
+
+        labels = cluster_alerts(lat, lng, risk, self.max_clusters)
+        n_clusters = int(labels.max()) + 1
+        risk_weight = risk ** 2 / 10  # Les alertes critiques pèsent plus lourd
+        weight_sums = np.bincount(labels, weights=risk, minlength=n_clusters)
+        centroid_lat = np.bincount(labels, weights=risk * lat, minlength=n_clusters) / weight_sums
+        centroid_lng = np.bincount(labels, weights=risk * lng, minlength=n_clusters) / weight_sums
+        counts = np.bincount(labels, minlength=n_clusters)
+        max_risk = np.zeros(n_clusters)
+        np.maximum.at(max_risk, labels, risk)
+
+        node_lat = np.concatenate(([self.depot[0]], centroid_lat))
+        node_lng = np.concatenate(([self.depot[1]], centroid_lng))
+        meters_per_minute = self.speed_kmh * 1000 / 60
+        travel = haversine_matrix(node_lat, node_lng, node_lat, node_lng) / meters_per_minute
+        service = np.concatenate(([0.0], self.service_minutes + np.minimum(counts, 10)))
+        score = np.concatenate(([0.0], np.bincount(labels, weights=risk_weight, minlength=n_clusters)))
+
+        routes = plan_routes(travel, service, score, max(1, vehicles), budget_minutes)
+
+        # Alertes de chaque cluster, les plus risquées en premier
+        order = np.lexsort((-risk, labels))
+        boundaries = np.searchsorted(labels[order], np.arange(n_clusters + 1))
+
+        result_routes = []
+        covered = 0
+        for vehicle, route in enumerate(routes):
+            if not route:
+                continue
+            stops = []
+            route_alert_ids = []
+            route_types = []
+            for node in route:
+                c = node - 1
+                members = order[boundaries[c]:boundaries[c + 1]]
+                member_ids = [alert_ids[i] for i in members]
+                route_alert_ids.extend(member_ids)
+                for i in members[:5]:
+                    if alert_types[i] not in route_types:
+                        route_types.append(alert_types[i])
+                stops.append({
+                    'lat': float(centroid_lat[c]),
+                    'lng': float(centroid_lng[c]),
+                    'alert_count': int(counts[c]),
+                    'max_risk': int(max_risk[c]),
+                    'alert_ids': member_ids[:10]
+                })
+            covered += sum(stop['alert_count'] for stop in stops)
+            depot = {'lat': self.depot[0], 'lng': self.depot[1]}
+            path = [depot] + [{'lat': s['lat'], 'lng': s['lng']} for s in stops] + [depot]
+            nodes = [0] + route + [0]
+            distance_m = sum(travel[a, b] for a, b in zip(nodes, nodes[1:])) * meters_per_minute
+            route_max_risk = max(stop['max_risk'] for stop in stops)
+            result_routes.append({
+                'id': str(uuid.uuid4()),
+                'vehicle': vehicle + 1,
+                'alert_id': route_alert_ids[0] if route_alert_ids else None,
+                'alert_ids': route_alert_ids,
+                'alert_type': route_types[0] if route_types else None,
+                'alert_types': route_types,
+                'stops': stops,
+                'path': path,
+                'duration': round(_route_time(route, travel, service)),
+                'distance_km': round(distance_m / 1000, 2),
+                'priority': 'high' if route_max_risk > 7 else 'medium',
+                'recommended_actions': [
+                    'Surveillance renforcée',
+                    'Contact avec les témoins',
+                    'Vérification des caméras à proximité'
+                ]
+            })
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        logger.info(f"Optimisation patrouilles: {len(lat)} alertes, {n_clusters} clusters, {elapsed_ms:.1f} ms")
+        return {
+            'routes': result_routes,
+            'alerts_total': int(len(lat)),
+            'alerts_covered': int(covered),
+            'clusters': n_clusters,
+            'computation_ms': round(elapsed_ms, 1)
+        }
+
+
+# Instance globale (cache partagé par les requêtes du worker)
+patrol_optimizer = PatrolOptimizer()
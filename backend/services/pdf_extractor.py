@@ -0,0 +1,228 @@
+"""
+Extraction du texte des PDF.
+
+- Pages lues en flux et assemblées par `"\\n".join` (plus de concaténation quadratique).
+- Au-delà de `parallel_min_pages`, les pages sont réparties par plages dans un
+  pool de processus : l'extraction n'occupe plus le worker de requête et profite
+  de plusieurs cœurs.
+- Moteur le plus rapide disponible : pypdfium2, puis pdfminer.six, puis PyPDF2.
+- Limites de taille et de nombre de pages vérifiées avant extraction.
+"""
+
+import importlib.util
+import io
+import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Union
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ('pypdfium2', 'pdfminer', 'pypdf2')
+_MODULES = {'pypdfium2': 'pypdfium2', 'pdfminer': 'pdfminer', 'pypdf2': 'PyPDF2'}
+
+Source = Union[str, bytes]
+
+
+class PdfLimitError(ValueError):
+    """PDF trop volumineux ou comportant trop de pages"""
+
+
+def available_backends() -> List[str]:
+    return [name for name in BACKENDS if importlib.util.find_spec(_MODULES[name]) is not None]
+
+
+def _open(source: Source):
+    return open(source, 'rb') if isinstance(source, str) else io.BytesIO(source)
+
+
+def page_count(backend: str, source: Source) -> int:
+    if backend == 'pypdfium2':
+        import pypdfium2 as pdfium
+        document = pdfium.PdfDocument(source)
+        try:
+            return len(document)
+        finally:
+            document.close()
+    if backend == 'pdfminer':
+        from pdfminer.pdfpage import PDFPage
+        with _open(source) as stream:
+            return sum(1 for _ in PDFPage.get_pages(stream))
+    import PyPDF2
+    with _open(source) as stream:
+        return len(PyPDF2.PdfReader(stream).pages)
+
+
+def _check_pages(count: int, max_pages: int = None):
+    if max_pages is not None and count > max_pages:
+        raise PdfLimitError(f"PDF trop long ({count} pages, maximum {max_pages})")
+
+
+def iter_page_texts(backend: str, source: Source, start: int = 0, stop: int = None,
+                    max_pages: int = None) -> Iterator[str]:
+    """
+    Texte des pages [start, stop[, page par page.
+    Le document n'est ouvert qu'une fois ; `max_pages` est vérifié avant toute extraction.
+    """
+    if backend == 'pypdfium2':
+        import pypdfium2 as pdfium
+        document = pdfium.PdfDocument(source)
+        try:
+            _check_pages(len(document), max_pages)
+            for index in range(start, len(document) if stop is None else stop):
+                page = document[index]
+                textpage = page.get_textpage()
+                try:
+                    yield textpage.get_text_range()
+                finally:
+                    textpage.close()
+                    page.close()
+        finally:
+            document.close()
+    elif backend == 'pdfminer':
+        from pdfminer.high_level import extract_pages
+        from pdfminer.layout import LTTextContainer
+        if max_pages is not None:
+            _check_pages(page_count(backend, source), max_pages)
+        with _open(source) as stream:
+            page_numbers = None if stop is None else range(start, stop)
+            for layout in extract_pages(stream, page_numbers=page_numbers):
+                yield "".join(element.get_text() for element in layout if isinstance(element, LTTextContainer))
+    else:
+        import PyPDF2
+        with _open(source) as stream:
+            pages = PyPDF2.PdfReader(stream).pages
+            _check_pages(len(pages), max_pages)
+            for index in range(start, len(pages) if stop is None else stop):
+                yield pages[index].extract_text() or ""
+
+
+def _extract_range(backend: str, source: Source, start: int, stop: int) -> str:
+    """Tâche du pool de processus : une plage de pages"""
+    return "\n".join(iter_page_texts(backend, source, start, stop))
+
+
+class PdfExtractor:
+    """Extraction de texte PDF avec limites et parallélisme par plages de pages"""
+
+    def __init__(self, backend: str = 'auto', max_pages: int = 500, max_bytes: int = 50 * 1024 * 1024,
+                 parallel_min_pages: int = 32, workers: int = None, pages_per_task: int = 16):
+        self.backend = backend
+        self.max_pages = max_pages
+        self.max_bytes = max_bytes
+        self.parallel_min_pages = parallel_min_pages
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self.pages_per_task = pages_per_task
+        self._executor = None
+        self._executor_pid = None
+        self._lock = threading.Lock()
+
+    def configure(self, config):
+        """Applique la configuration Flask (appelé par create_app)"""
+        self.backend = config.get('PDF_BACKEND', self.backend)
+        self.max_pages = config.get('PDF_MAX_PAGES', self.max_pages)
+        self.max_bytes = config.get('PDF_MAX_BYTES', self.max_bytes)
+        self.parallel_min_pages = config.get('PDF_PARALLEL_MIN_PAGES', self.parallel_min_pages)
+        self.workers = config.get('PDF_EXTRACT_WORKERS') or self.workers
+
+    def resolve_backend(self) -> str:
+        installed = available_backends()
+        if self.backend != 'auto':
+            if self.backend not in installed:
+                raise ValueError(f"Moteur PDF indisponible: {self.backend}")
+            return self.backend
+        if not installed:
+            raise ValueError("Aucun moteur d'extraction PDF installé")
+        return installed[0]
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        # Un pool par processus : après un fork (gunicorn), le pool du parent est inutilisable
+        with self._lock:
+            if self._executor is None or self._executor_pid != os.getpid():
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                self._executor_pid = os.getpid()
+            return self._executor
+
+    def _source(self, file) -> Source:
+        """Chemin ou contenu du PDF, après contrôle de la taille"""
+        if isinstance(file, str):
+            size = os.path.getsize(file)
+            source = file
+        elif isinstance(file, (bytes, bytearray)):
+            size = len(file)
+            source = bytes(file)
+        else:
+            source = self.read_bounded(file)
+            size = len(source)
+        if size > self.max_bytes:
+            raise PdfLimitError(f"PDF trop volumineux (maximum {self.max_bytes // (1024 * 1024)} Mo)")
+        return source
+
+    def read_bounded(self, file) -> bytes:
+        """Lit un FileStorage ou un flux sans dépasser `max_bytes` (PdfLimitError au-delà)"""
+        stream = getattr(file, 'stream', file)
+        data = stream.read(self.max_bytes + 1)
+        if len(data) > self.max_bytes:
+            raise PdfLimitError(f"PDF trop volumineux (maximum {self.max_bytes // (1024 * 1024)} Mo)")
+        return data
+
+    def extract(self, file, parallel: bool = None) -> str:
+        """
+        Extrait le texte d'un PDF.
+
+        Args:
+            file: Chemin, octets, ou objet fichier (FileStorage Flask).
+            parallel: Force (ou interdit) le pool de processus ; par défaut selon le nombre de pages.
+
+        Returns:
+            Texte des pages, séparées par un saut de ligne.
+
+        Raises:
+            PdfLimitError: si la taille ou le nombre de pages dépasse les limites.
+            ValueError: si le PDF est illisible.
+        """
+        source = self._source(file)
+        backend = self.resolve_backend()
+        automatic = parallel is None
+        if automatic:
+            parallel = self.workers > 1
+        try:
+            if parallel:
+                pages = page_count(backend, source)
+                _check_pages(pages, self.max_pages)
+                if automatic:
+                    parallel = pages >= self.parallel_min_pages
+            if not parallel:
+                # Une seule ouverture du document, pages lues en flux
+                return "\n".join(iter_page_texts(backend, source, max_pages=self.max_pages)).strip()
+
+            ranges = [(start, min(start + self.pages_per_task, pages))
+                      for start in range(0, pages, self.pages_per_task)]
+            if isinstance(source, str):
+                return self._extract_parallel(backend, source, ranges)
+            # Les processus relisent le fichier depuis le disque plutôt que de recevoir une copie par tâche
+            with tempfile.NamedTemporaryFile(suffix='.pdf') as spooled:
+                spooled.write(source)
+                spooled.flush()
+                return self._extract_parallel(backend, spooled.name, ranges)
+        except PdfLimitError:
+            raise
+        except Exception as e:
+            raise ValueError(f"Erreur lors de l'extraction du texte du PDF: {e}")
+
+    def _extract_parallel(self, backend: str, path: str, ranges) -> str:
+        parts = self._get_executor().map(_extract_range, [backend] * len(ranges), [path] * len(ranges),
+                                         [r[0] for r in ranges], [r[1] for r in ranges])
+        return "\n".join(parts).strip()
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None and self._executor_pid == os.getpid():
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Instance globale
+pdf_extractor = PdfExtractor()
@@ -0,0 +1,157 @@
+"""
+Construction des prompts du chatbot à partir de l'historique de la conversation.
+
+- Fenêtre des derniers messages lue en base (pagination par clé de Message.window).
+- Les tours plus anciens sont résumés de manière incrémentale ; le résumé est
+  stocké sur la conversation et n'est recalculé que lorsque suffisamment de
+  nouveaux messages sortent de la fenêtre.
+- Le prompt final respecte un budget de tokens : contexte documentaire tronqué,
+  puis historique ajouté du plus récent au plus ancien tant qu'il reste de la place.
+"""
+
+import logging
+from typing import Callable, List, Optional
+
+from sqlalchemy import and_, or_
+
+from backend.models.conversation import Conversation, Message
+from backend.utils.tokens import count_tokens, count_message_tokens, truncate_to_tokens
+
+logger = logging.getLogger(__name__)
+
+ROLE_BY_SENDER = {'user': 'user', 'bot': 'assistant', 'assistant': 'assistant'}
+
+
+class PromptBuilder:
+    """Assemble système + résumé + historique récent + question dans un budget de tokens"""
+
+    def __init__(self, max_prompt_tokens: int = 3000, history_window: int = 12,
+                 summary_trigger: int = 8, summary_max_tokens: int = 400, context_max_tokens: int = 800):
+        self.max_prompt_tokens = max_prompt_tokens
+        self.history_window = history_window
+        self.summary_trigger = summary_trigger
+        self.summary_max_tokens = summary_max_tokens
+        self.context_max_tokens = context_max_tokens
+
+    def configure(self, config):
+        """Applique la configuration Flask (appelé par create_app)"""
+        self.max_prompt_tokens = config.get('LLM_MAX_PROMPT_TOKENS', self.max_prompt_tokens)
+        self.history_window = config.get('CHAT_HISTORY_WINDOW', self.history_window)
+        self.summary_trigger = config.get('CHAT_SUMMARY_TRIGGER', self.summary_trigger)
+        self.context_max_tokens = config.get('LLM_CONTEXT_MAX_TOKENS', self.context_max_tokens)
+
+    # -------------------------------
+    # Résumé incrémental
+    # -------------------------------
+    def refresh_summary(self, conversation: Conversation, oldest_in_window: Optional[Message],
+                        summarize: Callable[[Optional[str], List[dict]], Optional[str]]) -> Optional[str]:
+        """
+        Intègre au résumé les messages sortis de la fenêtre récente.
+
+        Le résumé n'est recalculé qu'à partir de `summary_trigger` nouveaux messages,
+        ce qui amortit le coût de l'appel LLM. La conversation est modifiée en session,
+        l'appelant se charge du commit.
+        """
+        if oldest_in_window is None:
+            return conversation.summary
+
+        # Bornes par clé (created_at, id), comme Message.window : des messages de même date
+        # (écriture par lots) de part et d'autre d'une borne ne sont ni perdus ni résumés deux fois
+        query = Message.query.filter(
+            Message.conversation_id == conversation.id,
+            or_(Message.created_at < oldest_in_window.created_at,
+                and_(Message.created_at == oldest_in_window.created_at, Message.id < oldest_in_window.id))
+        )
+        if conversation.summary_until:
+            after = Message.created_at > conversation.summary_until
+            if conversation.summary_until_id:
+                after = or_(after, and_(Message.created_at == conversation.summary_until,
+                                        Message.id > conversation.summary_until_id))
+            query = query.filter(after)
+
+        pending = query.order_by(Message.created_at.asc(), Message.id.asc()).limit(self.summary_trigger * 4).all()
+        if len(pending) < self.summary_trigger:
+            return conversation.summary
+
+        turns = [{'role': ROLE_BY_SENDER.get(m.sender, 'user'), 'content': m.content} for m in pending]
+        summary = summarize(conversation.summary, turns)
+        if summary:
+            conversation.summary = truncate_to_tokens(summary, self.summary_max_tokens)
+            conversation.summary_until = pending[-1].created_at
+            conversation.summary_until_id = pending[-1].id
+        return conversation.summary
+
+    # -------------------------------
+    # Assemblage
+    # -------------------------------
+    def build(self, system_message: str, user_query: str, context: Optional[str] = None,
+              conversation: Optional[Conversation] = None,
+              summarize: Optional[Callable[[Optional[str], List[dict]], Optional[str]]] = None,
+              pending_messages: Optional[List[dict]] = None) -> List[dict]:
+        """
+        Construit la liste de messages à envoyer au LLM.
+
+        Args:
+            system_message: Consigne système.
+            user_query: Question de l'utilisateur.
+            context: Contexte documentaire (RAG), tronqué au budget dédié.
+            conversation: Conversation en cours (None pour une nouvelle conversation).
+            summarize: Fonction de résumé (résumé précédent, tours) -> nouveau résumé.
+            pending_messages: Messages pas encore persistés ({'sender', 'content'}).
+
+        Returns:
+            Messages au format chat, dans le budget de tokens.
+        """
+        history: List[dict] = []
+        window: List[Message] = []
+        summary = None
+        if conversation is not None and conversation.id:
+            window, _ = Message.window(conversation.id, self.history_window)
+            history = [{'role': ROLE_BY_SENDER.get(m.sender, 'user'), 'content': m.content} for m in window]
+            if summarize is not None:
+                try:
+                    summary = self.refresh_summary(conversation, window[0] if window else None, summarize)
+                except Exception as e:
+                    logger.warning(f"Résumé de conversation impossible: {e}")
+                    summary = conversation.summary
+            else:
+                summary = conversation.summary
+        # Le tampon a pu être écrit entre sa lecture et celle de la fenêtre : pas de tour en double
+        in_window = {m.id for m in window}
+        for message in pending_messages or []:
+            if message.get('id') in in_window:
+                continue
+            history.append({'role': ROLE_BY_SENDER.get(message['sender'], 'user'), 'content': message['content']})
+
+        system = system_message
+        if context:
+            system += f"\nContexte: {truncate_to_tokens(context, self.context_max_tokens)}"
+        if summary:
+            system += f"\nRésumé des échanges précédents: {summary}"
+
+        question = {'role': 'user', 'content': user_query}
+        budget = self.max_prompt_tokens - count_message_tokens([{'content': system}, question])
+
+        kept: List[dict] = []
+        for message in reversed(history):
+            cost = count_message_tokens([message])
+            if cost > budget:
+                break
+            kept.append(message)
+            budget -= cost
+        kept.reverse()
+
+        # L'historique doit commencer par un message utilisateur
+        while kept and kept[0]['role'] != 'user':
+            kept.pop(0)
+
+        return [{'role': 'system', 'content': system}] + kept + [question]
+
+    def token_count(self, messages: List[dict]) -> int:
+        return count_message_tokens(messages)
+
+
+# Instance globale
+prompt_builder = PromptBuilder()
+
+__all__ = ['PromptBuilder', 'prompt_builder', 'count_tokens']
@@ -0,0 +1,141 @@
+"""
+Cache des utilisateurs authentifiés.
+
+- Cache processus avec TTL : le chargement de l'utilisateur par Flask-JWT-Extended
+  (`user_lookup_loader`) ne touche la base qu'en cas d'absence ou d'expiration.
+- Mémo par requête : Flask-JWT-Extended conserve l'utilisateur chargé dans `g`,
+  `current_user_snapshot()` le réutilise au lieu de refaire `User.query.get()`.
+- Vérification des rôles depuis les claims du JWT (ajoutés par register/login).
+
+Les entrées sont invalidées dès qu'un utilisateur est modifié ou supprimé.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from flask_jwt_extended import get_jwt, get_current_user
+from sqlalchemy import event
+
+from backend.extensions import db
+from backend.models.user import User, UserRole
+
+
+class CachedUser:
+    """Copie en lecture seule d'un utilisateur, détachée de la session SQLAlchemy"""
+
+    __slots__ = ('_data', '_public', 'id', 'email', 'username', 'first_name', 'last_name',
+                 'role', 'is_active', 'is_verified', 'profile_picture')
+
+    def __init__(self, user: User):
+        self._data = user.to_dict()
+        self._public = user.to_public_dict()
+        self.id = user.id
+        self.email = user.email
+        self.username = user.username
+        self.first_name = user.first_name
+        self.last_name = user.last_name
+        self.role = user.role
+        self.is_active = user.is_active
+        self.is_verified = user.is_verified
+        self.profile_picture = user.profile_picture
+
+    def has_role(self, *roles) -> bool:
+        """Vérifie si l'utilisateur a l'un des rôles spécifiés"""
+        role_values = [r.value if isinstance(r, UserRole) else r for r in roles]
+        return self.role.value in role_values
+
+    def to_dict(self) -> dict:
+        return dict(self._data)
+
+    def to_public_dict(self) -> dict:
+        return dict(self._public)
+
+    def __repr__(self):
+        return f"<CachedUser {self.username} ({self.role.value})>"
+
+
+class UserCache:
+    """Cache LRU à durée de vie limitée des utilisateurs, partagé par les threads du worker"""
+
+    def __init__(self, ttl: float = 60.0, max_size: int = 10000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def configure(self, config):
+        self.ttl = config.get('USER_CACHE_TTL', self.ttl)
+        self.max_size = config.get('USER_CACHE_MAX_SIZE', self.max_size)
+
+    def get(self, user_id) -> Optional[CachedUser]:
+        """Retourne l'utilisateur depuis le cache, ou le charge depuis la base"""
+        if user_id is None:
+            return None
+        user_id = str(user_id)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[1]
+        self.misses += 1
+
+        user = db.session.get(User, user_id)
+        if user is None:
+            return None
+        snapshot = CachedUser(user)
+        if self.ttl > 0:
+            with self._lock:
+                self._entries[user_id] = (now + self.ttl, snapshot)
+                self._entries.move_to_end(user_id)
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+        return snapshot
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(str(user_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Instance globale
+user_cache = UserCache()
+
+
+@event.listens_for(User, 'after_update')
+@event.listens_for(User, 'after_delete')
+def _invalidate_user(mapper, connection, target):
+    """Toute modification du profil ou du rôle invalide l'entrée en cache"""
+    user_cache.invalidate(target.id)
+
+
+def current_user_snapshot() -> Optional[CachedUser]:
+    """
+    Utilisateur de la requête courante (déjà chargé par le user_lookup_loader).
+    À appeler après `@jwt_required()`.
+    """
+    try:
+        return get_current_user()
+    except RuntimeError:
+        return None
+
+
+def jwt_has_role(*roles) -> bool:
+    """
+    Vérifie le rôle depuis les claims du JWT, sans requête.
+    Repli sur l'utilisateur en cache pour les anciens tokens sans claim 'role'.
+    """
+    role_values = [r.value if isinstance(r, UserRole) else r for r in roles]
+    role = get_jwt().get('role')
+    if role is not None:
+        return role in role_values
+    user = current_user_snapshot()
+    return bool(user and user.has_role(*roles))
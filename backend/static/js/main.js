@@ -94,10 +94,26 @@ async function analyzeMarket(){
   try{
     const res=await fetch("/api/market/analyze",{method:"POST", headers:{ "Authorization":"Bearer "+TOKEN }, body:formData});
     const data=await res.json();
-    document.getElementById("market-result").textContent=JSON.stringify(data.data,null,2);
+    if(res.status!==202){ document.getElementById("market-result").textContent=JSON.stringify(data.data||data.message,null,2); return; }
+    const job=await pollJob(data.data.job.id, j=>{
+      document.getElementById("market-result").textContent=`Analyse en cours... ${Math.round(j.progress*100)}%`;
+    });
+    document.getElementById("market-result").textContent=job.status==="succeeded"
+      ? JSON.stringify(job.result,null,2) : (job.error||"Erreur lors de l'analyse");
   }catch(err){document.getElementById("market-result").textContent="Erreur serveur";}
 }
 
+// Suivi d'une tâche d'analyse en arrière-plan jusqu'à sa fin
+async function pollJob(jobId, onProgress){
+  while(true){
+    const res=await fetch(`/api/jobs/${jobId}`,{headers:{ "Authorization":"Bearer "+TOKEN }});
+    const job=(await res.json()).data.job;
+    if(["succeeded","failed","cancelled"].includes(job.status)) return job;
+    onProgress(job);
+    await new Promise(r=>setTimeout(r,1500));
+  }
+}
+
 // Profil
 async function getProfile(){
   if(!TOKEN){ document.getElementById("profile-result").textContent="Veuillez vous connecter"; return; }
@@ -9,7 +9,7 @@ async function analyzeMarket() {
     if(!text) return;
     marketResult.textContent = "Analyse en cours...";
     try {
-        const res = await fetch('/api/market/analyze', {
+        const res = await fetch('/api/market/analyze?sync=1', {
             method:'POST',
             headers:{'Content-Type':'application/json'},
             body: JSON.stringify({text})
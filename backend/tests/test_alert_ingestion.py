@@ -0,0 +1,134 @@
+"""
+Tests de l'ingestion en masse des alertes.
+"""
+
+import unittest
+import json
+from sqlalchemy import event
+from backend.app import create_app
+from backend.config import config
+from backend.extensions import db
+from backend.models import SuspectAlert, AlertHeatmapCell
+from backend.services.alert_ingestion import AlertIngestionPipeline
+
+
+class AlertIngestionTestCase(unittest.TestCase):
+    """Tests de l'endpoint /api/police/alerts/bulk"""
+
+    def setUp(self):
+        self.app = create_app(config['testing'])
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.client = self.app.test_client()
+
+        response = self.client.post(
+            '/api/auth/register',
+            data=json.dumps({
+                'email': 'agent@massy.fr',
+                'username': 'agent',
+                'password': 'SecurePassword123!',
+                'first_name': 'Agent',
+                'last_name': 'Massy',
+                'role': 'police'
+            }),
+            content_type='application/json'
+        )
+        self.headers = {'Authorization': f"Bearer {response.get_json()['data']['access_token']}"}
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def post_ndjson(self, records):
+        body = '\n'.join(record if isinstance(record, str) else json.dumps(record) for record in records)
+        return self.client.post('/api/police/alerts/bulk?source=camera-12', data=body,
+                                content_type='application/x-ndjson', headers=self.headers)
+
+    def test_ndjson_batch_with_invalid_lines(self):
+        """Les lignes valides sont insérées, les autres signalées par numéro de ligne"""
+        response = self.post_ndjson([
+            {'type': 'Intrusion', 'latitude': 48.735, 'longitude': 2.29, 'risk_level': 7,
+             'reported_at': '2025-01-01T10:00:00Z'},
+            {'type': 'Intrusion', 'latitude': 120, 'longitude': 2.29, 'risk_level': 7},
+            '{pas du json',
+            {'type': 'Incendie', 'latitude': 48.73, 'longitude': 2.28, 'risk_level': 9},
+        ])
+        data = response.get_json()['data']
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(data['accepted'], 2)
+        self.assertEqual(data['rejected'], 2)
+        self.assertEqual(sorted(error['line'] for error in data['errors']), [2, 3])
+        self.assertEqual(SuspectAlert.query.count(), 2)
+
+        alert = SuspectAlert.query.filter_by(alert_type='Intrusion').one()
+        self.assertIsNotNone(alert.geohash)
+        self.assertEqual(alert.additional_data['source'], 'camera-12')
+        total = sum(cell.alert_count for cell in AlertHeatmapCell.query.filter_by(resolution=500))
+        self.assertEqual(total, 2)
+
+    def test_deduplication(self):
+        """Une même détection (type, cellule, fenêtre) n'est insérée qu'une fois"""
+        record = {'type': 'Véhicule suspect', 'latitude': 48.735, 'longitude': 2.29, 'risk_level': 6,
+                  'reported_at': '2025-01-01T10:01:00'}
+        near = dict(record, latitude=48.7351, reported_at='2025-01-01T10:02:00')
+        response = self.client.post('/api/police/alerts/bulk', json={'alerts': [record, near]},
+                                    headers=self.headers)
+        self.assertEqual(response.get_json()['data']['duplicates'], 1)
+
+        response = self.post_ndjson([record])
+        self.assertEqual(response.get_json()['data']['accepted'], 0)
+        self.assertEqual(SuspectAlert.query.count(), 1)
+
+    def test_dedup_lookup_uses_geohash_index(self):
+        """La recherche des doublons existants parcourt l'index (geohash, reported_at), sans balayage"""
+        record = {'type': 'Intrusion', 'latitude': 48.735, 'longitude': 2.29, 'risk_level': 6,
+                  'reported_at': '2025-01-01T10:01:00'}
+        self.post_ndjson([record, dict(record, latitude=48.76)])
+
+        statements = []
+        listener = lambda conn, cursor, statement, parameters, *args: statements.append((statement, parameters))
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        pipeline = AlertIngestionPipeline()
+        alert = SuspectAlert.query.filter_by(latitude=48.735).one()
+        cell = alert.geohash[:pipeline.dedup_precision]
+        try:
+            keys = pipeline._existing_keys({cell, 'u09tvw0'}, 1735725600, 1735725700)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+        self.assertEqual(keys, {pipeline._key('Intrusion', alert.geohash, 1735725660)})
+
+        statement, parameters = statements[-1]
+        with db.engine.connect() as connection:
+            plan = [row[-1] for row in connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters)]
+        self.assertTrue([step for step in plan if 'ix_suspect_alerts_geohash_reported' in step], plan)
+        self.assertFalse([step for step in plan if step.startswith('SCAN suspect_alerts')], plan)
+
+    def test_malformed_fields_rejected_per_line(self):
+        """Date en millisecondes, additional_data non objet ou statut inconnu : rejet de la ligne, pas du lot"""
+        record = {'type': 'Intrusion', 'latitude': 48.735, 'longitude': 2.29, 'risk_level': 7}
+        response = self.post_ndjson([
+            dict(record, reported_at=1729350000000),
+            dict(record, latitude=48.74, additional_data=['camera']),
+            dict(record, latitude=48.75, status='archived'),
+            dict(record, latitude=48.76, reported_at=1729350000),
+        ])
+        self.assertEqual(response.status_code, 201)
+        data = response.get_json()['data']
+        self.assertEqual(data['accepted'], 1)
+        self.assertEqual([error['line'] for error in data['errors']], [1, 2, 3])
+        self.assertIn('reported_at invalide', data['errors'][0]['error'])
+        self.assertIn('additional_data', data['errors'][1]['error'])
+        self.assertIn('statut invalide', data['errors'][2]['error'])
+
+    def test_batch_too_large(self):
+        """Un lot dépassant la taille maximale est refusé"""
+        self.app.config['ALERT_INGEST_MAX_BATCH'] = 2
+        record = {'type': 'Test', 'latitude': 48.7, 'longitude': 2.3, 'risk_level': 5}
+        response = self.post_ndjson([record] * 3)
+        self.assertEqual(response.status_code, 413)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+"""
+Tests du cache adressé par contenu des analyses de documents.
+"""
+
+import io
+import json
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from backend.app import create_app
+from backend.config import config
+from backend.extensions import db
+from backend.models import UrbanismProject
+from backend.models.analysis_cache import AnalysisCacheEntry
+from backend.scripts.bench_pdf import build_sample_pdf
+from backend.services.ai_service import ai_service
+from backend.services.analysis_cache import analysis_cache
+
+
+class AnalysisCacheTestCase(unittest.TestCase):
+    """Tests du cache via /api/market/analyze"""
+
+    def setUp(self):
+        self.app = create_app(config['testing'])
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.client = self.app.test_client()
+        self.pdf = build_sample_pdf(3, lines_per_page=4)
+        self.llm_calls = 0
+
+        n8n = patch('backend.services.document_jobs.n8n_service')
+        n8n.start()
+        self.addCleanup(n8n.stop)
+        router = patch.object(ai_service.router, '_call', side_effect=self.fake_call)
+        router.start()
+        self.addCleanup(router.stop)
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def fake_call(self, target, messages, temperature, timeout):
+        self.llm_calls += 1
+        return "Offre conforme", {'prompt_tokens': 100, 'completion_tokens': 10}
+
+    def register(self, role):
+        response = self.client.post('/api/auth/register', data=json.dumps({
+            'email': f'{role}@massy.fr',
+            'username': f'{role}user',
+            'password': 'SecurePassword123!',
+            'first_name': 'Test',
+            'last_name': 'User',
+            'role': role
+        }), content_type='application/json')
+        return {'Authorization': f"Bearer {response.get_json()['data']['access_token']}"}
+
+    def upload(self, headers):
+        return self.client.post('/api/market/analyze', headers=headers, content_type='multipart/form-data',
+                                data={'file': (io.BytesIO(self.pdf), 'dce.pdf')})
+
+    def test_duplicate_upload_served_from_cache(self):
+        """Un second téléversement du même fichier ne relance ni l'extraction ni le LLM"""
+        headers = self.register('citizen')
+        first = self.upload(headers).get_json()['data']
+        second = self.upload(headers).get_json()['data']
+
+        self.assertFalse(first['extraction_cached'])
+        self.assertTrue(second['extraction_cached'])
+        self.assertEqual(first['document_hash'], second['document_hash'])
+        self.assertEqual(second['analysis'], "Offre conforme")
+        self.assertEqual(self.llm_calls, 1)
+        entry = db.session.get(AnalysisCacheEntry, ('extraction', first['document_hash']))
+        self.assertEqual(entry.hits, 1)
+
+    def test_expired_entries_are_recomputed(self):
+        """Une entrée expirée n'est plus servie"""
+        headers = self.register('citizen')
+        self.upload(headers)
+        AnalysisCacheEntry.query.update({'expires_at': datetime.utcnow() - timedelta(seconds=1)})
+        db.session.commit()
+
+        self.assertFalse(self.upload(headers).get_json()['data']['extraction_cached'])
+        self.assertEqual(self.llm_calls, 2)
+
+    def test_manual_invalidation(self):
+        """L'invalidation d'un fichier supprime aussi ses analyses"""
+        digest = self.upload(self.register('citizen')).get_json()['data']['document_hash']
+        police = self.register('police')
+
+        response = self.client.delete(f'/api/massy/analysis-cache?digest={digest}', headers=police)
+        self.assertEqual(response.get_json()['data']['deleted'], 2)
+        self.assertEqual(AnalysisCacheEntry.query.count(), 0)
+
+    def test_cache_leaves_caller_session_alone(self):
+        """Lecture et écriture du cache ne valident pas les changements en cours de l'appelant"""
+        project = UrbanismProject(title='En cours', description='-')
+        db.session.add(project)
+        analysis_cache.put('market', 'a' * 64, "Analyse")
+        self.assertEqual(analysis_cache.get('market', 'a' * 64), "Analyse")
+        self.assertIn(project, db.session.new)
+
+        db.session.rollback()
+        self.assertEqual(UrbanismProject.query.count(), 0)
+        self.assertEqual(db.session.get(AnalysisCacheEntry, ('market', 'a' * 64)).hits, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
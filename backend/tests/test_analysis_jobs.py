@@ -0,0 +1,149 @@
+"""
+Tests de la file des tâches d'analyse (/api/market/analyze, /api/jobs).
+"""
+
+import io
+import json
+import os
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from backend.app import create_app
+from backend.config import config
+from backend.extensions import db
+from backend.models import AnalysisJob
+from backend.scripts.bench_pdf import build_sample_pdf
+from backend.services.ai_service import ai_service
+from backend.services.job_queue import job_queue
+
+
+class AnalysisJobsTestCase(unittest.TestCase):
+    """Tests de la mise en file, du traitement et du suivi des tâches"""
+
+    def setUp(self):
+        self.app = create_app(config['testing'])
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.client = self.app.test_client()
+        # Aucun worker : les tâches restent en file jusqu'à work_once()
+        job_queue.mode = 'external'
+
+        n8n = patch('backend.services.document_jobs.n8n_service')
+        n8n.start()
+        self.addCleanup(n8n.stop)
+        router = patch.object(ai_service.router, '_call',
+                              return_value=("Offre conforme", {'prompt_tokens': 100, 'completion_tokens': 10}))
+        router.start()
+        self.addCleanup(router.stop)
+        response = self.client.post('/api/auth/register', data=json.dumps({
+            'email': 'agent@massy.fr',
+            'username': 'agentuser',
+            'password': 'SecurePassword123!',
+            'first_name': 'Test',
+            'last_name': 'User',
+            'role': 'citizen'
+        }), content_type='application/json')
+        self.headers = {'Authorization': f"Bearer {response.get_json()['data']['access_token']}"}
+
+    def tearDown(self):
+        job_queue.mode = self.app.config['JOB_QUEUE_MODE']
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def submit(self, text='Offre de services', priority=5):
+        return self.client.post(f'/api/market/analyze?priority={priority}', headers=self.headers,
+                                data=json.dumps({'text': text}), content_type='application/json')
+
+    def test_upload_returns_job_then_worker_delivers_result(self):
+        """Le téléversement répond 202 immédiatement ; le résultat est disponible après traitement"""
+        response = self.client.post('/api/market/analyze', headers=self.headers, content_type='multipart/form-data',
+                                    data={'file': (io.BytesIO(build_sample_pdf(2, lines_per_page=3)), 'dce.pdf')})
+        self.assertEqual(response.status_code, 202)
+        job_id = response.get_json()['data']['job']['id']
+        spooled = db.session.get(AnalysisJob, job_id).input_path
+        self.assertTrue(os.path.exists(spooled))
+
+        self.assertEqual(self.client.get(f'/api/jobs/{job_id}', headers=self.headers)
+                         .get_json()['data']['job']['status'], 'queued')
+        self.assertTrue(job_queue.work_once('test-worker'))
+
+        job = self.client.get(f'/api/jobs/{job_id}', headers=self.headers).get_json()['data']['job']
+        self.assertEqual(job['status'], 'succeeded')
+        self.assertEqual(job['progress'], 1.0)
+        self.assertEqual(job['result']['analysis'], "Offre conforme")
+        self.assertFalse(os.path.exists(spooled))
+
+        events = self.client.get(f'/api/jobs/{job_id}/events', headers=self.headers).get_data(as_text=True)
+        self.assertIn('event: done', events)
+
+    def test_priority_order_and_pending_limit(self):
+        """Les tâches prioritaires sont traitées d'abord ; au-delà de la limite, 429"""
+        low = self.submit('Offre A', priority=1).get_json()['data']['job']['id']
+        high = self.submit('Offre B', priority=9).get_json()['data']['job']['id']
+        self.assertEqual(job_queue.claim('test-worker'), high)
+
+        job_queue.max_pending_per_user = 2
+        self.assertEqual(self.submit('Offre C').status_code, 429)
+        job_queue.max_pending_per_user = self.app.config['JOB_MAX_PENDING_PER_USER']
+        self.assertEqual(db.session.get(AnalysisJob, low).status, 'queued')
+
+    def test_cancel_and_stale_requeue(self):
+        """Annulation d'une tâche en file ; une tâche abandonnée par son worker est remise en file"""
+        cancelled = self.submit().get_json()['data']['job']['id']
+        response = self.client.delete(f'/api/jobs/{cancelled}', headers=self.headers)
+        self.assertEqual(response.get_json()['data']['job']['status'], 'cancelled')
+        self.assertEqual(self.client.delete(f'/api/jobs/{cancelled}', headers=self.headers).status_code, 409)
+
+        stale = self.submit().get_json()['data']['job']['id']
+        job_queue.claim('lost-worker')
+        AnalysisJob.query.filter_by(id=stale).update(
+            {'heartbeat_at': datetime.utcnow() - timedelta(seconds=job_queue.stale_after + 1)})
+        db.session.commit()
+        self.assertEqual(job_queue.requeue_stale(), 1)
+        self.assertEqual(db.session.get(AnalysisJob, stale).status, 'queued')
+
+    def test_sync_mode_returns_result_inline(self):
+        """`?sync=1` conserve le comportement synchrone historique"""
+        response = self.client.post('/api/market/analyze?sync=1', headers=self.headers,
+                                    data=json.dumps({'text': 'Offre de services'}), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['data']['analysis'], "Offre conforme")
+
+    def test_inline_job_is_not_claimed_by_pool(self):
+        """Une tâche exécutée en ligne est créée réclamée : un worker du pool ne peut ni la prendre ni la rejouer"""
+        claims, handler = [], job_queue.handlers['market']
+
+        def concurrent_claim(job, report):
+            claims.append(job_queue.claim('pool-worker'))
+            return handler(job, report)
+
+        with patch.dict(job_queue.handlers, {'market': concurrent_claim}):
+            response = self.client.post('/api/market/analyze?sync=1', headers=self.headers,
+                                        data=json.dumps({'text': 'Offre de services'}),
+                                        content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(claims, [None])
+        job = AnalysisJob.query.one()
+        self.assertEqual((job.status, job.worker_id, job.attempts), ('succeeded', 'inline', 1))
+
+        with patch.dict(job_queue.handlers, {'market': concurrent_claim}):
+            job_queue.run(job.id, 'pool-worker')
+        self.assertEqual(len(claims), 1)
+
+    def test_threads_mode_starts_workers_with_app(self):
+        """Mode 'threads' : les workers démarrent avec l'application, sauf si JOB_QUEUE_AUTOSTART est désactivé"""
+        class ThreadsConfig(config['testing']):
+            JOB_QUEUE_MODE = 'threads'
+
+        with patch.object(job_queue, 'start') as start:
+            create_app(ThreadsConfig)
+            start.assert_called_once()
+            ThreadsConfig.JOB_QUEUE_AUTOSTART = False
+            create_app(ThreadsConfig)
+            start.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
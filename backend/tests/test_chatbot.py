@@ -85,7 +85,8 @@ class ChatbotTestCase(unittest.TestCase):
         self.assertEqual(data['data']['response'], "Réponse générée par l'IA")
 
         mock_context.assert_called_once_with(chat_data['message'])
-        mock_ai_response.assert_called_once_with(chat_data['message'], "Contexte pertinent sur les élections")
+        mock_ai_response.assert_called_once_with(chat_data['message'], "Contexte pertinent sur les élections",
+                                                 conversation=None, pending_messages=[])
         mock_n8n.assert_called_once()
 
     def test_chat_endpoint_without_message(self):
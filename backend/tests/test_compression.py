@@ -0,0 +1,86 @@
+"""
+Tests de la compression des réponses (gzip/brotli, seuil, flux).
+"""
+
+import gzip
+import json
+import unittest
+from backend.app import create_app
+from backend.config import config
+from backend.extensions import db
+from backend.models import SuspectAlert
+from backend.utils.compression import compressor, parse_accept_encoding, brotli
+
+
+class CompressionTestCase(unittest.TestCase):
+    """Tests via /api/transport/stations et /api/police/alerts"""
+
+    def setUp(self):
+        self.app = create_app(config['testing'])
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        compressor.min_size = self.app.config['COMPRESS_MIN_SIZE']
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_gzip_above_threshold_only(self):
+        """gzip au-delà du seuil ; ETag affaibli ; rien sans Accept-Encoding ni sous le seuil"""
+        plain = self.client.get('/api/transport/stations')
+        self.assertNotIn('Content-Encoding', plain.headers)
+
+        compressor.min_size = 100
+        compressed = self.client.get('/api/transport/stations', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(compressed.headers['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', compressed.headers['Vary'])
+        self.assertEqual(gzip.decompress(compressed.get_data()), plain.get_data())
+        self.assertEqual(compressed.headers['ETag'], f"W/{plain.headers['ETag']}")
+        revalidated = self.client.get('/api/transport/stations', headers={
+            'Accept-Encoding': 'gzip', 'If-None-Match': compressed.headers['ETag']})
+        self.assertEqual(revalidated.status_code, 304)
+
+        compressor.min_size = 1024 * 1024
+        small = self.client.get('/api/transport/stations', headers={'Accept-Encoding': 'gzip'})
+        self.assertNotIn('Content-Encoding', small.headers)
+
+    def test_streamed_response_compressed_incrementally(self):
+        """Une liste diffusée en flux est compressée morceau par morceau"""
+        response = self.client.post('/api/auth/register', data=json.dumps({
+            'email': 'agent@massy.fr',
+            'username': 'agent',
+            'password': 'SecurePassword123!',
+            'first_name': 'Agent',
+            'last_name': 'Massy',
+            'role': 'police'
+        }), content_type='application/json')
+        data = response.get_json()['data']
+        db.session.add_all([
+            SuspectAlert(alert_type='Test', description=f'Alerte {i}', latitude=48.73, longitude=2.29,
+                         risk_level=5, user_id=data['user']['id'])
+            for i in range(800)
+        ])
+        db.session.commit()
+
+        response = self.client.get('/api/police/alerts?status=all', headers={
+            'Authorization': f"Bearer {data['access_token']}", 'Accept-Encoding': 'gzip'})
+        self.assertTrue(response.is_streamed)
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        raw = response.get_data()
+        body = json.loads(gzip.decompress(raw))
+        self.assertEqual(len(body['data']['alerts']), 800)
+        self.assertLess(len(raw) * 5, len(gzip.decompress(raw)))
+
+    def test_encoding_negotiation(self):
+        """Choix du codage selon les préférences q du client"""
+        self.assertEqual(parse_accept_encoding('gzip;q=0.5, br'), {'gzip': 0.5, 'br': 1.0})
+        self.assertEqual(compressor.choose_encoding('identity'), None)
+        self.assertEqual(compressor.choose_encoding('gzip, br;q=0'), 'gzip')
+        self.assertEqual(compressor.choose_encoding('*'), 'br' if brotli else 'gzip')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+"""
+Tests de la pagination des conversations et des messages du chatbot.
+"""
+
+import unittest
+import json
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from backend.app import create_app
+from backend.config import config
+from backend.extensions import db
+from backend.models.conversation import Conversation, Message
+
+
+class ConversationPaginationTestCase(unittest.TestCase):
+    """Tests des listes de conversations et fenêtres de messages"""
+
+    def setUp(self):
+        self.app = create_app(config['testing'])
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.client = self.app.test_client()
+
+        response = self.client.post(
+            '/api/auth/register',
+            data=json.dumps({
+                'email': 'test@massy.fr',
+                'username': 'testuser',
+                'password': 'SecurePassword123!',
+                'first_name': 'Test',
+                'last_name': 'User',
+                'role': 'citizen'
+            }),
+            content_type='application/json'
+        )
+        data = response.get_json()['data']
+        self.headers = {'Authorization': f"Bearer {data['access_token']}"}
+        self.user_id = data['user']['id']
+
+        start = datetime(2025, 1, 1)
+        for i in range(3):
+            conversation = Conversation(user_id=self.user_id, title=f"Conversation {i}",
+                                        created_at=start, updated_at=start + timedelta(hours=i))
+            db.session.add(conversation)
+            db.session.flush()
+            for j in range(5 * (i + 1)):
+                db.session.add(Message(conversation_id=conversation.id, sender='user' if j % 2 == 0 else 'bot',
+                                       content=f"Message {i}-{j}", created_at=start + timedelta(minutes=j)))
+        db.session.commit()
+        self.conversation = Conversation.query.filter_by(title='Conversation 2').one()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_summaries_in_one_query(self):
+        """La liste renvoie des résumés calculés en une seule requête"""
+        self.client.get('/api/auth/me', headers=self.headers)  # Charge l'utilisateur en cache
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            response = self.client.get('/api/chatbot/conversations?limit=2', headers=self.headers)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+
+        data = response.get_json()['data']
+        self.assertEqual(len(statements), 1)
+        self.assertEqual([c['title'] for c in data['conversations']], ['Conversation 2', 'Conversation 1'])
+        self.assertEqual(data['conversations'][0]['message_count'], 15)
+        self.assertEqual(data['conversations'][0]['last_message']['content'], 'Message 2-14')
+        self.assertNotIn('messages', data['conversations'][0])
+
+        response = self.client.get(f"/api/chatbot/conversations?limit=2&cursor={data['next_cursor']}",
+                                   headers=self.headers)
+        data = response.get_json()['data']
+        self.assertEqual([c['title'] for c in data['conversations']], ['Conversation 0'])
+        self.assertIsNone(data['next_cursor'])
+
+    def test_summaries_read_only_the_page(self):
+        """Compte et dernier message calculés pour la seule page, par l'index des messages"""
+        statements = []
+        listener = lambda conn, cursor, statement, parameters, *args: statements.append((statement, parameters))
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            summaries, _ = Conversation.summaries_for_user(self.user_id, limit=1)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+        self.assertEqual([(s['title'], s['message_count']) for s in summaries], [('Conversation 2', 15)])
+
+        statement, parameters = statements[-1]
+        self.assertNotIn('row_number', statement.lower())
+        with db.engine.connect() as connection:
+            plan = [row[-1] for row in connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {statement}', parameters)]
+        self.assertFalse([step for step in plan if step.startswith('SCAN messages')], plan)
+        self.assertTrue([step for step in plan if 'ix_messages_conversation_created' in step], plan)
+
+    def test_message_keyset_pagination(self):
+        """Les pages de messages s'enchaînent sans doublon ni trou"""
+        url = f'/api/chatbot/conversations/{self.conversation.id}/messages'
+        page = self.client.get(f'{url}?limit=6', headers=self.headers).get_json()['data']
+        contents = [m['content'] for m in page['messages']]
+        self.assertEqual(contents[-1], 'Message 2-14')
+        while page['has_more']:
+            page = self.client.get(f"{url}?limit=6&before={page['before_cursor']}",
+                                   headers=self.headers).get_json()['data']
+            contents = [m['content'] for m in page['messages']] + contents
+        self.assertEqual(contents, [f"Message 2-{j}" for j in range(15)])
+
+        newer = self.client.get(f"{url}?limit=3&after={page['after_cursor']}",
+                                headers=self.headers).get_json()['data']
+        self.assertEqual(newer['messages'][0]['content'], contents[len(page['messages'])])
+
+    def test_invalid_cursor(self):
+        """Un curseur invalide est refusé"""
+        response = self.client.get(f'/api/chatbot/conversations/{self.conversation.id}/messages?before=xyz',
+                                   headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+"""
+Tests des profils de moteur SQLAlchemy (pool PostgreSQL, pragmas SQLite).
+"""
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from backend.app import create_app
+from backend.config import config
+from backend.extensions import db
+from backend.models import SuspectAlert, User
+from backend.utils.database import engine_options
+
+
+class DatabaseTuningTestCase(unittest.TestCase):
+    """Tests sur base SQLite fichier temporaire"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+        class FileConfig(config['testing']):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(self.directory, 'app.db')}"
+
+        self.app = create_app(FileConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        db.engine.dispose()
+        self.app_context.pop()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def pragma(self, name):
+        with db.engine.connect() as connection:
+            return connection.exec_driver_sql(f'PRAGMA {name}').scalar()
+
+    def test_sqlite_pragmas_applied_on_connect(self):
+        """WAL, synchronous=NORMAL, busy_timeout et mmap sur chaque connexion"""
+        self.assertEqual(self.pragma('journal_mode'), 'wal')
+        self.assertEqual(self.pragma('synchronous'), 1)
+        self.assertEqual(self.pragma('busy_timeout'), 5000)
+        self.assertEqual(self.pragma('mmap_size'), 256 * 1024 * 1024)
+
+    def test_concurrent_writes_do_not_lock(self):
+        """Écritures concurrentes depuis plusieurs threads sans « database is locked »"""
+        user = User(email='agent@massy.fr', username='agent', first_name='Agent', last_name='Massy',
+                    password_hash='x')
+        db.session.add(user)
+        db.session.commit()
+        user_id, errors = user.id, []
+
+        def write(index):
+            with self.app.app_context():
+                try:
+                    for i in range(25):
+                        db.session.add(SuspectAlert(alert_type='Test', description=f'{index}-{i}', latitude=48.73,
+                                                    longitude=2.29, risk_level=5, user_id=user_id))
+                        db.session.commit()
+                except Exception as e:
+                    errors.append(e)
+                finally:
+                    db.session.remove()
+
+        threads = [threading.Thread(target=write, args=(i,)) for i in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(SuspectAlert.query.count(), 150)
+
+    def test_engine_options_per_backend(self):
+        """Pool dimensionné pour PostgreSQL ; surcharge possible par SQLALCHEMY_ENGINE_OPTIONS"""
+        options = engine_options('postgresql://massy@db/massy', {'DB_POOL_SIZE': 4})
+        self.assertEqual(options['pool_size'], 4)
+        self.assertTrue(options['pool_pre_ping'])
+        self.assertEqual(engine_options('sqlite:///:memory:', {}), {})
+
+        class OverrideConfig(config['testing']):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(self.directory, 'other.db')}"
+            SQLALCHEMY_ENGINE_OPTIONS = {'echo_pool': True}
+
+        app = create_app(OverrideConfig)
+        self.assertEqual(app.config['SQLALCHEMY_ENGINE_OPTIONS'], {'echo_pool': True})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+"""
+Tests de l'analyse map-reduce des documents volumineux.
+"""
+
+import threading
+import time
+import unittest
+from backend.services.document_analyzer import DocumentAnalyzer, ChunkCache, split_sections
+from backend.utils.tokens import count_tokens
+
+
+def build_document(articles=40):
+    return "\n".join(
+        f"ARTICLE {i}\nLe titulaire du lot {i} s'engage à livrer les prestations dans un délai de {i} jours. "
+        + "Les pénalités de retard sont fixées par jour calendaire. " * 30
+        for i in range(1, articles + 1)
+    )
+
+
+class DocumentAnalyzerTestCase(unittest.TestCase):
+    """Tests du DocumentAnalyzer"""
+
+    def setUp(self):
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+        self.map_calls = 0
+
+    def analyze_chunk(self, chunk, index, total):
+        with self.lock:
+            self.active += 1
+            self.map_calls += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.01)
+        with self.lock:
+            self.active -= 1
+        return f"Partie {index}: {chunk.split(chr(10))[0]}"
+
+    @staticmethod
+    def reduce(partials, final):
+        return ("RAPPORT " if final else "") + " | ".join(p.splitlines()[-1] for p in partials)
+
+    def test_split_respects_budget_and_sections(self):
+        """Chaque morceau tient dans le budget et commence sur un article"""
+        chunks = split_sections(build_document(), max_tokens=600)
+        self.assertGreater(len(chunks), 5)
+        for chunk in chunks:
+            self.assertLessEqual(count_tokens(chunk), 600)
+            self.assertTrue(chunk.startswith("ARTICLE"))
+
+    def test_map_reduce_with_bounded_concurrency_and_cache(self):
+        """Les morceaux sont analysés en parallèle (borné) puis servis par le cache"""
+        analyzer = DocumentAnalyzer(chunk_tokens=600, reduce_tokens=10000, max_workers=3, cache=ChunkCache())
+        progress = []
+        result = analyzer.analyze(build_document(), 'market:v1', self.analyze_chunk, self.reduce,
+                                  progress=lambda done, total, stage: progress.append((done, total, stage)))
+
+        self.assertTrue(result['report'].startswith("RAPPORT"))
+        self.assertEqual(result['failed_chunks'], [])
+        self.assertEqual(self.map_calls, result['chunks'])
+        self.assertLessEqual(self.max_active, 3)
+        self.assertGreater(self.max_active, 1)
+        self.assertIn((result['chunks'], result['chunks'], 'map'), progress)
+        self.assertEqual(progress[-1], (1, 1, 'reduce'))
+
+        hits = []
+        analyzer.analyze(build_document(), 'market:v1', self.analyze_chunk, self.reduce,
+                         on_cache_hit=lambda: hits.append(1))
+        self.assertEqual(self.map_calls, result['chunks'])
+        self.assertEqual(len(hits), result['chunks'])
+
+    def test_hierarchical_reduce_and_failures(self):
+        """Les synthèses trop volumineuses passent par des paliers ; les échecs sont signalés"""
+        analyzer = DocumentAnalyzer(chunk_tokens=600, reduce_tokens=60, max_workers=2, cache=ChunkCache())
+        reduces = []
+
+        def analyze_chunk(chunk, index, total):
+            return None if index == 2 else self.analyze_chunk(chunk, index, total)
+
+        def reduce(partials, final):
+            reduces.append(final)
+            return self.reduce(partials, final)
+
+        result = analyzer.analyze(build_document(), 'urbanism:v1', analyze_chunk, reduce)
+        self.assertEqual(result['failed_chunks'], [2])
+        self.assertIn("Parties non analysées : 2", result['report'])
+        self.assertIn(False, reduces)
+        self.assertEqual(reduces[-1], True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+"""
+Tests du cache HTTP des endpoints de lecture (ETag, 304, Cache-Control, cache serveur).
+"""
+
+import json
+import unittest
+from unittest.mock import patch
+from backend.app import create_app
+from backend.config import config
+from backend.extensions import db
+from backend.utils.http_cache import response_cache
+
+
+class HttpCacheTestCase(unittest.TestCase):
+    """Tests via /api/transport/stations, /api/massy/metrics et /api/market/templates"""
+
+    def setUp(self):
+        self.app = create_app(config['testing'])
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_etag_and_conditional_get(self):
+        """ETag fort, Cache-Control public, puis 304 sans corps sur If-None-Match"""
+        first = self.client.get('/api/transport/stations')
+        etag = first.headers['ETag']
+        self.assertEqual(first.headers['X-Cache'], 'MISS')
+        self.assertIn('public', first.headers['Cache-Control'])
+        self.assertIn('max-age=3600', first.headers['Cache-Control'])
+
+        second = self.client.get('/api/transport/stations')
+        self.assertEqual(second.headers['X-Cache'], 'HIT')
+        self.assertEqual(second.headers['ETag'], etag)
+        self.assertEqual(second.get_data(), first.get_data())
+
+        for tag in (etag, f'W/{etag}', f'"autre", {etag}'):
+            revalidated = self.client.get('/api/transport/stations', headers={'If-None-Match': tag})
+            self.assertEqual(revalidated.status_code, 304)
+            self.assertEqual(revalidated.get_data(), b'')
+        changed = self.client.get('/api/transport/stations', headers={'If-None-Match': '"autre"'})
+        self.assertEqual(changed.status_code, 200)
+
+    def test_server_cache_skips_view_until_invalidated(self):
+        """La vue n'est plus exécutée tant que l'entrée est valide ; les erreurs ne sont pas mises en cache"""
+        with patch('backend.routes.dashboard.UrbanismProject') as projects:
+            projects.query.filter_by.side_effect = RuntimeError("base indisponible")
+            projects.query.count.side_effect = RuntimeError("base indisponible")
+            self.assertEqual(self.client.get('/api/massy/metrics').status_code, 500)
+
+        first = self.client.get('/api/massy/metrics')
+        self.assertTrue(first.headers['ETag'].startswith('W/'))
+        with patch('backend.routes.dashboard.SuspectAlert') as alerts:
+            second = self.client.get('/api/massy/metrics')
+            alerts.query.filter.assert_not_called()
+        self.assertEqual(second.headers['X-Cache'], 'HIT')
+
+        response_cache.invalidate('dashboard.metrics')
+        self.assertEqual(self.client.get('/api/massy/metrics').headers['X-Cache'], 'MISS')
+
+    def test_authenticated_templates_are_private(self):
+        """Les endpoints authentifiés restent privés et l'authentification est toujours vérifiée"""
+        self.assertEqual(self.client.get('/api/market/templates').status_code, 401)
+        response = self.client.post('/api/auth/register', data=json.dumps({
+            'email': 'agent@massy.fr',
+            'username': 'agentuser',
+            'password': 'SecurePassword123!',
+            'first_name': 'Test',
+            'last_name': 'User',
+            'role': 'citizen'
+        }), content_type='application/json')
+        headers = {'Authorization': f"Bearer {response.get_json()['data']['access_token']}"}
+        templates = self.client.get('/api/market/templates', headers=headers)
+        self.assertIn('private', templates.headers['Cache-Control'])
+        self.client.get('/api/market/templates', headers=headers)
+        self.assertEqual(self.client.get('/api/market/templates').status_code, 401)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+"""
+Tests du fournisseur JSON des réponses de l'API.
+"""
+
+import json
+import unittest
+import uuid
+from datetime import datetime
+from decimal import Decimal
+from backend.app import create_app
+from backend.config import config
+from backend.utils.helpers import create_response
+from backend.utils.json_provider import OrJSONProvider, StdlibJSONProvider, orjson
+
+
+class JSONProviderTestCase(unittest.TestCase):
+    """Tests de sérialisation via create_response()"""
+
+    def setUp(self):
+        self.app = create_app(config['testing'])
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+    def tearDown(self):
+        self.app_context.pop()
+
+    def body(self, data):
+        response, status = create_response(data)
+        return json.loads(response.get_data())
+
+    @unittest.skipIf(orjson is None, "orjson non installé")
+    def test_orjson_selected_and_native_types(self):
+        """orjson est utilisé s'il est installé ; dates et UUID en ISO 8601 / texte"""
+        self.assertIsInstance(self.app.json, OrJSONProvider)
+        identifier = uuid.uuid4()
+        data = self.body({'at': datetime(2025, 3, 1, 8, 30, 15), 'id': identifier,
+                          'price': Decimal('12.50'), 'tags': {'rer'}, 'by_zone': {3: 'nord'}})
+        self.assertEqual(data['data'], {'at': '2025-03-01T08:30:15', 'id': str(identifier),
+                                        'price': '12.50', 'tags': ['rer'], 'by_zone': {'3': 'nord'}})
+
+    def test_same_output_as_stdlib_and_fallback(self):
+        """Le module standard produit le même document ; les grands entiers restent sérialisables"""
+        payload = {'alerts': [{'id': str(i), 'risk': i, 'at': datetime(2025, 1, 1, 0, i)} for i in range(50)],
+                   'huge': 2 ** 70, 'texte': 'Sécurité à Massy'}
+        fast = self.body(payload)
+        self.app.json = StdlibJSONProvider(self.app)
+        self.assertEqual(self.body(payload), fast)
+        self.assertEqual(fast['data']['huge'], 2 ** 70)
+
+
+if __name__ == '__main__':
+    unittest.main()
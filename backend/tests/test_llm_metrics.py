@@ -0,0 +1,82 @@
+"""
+Tests de la comptabilité des appels LLM.
+"""
+
+import json
+import unittest
+from unittest.mock import patch
+from backend.app import create_app
+from backend.config import config
+from backend.extensions import db
+from backend.services.ai_service import ai_service
+from backend.services.llm_metrics import llm_metrics
+
+
+def fake_call(target, messages, temperature, timeout):
+    return "Analyse terminée", {'prompt_tokens': 120, 'completion_tokens': 30}
+
+
+class LLMMetricsTestCase(unittest.TestCase):
+    """Tests des agrégats et de l'endpoint /api/massy/llm-metrics"""
+
+    def setUp(self):
+        self.app = create_app(config['testing'])
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.client = self.app.test_client()
+        llm_metrics.reset()
+
+    def tearDown(self):
+        llm_metrics.reset()
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def register(self, role):
+        response = self.client.post('/api/auth/register', data=json.dumps({
+            'email': f'{role}@massy.fr',
+            'username': f'{role}user',
+            'password': 'SecurePassword123!',
+            'first_name': 'Test',
+            'last_name': 'User',
+            'role': role
+        }), content_type='application/json')
+        return {'Authorization': f"Bearer {response.get_json()['data']['access_token']}"}
+
+    def test_calls_aggregated_per_feature(self):
+        """Tokens, latence et tentatives sont agrégés par fonctionnalité"""
+        with patch.object(ai_service.router, '_call', side_effect=fake_call):
+            ai_service.analyze_market_offer("Offre de voirie")
+            ai_service.analyze_market_offer("Offre d'éclairage")
+            ai_service.analyze_urbanism_document("PLU")
+
+        snapshot = llm_metrics.snapshot()
+        self.assertEqual(snapshot['total']['calls'], 3)
+        self.assertEqual(snapshot['total']['total_tokens'], 450)
+        feature = snapshot['by_feature']['analyze_market_offer']
+        self.assertEqual((feature['calls'], feature['prompt_tokens'], feature['retries']), (2, 240, 0))
+        self.assertIn('analyze_urbanism_document', snapshot['by_feature'])
+
+    def test_failures_are_recorded(self):
+        """Un appel en échec est compté avec une estimation locale des tokens"""
+        with patch.object(ai_service.router, '_call', side_effect=RuntimeError("503")):
+            ai_service.analyze_urbanism_document("PLU")
+        total = llm_metrics.snapshot()['total']
+        self.assertEqual(total['errors'], 1)
+        self.assertGreater(total['prompt_tokens'], 0)
+
+    def test_metrics_endpoint_restricted(self):
+        """L'endpoint est réservé aux forces de l'ordre"""
+        response = self.client.get('/api/massy/llm-metrics', headers=self.register('citizen'))
+        self.assertEqual(response.status_code, 403)
+
+        response = self.client.get('/api/massy/llm-metrics', headers=self.register('police'))
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()['data']
+        self.assertIn('by_endpoint', data['usage'])
+        self.assertIn('targets', data['providers'])
+
+
+if __name__ == '__main__':
+    unittest.main()
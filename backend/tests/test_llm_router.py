@@ -0,0 +1,78 @@
+"""
+Tests du routeur LLM (paliers de modèles, repli, couverture, disjoncteurs).
+"""
+
+import time
+import unittest
+from backend.services.llm_router import LLMRouter, LLMUnavailableError, ProviderTarget, SMALL, LARGE
+
+
+def targets():
+    return [
+        ProviderTarget('mistral', 'small', SMALL, 'http://mistral', 'key'),
+        ProviderTarget('mistral', 'large', LARGE, 'http://mistral', 'key'),
+        ProviderTarget('openai', 'small', SMALL, 'http://openai', 'key'),
+    ]
+
+
+class LLMRouterTestCase(unittest.TestCase):
+    """Tests du LLMRouter avec un faux client HTTP"""
+
+    def setUp(self):
+        self.calls = []
+        self.behaviour = {}
+
+    def fake_call(self, target, messages, temperature, timeout):
+        self.calls.append(target.name)
+        delay, error = self.behaviour.get(target.name, (0, None))
+        time.sleep(delay)
+        if error:
+            raise error
+        return f"réponse {target.name}", {'prompt_tokens': 10, 'completion_tokens': 5}
+
+    def test_short_prompts_use_small_models(self):
+        """Les prompts courts vont vers un petit modèle, les longs vers un grand"""
+        router = LLMRouter(targets(), call=self.fake_call, small_prompt_tokens=50)
+        short = router.complete([{'role': 'user', 'content': "Horaires de la mairie ?"}])
+        long = router.complete([{'role': 'user', 'content': "mot " * 500}])
+
+        self.assertEqual(short.model, 'small')
+        self.assertEqual(long.model, 'large')
+        self.assertEqual(long.usage['prompt_tokens'], 10)
+
+    def test_fallback_and_circuit_breaker(self):
+        """Un fournisseur en échec est contourné puis écarté par son disjoncteur"""
+        router = LLMRouter(targets(), call=self.fake_call, breaker_failures=2, breaker_cooldown=60)
+        self.behaviour['mistral:small'] = (0, RuntimeError("503"))
+        router.stats['openai:small'].record(50000, True)  # mistral:small reste préféré malgré ses erreurs
+
+        for _ in range(3):
+            result = router.complete([{'role': 'user', 'content': "Bonjour"}], tier=SMALL)
+            self.assertEqual(result.provider, 'openai')
+
+        self.assertEqual(self.calls.count('mistral:small'), 2)
+        self.assertEqual(router.breakers['mistral:small'].state, 'open')
+
+    def test_hedging_bounds_tail_latency(self):
+        """Un appel lent est doublé par un second fournisseur après le délai de couverture"""
+        router = LLMRouter(targets(), call=self.fake_call, hedge_after_ms=50, request_timeout=5)
+        router.stats['openai:small'].record(5000, True)
+        self.behaviour['mistral:small'] = (1.0, None)
+
+        started = time.perf_counter()
+        result = router.complete([{'role': 'user', 'content': "Bonjour"}], tier=SMALL)
+        self.assertLess(time.perf_counter() - started, 0.5)
+        self.assertEqual(result.provider, 'openai')
+        self.assertTrue(result.hedged)
+        self.assertEqual(result.attempts, 2)
+
+    def test_all_providers_down(self):
+        """Sans fournisseur disponible, l'erreur remonte sans attendre"""
+        router = LLMRouter(targets()[:1], call=self.fake_call)
+        self.behaviour['mistral:small'] = (0, RuntimeError("timeout"))
+        with self.assertRaises(LLMUnavailableError):
+            router.complete([{'role': 'user', 'content': "Bonjour"}])
+
+
+if __name__ == '__main__':
+    unittest.main()
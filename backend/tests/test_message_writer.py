@@ -0,0 +1,155 @@
+"""
+Tests de l'écriture différée des messages du chatbot.
+"""
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+from datetime import datetime, timedelta
+from sqlalchemy.exc import OperationalError
+from backend.app import create_app
+from backend.config import config
+from backend.extensions import db
+from backend.models.user import User, UserRole
+from backend.models.conversation import Conversation, Message
+from backend.services.message_writer import MessageWriter
+from backend.services.prompt_builder import PromptBuilder
+
+
+class MessageWriterTestCase(unittest.TestCase):
+    """Tests du MessageWriter"""
+
+    def setUp(self):
+        self.app = create_app(config['testing'])
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        user = User(email='test@massy.fr', username='testuser', first_name='Test',
+                    last_name='User', role=UserRole.CITIZEN)
+        user.set_password('SecurePassword123!')
+        db.session.add(user)
+        db.session.flush()
+        self.user_id = user.id
+        self.conversation = Conversation(user_id=user.id, title="Élections",
+                                         created_at=datetime(2025, 1, 1), updated_at=datetime(2025, 1, 1))
+        db.session.add(self.conversation)
+        db.session.commit()
+        self.conversation_id = self.conversation.id
+
+        self.spill_dir = tempfile.TemporaryDirectory()
+        self.writer = MessageWriter(enabled=True, flush_interval=3600,
+                                    spill_path=os.path.join(self.spill_dir.name, 'pending.jsonl'))
+        self.writer.app = self.app
+
+    def tearDown(self):
+        self.spill_dir.cleanup()
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def rows(self, count, start=datetime(2025, 2, 1)):
+        return [self.writer.message_row(self.conversation_id, 'user' if i % 2 == 0 else 'bot',
+                                        f"Message {i}", start + timedelta(seconds=i)) for i in range(count)]
+
+    def test_buffered_then_flushed_in_batch(self):
+        """Les messages restent en mémoire jusqu'au vidage, puis sont écrits en une transaction"""
+        self.writer.add(self.user_id, self.conversation_id, self.rows(4))
+
+        self.assertEqual(Message.query.count(), 0)
+        self.assertEqual([row['content'] for row in self.writer.pending_for(self.conversation_id)],
+                         ["Message 0", "Message 1", "Message 2", "Message 3"])
+        self.assertEqual(self.writer.latest_conversation_id(self.user_id), self.conversation_id)
+
+        self.assertEqual(self.writer.flush(), 4)
+        db.session.expire_all()
+        self.assertEqual(Message.query.filter_by(conversation_id=self.conversation_id).count(), 4)
+        self.assertEqual(db.session.get(Conversation, self.conversation_id).updated_at,
+                         datetime(2025, 2, 1, 0, 0, 3))
+        self.assertEqual(self.writer.pending_for(self.conversation_id), [])
+        self.assertIsNone(self.writer.latest_conversation_id(self.user_id))
+
+    def test_prompt_ignores_pending_rows_already_written(self):
+        """Lot déjà validé mais encore en cours de vidage : chaque tour n'apparaît qu'une fois dans le prompt"""
+        self.writer.add(self.user_id, self.conversation_id, self.rows(4))
+        rows, touched = self.writer._drain()
+        self.writer._write(rows, touched)  # Validé en base, encore dans _inflight
+        later = [self.writer.message_row(self.conversation_id, 'user', "Message 4", datetime(2025, 2, 2))]
+        self.writer.add(self.user_id, self.conversation_id, later)
+        pending = self.writer.pending_for(self.conversation_id)
+        self.assertEqual(len(pending), 5)
+
+        messages = PromptBuilder(history_window=10).build("Système", "Question", conversation=self.conversation,
+                                                          pending_messages=pending)
+        self.assertEqual([message['content'] for message in messages[1:-1]],
+                         ["Message 0", "Message 1", "Message 2", "Message 3", "Message 4"])
+
+    def test_synchronous_mode_and_backpressure(self):
+        """Sans écriture différée ou tampon plein, les messages rejoignent la session"""
+        self.writer.enabled = False
+        self.writer.add(self.user_id, self.conversation_id, self.rows(2))
+        db.session.commit()
+        self.assertEqual(Message.query.count(), 2)
+
+        self.writer.enabled = True
+        self.writer.max_pending = 1
+        self.writer.add(self.user_id, self.conversation_id, self.rows(2, datetime(2025, 3, 1)))
+        db.session.commit()
+        self.assertEqual(Message.query.count(), 4)
+        self.assertEqual(self.writer.stats()['sync_fallbacks'], 1)
+
+    def test_spill_and_replay(self):
+        """Un vidage final impossible sauvegarde les messages, rejoués au démarrage suivant"""
+        self.writer.add(self.user_id, self.conversation_id, self.rows(3))
+        app, self.writer.app = self.writer.app, None  # Base indisponible
+        self.writer.shutdown()
+        self.assertTrue(os.path.exists(self.writer.spill_path))
+
+        self.writer.app = app
+        self.assertEqual(self.writer.replay_spill(), 3)
+        self.assertFalse(os.path.exists(self.writer.spill_path))
+        self.writer.flush()
+        self.assertEqual(Message.query.count(), 3)
+
+    def test_poisoned_row_is_isolated_then_dead_lettered(self):
+        """Une ligne refusée ne bloque pas le lot ; après max_attempts rejets elle part en lettres mortes"""
+        self.writer.max_attempts = 2
+        self.writer.dead_letter_path = os.path.join(self.spill_dir.name, 'dead.jsonl')
+        existing = self.rows(1, datetime(2025, 1, 15))[0]
+        db.session.add(Message(**existing))
+        db.session.commit()
+
+        rows = self.rows(4)
+        rows[2]['id'] = existing['id']  # Clé primaire déjà prise : violation de contrainte
+        self.writer.add(self.user_id, self.conversation_id, rows)
+
+        self.assertEqual(self.writer.flush(), 3)
+        self.assertEqual(Message.query.count(), 4)
+        self.assertEqual(len(self.writer.pending_for(self.conversation_id)), 1)
+
+        self.writer.add(self.user_id, self.conversation_id, self.rows(2, datetime(2025, 3, 1)))
+        self.assertEqual(self.writer.flush(), 2)
+        self.assertEqual(Message.query.count(), 6)
+        self.assertEqual(self.writer.pending_for(self.conversation_id), [])
+        self.assertEqual(self.writer.stats()['dead_lettered'], 1)
+        with open(self.writer.dead_letter_path, encoding='utf-8') as dead:
+            self.assertIn(rows[2]['content'], dead.read())
+
+        db.session.expire_all()
+        self.assertEqual(db.session.get(Conversation, self.conversation_id).updated_at,
+                         datetime(2025, 3, 1, 0, 0, 1))
+
+    def test_transient_failure_keeps_batch(self):
+        """Base indisponible : le lot entier reste en attente, sans compter de rejet par ligne"""
+        self.writer.add(self.user_id, self.conversation_id, self.rows(3))
+        with patch.object(self.writer, '_write', side_effect=OperationalError('INSERT', {}, Exception('locked'))):
+            with self.assertRaises(OperationalError):
+                self.writer.flush()
+        self.assertEqual(len(self.writer.pending_for(self.conversation_id)), 3)
+        self.assertEqual(self.writer.flush(), 3)
+        self.assertEqual(self.writer.stats()['dead_lettered'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+"""
+Tests du hachage des mots de passe hors thread de requête et de la limitation des connexions.
+"""
+
+import unittest
+import json
+from backend.app import create_app
+from backend.config import TestingConfig
+from backend.extensions import db
+from backend.models import User
+from backend.services.password_hasher import PasswordHasher, HasherBusyError, password_hasher
+from backend.utils.security import password_cost
+
+
+class RateLimitedConfig(TestingConfig):
+    RATELIMIT_ENABLED = True
+    RATELIMIT_STORAGE_URI = 'memory://'
+    LOGIN_ACCOUNT_RATE_LIMIT = '2 per minute'
+
+
+class PasswordHasherTestCase(unittest.TestCase):
+    """Tests unitaires du pool de hachage"""
+
+    def test_process_pool_roundtrip(self):
+        """Le hash et la vérification fonctionnent dans le pool de processus"""
+        hasher = PasswordHasher(rounds=4, workers=1)
+        try:
+            hashed = hasher.hash('SecurePassword123!')
+            self.assertEqual(password_cost(hashed), 4)
+            self.assertTrue(hasher.verify(hashed, 'SecurePassword123!'))
+            self.assertFalse(hasher.verify(hashed, 'wrong'))
+            self.assertEqual(hasher.stats()['samples'], 3)
+        finally:
+            hasher.shutdown()
+
+    def test_pool_workers_not_forked(self):
+        """Les processus bcrypt démarrent d'un processus propre (forkserver ou spawn), jamais par fork"""
+        hasher = PasswordHasher(rounds=4, workers=1)
+        try:
+            method = hasher._get_executor()._mp_context.get_start_method()
+            self.assertIn(method, ('forkserver', 'spawn'))
+            self.assertTrue(hasher.verify(hasher.hash('SecurePassword123!'), 'SecurePassword123!'))
+        finally:
+            hasher.shutdown()
+
+    def test_bounded_queue_rejects(self):
+        """Une file pleine refuse immédiatement la demande"""
+        hasher = PasswordHasher(rounds=4, max_pending=1, inline=True)
+        hasher._slots.acquire()
+        with self.assertRaises(HasherBusyError):
+            hasher.hash('SecurePassword123!')
+        self.assertEqual(hasher.stats()['rejected'], 1)
+
+
+class LoginProtectionTestCase(unittest.TestCase):
+    """Tests du rehash transparent et des limites de connexion"""
+
+    def setUp(self):
+        self.app = create_app(RateLimitedConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.client = self.app.test_client()
+        self.user = {
+            'email': 'test@massy.fr',
+            'username': 'testuser',
+            'password': 'SecurePassword123!',
+            'first_name': 'Test',
+            'last_name': 'User',
+            'role': 'citizen'
+        }
+        self.client.post('/api/auth/register', data=json.dumps(self.user), content_type='application/json')
+
+    def tearDown(self):
+        password_hasher.rounds = TestingConfig.BCRYPT_ROUNDS
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def login(self, password='SecurePassword123!'):
+        return self.client.post('/api/auth/login', json={'email': self.user['email'], 'password': password})
+
+    def test_rehash_on_login(self):
+        """Un changement de coût bcrypt est appliqué à la connexion suivante"""
+        password_hasher.rounds = 5
+        self.assertEqual(self.login().status_code, 200)
+        user = User.query.filter_by(email=self.user['email']).one()
+        self.assertEqual(password_cost(user.password_hash), 5)
+
+    def test_account_rate_limit(self):
+        """Les tentatives répétées sur un même compte sont limitées"""
+        self.assertEqual(self.login('Wrong123!').status_code, 401)
+        self.assertEqual(self.login('Wrong123!').status_code, 401)
+        response = self.login()
+        self.assertEqual(response.status_code, 429)
+        self.assertFalse(response.get_json()['success'])
+
+
+if __name__ == '__main__':
+    unittest.main()
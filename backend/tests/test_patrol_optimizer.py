@@ -0,0 +1,57 @@
+"""
+Tests unitaires du moteur d'optimisation des patrouilles.
+"""
+
+import unittest
+import numpy as np
+from backend.services.patrol_optimizer import PatrolOptimizer, cluster_alerts, plan_routes, haversine_matrix
+
+
+class PatrolOptimizerTestCase(unittest.TestCase):
+    """Tests du regroupement et de la construction des tournées"""
+
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.n = 2000
+        self.lat = 48.73 + rng.normal(0, 0.005, self.n)
+        self.lng = 2.29 + rng.normal(0, 0.007, self.n)
+        self.risk = rng.integers(1, 11, self.n)
+        self.ids = [f"a{i}" for i in range(self.n)]
+        self.types = ['Vol'] * self.n
+
+    def test_clusters_are_compact(self):
+        """Chaque alerte reçoit un cluster et le nombre de clusters est borné"""
+        labels = cluster_alerts(self.lat, self.lng, self.risk, 20)
+        self.assertEqual(len(labels), self.n)
+        self.assertLessEqual(labels.max() + 1, 20)
+
+    def test_routes_respect_budget(self):
+        """Aucune tournée ne dépasse la durée maximale"""
+        optimizer = PatrolOptimizer()
+        result = optimizer.optimize(self.ids, self.lat, self.lng, self.risk, self.types,
+                                    vehicles=3, budget_minutes=45)
+        self.assertTrue(result['routes'])
+        self.assertLessEqual(len(result['routes']), 3)
+        for route in result['routes']:
+            self.assertLessEqual(route['duration'], 45)
+            self.assertEqual(route['path'][0], route['path'][-1])
+
+    def test_stops_are_not_shared(self):
+        """Un même point chaud n'est visité que par une seule patrouille"""
+        travel = haversine_matrix(np.array([0.0, 0.0, 0.01, 0.02]), np.array([0.0, 0.01, 0.0, 0.02]),
+                                  np.array([0.0, 0.0, 0.01, 0.02]), np.array([0.0, 0.01, 0.0, 0.02])) / 400
+        routes = plan_routes(travel, np.array([0.0, 1, 1, 1]), np.array([0.0, 5, 3, 1]), 2, 60)
+        visited = [node for route in routes for node in route]
+        self.assertEqual(sorted(visited), [1, 2, 3])
+
+    def test_cache(self):
+        """Le cache restitue le résultat stocké pour une même signature"""
+        optimizer = PatrolOptimizer(cache_size=1)
+        optimizer.store(('sig', 3, 60), {'routes': []})
+        self.assertEqual(optimizer.get_cached(('sig', 3, 60)), {'routes': []})
+        optimizer.store(('other', 3, 60), {'routes': [1]})
+        self.assertIsNone(optimizer.get_cached(('sig', 3, 60)))
+
+
+if __name__ == '__main__':
+    unittest.main()
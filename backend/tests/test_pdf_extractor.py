@@ -0,0 +1,46 @@
+"""
+Tests du moteur d'extraction de texte PDF.
+"""
+
+import io
+import unittest
+from backend.scripts.bench_pdf import build_sample_pdf
+from backend.services.pdf_extractor import PdfExtractor, PdfLimitError
+from backend.utils.helpers import extract_text_from_pdf
+
+
+class PdfExtractorTestCase(unittest.TestCase):
+    """Tests du PdfExtractor"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.pdf = build_sample_pdf(40, lines_per_page=5)
+
+    def test_sequential_extraction_keeps_page_order(self):
+        """Les pages sont extraites dans l'ordre depuis un flux"""
+        text = PdfExtractor(workers=1).extract(io.BytesIO(self.pdf))
+        self.assertIn("Page 1 ligne 1", text)
+        self.assertLess(text.index("Page 2 ligne 5"), text.index("Page 3 ligne 1"))
+        self.assertLess(text.index("Page 39 ligne 1"), text.index("Page 40 ligne 1"))
+
+    def test_parallel_extraction_matches_sequential(self):
+        """L'extraction par plages dans le pool donne le même texte"""
+        extractor = PdfExtractor(workers=2, pages_per_task=7)
+        try:
+            self.assertEqual(extractor.extract(self.pdf, parallel=True),
+                             extractor.extract(self.pdf, parallel=False))
+        finally:
+            extractor.shutdown()
+
+    def test_limits(self):
+        """Les limites de pages et de taille sont appliquées"""
+        with self.assertRaises(PdfLimitError):
+            PdfExtractor(max_pages=10, workers=1).extract(self.pdf)
+        with self.assertRaises(PdfLimitError):
+            PdfExtractor(max_bytes=1024, workers=1).extract(io.BytesIO(self.pdf))
+        with self.assertRaises(ValueError):
+            extract_text_from_pdf(b"pas un pdf")
+
+
+if __name__ == '__main__':
+    unittest.main()
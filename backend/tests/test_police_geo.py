@@ -0,0 +1,228 @@
+"""
+Tests de l'index spatial et des requêtes géographiques sur les alertes.
+"""
+
+import unittest
+import json
+from unittest.mock import patch
+from sqlalchemy import event
+from backend.app import create_app
+from backend.config import config
+from backend.extensions import db
+from backend.models import SuspectAlert, AlertHeatmapCell
+from backend.utils.geo import (
+    geohash_encode, geohash_bounds, geohash_cover_radius, haversine_m, hex_cell, hex_center
+)
+
+
+class GeoUtilsTestCase(unittest.TestCase):
+    """Tests des fonctions géospatiales pures"""
+
+    def test_geohash_roundtrip(self):
+        """Le geohash encode une position contenue dans sa cellule"""
+        geohash = geohash_encode(48.735, 2.29, 7)
+        self.assertEqual(len(geohash), 7)
+        min_lat, min_lng, max_lat, max_lng = geohash_bounds(geohash)
+        self.assertTrue(min_lat <= 48.735 <= max_lat)
+        self.assertTrue(min_lng <= 2.29 <= max_lng)
+
+    def test_radius_cover_contains_circle(self):
+        """Les préfixes couvrant un rayon incluent les points du cercle"""
+        prefixes = geohash_cover_radius(48.735, 2.29, 400)
+        self.assertTrue(prefixes)
+        for d_lat, d_lng in [(0.0035, 0), (-0.0035, 0), (0, 0.005), (0, -0.005)]:
+            point = geohash_encode(48.735 + d_lat, 2.29 + d_lng)
+            self.assertTrue(any(point.startswith(prefix) for prefix in prefixes))
+
+    def test_haversine(self):
+        """Un degré de latitude mesure environ 111 km"""
+        self.assertAlmostEqual(haversine_m(48.0, 2.0, 49.0, 2.0), 111195, delta=50)
+
+    def test_hex_center_is_in_own_cell(self):
+        """Le centre d'un hexagone appartient à cet hexagone"""
+        q, r = hex_cell(48.735, 2.29, 500)
+        self.assertEqual(hex_cell(*hex_center(q, r, 500), 500), (q, r))
+
+
+class PoliceGeoTestCase(unittest.TestCase):
+    """Tests des endpoints géographiques de la police"""
+
+    def setUp(self):
+        self.app = create_app(config['testing'])
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.client = self.app.test_client()
+
+        response = self.client.post(
+            '/api/auth/register',
+            data=json.dumps({
+                'email': 'agent@massy.fr',
+                'username': 'agent',
+                'password': 'SecurePassword123!',
+                'first_name': 'Agent',
+                'last_name': 'Massy',
+                'role': 'police'
+            }),
+            content_type='application/json'
+        )
+        data = response.get_json()
+        self.headers = {'Authorization': f"Bearer {data['data']['access_token']}"}
+        self.user_id = data['data']['user']['id']
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def add_alert(self, lat, lng, risk=5):
+        alert = SuspectAlert(alert_type='Test', description='Alerte de test', latitude=lat,
+                             longitude=lng, risk_level=risk, user_id=self.user_id)
+        db.session.add(alert)
+        db.session.commit()
+        return alert
+
+    def test_geohash_is_indexed_on_insert(self):
+        """Le geohash est calculé à l'insertion"""
+        alert = self.add_alert(48.735, 2.29)
+        self.assertEqual(alert.geohash, geohash_encode(48.735, 2.29))
+
+    def test_nearby_filters_by_distance(self):
+        """La recherche par rayon ne renvoie que les alertes proches, triées"""
+        self.add_alert(48.7352, 2.2902)
+        self.add_alert(48.735, 2.29)
+        self.add_alert(48.76, 2.33)
+
+        response = self.client.get('/api/police/alerts/nearby?lat=48.735&lng=2.29&radius=300',
+                                   headers=self.headers)
+        data = response.get_json()['data']
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(data['count'], 2)
+        self.assertLessEqual(data['alerts'][0]['distance_m'], data['alerts'][1]['distance_m'])
+
+    def test_nearby_limit_applied_in_sql(self):
+        """La limite est appliquée par la base, sur les alertes les plus proches"""
+        for i in range(20):
+            self.add_alert(48.735 + 0.0005 * (20 - i), 2.29)
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            response = self.client.get('/api/police/alerts/nearby?lat=48.735&lng=2.29&radius=20000&limit=3',
+                                       headers=self.headers)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+        distances = [alert['distance_m'] for alert in response.get_json()['data']['alerts']]
+        self.assertEqual(len(distances), 3)
+        self.assertEqual(distances, sorted(distances))
+        self.assertLess(distances[-1], 200)
+        self.assertTrue(any('suspect_alerts' in statement and 'LIMIT' in statement for statement in statements))
+
+    def test_geo_limit_validated_and_reporter_loaded(self):
+        """limit < 1 refusé (400) ; le rapporteur est chargé avec les alertes, sans requête par alerte"""
+        for path in ('/api/police/alerts/nearby?lat=48.735&lng=2.29&radius=300',
+                     '/api/police/alerts/bbox?min_lat=48.73&min_lng=2.28&max_lat=48.74&max_lng=2.30'):
+            for limit in ('-1', '0'):
+                self.assertEqual(self.client.get(f'{path}&limit={limit}', headers=self.headers).status_code, 400)
+
+        for i in range(5):
+            self.add_alert(48.735 + 0.0001 * i, 2.29)
+        db.session.expunge_all()
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            response = self.client.get('/api/police/alerts/bbox?min_lat=48.73&min_lng=2.28&max_lat=48.74&max_lng=2.30',
+                                       headers=self.headers)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+        self.assertEqual(response.get_json()['data']['count'], 5)
+        self.assertEqual(sum('FROM suspect_alerts' in statement for statement in statements), 1)
+        self.assertFalse(any(statement.lstrip().startswith('SELECT users.') for statement in statements))
+
+    def test_bbox_query(self):
+        """La recherche par zone renvoie les alertes de la boîte"""
+        self.add_alert(48.735, 2.29)
+        self.add_alert(48.80, 2.40)
+        response = self.client.get(
+            '/api/police/alerts/bbox?min_lat=48.73&min_lng=2.28&max_lat=48.74&max_lng=2.30',
+            headers=self.headers)
+        self.assertEqual(response.get_json()['data']['count'], 1)
+
+    def test_heatmap_is_updated_incrementally(self):
+        """Les cellules de densité suivent les insertions, déplacements et suppressions"""
+        alert = self.add_alert(48.735, 2.29, risk=8)
+        self.add_alert(48.7351, 2.2901, risk=4)
+
+        response = self.client.get('/api/police/heatmap?resolution=500', headers=self.headers)
+        data = response.get_json()['data']
+        self.assertEqual(data['total_alerts'], 2)
+        self.assertEqual(len(data['cells']), 1)
+        self.assertEqual(data['cells'][0]['avg_risk'], 6)
+
+        alert.latitude = 48.80
+        db.session.commit()
+        cells = AlertHeatmapCell.query.filter(AlertHeatmapCell.resolution == 500,
+                                              AlertHeatmapCell.alert_count > 0).count()
+        self.assertEqual(cells, 2)
+
+        db.session.delete(alert)
+        db.session.commit()
+        response = self.client.get('/api/police/heatmap?resolution=500', headers=self.headers)
+        self.assertEqual(response.get_json()['data']['total_alerts'], 1)
+
+    def test_heatmap_cell_created_concurrently(self):
+        """Une cellule créée par une autre transaction entre la lecture et l'insertion est incrémentée"""
+        table = AlertHeatmapCell.__table__
+        q, r = hex_cell(48.735, 2.29, 500)
+        lat, lng = hex_center(q, r, 500)
+
+        class RacingConnection:
+            """Connexion qui insère la cellule « concurrente » juste avant notre insertion"""
+
+            def __init__(self, connection):
+                self.connection, self.raced = connection, False
+
+            def __getattr__(self, name):
+                return getattr(self.connection, name)
+
+            def race(self):
+                if not self.raced:
+                    self.raced = True
+                    self.connection.execute(table.insert().values(
+                        resolution=500, q=q, r=r, center_lat=lat, center_lng=lng, alert_count=1, risk_total=3))
+
+            def begin_nested(self):
+                self.race()
+                return self.connection.begin_nested()
+
+            def execute(self, statement, *args, **kwargs):
+                if statement.is_insert:
+                    self.race()
+                return self.connection.execute(statement, *args, **kwargs)
+
+        for upsert in (True, False):
+            with patch.object(AlertHeatmapCell, '_upsert_statement',
+                              wraps=AlertHeatmapCell._upsert_statement if upsert else lambda name: None):
+                with db.engine.begin() as connection:
+                    AlertHeatmapCell.apply_delta(RacingConnection(connection), [(48.735, 2.29, 5)])
+            cell = AlertHeatmapCell.query.filter_by(resolution=500, q=q, r=r).one()
+            self.assertEqual((cell.alert_count, cell.risk_total), (2, 8))
+            db.session.remove()
+            AlertHeatmapCell.query.delete()
+            db.session.commit()
+
+    def test_heatmap_invalid_resolution(self):
+        """Une résolution non pré-calculée est refusée"""
+        response = self.client.get('/api/police/heatmap?resolution=123', headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
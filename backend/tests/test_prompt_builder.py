@@ -0,0 +1,113 @@
+"""
+Tests de la construction des prompts du chatbot (historique, résumé, budget de tokens).
+"""
+
+import unittest
+from datetime import datetime, timedelta
+from backend.app import create_app
+from backend.config import config
+from backend.extensions import db
+from backend.models.user import User, UserRole
+from backend.models.conversation import Conversation, Message
+from backend.services.prompt_builder import PromptBuilder
+from backend.utils.tokens import count_tokens, count_message_tokens, truncate_to_tokens
+
+
+class PromptBuilderTestCase(unittest.TestCase):
+    """Tests du PromptBuilder"""
+
+    def setUp(self):
+        self.app = create_app(config['testing'])
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        user = User(email='test@massy.fr', username='testuser', first_name='Test',
+                    last_name='User', role=UserRole.CITIZEN)
+        user.set_password('SecurePassword123!')
+        db.session.add(user)
+        db.session.flush()
+
+        start = datetime(2025, 1, 1)
+        self.conversation = Conversation(user_id=user.id, title="Élections", created_at=start, updated_at=start)
+        db.session.add(self.conversation)
+        db.session.flush()
+        for i in range(30):
+            db.session.add(Message(conversation_id=self.conversation.id, sender='user' if i % 2 == 0 else 'bot',
+                                   content=f"Message numéro {i} sur le bureau de vote", created_at=start + timedelta(minutes=i)))
+        db.session.commit()
+        self.summaries = []
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def summarize(self, previous, turns):
+        self.summaries.append(len(turns))
+        return f"Résumé de {len(turns)} échanges"
+
+    def test_recent_window_and_incremental_summary(self):
+        """La fenêtre récente est conservée et les anciens tours sont résumés une seule fois"""
+        builder = PromptBuilder(history_window=6, summary_trigger=8)
+        messages = builder.build("Système", "Nouvelle question", conversation=self.conversation,
+                                 summarize=self.summarize)
+
+        self.assertEqual(messages[0]['role'], 'system')
+        self.assertIn("Résumé de 24 échanges", messages[0]['content'])
+        self.assertEqual(messages[-1], {'role': 'user', 'content': "Nouvelle question"})
+        self.assertEqual(messages[1]['content'], "Message numéro 24 sur le bureau de vote")
+        self.assertEqual(messages[-2]['role'], 'assistant')
+        self.assertEqual(self.conversation.summary_until, datetime(2025, 1, 1) + timedelta(minutes=23))
+
+        # Pas de nouveau message hors fenêtre : le résumé en cache est réutilisé
+        builder.build("Système", "Autre question", conversation=self.conversation, summarize=self.summarize)
+        self.assertEqual(self.summaries, [24])
+
+    def test_equal_timestamps_at_boundaries(self):
+        """Des messages de même date à la limite de la fenêtre ou du résumé sont résumés une fois, sans perte"""
+        Message.query.delete()
+        batch = datetime(2025, 2, 1)
+        for i in range(12):
+            db.session.add(Message(conversation_id=self.conversation.id, sender='user' if i % 2 == 0 else 'bot',
+                                   content=f"Lot {i}", created_at=batch))
+        db.session.commit()
+        ordered = Message.query.order_by(Message.created_at, Message.id).all()
+        seen = []
+
+        def summarize(previous, turns):
+            seen.extend(turn['content'] for turn in turns)
+            return f"Résumé de {len(seen)} échanges"
+
+        builder = PromptBuilder(history_window=4, summary_trigger=4)
+        builder.build("Système", "Question", conversation=self.conversation, summarize=summarize)
+        self.assertEqual(seen, [message.content for message in ordered[:8]])
+        self.assertEqual(self.conversation.summary_until_id, ordered[7].id)
+
+        for i in range(4):
+            db.session.add(Message(conversation_id=self.conversation.id, sender='user' if i % 2 == 0 else 'bot',
+                                   content=f"Suite {i}", created_at=batch + timedelta(minutes=1)))
+        db.session.commit()
+        builder.build("Système", "Question", conversation=self.conversation, summarize=summarize)
+        self.assertEqual(seen, [message.content for message in ordered])
+
+    def test_token_budget(self):
+        """Le prompt reste dans le budget et garde les messages les plus récents"""
+        builder = PromptBuilder(max_prompt_tokens=120, history_window=30, context_max_tokens=30)
+        messages = builder.build("Système", "Question", context="contexte " * 500,
+                                 conversation=self.conversation)
+
+        self.assertLessEqual(count_message_tokens(messages), 120)
+        self.assertLess(len(messages), 32)
+        self.assertEqual(messages[1]['role'], 'user')
+        self.assertEqual(messages[-2]['content'], "Message numéro 29 sur le bureau de vote")
+
+    def test_truncate_to_tokens(self):
+        """La troncature respecte le budget demandé"""
+        text = "mot " * 1000
+        self.assertLessEqual(count_tokens(truncate_to_tokens(text, 50)), 50)
+        self.assertEqual(truncate_to_tokens("court", 50), "court")
+
+
+if __name__ == '__main__':
+    unittest.main()
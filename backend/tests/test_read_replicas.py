@@ -0,0 +1,131 @@
+"""
+Tests du routage des lectures vers un réplica (deux bases SQLite fichier locales).
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+import sqlalchemy as sa
+from flask import g
+from backend.app import create_app
+from backend.config import config
+from backend.extensions import db
+from backend.models import UrbanismProject
+from backend.utils.replicas import STICKY_COOKIE, default_lag_probe, replica_engine_options, replica_router
+
+
+class ReadReplicaTestCase(unittest.TestCase):
+    """La principale contient 1 projet d'urbanisme, le réplica 3 : la réponse indique la base lue"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        replica_uri = f"sqlite:///{os.path.join(self.directory, 'replica.db')}"
+
+        class ReplicaConfig(config['testing']):
+            SQLALCHEMY_DATABASE_URI = f"sqlite:///{os.path.join(self.directory, 'primary.db')}"
+            SQLALCHEMY_REPLICA_URIS = [replica_uri]
+            REPLICA_CHECK_INTERVAL = 0
+            HTTP_CACHE_ENABLED = False
+
+        self.app = create_app(ReplicaConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        db.session.add(UrbanismProject(title='Principale', description='-'))
+        db.session.commit()
+
+        self.replica_engine = sa.create_engine(replica_uri)
+        db.metadata.create_all(self.replica_engine)
+        with self.replica_engine.begin() as connection:
+            connection.execute(sa.insert(UrbanismProject.__table__),
+                               [{'title': f'Réplica {i}', 'description': '-'} for i in range(3)])
+
+    def tearDown(self):
+        replica_router.lag_probe = default_lag_probe
+        db.session.remove()
+        db.drop_all()
+        db.engine.dispose()
+        replica_router.dispose()
+        self.replica_engine.dispose()
+        self.app_context.pop()
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def activities(self, client):
+        return len(client.get('/api/massy/recent-activity').get_json()['data']['activities'])
+
+    def test_read_only_route_uses_replica(self):
+        """Les routes @read_replica lisent le réplica ; un lecteur en retard est écarté"""
+        self.assertEqual(self.activities(self.app.test_client()), 3)
+        self.assertGreater(replica_router.reads['replica'], 0)
+
+        replica_router.lag_probe = lambda connection: 60.0
+        self.assertEqual(self.activities(self.app.test_client()), 1)
+        self.assertFalse(replica_router.health()[0]['healthy'])
+
+    def test_read_your_writes_after_commit(self):
+        """Après une écriture, le client lit la principale pendant REPLICA_STICKY_SECONDS"""
+        client = self.app.test_client()
+        response = client.post('/api/auth/register', data=json.dumps({
+            'email': 'agent@massy.fr',
+            'username': 'agent',
+            'password': 'SecurePassword123!',
+            'first_name': 'Agent',
+            'last_name': 'Massy',
+            'role': 'citizen'
+        }), content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        self.assertIn(STICKY_COOKIE, response.headers['Set-Cookie'])
+        self.assertEqual(self.activities(client), 1)
+        self.assertEqual(self.activities(self.app.test_client()), 3)
+
+    def test_writes_and_later_reads_in_request_go_to_primary(self):
+        """Dans une requête routée vers le réplica, le flush et les lectures suivantes visent la principale"""
+        with self.app.test_request_context('/api/massy/recent-activity'):
+            g.db_read_replica = True
+            self.assertEqual(UrbanismProject.query.count(), 3)
+            db.session.add(UrbanismProject(title='Nouveau', description='-'))
+            db.session.flush()
+            self.assertEqual(UrbanismProject.query.count(), 2)
+            db.session.commit()
+        with self.replica_engine.connect() as connection:
+            self.assertEqual(connection.execute(sa.select(sa.func.count()).select_from(UrbanismProject.__table__))
+                             .scalar(), 3)
+
+    def test_slow_probe_does_not_block_other_threads(self):
+        """Pendant qu'un thread sonde, les autres gardent le dernier état connu et le collage reste libre"""
+        started, release = threading.Event(), threading.Event()
+
+        def slow_probe(connection):
+            started.set()
+            release.wait(5)
+            return 0.0
+
+        replica_router.lag_probe = slow_probe
+        prober = threading.Thread(target=replica_router.pick)
+        prober.start()
+        try:
+            self.assertTrue(started.wait(5))
+            began = time.monotonic()
+            self.assertIsNotNone(replica_router.pick())
+            replica_router.mark_written('agent')
+            with self.app.test_request_context('/'):
+                self.assertTrue(replica_router.is_sticky('agent'))
+            self.assertLess(time.monotonic() - began, 1)
+        finally:
+            release.set()
+            prober.join(5)
+
+    def test_replica_connect_timeout(self):
+        """Les moteurs des réplicas abandonnent la connexion après REPLICA_CONNECT_TIMEOUT"""
+        options = replica_engine_options('postgresql://massy@replica/massy', {'REPLICA_CONNECT_TIMEOUT': 2})
+        self.assertEqual(options['connect_args'], {'connect_timeout': 2})
+        self.assertIn('pool_size', options)
+        self.assertEqual(replica_engine_options('sqlite:///replica.db', {})['connect_args'], {'timeout': 3})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+"""
+Tests de `flask massy bootstrap` et de la vérification de version du schéma.
+"""
+
+import unittest
+from sqlalchemy import insert, inspect, text
+from backend.app import create_app
+from backend.app.schema import SchemaMismatchError, bootstrap, check_schema
+from backend.config import config
+from backend.extensions import db
+from backend.models import AlertHeatmapCell, SchemaVersion, SuspectAlert, User, UserRole
+from backend.models.types import new_id
+
+
+class SchemaBootstrapTestCase(unittest.TestCase):
+    """Tests sur base SQLite en mémoire, vide au départ"""
+
+    def setUp(self):
+        self.app = create_app(config['testing'])
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.runner = self.app.test_cli_runner()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_bootstrap_is_idempotent(self):
+        """Premier passage : tables créées et version enregistrée ; second passage : rien à faire"""
+        result = self.runner.invoke(args=['massy', 'bootstrap'])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn('mis à jour', result.output)
+        self.assertIn('messages', inspect(db.engine).get_table_names())
+
+        self.assertFalse(bootstrap()['changed'])
+        result = self.runner.invoke(args=['massy', 'schema-status'])
+        self.assertEqual(result.exit_code, 0, result.output)
+
+    def test_worker_check_modes(self):
+        """Base vide ou empreinte différente : avertissement, ou refus en mode strict"""
+        self.assertTrue(check_schema(self.app))  # SCHEMA_CHECK = 'off' en test
+        self.assertFalse(check_schema(self.app, 'warn'))
+        with self.assertRaises(SchemaMismatchError):
+            check_schema(self.app, 'strict')
+
+        bootstrap()
+        self.assertTrue(check_schema(self.app, 'strict'))
+
+        db.session.get(SchemaVersion, 1).fingerprint = 'ancienne'
+        db.session.commit()
+        self.assertFalse(check_schema(self.app, 'warn'))
+        self.assertEqual(self.runner.invoke(args=['massy', 'schema-status']).exit_code, 1)
+
+    def test_missing_column_requires_migration(self):
+        """create_all ne modifie pas une table existante : le bootstrap échoue sans enregistrer de version"""
+        db.create_all()
+        db.session.execute(text('ALTER TABLE analysis_cache DROP COLUMN last_hit_at'))
+        db.session.commit()
+
+        result = self.runner.invoke(args=['massy', 'bootstrap'])
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn('analysis_cache.last_hit_at', result.output)
+        self.assertIsNone(db.session.get(SchemaVersion, 1))
+
+    def test_index_and_nullability_drift_require_migration(self):
+        """Un index absent ou une nullabilité différente sur une table existante n'est pas enregistré comme appliqué"""
+        db.create_all()
+        db.session.execute(text('DROP INDEX ix_analysis_jobs_queue'))
+        db.session.execute(text('DROP TABLE alert_heatmap_cells'))
+        db.session.execute(text('CREATE TABLE alert_heatmap_cells (resolution INTEGER, q INTEGER, r INTEGER, '
+                                'center_lat FLOAT, center_lng FLOAT, alert_count INTEGER, risk_total INTEGER, '
+                                'updated_at DATETIME, PRIMARY KEY (resolution, q, r))'))
+        db.session.commit()
+
+        result = self.runner.invoke(args=['massy', 'bootstrap'])
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn('index ix_analysis_jobs_queue absent', result.output)
+        self.assertIn('alert_heatmap_cells.center_lat : NULL au lieu de NOT NULL', result.output)
+        self.assertIsNone(db.session.get(SchemaVersion, 1))
+
+    def test_bootstrap_upgrades_baseline_schema(self):
+        """Base au schéma initial avec des alertes : la migration ajoute colonnes et index, geohash et densité"""
+        db.create_all()
+        for statement in (
+            'DROP INDEX ix_suspect_alerts_geohash_reported', 'DROP INDEX ix_suspect_alerts_lat_lng',
+            'DROP INDEX ix_conversations_user_updated', 'DROP INDEX ix_messages_conversation_created',
+            'ALTER TABLE suspect_alerts DROP COLUMN geohash', 'ALTER TABLE conversations DROP COLUMN summary',
+            'ALTER TABLE conversations DROP COLUMN summary_until',
+            'ALTER TABLE conversations DROP COLUMN summary_until_id',
+            'DROP TABLE alert_heatmap_cells', 'DROP TABLE analysis_cache', 'DROP TABLE analysis_jobs',
+            'DROP TABLE schema_version',
+        ):
+            db.session.execute(text(statement))
+        user_id = new_id()
+        db.session.execute(insert(User.__table__).values(
+            id=user_id, email='agent@massy.fr', username='agent', password_hash='x', first_name='Agent',
+            last_name='Massy', role=UserRole.POLICE))
+        # Colonnes du schéma initial seulement (pas de geohash)
+        db.session.execute(insert(SuspectAlert.__table__), [
+            {'id': new_id(), 'alert_type': 'Test', 'description': '-', 'latitude': 48.73 + i * 0.01,
+             'longitude': 2.29, 'risk_level': 5, 'status': 'new', 'user_id': user_id} for i in range(3)])
+        db.session.commit()
+
+        result = self.runner.invoke(args=['massy', 'bootstrap'])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIsNotNone(db.session.get(SchemaVersion, 1).revision)
+        self.assertEqual(SuspectAlert.query.filter(SuspectAlert.geohash.isnot(None)).count(), 3)
+        total = sum(cell.alert_count for cell in AlertHeatmapCell.query.filter_by(resolution=500))
+        self.assertEqual(total, 3)
+        indexes = {index['name'] for index in inspect(db.engine).get_indexes('suspect_alerts')}
+        self.assertIn('ix_suspect_alerts_geohash_reported', indexes)
+
+        result = self.runner.invoke(args=['massy', 'rebuild-heatmap', '--batch-size', '2'])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn('3 alerte(s) indexée(s)', result.output)
+        db.session.expire_all()
+        total = sum(cell.alert_count for cell in AlertHeatmapCell.query.filter_by(resolution=500))
+        self.assertEqual(total, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+"""
+Tests du profil de production gunicorn et des hooks de cycle de vie des workers.
+"""
+
+import importlib.util
+import multiprocessing
+import os
+import runpy
+import unittest
+from unittest.mock import patch
+from backend.app import create_app
+from backend.app.serving import reset_after_fork, warm_worker
+from backend.config import config
+from backend.extensions import db
+
+CONF_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'gunicorn.conf.py')
+
+
+def load_conf(**env):
+    with patch.dict(os.environ, env):
+        settings = runpy.run_path(CONF_PATH)
+        settings['_environ'] = dict(os.environ)
+    return settings
+
+
+class GunicornConfTestCase(unittest.TestCase):
+    """Tests de backend/gunicorn.conf.py"""
+
+    def test_worker_sizing_per_class(self):
+        """Nombre de workers et de threads selon la classe choisie"""
+        cores = multiprocessing.cpu_count()
+        gthread = load_conf(GUNICORN_WORKER_CLASS='gthread', GUNICORN_THREADS='8')
+        self.assertEqual((gthread['workers'], gthread['threads']), (cores + 1, 8))
+        self.assertTrue(gthread['preload_app'])
+        self.assertEqual(gthread['wsgi_app'], 'backend.wsgi:app')
+
+        sync = load_conf(GUNICORN_WORKER_CLASS='sync', GUNICORN_MAX_REQUESTS='500')
+        self.assertEqual((sync['workers'], sync['threads']), (2 * cores + 1, 1))
+        self.assertEqual((sync['max_requests'], sync['max_requests_jitter']), (500, 50))
+
+        if importlib.util.find_spec('gevent') is None:
+            self.assertEqual(load_conf(GUNICORN_WORKER_CLASS='gevent')['worker_class'], 'gthread')
+        with self.assertRaises(ValueError):
+            load_conf(GUNICORN_WORKER_CLASS='eventlet')
+
+    def test_sync_never_runs_under_gunicorn(self):
+        """Ni le maître ni les workers ne synchronisent : le maître reste sans thread avant le fork"""
+        settings = load_conf(AUTO_SYNC_ON_STARTUP='true', SCHEDULER_ENABLED='true')
+        self.assertEqual(settings['_environ']['AUTO_SYNC_ON_STARTUP'], 'false')
+        self.assertEqual(settings['_environ']['SCHEDULER_ENABLED'], 'false')
+        self.assertEqual(settings['_environ']['JOB_QUEUE_AUTOSTART'], 'false')
+
+        server = type('Server', (), {})()
+        server.log = type('Log', (), {'warning': lambda self, message: warnings.append(message)})()
+        warnings = []
+        with patch('backend.scripts.auto_sync.init_app') as init_app:
+            settings['when_ready'](server)
+        init_app.assert_not_called()
+        self.assertIn('auto_sync --schedule', warnings[0])
+
+    def test_sync_disabled_by_default(self):
+        """Hors processus dédié, create_app ne lance ni synchro ni scheduler"""
+        self.assertFalse(config['default'].AUTO_SYNC_ON_STARTUP)
+        self.assertFalse(config['default'].SCHEDULER_ENABLED)
+
+        with patch.dict(os.environ):
+            os.environ.pop('AUTO_SYNC_ON_STARTUP', None)
+            os.environ.pop('SCHEDULER_ENABLED', None)
+            settings = load_conf()
+        self.assertFalse(settings['_sync_requested'])
+
+
+class WorkerLifecycleTestCase(unittest.TestCase):
+    """Tests de reset_after_fork et warm_worker"""
+
+    def setUp(self):
+        self.app = create_app(config['testing'])
+
+    def test_reset_after_fork_replaces_connection_pool(self):
+        """Le pool hérité du maître est abandonné sans fermer ses connexions"""
+        with self.app.app_context():
+            pool = db.engine.pool
+        reset_after_fork(self.app)
+        with self.app.app_context():
+            self.assertIsNot(db.engine.pool, pool)
+
+    def test_warm_worker_fills_response_cache(self):
+        """Les chemins préchauffés sont servis depuis le cache dès la première requête"""
+        self.app.config['SERVING_WARM_PATHS'] = ['/api/transport/stations']
+        warm_worker(self.app)
+        response = self.app.test_client().get('/api/transport/stations')
+        self.assertEqual(response.headers['X-Cache'], 'HIT')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+"""
+Tests du démarrage de l'application : aucun travail bloquant ni dépendance lourde dans create_app.
+"""
+
+import unittest
+from unittest.mock import patch
+from backend.app import create_app
+from backend.config import config
+from backend.scripts.bench_startup import measure_startup, parse_importtime
+
+
+class StartupTestCase(unittest.TestCase):
+    """Tests de create_app et du profil d'import"""
+
+    def test_heavy_modules_not_imported_by_create_app(self):
+        """chromadb, bs4, apscheduler et les moteurs PDF ne sont chargés qu'à l'usage"""
+        result = measure_startup('testing')
+        self.assertEqual(result['heavy_loaded'], [])
+        self.assertTrue(any(name == 'backend.app' for name, _, _ in result['imports']))
+
+    def test_sync_and_scheduler_follow_configuration(self):
+        """Aucune synchro ni scheduler en test ; sinon synchro dans un thread, jamais dans create_app"""
+        with patch('backend.scripts.auto_sync.auto_sync_all') as sync, \
+                patch('backend.scripts.auto_sync.start_scheduler') as scheduler:
+            create_app(config['testing'])
+            sync.assert_not_called()
+            scheduler.assert_not_called()
+
+        class SyncConfig(config['testing']):
+            AUTO_SYNC_ON_STARTUP = True
+            SCHEDULER_ENABLED = True
+
+        with patch('backend.scripts.auto_sync.threading.Thread') as thread, \
+                patch('backend.scripts.auto_sync.auto_sync_all') as sync, \
+                patch('backend.scripts.auto_sync.start_scheduler') as scheduler:
+            app = create_app(SyncConfig)
+            sync.assert_not_called()
+            thread.return_value.start.assert_called_once()
+            scheduler.assert_called_once_with(app, 30)
+
+    def test_parse_importtime(self):
+        """Lecture de la sortie de -X importtime"""
+        entries = parse_importtime(
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |   bs4.element\n"
+            "import time:       300 |        420 | bs4\n"
+        )
+        self.assertEqual(entries, [('bs4.element', 120, 1), ('bs4', 420, 0)])
+
+
+if __name__ == '__main__':
+    unittest.main()
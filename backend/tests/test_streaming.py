@@ -0,0 +1,72 @@
+"""
+Tests des réponses JSON diffusées en flux (/api/police/alerts, /api/auth/users).
+"""
+
+import json
+import unittest
+from backend.app import create_app
+from backend.config import config
+from backend.extensions import db
+from backend.models import SuspectAlert
+
+
+class StreamingResponseTestCase(unittest.TestCase):
+    """Tests du tableau JSON et du NDJSON diffusés par lots"""
+
+    def setUp(self):
+        self.app = create_app(config['testing'])
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.client = self.app.test_client()
+
+        response = self.client.post('/api/auth/register', data=json.dumps({
+            'email': 'agent@massy.fr',
+            'username': 'agent',
+            'password': 'SecurePassword123!',
+            'first_name': 'Agent',
+            'last_name': 'Massy',
+            'role': 'police'
+        }), content_type='application/json')
+        data = response.get_json()['data']
+        self.headers = {'Authorization': f"Bearer {data['access_token']}"}
+        # Plus d'un lot (500 lignes) pour couvrir les séparateurs entre lots
+        db.session.add_all([
+            SuspectAlert(alert_type='Test', description=f'Alerte {i}', latitude=48.73 + i * 1e-5,
+                         longitude=2.29, risk_level=i % 10 + 1, user_id=data['user']['id'])
+            for i in range(1203)
+        ])
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_json_array_keeps_response_envelope(self):
+        """Le flux est un document create_response() valide contenant toutes les lignes"""
+        response = self.client.get('/api/police/alerts?status=all', headers=self.headers)
+        self.assertTrue(response.is_streamed)
+        body = json.loads(response.get_data())
+        self.assertTrue(body['success'])
+        self.assertEqual(body['status'], 200)
+        alerts = body['data']['alerts']
+        self.assertEqual(len(alerts), 1203)
+        self.assertEqual(len({alert['id'] for alert in alerts}), 1203)
+        self.assertEqual(alerts[0]['reporter']['username'], 'agent')
+
+    def test_ndjson_and_count(self):
+        """NDJSON sur demande ; le nombre d'éléments suit le tableau"""
+        response = self.client.get('/api/police/alerts?status=all&format=ndjson', headers=self.headers)
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        lines = response.get_data(as_text=True).splitlines()
+        self.assertEqual(len(lines), 1203)
+        self.assertIn('risk_level', json.loads(lines[0]))
+
+        users = json.loads(self.client.get('/api/auth/users', headers=self.headers).get_data())
+        self.assertEqual(users['data']['count'], 1)
+        self.assertEqual(users['data']['users'][0]['username'], 'agent')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+"""
+Tests de la réception des fichiers téléversés (spool sur disque, empreinte, plafonds).
+"""
+
+import hashlib
+import io
+import json
+import os
+import tempfile
+import unittest
+from backend.app import create_app
+from backend.config import config
+from backend.extensions import db
+from backend.utils.uploads import HashingSpoolFile, UploadTooLargeError, get_upload
+from flask import request
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.test import EnvironBuilder
+
+
+class UploadsTestCase(unittest.TestCase):
+    """Tests via /api/media/analyze-video et /api/market/analyze"""
+
+    def setUp(self):
+        self.app = create_app(config['testing'])
+        self.spool_dir = tempfile.mkdtemp()
+        self.app.config['UPLOAD_SPOOL_DIR'] = self.spool_dir
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.client = self.app.test_client()
+        response = self.client.post('/api/auth/register', data=json.dumps({
+            'email': 'agent@massy.fr',
+            'username': 'agentuser',
+            'password': 'SecurePassword123!',
+            'first_name': 'Test',
+            'last_name': 'User',
+            'role': 'citizen'
+        }), content_type='application/json')
+        self.headers = {'Authorization': f"Bearer {response.get_json()['data']['access_token']}"}
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_upload_hashed_while_spooled_then_removed(self):
+        """Le fichier est haché pendant la réception et supprimé en fin de requête"""
+        content = os.urandom(300 * 1024)
+        response = self.client.post('/api/media/analyze-video', headers=self.headers,
+                                    content_type='multipart/form-data',
+                                    data={'video': (io.BytesIO(content), 'patrouille.mp4')})
+        data = response.get_json()['data']
+        self.assertEqual(data['size'], len(content))
+        self.assertEqual(data['sha256'], hashlib.sha256(content).hexdigest())
+        self.assertEqual(os.listdir(self.spool_dir), [])
+
+    def test_declared_length_over_endpoint_cap_rejected(self):
+        """Un Content-Length au-delà du plafond de la route est refusé avant lecture du corps"""
+        self.app.config['UPLOAD_PDF_MAX_BYTES'] = 1024
+        response = self.client.post('/api/market/analyze', headers=self.headers,
+                                    content_type='multipart/form-data',
+                                    data={'file': (io.BytesIO(b'%PDF' + b'0' * 4096), 'dce.pdf')})
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(os.listdir(self.spool_dir), [])
+
+    def test_spool_file_enforces_cap_while_writing(self):
+        """Sans Content-Length, l'écriture s'interrompt dès que le plafond est atteint"""
+        spooled = HashingSpoolFile(self.spool_dir, max_bytes=10)
+        spooled.write(b'0123456789')
+        with self.assertRaises(RequestEntityTooLarge):
+            spooled.write(b'x')
+        spooled.close()
+        self.assertEqual(os.listdir(self.spool_dir), [])
+
+    def test_oversize_body_without_length_leaves_no_partial_file(self):
+        """Corps sans Content-Length au-delà du plafond : aucun fichier .part ne reste dans le spool"""
+        builder = EnvironBuilder(method='POST', path='/api/media/analyze-video',
+                                 data={'video': (io.BytesIO(os.urandom(64 * 1024)), 'patrouille.mp4'),
+                                       'note': 'ronde'})
+        environ = builder.get_environ()
+        del environ['CONTENT_LENGTH']
+        environ['wsgi.input_terminated'] = True
+        with self.app.request_context(environ):
+            request.upload_limit = 1024
+            with self.assertRaises(UploadTooLargeError):
+                get_upload('video')
+            self.assertEqual(os.listdir(self.spool_dir), [])
+            request.close()
+        self.assertEqual(os.listdir(self.spool_dir), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+"""
+Tests du cache des utilisateurs authentifiés.
+"""
+
+import unittest
+import json
+from sqlalchemy import event
+from backend.app import create_app
+from backend.config import config
+from backend.extensions import db
+from backend.services.user_cache import user_cache
+
+
+class UserCacheTestCase(unittest.TestCase):
+    """Vérifie que l'autorisation ne coûte aucune requête SQL sur le chemin chaud"""
+
+    def setUp(self):
+        self.app = create_app(config['testing'])
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        self.client = self.app.test_client()
+        user_cache.clear()
+
+        response = self.client.post(
+            '/api/auth/register',
+            data=json.dumps({
+                'email': 'agent@massy.fr',
+                'username': 'agent',
+                'password': 'SecurePassword123!',
+                'first_name': 'Agent',
+                'last_name': 'Massy',
+                'role': 'police'
+            }),
+            content_type='application/json'
+        )
+        data = response.get_json()['data']
+        self.headers = {'Authorization': f"Bearer {data['access_token']}"}
+        self.user_id = data['user']['id']
+
+        self.statements = []
+        event.listen(db.engine, 'before_cursor_execute', self.count_statement)
+
+    def tearDown(self):
+        event.remove(db.engine, 'before_cursor_execute', self.count_statement)
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def count_statement(self, conn, cursor, statement, *args):
+        self.statements.append(statement)
+
+    def test_profile_served_from_cache(self):
+        """Après un premier chargement, /me ne fait plus de requête"""
+        self.client.get('/api/auth/me', headers=self.headers)
+        self.statements.clear()
+        response = self.client.get('/api/auth/me', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['data']['user']['email'], 'agent@massy.fr')
+        self.assertEqual(self.statements, [])
+
+    def test_role_check_without_query(self):
+        """Le contrôle d'accès police ne requête pas la table users"""
+        self.client.get('/api/police/alerts', headers=self.headers)
+        self.statements.clear()
+        self.client.get('/api/police/alerts', headers=self.headers)
+        self.assertFalse([s for s in self.statements if 'FROM users' in s])
+
+    def test_profile_update_invalidates_cache(self):
+        """La mise à jour du profil invalide l'entrée en cache"""
+        self.client.get('/api/auth/me', headers=self.headers)
+        self.client.put(f'/api/auth/users/{self.user_id}', json={'first_name': 'Nouveau'}, headers=self.headers)
+        response = self.client.get('/api/auth/me', headers=self.headers)
+        self.assertEqual(response.get_json()['data']['user']['first_name'], 'Nouveau')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+"""
+Tests des identifiants UUID (UUIDv7, stockage compact, conversion d'une base existante).
+"""
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+import uuid
+import sqlalchemy as sa
+from backend.app import create_app
+from backend.config import config
+from backend.extensions import db
+from backend.models import SuspectAlert, User
+from backend.models.types import GUID, new_id, uuid7
+from backend.scripts.convert_uuid_storage import convert
+
+
+class UuidStorageTestCase(unittest.TestCase):
+    """Tests du type GUID et du script de conversion"""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_uuid7_is_time_ordered(self):
+        """Version 7, variante RFC, chaînes canoniques croissantes d'une milliseconde à l'autre"""
+        value = uuid7()
+        self.assertEqual(value.version, 7)
+        self.assertEqual(value.variant, uuid.RFC_4122)
+        identifier = new_id()
+        self.assertEqual(str(uuid.UUID(identifier)), identifier)
+
+        ids = []
+        for _ in range(5):
+            ids.append(str(uuid7()))
+            time.sleep(0.002)
+        self.assertEqual(ids, sorted(ids))
+
+    def test_native_storage_round_trip(self):
+        """Stockage en 16 octets sous SQLite, chaîne canonique côté Python, id mal formé sans résultat"""
+        metadata = sa.MetaData()
+        table = sa.Table('items', metadata, sa.Column('id', GUID(storage='native'), primary_key=True))
+        engine = sa.create_engine('sqlite://')
+        metadata.create_all(engine)
+        identifier = new_id()
+        with engine.begin() as connection:
+            connection.execute(sa.insert(table), {'id': identifier})
+            raw = connection.exec_driver_sql('SELECT id FROM items').scalar()
+            self.assertEqual(raw, uuid.UUID(identifier).bytes)
+            self.assertEqual(connection.execute(sa.select(table.c.id).where(table.c.id == identifier)).scalar(),
+                             identifier)
+            self.assertIsNone(connection.execute(sa.select(table.c.id).where(table.c.id == 'inconnu')).scalar())
+        engine.dispose()
+
+    def test_convert_string_database_to_native(self):
+        """La conversion conserve les lignes et les identifiants, stockés ensuite sur 16 octets"""
+        source_url = f"sqlite:///{os.path.join(self.directory, 'string.db')}"
+        target_url = f"sqlite:///{os.path.join(self.directory, 'native.db')}"
+
+        class FileConfig(config['testing']):
+            SQLALCHEMY_DATABASE_URI = source_url
+
+        app = create_app(FileConfig)
+        with app.app_context():
+            db.create_all()
+            user = User(email='agent@massy.fr', username='agent', first_name='Agent', last_name='Massy',
+                        password_hash='x')
+            db.session.add(user)
+            db.session.flush()
+            db.session.add(SuspectAlert(alert_type='Test', description='-', latitude=48.73, longitude=2.29,
+                                        risk_level=5, user_id=user.id))
+            db.session.commit()
+            user_id = user.id
+            db.session.remove()
+            db.engine.dispose()
+
+        counts = convert(source_url, target_url, 'string', 'native', log=lambda message: None)
+        self.assertEqual(counts['users'], 1)
+        self.assertEqual(counts['suspect_alerts'], 1)
+
+        engine = sa.create_engine(target_url)
+        with engine.connect() as connection:
+            self.assertEqual(connection.exec_driver_sql('SELECT id FROM users').scalar(), uuid.UUID(user_id).bytes)
+            self.assertEqual(connection.exec_driver_sql('SELECT user_id FROM suspect_alerts').scalar(),
+                             uuid.UUID(user_id).bytes)
+        engine.dispose()
+
+        with self.assertRaises(RuntimeError):
+            convert(source_url, target_url, log=lambda message: None)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,8 +3,8 @@ Package utils pour helpers et sécurité.
 Permet d'importer les fonctions directement.
 """
 
-from .security import hash_password, check_password, validate_password, validate_email
+from .security import hash_password, check_password, password_cost, validate_password, validate_email
 
 __all__ = [
-    "hash_password", "check_password", "validate_password", "validate_email"
+    "hash_password", "check_password", "password_cost", "validate_password", "validate_email"
 ]
@@ -0,0 +1,157 @@
+"""
+Compression des réponses HTTP (brotli ou gzip) selon Accept-Encoding.
+
+- Seuil minimal : les petites réponses ne sont pas compressées (gain nul, CPU perdu).
+- Liste blanche de types de contenu (JSON, NDJSON, HTML, CSS, JS, SVG, texte).
+- Réponses diffusées en flux compressées morceau par morceau, avec vidage
+  après chaque morceau : le client reçoit les lots au fil de l'eau.
+- Un ETag fort devient faible une fois la réponse compressée (représentation
+  différente, contenu équivalent) ; les 304 restent possibles.
+
+brotli est optionnel : sans lui, seul gzip est proposé.
+"""
+
+import zlib
+from typing import Iterable, Optional
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dépendance optionnelle
+    brotli = None
+
+DEFAULT_MIMETYPES = (
+    'application/json', 'application/x-ndjson', 'application/javascript', 'application/xml',
+    'image/svg+xml', 'text/html', 'text/css', 'text/plain', 'text/javascript', 'text/csv', 'text/xml'
+)
+
+
+def parse_accept_encoding(header: Optional[str]) -> dict:
+    """Accept-Encoding -> {codage: q}"""
+    accepted = {}
+    for part in (header or '').split(','):
+        name, _, params = part.strip().partition(';')
+        if not name:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+    return accepted
+
+
+class _GzipStream:
+    def __init__(self, level: int):
+        # wbits=31 : en-tête et somme de contrôle gzip
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliStream:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class Compressor:
+    """Compression des réponses par hook after_request"""
+
+    def __init__(self, enabled: bool = True, min_size: int = 1024, gzip_level: int = 6,
+                 brotli_quality: int = 4, mimetypes: Iterable[str] = DEFAULT_MIMETYPES):
+        self.enabled = enabled
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.mimetypes = frozenset(mimetypes)
+
+    def init_app(self, app):
+        """Applique la configuration et enregistre le hook (appelé par create_app)"""
+        config = app.config
+        self.enabled = config.get('COMPRESS_ENABLED', self.enabled)
+        self.min_size = config.get('COMPRESS_MIN_SIZE', self.min_size)
+        self.gzip_level = config.get('COMPRESS_GZIP_LEVEL', self.gzip_level)
+        self.brotli_quality = config.get('COMPRESS_BROTLI_QUALITY', self.brotli_quality)
+        self.mimetypes = frozenset(config.get('COMPRESS_MIMETYPES') or self.mimetypes)
+        app.after_request(self.after_request)
+
+    def choose_encoding(self, header: Optional[str]) -> Optional[str]:
+        accepted = parse_accept_encoding(header)
+        wildcard = accepted.get('*', 0.0)
+        candidates = (['br'] if brotli is not None else []) + ['gzip']
+        best, best_quality = None, 0.0
+        for encoding in candidates:
+            quality = accepted.get(encoding, wildcard)
+            if quality > best_quality:
+                best, best_quality = encoding, quality
+        return best
+
+    def _stream(self, encoding: str):
+        return _BrotliStream(self.brotli_quality) if encoding == 'br' else _GzipStream(self.gzip_level)
+
+    def _eligible(self, response) -> bool:
+        if not self.enabled or request.method == 'HEAD':
+            return False
+        if response.status_code < 200 or response.status_code in (204, 206, 304):
+            return False
+        if response.direct_passthrough or 'Content-Encoding' in response.headers:
+            return False
+        if response.mimetype not in self.mimetypes:
+            return False
+        return 'no-transform' not in response.headers.get('Cache-Control', '')
+
+    def after_request(self, response):
+        if not self._eligible(response):
+            return response
+        response.vary.add('Accept-Encoding')
+        encoding = self.choose_encoding(request.headers.get('Accept-Encoding'))
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = self._compress_iter(response.response, self._stream(encoding))
+            response.headers.pop('Content-Length', None)
+        else:
+            body = response.get_data()
+            if len(body) < self.min_size:
+                return response
+            stream = self._stream(encoding)
+            response.set_data(stream.compress(body) + stream.finish())
+
+        response.headers['Content-Encoding'] = encoding
+        etag = response.headers.get('ETag')
+        if etag and not etag.startswith('W/'):
+            response.headers['ETag'] = f'W/{etag}'
+        return response
+
+    @staticmethod
+    def _compress_iter(chunks, stream) -> Iterable[bytes]:
+        try:
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode('utf-8')
+                if chunk:
+                    yield stream.compress(chunk)
+            yield stream.finish()
+        finally:
+            close = getattr(chunks, 'close', None)
+            if close:
+                close()
+
+
+# Instance globale
+compressor = Compressor()
@@ -0,0 +1,81 @@
+"""
+Profils de moteur SQLAlchemy par type de base.
+
+- PostgreSQL / MySQL : pool dimensionné (pool_size, max_overflow, pool_timeout),
+  pre-ping contre les connexions coupées par le serveur ou un proxy, recyclage
+  périodique. Avec des workers gthread, pool_size + max_overflow doit couvrir
+  GUNICORN_THREADS.
+- SQLite fichier : pragmas appliqués à chaque nouvelle connexion — journal WAL
+  (lecteurs et écrivain ne se bloquent plus), synchronous=NORMAL (sûr en WAL),
+  busy_timeout (attente du verrou au lieu de « database is locked »), mmap et cache.
+- SQLite en mémoire (tests) : options par défaut de Flask-SQLAlchemy.
+
+SQLALCHEMY_ENGINE_OPTIONS, si défini dans la configuration, complète et remplace
+les options calculées ici.
+"""
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+
+def _is_memory_sqlite(url) -> bool:
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+
+def engine_options(uri: str, config) -> dict:
+    """Options de create_engine() selon le type de base de `uri`"""
+    url = make_url(uri)
+    if url.get_backend_name() == 'sqlite':
+        return {}
+    return {
+        'pool_size': config.get('DB_POOL_SIZE', 10),
+        'max_overflow': config.get('DB_MAX_OVERFLOW', 20),
+        'pool_timeout': config.get('DB_POOL_TIMEOUT', 30),
+        'pool_recycle': config.get('DB_POOL_RECYCLE', 1800),
+        'pool_pre_ping': config.get('DB_POOL_PRE_PING', True),
+    }
+
+
+def sqlite_pragmas(config, memory: bool = False) -> list:
+    """Pragmas (nom, valeur) appliqués à chaque connexion SQLite"""
+    pragmas = [
+        ('busy_timeout', config.get('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+        ('synchronous', config.get('SQLITE_SYNCHRONOUS', 'NORMAL')),
+        ('cache_size', -abs(config.get('SQLITE_CACHE_SIZE_KB', 20000))),
+        ('temp_store', 'MEMORY'),
+    ]
+    if not memory:
+        # WAL et mmap n'ont de sens que pour une base fichier
+        pragmas.insert(0, ('journal_mode', config.get('SQLITE_JOURNAL_MODE', 'WAL')))
+        pragmas.append(('mmap_size', config.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)))
+    return pragmas
+
+
+def install_sqlite_pragmas(engine, config):
+    """Écoute l'ouverture des connexions SQLite du moteur pour y appliquer les pragmas"""
+    if engine.dialect.name != 'sqlite':
+        return
+    pragmas = sqlite_pragmas(config, memory=_is_memory_sqlite(engine.url))
+
+    @event.listens_for(engine, 'connect')
+    def _apply_pragmas(dbapi_connection, _connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas:
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
+
+
+def init_app(app):
+    """Calcule SQLALCHEMY_ENGINE_OPTIONS (à appeler avant db.init_app)"""
+    config = app.config
+    overrides = config.get('SQLALCHEMY_ENGINE_OPTIONS') or {}
+    config['SQLALCHEMY_ENGINE_OPTIONS'] = {**engine_options(config['SQLALCHEMY_DATABASE_URI'], config), **overrides}
+
+
+def configure_engines(app, db):
+    """Installe les pragmas SQLite sur les moteurs créés (à appeler après db.init_app)"""
+    with app.app_context():
+        for engine in db.engines.values():
+            install_sqlite_pragmas(engine, app.config)
@@ -0,0 +1,237 @@
+"""
+Outils géospatiaux : geohash, distances et grille hexagonale.
+
+Utilisés pour indexer les alertes (colonne `geohash`) et pré-calculer
+les cartes de densité affichées sur la carte de la police.
+"""
+
+import math
+from typing import Dict, Iterable, List, Tuple
+
+EARTH_RADIUS_M = 6371000.0
+
+# Latitude de référence (Massy) pour la projection locale de la grille hexagonale
+REFERENCE_LATITUDE = 48.73
+
+# Précision du geohash stocké sur chaque alerte (~5 m)
+GEOHASH_PRECISION = 9
+
+# Tailles (rayon en mètres) des hexagones maintenus dans la table de densité
+HEATMAP_RESOLUTIONS_M = (250, 500, 1000)
+
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+_BASE32_INDEX = {c: i for i, c in enumerate(_BASE32)}
+_SQRT3 = math.sqrt(3)
+
+
+# -------------------------------
+# Geohash
+# -------------------------------
+def geohash_encode(lat: float, lng: float, precision: int = GEOHASH_PRECISION) -> str:
+    """
+    Encode une position en geohash.
+
+    Args:
+        lat: Latitude en degrés.
+        lng: Longitude en degrés.
+        precision: Nombre de caractères du geohash.
+
+    Returns:
+        Chaîne geohash.
+    """
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        rng, value = (lng_range, lng) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            rng[0] = mid
+        else:
+            bits <<= 1
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return ''.join(chars)
+
+
+def geohash_prefix_range(prefix: str) -> Tuple[str, str]:
+    """Bornes [début, fin) des geohash commençant par `prefix` : filtre servi par un index B-tree"""
+    return prefix, prefix + '~'  # '~' est après tous les caractères base32
+
+
+def geohash_bounds(geohash: str) -> Tuple[float, float, float, float]:
+    """Retourne la boîte (min_lat, min_lng, max_lat, max_lng) d'un geohash"""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    even = True
+    for char in geohash:
+        value = _BASE32_INDEX[char]
+        for shift in range(4, -1, -1):
+            rng = lng_range if even else lat_range
+            mid = (rng[0] + rng[1]) / 2
+            if (value >> shift) & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+    return lat_range[0], lng_range[0], lat_range[1], lng_range[1]
+
+
+def geohash_cell_size(precision: int, lat: float = REFERENCE_LATITUDE) -> Tuple[float, float]:
+    """Dimensions approximatives (hauteur, largeur) en mètres d'une cellule geohash"""
+    lng_bits = math.ceil(5 * precision / 2)
+    lat_bits = 5 * precision - lng_bits
+    height = 180.0 / (2 ** lat_bits) * 111320.0
+    width = 360.0 / (2 ** lng_bits) * 111320.0 * math.cos(math.radians(lat))
+    return height, width
+
+
+def geohash_neighbors(geohash: str) -> List[str]:
+    """Retourne le geohash et ses 8 voisins (même précision)"""
+    min_lat, min_lng, max_lat, max_lng = geohash_bounds(geohash)
+    d_lat = max_lat - min_lat
+    d_lng = max_lng - min_lng
+    center_lat = (min_lat + max_lat) / 2
+    center_lng = (min_lng + max_lng) / 2
+    cells = []
+    for i in (-1, 0, 1):
+        for j in (-1, 0, 1):
+            lat = center_lat + i * d_lat
+            if not -90.0 <= lat <= 90.0:
+                continue
+            lng = (center_lng + j * d_lng + 180.0) % 360.0 - 180.0
+            cell = geohash_encode(lat, lng, len(geohash))
+            if cell not in cells:
+                cells.append(cell)
+    return cells
+
+
+def geohash_cover_radius(lat: float, lng: float, radius_m: float) -> List[str]:
+    """
+    Calcule les préfixes geohash couvrant un cercle.
+
+    On choisit la précision la plus fine dont la cellule est au moins aussi
+    grande que le rayon : la cellule centrale et ses 8 voisines couvrent alors
+    entièrement le cercle.
+
+    Returns:
+        Liste de préfixes, vide si le rayon dépasse la cellule la plus grossière.
+    """
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        height, width = geohash_cell_size(precision, lat)
+        if min(height, width) >= radius_m:
+            return geohash_neighbors(geohash_encode(lat, lng, precision))
+    return []
+
+
+# -------------------------------
+# Distances
+# -------------------------------
+def haversine_m(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """Distance orthodromique en mètres entre deux points"""
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lng2 - lng1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))
+
+
+def radius_bounding_box(lat: float, lng: float, radius_m: float) -> Tuple[float, float, float, float]:
+    """Boîte englobante (min_lat, min_lng, max_lat, max_lng) d'un cercle"""
+    d_lat = math.degrees(radius_m / EARTH_RADIUS_M)
+    cos_lat = max(math.cos(math.radians(lat)), 1e-6)
+    d_lng = math.degrees(radius_m / (EARTH_RADIUS_M * cos_lat))
+    return lat - d_lat, lng - d_lng, lat + d_lat, lng + d_lng
+
+
+def validate_bbox(min_lat: float, min_lng: float, max_lat: float, max_lng: float) -> bool:
+    """Vérifie qu'une boîte englobante est cohérente"""
+    return (-90.0 <= min_lat <= max_lat <= 90.0) and (-180.0 <= min_lng <= max_lng <= 180.0)
+
+
+# -------------------------------
+# Grille hexagonale
+# -------------------------------
+def _project(lat: float, lng: float) -> Tuple[float, float]:
+    """Projection équirectangulaire locale (mètres) centrée sur Massy"""
+    x = EARTH_RADIUS_M * math.radians(lng) * math.cos(math.radians(REFERENCE_LATITUDE))
+    y = EARTH_RADIUS_M * math.radians(lat)
+    return x, y
+
+
+def _unproject(x: float, y: float) -> Tuple[float, float]:
+    lat = math.degrees(y / EARTH_RADIUS_M)
+    lng = math.degrees(x / (EARTH_RADIUS_M * math.cos(math.radians(REFERENCE_LATITUDE))))
+    return lat, lng
+
+
+def hex_cell(lat: float, lng: float, size_m: float) -> Tuple[int, int]:
+    """
+    Retourne les coordonnées axiales (q, r) de l'hexagone contenant un point.
+
+    Args:
+        lat: Latitude.
+        lng: Longitude.
+        size_m: Rayon de l'hexagone en mètres.
+    """
+    x, y = _project(lat, lng)
+    qf = (_SQRT3 / 3 * x - y / 3) / size_m
+    rf = (2 / 3 * y) / size_m
+    sf = -qf - rf
+    q, r, s = round(qf), round(rf), round(sf)
+    dq, dr, ds = abs(q - qf), abs(r - rf), abs(s - sf)
+    if dq > dr and dq > ds:
+        q = -r - s
+    elif dr > ds:
+        r = -q - s
+    return int(q), int(r)
+
+
+def hex_center(q: int, r: int, size_m: float) -> Tuple[float, float]:
+    """Centre (lat, lng) d'un hexagone"""
+    x = size_m * (_SQRT3 * q + _SQRT3 / 2 * r)
+    y = size_m * 1.5 * r
+    return _unproject(x, y)
+
+
+def hex_boundary(q: int, r: int, size_m: float) -> List[Dict[str, float]]:
+    """Sommets de l'hexagone, prêts pour un polygone Leaflet"""
+    cx = size_m * (_SQRT3 * q + _SQRT3 / 2 * r)
+    cy = size_m * 1.5 * r
+    vertices = []
+    for i in range(6):
+        angle = math.radians(60 * i - 30)
+        lat, lng = _unproject(cx + size_m * math.cos(angle), cy + size_m * math.sin(angle))
+        vertices.append({'lat': lat, 'lng': lng})
+    return vertices
+
+
+def heatmap_deltas(points: Iterable[Tuple[float, float, int]], sign: int = 1) -> Dict[Tuple[int, int, int], List[int]]:
+    """
+    Agrège des alertes en variations de cellules pour toutes les résolutions.
+
+    Args:
+        points: Itérable de (latitude, longitude, niveau de risque).
+        sign: +1 pour un ajout, -1 pour une suppression.
+
+    Returns:
+        Dict {(résolution, q, r): [nombre, somme des risques]}.
+    """
+    deltas: Dict[Tuple[int, int, int], List[int]] = {}
+    for lat, lng, risk in points:
+        for size in HEATMAP_RESOLUTIONS_M:
+            key = (size,) + hex_cell(lat, lng, size)
+            delta = deltas.setdefault(key, [0, 0])
+            delta[0] += sign
+            delta[1] += sign * int(risk or 0)
+    return deltas
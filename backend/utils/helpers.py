@@ -1,25 +1,18 @@
 from flask import jsonify
 from typing import Dict, Optional, Union, Tuple, Any
+from datetime import datetime
+import base64
 import re
 
-import re
-from typing import Optional
-from flask import jsonify
-import PyPDF2
 
 def extract_text_from_pdf(file) -> str:
     """
     Extrait le texte d'un fichier PDF.
-    `file` doit être un objet FileStorage (Flask `request.files['file']`)
+    `file` peut être un objet FileStorage (Flask `request.files['file']`), un chemin ou des octets.
+    Délègue au moteur d'extraction (pages en flux, pool de processus pour les gros fichiers).
     """
-    try:
-        reader = PyPDF2.PdfReader(file)
-        text = ""
-        for page in reader.pages:
-            text += page.extract_text() + "\n"
-        return text.strip()
-    except Exception as e:
-        raise ValueError(f"Erreur lors de l'extraction du texte du PDF: {e}")
+    from backend.services.pdf_extractor import pdf_extractor
+    return pdf_extractor.extract(file)
 
 
 def create_response(
@@ -74,6 +67,36 @@ def error_response(
     return jsonify(response), status_code
 
 
+def encode_cursor(created_at: datetime, item_id: str) -> str:
+    """
+    Encode un curseur de pagination par clé (date, identifiant).
+
+    Args:
+        created_at: Date de l'élément servant de borne.
+        item_id: Identifiant de l'élément (départage les dates égales).
+
+    Returns:
+        Curseur opaque utilisable dans une URL.
+    """
+    raw = f"{created_at.isoformat()}|{item_id}".encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """
+    Décode un curseur produit par `encode_cursor`.
+
+    Raises:
+        ValueError: si le curseur est invalide.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('utf-8')
+        created_at, item_id = raw.split('|', 1)
+        return datetime.fromisoformat(created_at), item_id
+    except Exception:
+        raise ValueError("Curseur de pagination invalide")
+
+
 def sanitize_input(input_string: str) -> str:
     """
     Nettoie une chaîne de caractères pour éviter les injections ou caractères non désirés.
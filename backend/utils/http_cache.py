@@ -0,0 +1,172 @@
+"""
+Cache HTTP des endpoints de lecture.
+
+`@cached_response(...)` ajoute à une route GET :
+- un ETag (fort par défaut, faible avec `weak=True`) calculé sur le corps ;
+- la réponse 304 sans corps si `If-None-Match` correspond ;
+- l'en-tête Cache-Control (public/private, max-age, stale-while-revalidate) ;
+- optionnellement, un cache serveur des réponses rendues (`server_ttl`),
+  indexé par chemin et paramètres : la vue n'est plus exécutée tant que
+  l'entrée est valide (`X-Cache: HIT`).
+
+Seules les réponses 200 non diffusées en flux sont mises en cache.
+Le décorateur se place sous `@jwt_required` : l'authentification reste vérifiée
+à chaque requête, même quand la réponse vient du cache.
+"""
+
+import functools
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Sequence
+
+from flask import current_app, request
+
+
+class _Entry:
+    __slots__ = ('body', 'status', 'headers', 'etag', 'expires_at')
+
+    def __init__(self, body: bytes, status: int, headers: list, etag: str, expires_at: float):
+        self.body = body
+        self.status = status
+        self.headers = headers
+        self.etag = etag
+        self.expires_at = expires_at
+
+
+class ResponseCache:
+    """Cache LRU en mémoire des réponses rendues (par processus)"""
+
+    def __init__(self, enabled: bool = True, max_entries: int = 512):
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def configure(self, config):
+        """Applique la configuration Flask (appelé par create_app)"""
+        self.enabled = config.get('HTTP_CACHE_ENABLED', self.enabled)
+        self.max_entries = config.get('HTTP_CACHE_MAX_ENTRIES', self.max_entries)
+        self.clear()
+
+    def get(self, key: tuple) -> Optional[_Entry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires_at <= time.monotonic():
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def set(self, key: tuple, entry: _Entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, endpoint: Optional[str] = None) -> int:
+        """Supprime les entrées d'un endpoint (ou toutes)"""
+        with self._lock:
+            keys = [key for key in self._entries if endpoint is None or key[0] == endpoint]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def clear(self):
+        self.invalidate()
+        self.hits = self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+def compute_etag(body: bytes, weak: bool = False) -> str:
+    digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+    return f'W/"{digest}"' if weak else f'"{digest}"'
+
+
+def _not_modified(etag: str) -> bool:
+    # Comparaison faible (RFC 9110) : W/"x" et "x" désignent la même représentation pour un GET
+    candidates = request.headers.get('If-None-Match')
+    if not candidates:
+        return False
+    if candidates.strip() == '*':
+        return True
+    opaque = etag[2:] if etag.startswith('W/') else etag
+    return any((tag.strip()[2:] if tag.strip().startswith('W/') else tag.strip()) == opaque
+               for tag in candidates.split(','))
+
+
+def _finalize(response, etag: str, max_age: int, public: bool, stale_while_revalidate: Optional[int],
+              vary: Sequence[str], cache_state: Optional[str]):
+    response.headers['ETag'] = etag
+    directives = ['public' if public else 'private', f'max-age={max_age}']
+    if stale_while_revalidate:
+        directives.append(f'stale-while-revalidate={stale_while_revalidate}')
+    if max_age == 0:
+        directives.append('must-revalidate')
+    response.headers['Cache-Control'] = ', '.join(directives)
+    for header in vary:
+        response.vary.add(header)
+    if cache_state:
+        response.headers['X-Cache'] = cache_state
+    if _not_modified(etag):
+        response.status_code = 304
+        response.set_data(b'')
+        response.headers.pop('Content-Length', None)
+    return response
+
+
+def cached_response(max_age: int = 0, public: bool = True, server_ttl: Optional[int] = None,
+                    weak: bool = False, stale_while_revalidate: Optional[int] = None,
+                    vary: Sequence[str] = ()):
+    """
+    Décorateur de route GET : ETag, requêtes conditionnelles, Cache-Control et cache serveur.
+
+    Args:
+        max_age: Durée de fraîcheur côté navigateur/CDN (secondes).
+        public: Cache-Control public (CDN autorisé) ou private (navigateur uniquement).
+        server_ttl: Durée de conservation de la réponse rendue côté serveur ; None = pas de cache serveur.
+        weak: ETag faible (contenu équivalent plutôt qu'identique à l'octet près).
+        stale_while_revalidate: Fenêtre pendant laquelle un cache peut servir une réponse périmée.
+        vary: En-têtes de requête dont dépend la réponse (ajoutés à Vary et à la clé du cache serveur).
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(*args, **kwargs)
+            options = (max_age, public, stale_while_revalidate, vary)
+
+            use_server_cache = bool(server_ttl) and response_cache.enabled
+            key = None
+            if use_server_cache:
+                key = (request.endpoint, request.path, tuple(sorted(request.args.items(multi=True))),
+                       tuple(request.headers.get(header, '') for header in vary))
+                entry = response_cache.get(key)
+                if entry is not None:
+                    response = current_app.response_class(entry.body, status=entry.status, headers=entry.headers)
+                    return _finalize(response, entry.etag, *options, 'HIT')
+
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code != 200 or response.is_streamed:
+                return response
+            body = response.get_data()
+            etag = compute_etag(body, weak)
+            if use_server_cache:
+                headers = [(name, value) for name, value in response.headers.items()
+                           if name.lower() not in ('content-length', 'set-cookie')]
+                response_cache.set(key, _Entry(body, response.status_code, headers, etag,
+                                               time.monotonic() + server_ttl))
+            return _finalize(response, etag, *options, 'MISS' if use_server_cache else None)
+        return wrapper
+    return decorator
+
+
+# Instance globale
+response_cache = ResponseCache()
@@ -0,0 +1,99 @@
+"""
+Sérialisation JSON des réponses de l'API.
+
+`OrJSONProvider` remplace le module `json` de la bibliothèque standard par orjson
+(implémentation native, plusieurs fois plus rapide sur les grandes listes) :
+- datetime, date, UUID et dataclasses sérialisés nativement (ISO 8601) ;
+- réponse construite directement en octets, sans passage par une chaîne Python ;
+- clés non triées par défaut (le tri coûte plus cher que la sérialisation elle-même).
+
+Les objets qu'orjson ne sait pas traiter (entiers de plus de 64 bits…) sont
+sérialisés par le module standard, avec les mêmes conventions.
+"""
+
+import dataclasses
+import decimal
+import json
+import uuid
+from datetime import date
+from typing import Any
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dépendance optionnelle
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    """Types non natifs : mêmes conventions qu'orjson (dates ISO 8601)"""
+    if isinstance(obj, date):
+        return obj.isoformat()
+    if isinstance(obj, (decimal.Decimal, uuid.UUID)):
+        return str(obj)
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    if hasattr(obj, '__html__'):
+        return str(obj.__html__())
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class StdlibJSONProvider(DefaultJSONProvider):
+    """Module standard, dates en ISO 8601 (comme orjson) plutôt qu'au format HTTP"""
+
+    default = staticmethod(_default)
+    ensure_ascii = False
+    sort_keys = False
+
+
+class OrJSONProvider(StdlibJSONProvider):
+    """Sérialisation orjson, repli sur le module standard pour les cas non gérés"""
+
+    def _options(self, indent: bool = False) -> int:
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps_bytes(self, obj: Any, indent: bool = False) -> bytes:
+        try:
+            return orjson.dumps(obj, default=self.default, option=self._options(indent))
+        except orjson.JSONEncodeError:
+            # Entier hors 64 bits, clé de type inattendu… : module standard
+            return json.dumps(obj, default=self.default, ensure_ascii=False, sort_keys=self.sort_keys,
+                              indent=2 if indent else None,
+                              separators=None if indent else (',', ':')).encode('utf-8')
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if kwargs:
+            # Options propres au module standard (cls, indent personnalisé…)
+            return super().dumps(obj, **kwargs)
+        return self.dumps_bytes(obj).decode('utf-8')
+
+    def loads(self, s, **kwargs: Any) -> Any:
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self.dumps_bytes(obj, indent) + b"\n", mimetype=self.mimetype)
+
+
+def make_json_provider(app):
+    """
+    Fournisseur JSON selon `JSON_PROVIDER` : 'orjson', 'stdlib', ou 'auto'
+    (orjson s'il est installé).
+    """
+    choice = app.config.get('JSON_PROVIDER', 'auto')
+    if choice == 'orjson' and orjson is None:
+        raise RuntimeError("JSON_PROVIDER=orjson mais orjson n'est pas installé")
+    if choice == 'stdlib' or orjson is None:
+        return StdlibJSONProvider(app)
+    return OrJSONProvider(app)
@@ -0,0 +1,233 @@
+"""
+Routage des lectures vers des réplicas de la base.
+
+- Les routes marquées `@read_replica` lisent sur un réplica (SQLALCHEMY_REPLICA_URIS),
+  choisi à tour de rôle parmi ceux qui répondent et dont le retard est sous
+  REPLICA_MAX_LAG_SECONDS ; sinon, repli sur la base principale.
+- Les écritures (flush, INSERT/UPDATE/DELETE explicites) vont toujours sur la principale.
+- Lecture de ses propres écritures : après une écriture, la suite de la requête lit
+  sur la principale, ainsi que les requêtes suivantes du même client pendant
+  REPLICA_STICKY_SECONDS (cookie, et identité JWT pour les clients sans cookie).
+- Sans réplica configuré, tout passe par la principale, comme avant.
+
+L'état de santé de chaque réplica est sondé au plus toutes les REPLICA_CHECK_INTERVAL
+secondes par processus, pendant la requête qui en a besoin : un seul thread sonde à
+la fois, les autres utilisent le dernier état connu sans attendre. La connexion à un
+réplica injoignable abandonne après REPLICA_CONNECT_TIMEOUT secondes.
+"""
+
+import functools
+import itertools
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+import sqlalchemy as sa
+from flask import g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.sql.dml import UpdateBase
+
+logger = logging.getLogger(__name__)
+
+STICKY_COOKIE = 'db_read_primary'
+
+
+def replica_engine_options(uri: str, config) -> dict:
+    """Options de create_engine() d'un réplica : celles de la principale, plus un délai de connexion"""
+    from backend.utils.database import engine_options
+
+    options = engine_options(uri, config)
+    timeout = config.get('REPLICA_CONNECT_TIMEOUT', 3)
+    backend = sa.engine.make_url(uri).get_backend_name()
+    if backend == 'sqlite':
+        options['connect_args'] = {'timeout': timeout}
+    elif backend in ('postgresql', 'mysql', 'mariadb'):
+        options['connect_args'] = {'connect_timeout': max(1, int(timeout))}
+    return options
+
+
+def default_lag_probe(connection) -> float:
+    """Retard de réplication en secondes (0 si la base ne sait pas le mesurer)"""
+    if connection.dialect.name == 'postgresql':
+        lag = connection.exec_driver_sql(
+            "SELECT CASE WHEN pg_is_in_recovery() "
+            "THEN COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) ELSE 0 END"
+        ).scalar()
+        return float(lag or 0)
+    connection.exec_driver_sql('SELECT 1')
+    return 0.0
+
+
+class _Replica:
+    __slots__ = ('engine', 'healthy', 'lag', 'checked_at')
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.healthy = True
+        self.lag = 0.0
+        self.checked_at = 0.0
+
+
+class ReplicaRouter:
+    """Réplicas de lecture du processus et état de santé"""
+
+    def __init__(self, max_lag: float = 5.0, check_interval: float = 5.0, sticky_seconds: int = 10,
+                 max_sticky_users: int = 10000):
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.sticky_seconds = sticky_seconds
+        self.max_sticky_users = max_sticky_users
+        self.lag_probe: Callable = default_lag_probe
+        self._replicas: List[_Replica] = []
+        self._cycle = itertools.count()
+        self._sticky_users: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._probe_lock = threading.Lock()
+        self.reads = {'replica': 0, 'primary': 0}
+
+    def init_app(self, app):
+        """Crée les moteurs des réplicas et branche le cookie de collage (appelé par create_app)"""
+        from backend.utils.database import install_sqlite_pragmas
+
+        config = app.config
+        self.max_lag = config.get('REPLICA_MAX_LAG_SECONDS', self.max_lag)
+        self.check_interval = config.get('REPLICA_CHECK_INTERVAL', self.check_interval)
+        self.sticky_seconds = config.get('REPLICA_STICKY_SECONDS', self.sticky_seconds)
+        self.dispose()
+        self._replicas = []
+        for uri in config.get('SQLALCHEMY_REPLICA_URIS') or ():
+            engine = sa.create_engine(uri, **replica_engine_options(uri, config))
+            install_sqlite_pragmas(engine, config)
+            self._replicas.append(_Replica(engine))
+        self._sticky_users.clear()
+        self.reads = {'replica': 0, 'primary': 0}
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._replicas)
+
+    def dispose(self, close: bool = True):
+        """Libère les pools (close=False après un fork, voir backend/app/serving.py)"""
+        for replica in self._replicas:
+            replica.engine.dispose(close=close)
+
+    def _check(self, replica: _Replica):
+        try:
+            with replica.engine.connect() as connection:
+                replica.lag = self.lag_probe(connection)
+            replica.healthy = replica.lag <= self.max_lag
+            if not replica.healthy:
+                logger.warning(f"Réplica {replica.engine.url.render_as_string()} en retard de {replica.lag:.1f} s")
+        except Exception as e:
+            replica.healthy = False
+            logger.warning(f"Réplica {replica.engine.url.render_as_string()} indisponible : {e}")
+        replica.checked_at = time.monotonic()
+
+    def pick(self):
+        """Moteur d'un réplica sain, None si aucun (lecture sur la principale)"""
+        if not self._replicas:
+            return None
+        now = time.monotonic()
+        due = [replica for replica in self._replicas if now - replica.checked_at >= self.check_interval]
+        # Sonde hors du verrou de collage ; si un autre thread sonde déjà, on garde le dernier état connu
+        if due and self._probe_lock.acquire(blocking=False):
+            try:
+                for replica in due:
+                    if time.monotonic() - replica.checked_at >= self.check_interval:
+                        self._check(replica)
+            finally:
+                self._probe_lock.release()
+        healthy = [replica for replica in self._replicas if replica.healthy]
+        if not healthy:
+            return None
+        return healthy[next(self._cycle) % len(healthy)].engine
+
+    def health(self) -> List[Dict]:
+        return [{'url': replica.engine.url.render_as_string(), 'healthy': replica.healthy,
+                 'lag_seconds': round(replica.lag, 3)} for replica in self._replicas]
+
+    # Lecture de ses propres écritures
+
+    def mark_written(self, identity: Optional[str]):
+        if identity is None or not self.sticky_seconds:
+            return
+        with self._lock:
+            self._sticky_users[identity] = time.time() + self.sticky_seconds
+            self._sticky_users.move_to_end(identity)
+            while len(self._sticky_users) > self.max_sticky_users:
+                self._sticky_users.popitem(last=False)
+
+    def is_sticky(self, identity: Optional[str]) -> bool:
+        now = time.time()
+        try:
+            if float(request.cookies.get(STICKY_COOKIE, 0)) > now:
+                return True
+        except ValueError:
+            pass
+        with self._lock:
+            return identity is not None and self._sticky_users.get(identity, 0) > now
+
+    @staticmethod
+    def _before_request():
+        # g suit le contexte d'application, qui peut survivre à plusieurs requêtes (tests, CLI)
+        for name in ('db_read_replica', 'db_replica_engine', 'db_wrote'):
+            g.pop(name, None)
+
+    def _after_request(self, response):
+        if g.get('db_wrote') and self.enabled and self.sticky_seconds:
+            response.set_cookie(STICKY_COOKIE, str(int(time.time()) + self.sticky_seconds),
+                                max_age=self.sticky_seconds, httponly=True, samesite='Lax')
+        return response
+
+
+def _jwt_identity() -> Optional[str]:
+    try:
+        from flask_jwt_extended import get_jwt
+        return get_jwt().get('sub')
+    except Exception:
+        return None
+
+
+def read_replica(view):
+    """Décorateur de route en lecture seule : les requêtes SELECT peuvent aller sur un réplica"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if replica_router.enabled and not replica_router.is_sticky(_jwt_identity()):
+            g.db_read_replica = True
+        return view(*args, **kwargs)
+    return wrapper
+
+
+class RoutingSession(Session):
+    """Session Flask-SQLAlchemy qui envoie les lectures des routes @read_replica sur un réplica"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        primary = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        if bind is not None or not has_request_context() or not g.get('db_read_replica'):
+            return primary
+        if self._flushing or g.get('db_wrote') or isinstance(clause, UpdateBase):
+            return primary
+        if primary is not self._db.engines.get(None):
+            return primary  # Modèle rattaché à une autre base (__bind_key__)
+        replica = g.get('db_replica_engine')
+        if replica is None:
+            replica = replica_router.pick() or primary
+            g.db_replica_engine = replica
+        replica_router.reads['replica' if replica is not primary else 'primary'] += 1
+        return replica
+
+
+@event.listens_for(RoutingSession, 'after_flush')
+def _record_write(session, _flush_context):
+    if has_request_context():
+        g.db_wrote = True
+        replica_router.mark_written(_jwt_identity())
+
+
+# Instance globale
+replica_router = ReplicaRouter()
@@ -47,17 +47,18 @@ def validate_password(password: str) -> Tuple[bool, str]:
     return True, "Mot de passe valide"
 
 
-def hash_password(password: str) -> str:
+def hash_password(password: str, rounds: int = 12) -> str:
     """
     Hash un mot de passe avec bcrypt.
 
     Args:
         password: Mot de passe en clair.
+        rounds: Facteur de coût bcrypt.
 
     Returns:
         Mot de passe hashé en string UTF-8.
     """
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
 
 
 def check_password(hashed_password: str, password: str) -> bool:
@@ -72,3 +73,19 @@ def check_password(hashed_password: str, password: str) -> bool:
         True si le mot de passe correspond au hash, False sinon.
     """
     return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+
+
+def password_cost(hashed_password: str) -> int:
+    """
+    Extrait le facteur de coût d'un hash bcrypt ($2b$12$...).
+
+    Args:
+        hashed_password: Mot de passe hashé.
+
+    Returns:
+        Facteur de coût, ou 0 si le hash n'est pas reconnu.
+    """
+    try:
+        return int(hashed_password.split('$')[2])
+    except (AttributeError, IndexError, ValueError):
+        return 0
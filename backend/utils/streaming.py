@@ -0,0 +1,86 @@
+"""
+Réponses JSON en flux pour les grandes collections.
+
+Les lignes sont lues par lots (`yield_per`, curseur serveur sur PostgreSQL),
+sérialisées lot par lot et envoyées au fil de l'eau : la mémoire consommée
+ne dépend plus du nombre de lignes.
+
+Deux formats :
+- tableau JSON dans l'enveloppe habituelle de create_response()
+  ({"success", "message", "status", "data": {<clé>: [...], ...}}) ;
+- NDJSON (une ligne JSON par élément, sans enveloppe) avec `?format=ndjson`
+  ou `Accept: application/x-ndjson`.
+"""
+
+import logging
+from typing import Any, Callable, Dict, Optional
+
+from flask import Response, current_app, request, stream_with_context
+
+from backend.extensions import db
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+
+
+def wants_ndjson() -> bool:
+    if request.args.get('format') == 'ndjson':
+        return True
+    return request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE]) == NDJSON_MIMETYPE
+
+
+def _batches(query, batch_size: int):
+    batch = []
+    for row in query.yield_per(batch_size):
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def stream_query(query, serialize: Callable[[Any], dict], key: str, message: str = "Succès",
+                 batch_size: int = 500, extra: Optional[Dict[str, Any]] = None,
+                 with_count: bool = False) -> Response:
+    """
+    Diffuse les résultats d'une requête SQLAlchemy.
+
+    Args:
+        query: Requête (non exécutée) ; lue par lots de `batch_size`.
+        serialize: Ligne -> dict (typiquement `Model.to_dict`).
+        key: Clé du tableau dans `data`.
+        message: Message de l'enveloppe.
+        extra: Champs supplémentaires de `data`, écrits après le tableau.
+        with_count: Ajoute `count` (nombre d'éléments diffusés) après le tableau.
+    """
+    dumps = current_app.json.dumps
+    ndjson = wants_ndjson()
+
+    def generate():
+        count = 0
+        try:
+            if not ndjson:
+                head = dumps({'success': True, 'message': message, 'status': 200})
+                yield f'{head[:-1]},"data":{{{dumps(key)}:['
+            for batch in _batches(query, batch_size):
+                items = [serialize(row) for row in batch]
+                if ndjson:
+                    yield "".join(dumps(item) + "\n" for item in items)
+                else:
+                    # Un seul appel de sérialisation par lot ; crochets du lot retirés
+                    yield ("," if count else "") + dumps(items)[1:-1]
+                # La session ne garde que des références faibles : le lot envoyé est libéré
+                count += len(items)
+            if not ndjson:
+                tail = dict(extra or {})
+                if with_count:
+                    tail['count'] = count
+                yield "]" + ("," + dumps(tail)[1:-1] if tail else "") + "}}\n"
+        except Exception as e:
+            # Statut déjà envoyé : le document tronqué signale l'erreur au client
+            logger.error(f"Erreur pendant la diffusion de '{key}' après {count} élément(s): {e}")
+            db.session.rollback()
+
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE if ndjson else 'application/json')
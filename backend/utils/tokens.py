@@ -0,0 +1,65 @@
+"""
+Estimation locale du nombre de tokens d'un texte.
+
+Utilise `tiktoken` s'il est installé, sinon une approximation rapide par
+expression régulière (mots et ponctuation), suffisante pour borner un prompt.
+"""
+
+import math
+import re
+
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+_TOKENS_PER_WORD = 1.3  # Les mots français longs sont découpés en plusieurs tokens
+_MESSAGE_OVERHEAD = 4   # Rôle et séparateurs ajoutés par l'API pour chaque message
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding('cl100k_base')
+except Exception:  # tiktoken absent ou encodage indisponible hors ligne
+    _encoding = None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Estime le nombre de tokens d'un texte.
+
+    Args:
+        text: Texte à mesurer.
+
+    Returns:
+        Nombre de tokens (estimation).
+    """
+    if not text:
+        return 0
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return math.ceil(len(_TOKEN_PATTERN.findall(text)) * _TOKENS_PER_WORD)
+
+
+def count_message_tokens(messages) -> int:
+    """Estime la taille d'une liste de messages au format chat"""
+    return sum(count_tokens(message['content']) + _MESSAGE_OVERHEAD for message in messages)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Tronque un texte pour qu'il tienne dans un budget de tokens.
+
+    Args:
+        text: Texte à tronquer.
+        max_tokens: Budget maximal.
+
+    Returns:
+        Texte éventuellement tronqué (suffixé par « … »).
+    """
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+    if _encoding is not None:
+        return _encoding.decode(_encoding.encode(text, disallowed_special=())[:max_tokens - 1]) + "…"
+    kept_words = int((max_tokens - 1) / _TOKENS_PER_WORD)
+    matches = list(_TOKEN_PATTERN.finditer(text))
+    if kept_words <= 0 or not matches:
+        return "…"
+    return text[:matches[min(kept_words, len(matches)) - 1].end()] + "…"
@@ -0,0 +1,185 @@
+"""
+Réception des fichiers téléversés sans les charger en mémoire.
+
+- Chaque fichier d'un formulaire multipart est écrit directement sur disque
+  (dossier UPLOAD_SPOOL_DIR) au fil de la lecture du corps de la requête,
+  et son empreinte SHA-256 est calculée pendant l'écriture.
+- Les routes déclarent leur plafond avec `@limit_upload('CLE_CONFIG')` :
+  un Content-Length trop grand est refusé (413) avant toute lecture du corps,
+  et un corps sans Content-Length est interrompu dès que le plafond est atteint.
+- Les services reçoivent un chemin de fichier (SpooledUpload.path), jamais les octets.
+- Le fichier temporaire est supprimé à la fin de la requête, sauf s'il a été
+  déplacé entre-temps (par exemple vers la file des analyses), y compris quand
+  la lecture du corps échoue (plafond dépassé, client déconnecté).
+"""
+
+import functools
+import hashlib
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from typing import Optional
+
+from flask import Request, current_app, request
+from werkzeug.exceptions import RequestEntityTooLarge
+
+from backend.utils.helpers import error_response
+
+
+class UploadTooLargeError(ValueError):
+    """Fichier ou corps de requête au-delà du plafond de l'endpoint"""
+
+
+def _limit_message(limit: int) -> str:
+    return f"Fichier trop volumineux (maximum {limit // (1024 * 1024)} Mo)"
+
+
+class HashingSpoolFile:
+    """
+    Fichier temporaire sur disque qui calcule son SHA-256 et sa taille à l'écriture.
+    Fournit l'interface attendue par Werkzeug (write, read, readline, seek).
+    """
+
+    def __init__(self, directory: str, max_bytes: Optional[int] = None):
+        os.makedirs(directory, exist_ok=True)
+        self._file = tempfile.NamedTemporaryFile(dir=directory, prefix='upload-', suffix='.part', delete=False)
+        self.path = self._file.name
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._hash = hashlib.sha256()
+
+    def write(self, data: bytes) -> int:
+        self.size += len(data)
+        if self.max_bytes is not None and self.size > self.max_bytes:
+            self.close()  # Fichier partiel : jamais rattaché à request.files
+            raise RequestEntityTooLarge(_limit_message(self.max_bytes))
+        self._hash.update(data)
+        return self._file.write(data)
+
+    @property
+    def sha256(self) -> str:
+        return self._hash.hexdigest()
+
+    def __getattr__(self, name):
+        # read, readline, seek, tell, flush… délégués au fichier sous-jacent
+        return getattr(self._file, name)
+
+    def __iter__(self):
+        return iter(self._file)
+
+    def close(self):
+        self._file.close()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass  # Déjà déplacé par la route
+
+
+class UploadRequest(Request):
+    """Requête Flask dont les fichiers sont spoolés sur disque avec plafond par endpoint"""
+
+    upload_limit: Optional[int] = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._spool_files = []
+
+    @property
+    def max_content_length(self) -> Optional[int]:
+        if self.upload_limit is not None:
+            return self.upload_limit
+        return super().max_content_length
+
+    @property
+    def max_form_memory_size(self) -> Optional[int]:
+        # Champs texte du formulaire (hors fichiers), gardés en mémoire par Werkzeug
+        return current_app.config.get('UPLOAD_FORM_MEMORY_SIZE') if current_app else None
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        directory = current_app.config.get('UPLOAD_SPOOL_DIR') or os.path.join(current_app.instance_path, 'uploads')
+        spooled = HashingSpoolFile(directory, self.max_content_length)
+        # Suivi de tous les fichiers créés : si l'analyse du corps échoue, ils n'apparaissent pas dans request.files
+        self._spool_files.append(spooled)
+        return spooled
+
+    def discard_spool_files(self):
+        """Ferme et supprime les fichiers spoolés de la requête (sauf ceux déjà déplacés)"""
+        for spooled in self._spool_files:
+            spooled.close()
+        self._spool_files = []
+
+    def close(self):
+        super().close()
+        self.discard_spool_files()
+
+
+@dataclass
+class SpooledUpload:
+    """Fichier téléversé, déjà écrit sur disque et haché"""
+    filename: str
+    content_type: Optional[str]
+    path: str
+    size: int
+    sha256: str
+
+
+def limit_upload(config_key: str):
+    """
+    Décorateur de route : plafonne le corps de la requête à `app.config[config_key]` octets.
+    Le Content-Length annoncé est vérifié avant toute lecture du corps.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            limit = current_app.config.get(config_key)
+            if limit:
+                if request.content_length is not None and request.content_length > limit:
+                    return error_response(_limit_message(limit), 413)
+                request.upload_limit = limit
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def get_upload(field: str, extensions: Optional[tuple] = None) -> Optional[SpooledUpload]:
+    """
+    Fichier `field` de la requête multipart courante.
+
+    Returns:
+        SpooledUpload, ou None si le champ est absent.
+
+    Raises:
+        UploadTooLargeError: si le plafond de l'endpoint est dépassé pendant la lecture.
+        ValueError: si le nom de fichier est vide ou l'extension refusée.
+    """
+    try:
+        storage = request.files.get(field)
+    except RequestEntityTooLarge:
+        if isinstance(request, UploadRequest):
+            request.discard_spool_files()  # Fichier partiel, pas de suite possible
+        raise UploadTooLargeError(_limit_message(request.max_content_length or 0))
+    if storage is None:
+        return None
+    if not storage.filename:
+        raise ValueError("Aucun fichier sélectionné")
+    if extensions and not storage.filename.lower().endswith(extensions):
+        raise ValueError(f"Le fichier doit être au format {', '.join(e.lstrip('.').upper() for e in extensions)}")
+    stream = storage.stream
+    stream.flush()
+    return SpooledUpload(storage.filename, storage.mimetype, stream.path, stream.size, stream.sha256)
+
+
+def move_upload(upload: SpooledUpload, destination: str) -> str:
+    """Déplace le fichier spoolé hors du dossier temporaire (il ne sera plus supprimé en fin de requête)"""
+    os.makedirs(os.path.dirname(destination), exist_ok=True)
+    if os.path.exists(destination):
+        return destination  # Même contenu déjà présent
+    try:
+        os.replace(upload.path, destination)
+    except OSError:
+        # Autre système de fichiers : copie (le fichier spoolé sera supprimé en fin de requête)
+        shutil.copyfile(upload.path, f"{destination}.tmp")
+        os.replace(f"{destination}.tmp", destination)
+    upload.path = destination
+    return destination